@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Gemini Enterprise Financial Scenarios Report Generator
+Creates the scenario PDF next to the Gemini strategy documents in gemini/
+
+The stated 18-month scenario ranges are recomputed by gemini_scenarios from
+their drivers (seat growth, bundle price, market share, partner mix and
+investment) and set against the figures in the README and the GTM 6-pager.
+
+Usage: python gemini_scenario_report.py [output.pdf | - | --validate]
+"""
+
+import os
+import sys
+
+import shared_engine  # noqa: F401 - puts sierra/scripts on sys.path
+from report_story import Story, report_date, inch, letter, TA_CENTER, TA_JUSTIFY, banded_table, validate_story
+from gemini_scenarios import (GEMINI_DIR, BASELINE_ARR_B, BASELINE_SEATS_M, ADDRESSABLE_SEATS_M, ENTERPRISES,
+                              DRIVERS, load_scenarios, scenario_ranges, summary_table_rows, driver_table_rows,
+                              range_table_rows, composition_table_rows, envelope_table_rows)
+
+# Short name used by the report tools and as the style registry namespace
+REPORT_KEY = 'gemini'
+
+OUTPUT_PATH = os.path.normpath(os.path.join(GEMINI_DIR, "Gemini_Enterprise_Financial_Scenarios.pdf"))
+
+# Monte Carlo draws per scenario and grid points per driver behind the tables
+SAMPLES = 200_000
+SEED = 2025
+GRID_POINTS = 8
+
+# Paragraph styles: key -> (style name, parent, attributes)
+STYLE_SPECS = {
+    'title': ('CustomTitle', 'Heading1', dict(
+        fontSize=20, spaceAfter=24, alignment=TA_CENTER, textColor='#1a73e8')),
+    'subtitle': ('CustomSubtitle', 'Heading2', dict(
+        fontSize=13, spaceAfter=18, alignment=TA_CENTER, textColor='grey')),
+    'section': ('SectionHeader', 'Heading2', dict(
+        fontSize=14, spaceBefore=18, spaceAfter=10, textColor='#1a73e8')),
+    'body': ('BodyText', 'Normal', dict(fontSize=10, spaceAfter=10, alignment=TA_JUSTIFY)),
+    'formula': ('Formula', 'Code', dict(fontSize=9, leftIndent=24, spaceAfter=10)),
+    'author': ('AuthorStyle', 'Normal', dict(fontSize=12, alignment=TA_CENTER, spaceAfter=6)),
+}
+
+# Table themes: name -> TableStyle commands
+TABLE_SPECS = {
+    'summary': banded_table('#1a73e8', 9, 9, align='CENTER', valign='MIDDLE', extra=[
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ]),
+    'drivers': banded_table('#34a853', 9, 9, body_bg='whitesmoke', valign='MIDDLE'),
+    'scenario': banded_table('#1a73e8', 8, 8, align='CENTER', valign='MIDDLE', extra=[
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ]),
+}
+
+# Page geometry shared by the layout pass and the final canvas
+PAGE_MARGINS = dict(rightMargin=0.75*inch, leftMargin=0.75*inch, topMargin=0.75*inch, bottomMargin=0.75*inch)
+
+
+def build_story(date=None, scenarios=None, samples=SAMPLES, seed=SEED):
+    """Describe the scenario report as a Story of page-aligned sections
+
+    date is printed on the title page (default: report_story.report_date()),
+    scenarios default to gemini_scenarios.load_scenarios(), and samples and
+    seed set the Monte Carlo draws behind the recomputed ranges.
+    """
+    scenarios = scenarios or load_scenarios()
+    date = date or report_date()
+    ranges = scenario_ranges(scenarios, samples, seed)
+
+    story = Story(title="Gemini Enterprise Financial Scenarios", author="Rohit Kelapure")
+
+    # Title page
+    story.spacer(1.5*inch)
+    story.paragraph('title', "Gemini Enterprise Financial Scenarios")
+    story.paragraph('subtitle', "18-month ARR, market share, investment and ROI recomputed from explicit drivers")
+    story.spacer(0.4*inch)
+    story.paragraph('author', "Prepared by: Rohit Kelapure")
+    story.paragraph('author', f"Date: {date.strftime('%B %d, %Y')}")
+    story.spacer(0.4*inch)
+    story.table('summary', summary_table_rows(ranges), [1.2*inch, 1.3*inch, 1.1*inch, 1.4*inch, 1.1*inch])
+    story.page_break()
+
+    # 1. Model
+    story.heading('section', "1. From drivers to ARR", 1)
+    story.paragraph('body', f"""The strategy documents state each scenario as ranges for ARR, market share, investment and ROI, starting from a <b>${BASELINE_ARR_B:g}B ARR baseline across {ENTERPRISES:,} enterprises</b>. The ranges are not derived from one another in the source material. This report rebuilds them from the drivers behind the 6-pager's revenue composition: direct API and Vertex consumption, incremental Workspace revenue and partner-sourced revenue.""")
+    story.preformatted('formula', "direct    = enterprise AI platform market x market share\n"
+                                  f"seats     = {BASELINE_SEATS_M:g}M Gemini Workspace seats x seat growth\n"
+                                  "workspace = seats x bundle price x 12 x price realization\n"
+                                  "ARR       = (direct + workspace) / (1 - partner share of ARR)\n"
+                                  "ROI       = ARR / investment")
+    story.paragraph('body', f"""Price realization is the share of the $2-4/user/month bundle list price that becomes incremental ARR once enterprise-agreement discounts and seats already paying for Gemini are netted out. Seat penetration is measured against {ADDRESSABLE_SEATS_M:g}M enterprise Workspace seats, the base of the 6-pager's 40%, 55% and 70% penetration targets.""")
+    story.heading('section', "2. Driver assumptions", 1)
+    story.paragraph('body', """Every driver is given a range per scenario. Market share and investment are the ranges the scenarios state; the remaining drivers are calibrated to the 6-pager's seat, pricing and partner-mix targets.""")
+    story.table('drivers', driver_table_rows(scenarios), [2.4*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    story.page_break()
+
+    # 3. Recomputed ranges
+    story.heading('section', "3. Recomputed scenario ranges", 1)
+    story.paragraph('body', f"""Each scenario is evaluated over <b>{samples:,} Monte Carlo draws</b>, with every driver uniform over its range, in one vectorized pass. The recomputed range is the 5th to 95th percentile of those draws; the share of draws landing inside the stated range shows how well the stated figures follow from the drivers.""")
+    story.table('scenario', range_table_rows(ranges),
+                [1*inch, 0.95*inch, 1.1*inch, 0.8*inch, 0.85*inch, 1.1*inch, 0.8*inch])
+    story.spacer(0.15*inch)
+    for result in ranges:
+        s = result.scenario
+        # ROI the stated ARR and investment ranges allow between them
+        implied = (s.stated_arr_low_b * 1000 / s.investment_m_high, s.stated_arr_high_b * 1000 / s.investment_m_low)
+        if abs(implied[0] - s.stated_roi_low) > 0.05 or abs(implied[1] - s.stated_roi_high) > 0.05:
+            story.paragraph('body', f"""<b>{s.name}:</b> dividing the stated ARR by the stated investment gives {implied[0]:.1f}x-{implied[1]:.1f}x, not the stated {s.stated_roi_low:.1f}x-{s.stated_roi_high:.1f}x ROI. The recomputed {result.low('roi'):.1f}x-{result.high('roi'):.1f}x follows the ARR and investment ranges, so only {result.roi_in_stated:.0%} of draws land in the stated ROI range.""")
+
+    story.heading('section', "4. Revenue composition", 1)
+    story.paragraph('body', """Median outcome per scenario, split into the three revenue streams, with the Workspace seat count and penetration the seat-growth driver implies.""")
+    story.table('scenario', composition_table_rows(ranges),
+                [1*inch, 0.85*inch, 0.85*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.85*inch, 0.85*inch])
+
+    story.heading('section', "5. Full-factorial envelope", 1)
+    story.paragraph('body', f"""The extremes come from a full-factorial sweep of {GRID_POINTS} points per driver over all {len(DRIVERS)} drivers, evaluated as one broadcast. They bound what the driver ranges can produce when every driver sits at the same end of its range at once.""")
+    story.table('scenario', envelope_table_rows(scenarios, GRID_POINTS),
+                [1.2*inch, 1*inch, 1.1*inch, 1.1*inch, 1*inch, 1*inch])
+
+    return story
+
+def render_report(story, output, pagesize=letter, cache=None, timings=None, profile=None):
+    """Lay out and write a story from build_story; returns render_story's section summary
+
+    cache, timings and profile are passed to report_engine.render_story.
+    """
+    from report_engine import render_story
+
+    return render_story(story, output, REPORT_KEY, STYLE_SPECS, TABLE_SPECS,
+                        dict(pagesize=pagesize, **PAGE_MARGINS), cache=cache, timings=timings,
+                        profile=profile)
+
+def write_pdf(output, pagesize=letter, date=None, cache=None, scenarios=None, profile=None):
+    """Render the report into output: a file path, binary stream, socket or file descriptor"""
+    return render_report(build_story(date, scenarios), output, pagesize, cache, profile=profile)
+
+def pdf_bytes(pagesize=letter, date=None, cache=None, scenarios=None, profile=None, view=False):
+    """Render the report in memory; returns bytes, or a memoryview over the buffer with view=True"""
+    from report_engine import pdf_bytes as render_pdf_bytes
+
+    return render_pdf_bytes(write_pdf, pagesize, date, cache, scenarios, profile, view=view)
+
+def validate(pagesize=letter, date=None, scenarios=None):
+    """Build the story and return its structural problems (report_story.validate_story) without rendering"""
+    return validate_story(build_story(date, scenarios), STYLE_SPECS, TABLE_SPECS,
+                          dict(pagesize=pagesize, **PAGE_MARGINS))
+
+if __name__ == "__main__":
+    # "-" writes the PDF to stdout, e.g. to pipe it into another program
+    target = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_PATH
+    if target == '-':
+        sys.stdout.flush()
+        write_pdf(sys.stdout.fileno())
+    elif target == '--validate':
+        problems = validate()
+        print('\n'.join(problems) or "Gemini scenario story is valid")
+        sys.exit(1 if problems else 0)
+    else:
+        write_pdf(target)
+        print(f"Gemini scenario PDF created successfully: {target}")
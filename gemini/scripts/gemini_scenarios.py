@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Gemini Enterprise Scenario Engine
+Recomputes the 18-month financial scenario ranges from explicit drivers
+
+The README and the GTM 6-pager state each scenario's ARR, market share,
+investment and ROI as ranges. This engine rebuilds them from the drivers
+behind the 6-pager's revenue composition (direct API and Vertex, Workspace
+incremental, partner-sourced):
+
+    direct    = enterprise AI platform market x market share
+    seats     = today's Gemini Workspace seats x seat growth
+    workspace = seats x bundle price x 12 x realization
+    ARR       = (direct + workspace) / (1 - partner share of ARR)
+    ROI       = ARR / investment
+
+Realization is the share of the $/user/month bundle list price that turns
+into incremental ARR once enterprise-agreement discounts and seats already
+paying for Gemini are netted out. Each scenario gives every driver a
+(low, high) range in gemini/data/scenarios.csv. evaluate broadcasts over
+driver arrays of any shape, so Monte Carlo samples (scenario_ranges) and
+full-factorial grids (grid_sweep) run in single numpy passes.
+
+Usage: python gemini_scenarios.py [--samples N] [--seed S] [--grid POINTS]
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import shared_engine  # noqa: F401 - puts sierra/scripts on sys.path
+from sierra_data import read_table
+
+GEMINI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+SCENARIO_PATH = os.path.join(GEMINI_DIR, 'data', 'scenarios.csv')
+
+# Current position from the README and the 6-pager
+BASELINE_ARR_B = 1.2               # $B ARR across 85,000 enterprises
+BASELINE_SEATS_M = 45.0            # Gemini-enabled Workspace seats today
+ADDRESSABLE_SEATS_M = 300.0        # enterprise Workspace seats the penetration targets refer to
+ENTERPRISES = 85_000
+
+DRIVERS = ('seat_growth', 'bundle_price', 'realization', 'market_b', 'share', 'partner_share',
+           'investment_m')
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """Driver ranges for one financial scenario, with the ARR and ROI ranges the README states
+
+    seat_growth multiplies today's Gemini Workspace seats, bundle_price is
+    $/user/month, market_b the enterprise AI platform market in $B, share and
+    partner_share are fractions, and investment_m is in $M.
+    """
+    key: str
+    name: str
+    seat_growth_low: float
+    seat_growth_high: float
+    bundle_price_low: float
+    bundle_price_high: float
+    realization_low: float
+    realization_high: float
+    market_b_low: float
+    market_b_high: float
+    share_low: float
+    share_high: float
+    partner_share_low: float
+    partner_share_high: float
+    investment_m_low: float
+    investment_m_high: float
+    stated_arr_low_b: float
+    stated_arr_high_b: float
+    stated_roi_low: float
+    stated_roi_high: float
+
+    def driver_range(self, driver):
+        return getattr(self, f"{driver}_low"), getattr(self, f"{driver}_high")
+
+
+def load_scenarios(path=SCENARIO_PATH):
+    """Scenarios in file order (conservative, base, aggressive)"""
+    return read_table(path, Scenario)
+
+
+class Outcome:
+    """Scenario outputs; ARR, ROI, share and investment have the common shape of all the drivers"""
+
+    def __init__(self, seat_growth, bundle_price, realization, market_b, share, partner_share,
+                 investment_m):
+        self.seats_m = BASELINE_SEATS_M * seat_growth
+        self.penetration = self.seats_m / ADDRESSABLE_SEATS_M
+        self.direct_b = market_b * share
+        self.workspace_b = self.seats_m * bundle_price * 12 * realization / 1000
+        self.arr_b = (self.direct_b + self.workspace_b) / (1 - partner_share)
+        self.partner_b = self.arr_b * partner_share
+        self.roi = self.arr_b * 1000 / investment_m
+        self.arr_b = np.broadcast_to(self.arr_b, self.roi.shape)
+        self.share = np.broadcast_to(share, self.roi.shape)
+        self.investment_m = np.broadcast_to(investment_m, self.roi.shape)
+
+    @property
+    def growth(self):
+        """ARR as a multiple of today's baseline"""
+        return self.arr_b / BASELINE_ARR_B
+
+
+def evaluate(**drivers):
+    """Outcome for driver arrays (keyword per DRIVERS) that broadcast against each other"""
+    missing = set(DRIVERS) - set(drivers)
+    if missing:
+        raise ValueError(f"Missing drivers {sorted(missing)}")
+    return Outcome(**{name: np.asarray(drivers[name], dtype=float) for name in DRIVERS})
+
+
+def sample_drivers(scenario, rng, n):
+    """n draws of every driver, uniform over the scenario's ranges"""
+    drivers = {}
+    for name in DRIVERS:
+        low, high = scenario.driver_range(name)
+        drivers[name] = low + (high - low) * rng.random(n)
+    return drivers
+
+
+def grid_drivers(scenario, points):
+    """Full-factorial grid: each driver's linspace on its own axis, broadcasting to points ** drivers"""
+    drivers = {}
+    for axis, name in enumerate(DRIVERS):
+        shape = [1] * len(DRIVERS)
+        shape[axis] = points
+        drivers[name] = np.linspace(*scenario.driver_range(name), points).reshape(shape)
+    return drivers
+
+
+class ScenarioRange:
+    """Percentiles of one scenario's outputs, and how often ARR and ROI land in the stated ranges"""
+
+    def __init__(self, scenario, outcome, percentiles=PERCENTILES):
+        self.scenario = scenario
+        self.samples = outcome.arr_b.size
+        self.percentiles = percentiles
+        self.values = {name: np.percentile(getattr(outcome, name), percentiles)
+                       for name in ('arr_b', 'direct_b', 'workspace_b', 'partner_b', 'roi', 'seats_m',
+                                    'penetration', 'growth')}
+        self.arr_in_stated = float(np.mean((outcome.arr_b >= scenario.stated_arr_low_b)
+                                           & (outcome.arr_b <= scenario.stated_arr_high_b)))
+        self.roi_in_stated = float(np.mean((outcome.roi >= scenario.stated_roi_low)
+                                           & (outcome.roi <= scenario.stated_roi_high)))
+
+    def low(self, name):
+        return self.values[name][0]
+
+    def median(self, name):
+        return self.values[name][len(self.percentiles) // 2]
+
+    def high(self, name):
+        return self.values[name][-1]
+
+
+def scenario_ranges(scenarios=None, samples=200_000, seed=2025):
+    """ScenarioRange per scenario from samples Monte Carlo draws each"""
+    rng = np.random.default_rng(seed)
+    return [ScenarioRange(scenario, evaluate(**sample_drivers(scenario, rng, samples)))
+            for scenario in scenarios or load_scenarios()]
+
+
+def grid_sweep(scenario, points=8):
+    """(min, max) ARR and ROI over the full-factorial driver grid; the envelope of the scenario"""
+    outcome = evaluate(**grid_drivers(scenario, points))
+    return (outcome.arr_b.min(), outcome.arr_b.max()), (outcome.roi.min(), outcome.roi.max())
+
+
+def _range(low, high, fmt):
+    return f"{fmt.format(low)} - {fmt.format(high)}"
+
+
+def summary_table_rows(ranges):
+    """Header and rows for the title-page summary, laid out like the README scenario table"""
+    rows = [['Scenario', 'ARR (P5-P95)', 'Market share', 'Investment', 'ROI (P5-P95)']]
+    for result in ranges:
+        s = result.scenario
+        rows.append([s.name, _range(result.low('arr_b'), result.high('arr_b'), '${:.1f}B'),
+                     _range(*s.driver_range('share'), '{:.0%}'),
+                     _range(*s.driver_range('investment_m'), '${:,.0f}M'),
+                     _range(result.low('roi'), result.high('roi'), '{:.1f}x')])
+    return rows
+
+
+def driver_table_rows(scenarios=None):
+    """Header and rows for the report's driver assumptions table"""
+    scenarios = scenarios or load_scenarios()
+    rows = [['Driver'] + [scenario.name for scenario in scenarios]]
+    for label, driver, fmt in (('Workspace seat growth (x today)', 'seat_growth', '{:.1f}x'),
+                               ('Bundle price ($/user/month)', 'bundle_price', '${:.2f}'),
+                               ('Price realization', 'realization', '{:.0%}'),
+                               ('AI platform market ($B)', 'market_b', '${:.1f}B'),
+                               ('Market share', 'share', '{:.0%}'),
+                               ('Partner share of ARR', 'partner_share', '{:.0%}'),
+                               ('Investment ($M)', 'investment_m', '${:,.0f}M')):
+        rows.append([label] + [_range(*scenario.driver_range(driver), fmt) for scenario in scenarios])
+    return rows
+
+
+def range_table_rows(ranges):
+    """Header and rows comparing recomputed P5-P95 ranges with the stated ones"""
+    rows = [['Scenario', 'Stated ARR', 'Recomputed ARR\n(P5-P95)', 'Draws in\nstated ARR',
+             'Stated ROI', 'Recomputed ROI\n(P5-P95)', 'Draws in\nstated ROI']]
+    for result in ranges:
+        s = result.scenario
+        rows.append([s.name, _range(s.stated_arr_low_b, s.stated_arr_high_b, '${:.1f}B'),
+                     _range(result.low('arr_b'), result.high('arr_b'), '${:.2f}B'), f"{result.arr_in_stated:.0%}",
+                     _range(s.stated_roi_low, s.stated_roi_high, '{:.1f}x'),
+                     _range(result.low('roi'), result.high('roi'), '{:.1f}x'), f"{result.roi_in_stated:.0%}"])
+    return rows
+
+
+def composition_table_rows(ranges):
+    """Header and rows for the median revenue composition of each scenario"""
+    rows = [['Scenario', 'Direct API\nand Vertex', 'Workspace\nincremental', 'Partner-\nsourced', 'Total ARR',
+             'Workspace\nseats', 'Seat\npenetration', 'Growth on\n$1.2B base']]
+    for result in ranges:
+        rows.append([result.scenario.name] + [f"${result.median(name):.2f}B"
+                                              for name in ('direct_b', 'workspace_b', 'partner_b', 'arr_b')]
+                    + [f"{result.median('seats_m'):.0f}M", f"{result.median('penetration'):.0%}",
+                       f"{result.median('growth'):.1f}x"])
+    return rows
+
+
+def envelope_table_rows(scenarios=None, points=8):
+    """Header and rows for the full-factorial grid extremes of each scenario"""
+    rows = [['Scenario', 'Grid points', 'ARR minimum', 'ARR maximum', 'ROI minimum', 'ROI maximum']]
+    for scenario in scenarios or load_scenarios():
+        (arr_min, arr_max), (roi_min, roi_max) = grid_sweep(scenario, points)
+        rows.append([scenario.name, f"{points ** len(DRIVERS):,}", f"${arr_min:.2f}B", f"${arr_max:.2f}B",
+                     f"{roi_min:.1f}x", f"{roi_max:.1f}x"])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the Gemini financial scenarios from their drivers")
+    parser.add_argument('--samples', type=int, default=1_000_000, help='Monte Carlo draws per scenario')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--grid', type=int, default=8, help='grid points per driver for the envelope sweep')
+    args = parser.parse_args()
+
+    scenarios = load_scenarios()
+    start = time.perf_counter()
+    ranges = scenario_ranges(scenarios, args.samples, args.seed)
+    sampled = time.perf_counter()
+    envelopes = [grid_sweep(scenario, args.grid) for scenario in scenarios]
+    swept = time.perf_counter()
+
+    print(f"{'Scenario':<13} {'ARR P5-P95 ($B)':>16} {'Stated':>11} {'In':>5} {'ROI P5-P95':>12} "
+          f"{'Stated':>11} {'In':>5} {'Grid ARR ($B)':>14} {'Seats (M)':>10}")
+    for result, ((arr_min, arr_max), _) in zip(ranges, envelopes):
+        s = result.scenario
+        arr = f"{result.low('arr_b'):.2f} - {result.high('arr_b'):.2f}"
+        roi = f"{result.low('roi'):.1f} - {result.high('roi'):.1f}x"
+        print(f"{s.name:<13} {arr:>16} {f'{s.stated_arr_low_b:.1f} - {s.stated_arr_high_b:.1f}':>11} "
+              f"{result.arr_in_stated:>5.0%} {roi:>12} {f'{s.stated_roi_low:.1f} - {s.stated_roi_high:.1f}x':>11} "
+              f"{result.roi_in_stated:>5.0%} {f'{arr_min:.2f} - {arr_max:.2f}':>14} "
+              f"{result.median('seats_m'):>10.0f}")
+    print("\nMedian composition ($B): " + "; ".join(
+        f"{r.scenario.name} direct {r.median('direct_b'):.2f}, Workspace {r.median('workspace_b'):.2f}, "
+        f"partner {r.median('partner_b'):.2f}" for r in ranges))
+    print(f"{args.samples:,} draws per scenario in {(sampled - start) * 1000:.0f} ms; "
+          f"{args.grid ** len(DRIVERS):,}-point grid per scenario in {(swept - sampled) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Shared Report Engine
+Makes the report engine and dataset helpers in sierra/scripts importable from gemini/scripts
+
+The Gemini scripts import report_story, report_engine and sierra_data as
+top-level modules, as the Sierra scripts do. Importing this module first
+appends sierra/scripts to sys.path, after the Gemini scripts' own directory.
+"""
+
+import os
+import sys
+
+SIERRA_SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   os.pardir, os.pardir, 'sierra', 'scripts'))
+
+if SIERRA_SCRIPTS_DIR not in sys.path:
+    sys.path.append(SIERRA_SCRIPTS_DIR)
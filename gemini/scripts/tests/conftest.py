@@ -0,0 +1,13 @@
+"""
+Shared setup for the Gemini script tests
+The scripts import each other as top-level modules, as when run from gemini/scripts
+
+Usage: python -m pytest gemini/scripts/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_engine  # noqa: E402,F401 - puts sierra/scripts on sys.path
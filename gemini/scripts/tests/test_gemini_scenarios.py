@@ -0,0 +1,35 @@
+"""Tests for the Gemini scenario engine"""
+
+import numpy as np
+import pytest
+
+import gemini_scenarios
+
+
+def test_outcome_composes_arr_from_its_drivers():
+    outcome = gemini_scenarios.evaluate(seat_growth=2.0, bundle_price=30.0, realization=0.5, market_b=50.0,
+                                        share=0.1, partner_share=0.2, investment_m=1000.0)
+    workspace_b = gemini_scenarios.BASELINE_SEATS_M * 2 * 30 * 12 * 0.5 / 1000
+    assert outcome.arr_b == pytest.approx((5.0 + workspace_b) / 0.8)
+    assert outcome.partner_b == pytest.approx(outcome.arr_b * 0.2)
+    assert outcome.roi == pytest.approx(outcome.arr_b)
+    assert outcome.growth == pytest.approx(outcome.arr_b / gemini_scenarios.BASELINE_ARR_B)
+
+
+def test_sampled_ranges_sit_inside_the_grid_envelope():
+    scenarios = gemini_scenarios.load_scenarios()
+    ranges = gemini_scenarios.scenario_ranges(scenarios, samples=20_000)
+    assert [r.scenario.key for r in ranges] == [s.key for s in scenarios]
+    for scenario_range in ranges:
+        (arr_low, arr_high), (roi_low, roi_high) = gemini_scenarios.grid_sweep(scenario_range.scenario, 4)
+        assert arr_low <= scenario_range.low('arr_b') <= scenario_range.median('arr_b')
+        assert scenario_range.median('arr_b') <= scenario_range.high('arr_b') <= arr_high
+        assert roi_low <= scenario_range.low('roi') <= scenario_range.high('roi') <= roi_high
+    # Scenarios run from conservative to aggressive
+    assert np.all(np.diff([r.median('arr_b') for r in ranges]) > 0)
+
+
+def test_evaluate_needs_every_driver():
+    with pytest.raises(ValueError, match='investment_m'):
+        gemini_scenarios.evaluate(seat_growth=1, bundle_price=1, realization=1, market_b=1, share=1,
+                                  partner_share=0)
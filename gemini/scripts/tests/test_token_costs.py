@@ -0,0 +1,67 @@
+"""Tests for the binned token-cost simulator against per-request pricing"""
+
+import numpy as np
+
+import token_costs
+
+BOUNDARIES = (127_999, 128_000, 128_001, 200_000, 200_001, 1_048_576, 1_048_577)
+
+
+def _requests(count=20_000, seed=11):
+    """Requests with lengths spread across every price tier and context window, boundaries included"""
+    rng = np.random.default_rng(seed)
+    workloads = len(token_costs.load_workloads())
+    input_tokens = np.exp(rng.uniform(0, np.log(1_500_000), count)).astype(np.uint32) + 1
+    output_tokens = rng.integers(1, 40_000, count).astype(np.uint32)
+    input_tokens[:len(BOUNDARIES)] = BOUNDARIES
+    output_tokens[:len(BOUNDARIES)] = 0
+    input_tokens[len(BOUNDARIES):2 * len(BOUNDARIES)] = np.array(BOUNDARIES) - 1000
+    output_tokens[len(BOUNDARIES):2 * len(BOUNDARIES)] = 1000
+    return rng.integers(0, workloads, count).astype(np.uint8), input_tokens, output_tokens
+
+
+def _brute_force(prices, workload, input_tokens, output_tokens, workloads):
+    """(cost, served) per (model, workload), pricing every request on its own"""
+    cost = np.zeros((len(prices), workloads))
+    served = np.zeros((len(prices), workloads), dtype=np.int64)
+    for m, price in enumerate(prices):
+        for w, i, o in zip(workload.tolist(), input_tokens.tolist(), output_tokens.tolist()):
+            if i + o > price.context_window:
+                continue
+            long = price.long_context_tokens is not None and i > price.long_context_tokens
+            input_price = price.long_input_per_m if long else price.input_per_m
+            output_price = price.long_output_per_m if long else price.output_per_m
+            cost[m, w] += (i * input_price + o * output_price) / 1e6
+            served[m, w] += 1
+    return cost, served
+
+
+def test_binned_costs_match_per_request_pricing():
+    prices, workloads = token_costs.load_prices(), token_costs.load_workloads()
+    workload, input_tokens, output_tokens = _requests()
+    chunks = [(workload[i:i + 3000], input_tokens[i:i + 3000], output_tokens[i:i + 3000])
+              for i in range(0, len(workload), 3000)]
+    summary = token_costs.simulate(chunks, prices, workloads)
+    cost, served = _brute_force(prices, workload, input_tokens, output_tokens, len(workloads))
+
+    assert summary.total_requests == len(workload)
+    np.testing.assert_array_equal(summary.served, served)
+    np.testing.assert_allclose(summary.cost, cost, rtol=1e-9)
+    # Requests over some model's window (or a long-context tier) are in the sample
+    assert (served < np.bincount(workload, minlength=len(workloads))).any()
+
+
+def test_trace_files_price_like_the_chunks_they_were_written_from(tmp_path):
+    path = str(tmp_path / 'trace.npy')
+    token_costs.write_trace(path, token_costs.synthetic_chunks(5000, chunk=2000), 5000)
+    from_trace = token_costs.simulate(token_costs.trace_chunks(path, chunk=1500))
+    direct = token_costs.simulate(token_costs.synthetic_chunks(5000, chunk=2000))
+    np.testing.assert_array_equal(from_trace.counts, direct.counts)
+    np.testing.assert_allclose(from_trace.cost, direct.cost)
+
+
+def test_models_compare_with_a_gemini_model_of_their_tier():
+    prices = {price.key: price for price in token_costs.load_prices()}
+    pairs = {key: price.compare_to for key, price in prices.items() if price.compare_to}
+    assert all(prices[baseline].provider == 'Google' for baseline in pairs.values())
+    assert pairs['claude_haiku'] == pairs['gpt_4o_mini'] == 'gemini_flash'
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Gemini Token Cost Comparison Report Generator
+Creates the cost-comparison PDF next to the Gemini strategy documents in gemini/
+
+The relative costs in the README pricing table are computed by token_costs
+from a simulated request trace instead of being quoted per token, and are
+broken down by workload. Styles are shared with the Gemini scenario report.
+
+Usage: python token_cost_report.py [output.pdf | - | --validate]
+"""
+
+import os
+import sys
+
+import shared_engine  # noqa: F401 - puts sierra/scripts on sys.path
+from report_story import Story, report_date, inch, letter, validate_story
+from gemini_scenario_report import STYLE_SPECS, TABLE_SPECS, PAGE_MARGINS
+from gemini_scenarios import GEMINI_DIR
+from token_costs import (simulate, synthetic_chunks, comparison_table_rows, workload_table_rows,
+                         workload_cost_rows)
+
+# Short name used by the report tools and as the style registry namespace
+REPORT_KEY = 'tokens'
+
+OUTPUT_PATH = os.path.normpath(os.path.join(GEMINI_DIR, "Gemini_Token_Cost_Comparison.pdf"))
+
+# Synthetic requests behind the tables when no summary is given
+REQUESTS = 5_000_000
+SEED = 2025
+
+def build_story(date=None, summary=None):
+    """Describe the cost comparison as a Story of page-aligned sections
+
+    summary is a token_costs.CostSummary, by default simulated over REQUESTS
+    synthetic requests; date is printed on the title page (default:
+    report_story.report_date()).
+    """
+    summary = summary or simulate(synthetic_chunks(REQUESTS, seed=SEED))
+    date = date or report_date()
+
+    story = Story(title="Gemini Token Cost Comparison", author="Rohit Kelapure")
+
+    # Title page
+    story.spacer(1.5*inch)
+    story.paragraph('title', "Gemini Token Cost Comparison")
+    story.paragraph('subtitle', f"Cost per provider and model over {summary.total_requests:,} simulated requests")
+    story.spacer(0.4*inch)
+    story.paragraph('author', "Prepared by: Rohit Kelapure")
+    story.paragraph('author', f"Date: {date.strftime('%B %d, %Y')}")
+    story.spacer(0.4*inch)
+    story.table('summary', comparison_table_rows(summary),
+                [0.85*inch, 1.15*inch, 1.15*inch, 0.8*inch, 1.1*inch, 0.75*inch, 0.8*inch])
+    story.page_break()
+
+    story.heading('section', "1. Method", 1)
+    story.paragraph('body', """Per-token list prices do not compare models on their own: what a workload costs depends on how its requests split between input and output tokens, and on how many of its prompts cross a long-context price tier or exceed a model's context window. Every model is therefore priced over the same trace of requests, drawn from the workload mix below with lognormal input and output lengths.""")
+    story.paragraph('body', """A request whose input exceeds a model's long-context threshold is billed at that model's long-context prices, and a request whose input and output do not fit a model's context window is counted as not served. Costs per 1,000 requests and relative costs use only the requests every model serves, so a smaller context window does not make a model look cheaper.""")
+    story.heading('section', "2. Workload mix", 1)
+    story.table('drivers', workload_table_rows(summary), [2.2*inch, 1.1*inch, 1.1*inch, 1.1*inch, 1.2*inch])
+    story.page_break()
+
+    story.heading('section', "3. Cost by workload", 1)
+    story.paragraph('body', """Dollars per 1,000 requests of each workload, for the requests every model serves. Long-prompt workloads widen the gap between models priced mainly on input tokens and those priced mainly on output tokens.""")
+    story.table('scenario', workload_cost_rows(summary), [1.45*inch] + [0.78*inch] * len(summary.prices))
+
+    return story
+
+def render_report(story, output, pagesize=letter, cache=None, timings=None, profile=None):
+    """Lay out and write a story from build_story; returns render_story's section summary
+
+    cache, timings and profile are passed to report_engine.render_story.
+    """
+    from report_engine import render_story
+
+    return render_story(story, output, REPORT_KEY, STYLE_SPECS, TABLE_SPECS,
+                        dict(pagesize=pagesize, **PAGE_MARGINS), cache=cache, timings=timings,
+                        profile=profile)
+
+def write_pdf(output, pagesize=letter, date=None, cache=None, summary=None, profile=None):
+    """Render the report into output: a file path, binary stream, socket or file descriptor"""
+    return render_report(build_story(date, summary), output, pagesize, cache, profile=profile)
+
+def pdf_bytes(pagesize=letter, date=None, cache=None, summary=None, profile=None, view=False):
+    """Render the report in memory; returns bytes, or a memoryview over the buffer with view=True"""
+    from report_engine import pdf_bytes as render_pdf_bytes
+
+    return render_pdf_bytes(write_pdf, pagesize, date, cache, summary, profile, view=view)
+
+def validate(pagesize=letter, date=None, summary=None):
+    """Build the story and return its structural problems (report_story.validate_story) without rendering"""
+    return validate_story(build_story(date, summary), STYLE_SPECS, TABLE_SPECS,
+                          dict(pagesize=pagesize, **PAGE_MARGINS))
+
+if __name__ == "__main__":
+    # "-" writes the PDF to stdout, e.g. to pipe it into another program
+    target = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_PATH
+    if target == '-':
+        sys.stdout.flush()
+        write_pdf(sys.stdout.fileno())
+    elif target == '--validate':
+        problems = validate()
+        print('\n'.join(problems) or "Token cost story is valid")
+        sys.exit(1 if problems else 0)
+    else:
+        write_pdf(target)
+        print(f"Token cost comparison PDF created successfully: {target}")
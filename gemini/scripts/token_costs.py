@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Token Cost Workload Simulator
+Cost per provider and model for request traces, streamed in vectorized chunks
+
+A trace is a sequence of requests, each with a workload, its input (prompt)
+tokens and its output tokens. Traces are stored as .npy files of TRACE_DTYPE
+records (9 bytes a request) and read through a memory map one chunk at a
+time, so traces of hundreds of millions of requests are simulated in
+constant memory. Synthetic traces draw lognormal input and output lengths
+per workload from gemini/data/workloads.csv; recorded traces can be
+imported from CSV.
+
+Every model of gemini/data/model_prices.csv is priced from the same pass.
+A request is billed at a model's long-context prices when its input
+exceeds the model's long_context_tokens, and is not served by a model whose
+context window cannot hold its input and output. Those thresholds split
+requests into a handful of length classes; within a class every model's
+cost is linear in tokens, so each chunk reduces to request counts and
+token sums per workload and class (three bincounts), and the costs of all
+models follow exactly from the sums. Model comparisons ("vs Gemini") use
+only the requests every model serves, so context-window differences do not
+distort them.
+
+Usage: python token_costs.py [--requests N | --trace PATH] [--write-trace PATH]
+       [--import-csv CSV --write-trace PATH] [--chunk N] [--seed S] [--markdown]
+"""
+
+import argparse
+import csv
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import shared_engine  # noqa: F401 - puts sierra/scripts on sys.path
+from gemini_scenarios import GEMINI_DIR
+from sierra_data import read_table
+
+PRICES_PATH = os.path.join(GEMINI_DIR, 'data', 'model_prices.csv')
+WORKLOADS_PATH = os.path.join(GEMINI_DIR, 'data', 'workloads.csv')
+
+TRACE_DTYPE = np.dtype([('workload', 'u1'), ('input_tokens', '<u4'), ('output_tokens', '<u4')])
+CHUNK = 1_000_000                   # requests read and binned at a time
+MAX_INPUT_TOKENS = 2_000_000        # synthetic lengths are clipped to this
+DEFAULT_REQUESTS = 10_000_000
+
+
+@dataclass(frozen=True, slots=True)
+class ModelPrice:
+    """List prices in $ per million tokens, with the long-context tier and context window
+
+    compare_to names the Gemini model the README compares this one against.
+    """
+    key: str
+    provider: str
+    model: str
+    input_per_m: float
+    output_per_m: float
+    context_window: int
+    long_context_tokens: int | None
+    long_input_per_m: float | None
+    long_output_per_m: float | None
+    compare_to: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class Workload:
+    """Request mix entry with lognormal input and output token lengths (median, sigma)"""
+    key: str
+    name: str
+    share: float
+    input_median: float
+    input_sigma: float
+    output_median: float
+    output_sigma: float
+
+
+def load_prices(path=PRICES_PATH):
+    return read_table(path, ModelPrice)
+
+
+def load_workloads(path=WORKLOADS_PATH):
+    return read_table(path, Workload)
+
+
+class PriceTable:
+    """Model prices, long-context thresholds and context windows as (models, 1) columns"""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+        def column(values):
+            return np.array(values, dtype=float)[:, None]
+
+        self.input = column([price.input_per_m for price in prices]) / 1e6
+        self.output = column([price.output_per_m for price in prices]) / 1e6
+        self.long_input = column([price.long_input_per_m or price.input_per_m for price in prices]) / 1e6
+        self.long_output = column([price.long_output_per_m or price.output_per_m for price in prices]) / 1e6
+        # Length classes: a request's class counts the thresholds (windows) below its input (total) tokens
+        self.input_edges = np.unique([price.long_context_tokens for price in prices
+                                      if price.long_context_tokens is not None])
+        self.total_edges = np.unique([price.context_window for price in prices])
+        # A model bills long-context from the input class past its threshold, and serves the total
+        # classes up to its window; models without a tier never reach long-context billing
+        self.long_from = column([np.searchsorted(self.input_edges, price.long_context_tokens) + 1
+                                 if price.long_context_tokens is not None else np.inf for price in prices])
+        self.window_class = column([np.searchsorted(self.total_edges, price.context_window)
+                                    for price in prices])
+
+    @property
+    def classes(self):
+        return (len(self.input_edges) + 1) * (len(self.total_edges) + 1)
+
+    def length_class(self, input_tokens, output_tokens):
+        """Class index of each request; requests in one class cost the same per token on every model"""
+        input_class = np.searchsorted(self.input_edges, input_tokens, side='left')
+        total_class = np.searchsorted(self.total_edges, input_tokens.astype(np.int64) + output_tokens, side='left')
+        return input_class * (len(self.total_edges) + 1) + total_class
+
+    def class_terms(self):
+        """(long, served) boolean arrays of shape (models, classes)"""
+        classes = np.arange(self.classes)
+        input_class, total_class = np.divmod(classes, len(self.total_edges) + 1)
+        return input_class >= self.long_from, total_class <= self.window_class
+
+
+class CostSummary:
+    """Request counts and token sums per workload and length class, priced per model
+
+    Cost is linear in tokens and the same per token for every request of a
+    class, so the sums price the trace exactly.
+    """
+
+    def __init__(self, prices, workloads):
+        self.prices = prices
+        self.workloads = workloads
+        self.table = PriceTable(prices)
+        shape = (len(workloads), self.table.classes)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.input_sums = np.zeros(shape)
+        self.output_sums = np.zeros(shape)
+        self.seconds = 0.0
+
+    def add(self, workload, input_tokens, output_tokens):
+        """Accumulate one chunk of requests"""
+        bins = workload.astype(np.intp) * self.table.classes + self.table.length_class(input_tokens, output_tokens)
+        size = self.counts.size
+        self.counts += np.bincount(bins, minlength=size).reshape(self.counts.shape)
+        self.input_sums += np.bincount(bins, input_tokens, minlength=size).reshape(self.counts.shape)
+        self.output_sums += np.bincount(bins, output_tokens, minlength=size).reshape(self.counts.shape)
+
+    @property
+    def requests(self):
+        return self.counts.sum(axis=1)
+
+    @property
+    def input_tokens(self):
+        return self.input_sums.sum(axis=1)
+
+    @property
+    def output_tokens(self):
+        return self.output_sums.sum(axis=1)
+
+    @property
+    def total_requests(self):
+        return int(self.counts.sum())
+
+    def _class_costs(self):
+        """$ per (model, workload, class) had every model served every request"""
+        long, _ = self.table.class_terms()
+        input_price = np.where(long, self.table.long_input, self.table.input)[:, None, :]
+        output_price = np.where(long, self.table.long_output, self.table.output)[:, None, :]
+        return self.input_sums * input_price + self.output_sums * output_price
+
+    @property
+    def cost(self):
+        """(models, workloads) $ for the requests each model serves"""
+        _, served = self.table.class_terms()
+        return (self._class_costs() * served[:, None, :]).sum(axis=2)
+
+    @property
+    def served(self):
+        """(models, workloads) requests each model's context window holds"""
+        _, served = self.table.class_terms()
+        return (self.counts * served[:, None, :]).sum(axis=2)
+
+    @property
+    def common(self):
+        """(workloads,) requests every model serves"""
+        _, served = self.table.class_terms()
+        return (self.counts * served.all(axis=0)).sum(axis=1)
+
+    @property
+    def common_cost(self):
+        """(models, workloads) $ for the requests every model serves"""
+        _, served = self.table.class_terms()
+        return (self._class_costs() * served.all(axis=0)).sum(axis=2)
+
+    def index(self, key):
+        return next(i for i, price in enumerate(self.prices) if price.key == key)
+
+    def cost_per_1k(self, model, workload=None):
+        """$ per 1,000 requests over the requests every model serves"""
+        common_cost, common = self.common_cost[model], self.common
+        if workload is None:
+            return common_cost.sum() / max(1, common.sum()) * 1000
+        return common_cost[workload] / max(1, common[workload]) * 1000
+
+    def versus(self, model, workload=None):
+        """Relative cost against the model's compare_to model, or None for the baselines"""
+        baseline = self.prices[model].compare_to
+        if baseline is None:
+            return None
+        return self.cost_per_1k(model, workload) / self.cost_per_1k(self.index(baseline), workload) - 1
+
+    def unserved_share(self, model):
+        return 1 - self.served[model].sum() / max(1, self.total_requests)
+
+
+def simulate(chunks, prices=None, workloads=None):
+    """CostSummary for an iterable of (workload, input tokens, output tokens) chunks"""
+    summary = CostSummary(prices or load_prices(), workloads or load_workloads())
+    start = time.perf_counter()
+    for workload, input_tokens, output_tokens in chunks:
+        summary.add(workload, input_tokens, output_tokens)
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def synthetic_chunks(requests, workloads=None, seed=2025, chunk=CHUNK):
+    """(workload, input tokens, output tokens) chunks drawn from the workload mix"""
+    workloads = workloads or load_workloads()
+    rng = np.random.default_rng(seed)
+    shares = np.array([w.share for w in workloads])
+    shares /= shares.sum()
+    log_medians = np.log([[w.input_median, w.output_median] for w in workloads])
+    sigmas = np.array([[w.input_sigma, w.output_sigma] for w in workloads])
+    for first in range(0, requests, chunk):
+        n = min(chunk, requests - first)
+        kind = rng.choice(len(workloads), n, p=shares).astype(np.uint8)
+        lengths = np.exp(log_medians[kind] + sigmas[kind] * rng.standard_normal((n, 2)))
+        lengths = np.clip(np.rint(lengths), 1, MAX_INPUT_TOKENS).astype(np.uint32)
+        yield kind, lengths[:, 0], lengths[:, 1]
+
+
+def trace_chunks(path, chunk=CHUNK):
+    """Chunks of a TRACE_DTYPE .npy trace, read through a memory map"""
+    trace = np.load(path, mmap_mode='r')
+    if trace.dtype != TRACE_DTYPE:
+        raise ValueError(f"{path} holds {trace.dtype}, expected a trace of {TRACE_DTYPE}")
+    for first in range(0, len(trace), chunk):
+        block = np.asarray(trace[first:first + chunk])
+        yield block['workload'], block['input_tokens'], block['output_tokens']
+
+
+def write_trace(path, chunks, requests):
+    """Write requests records from chunks to a .npy trace without holding it in memory"""
+    trace = np.lib.format.open_memmap(path, mode='w+', dtype=TRACE_DTYPE, shape=(requests,))
+    written = 0
+    for workload, input_tokens, output_tokens in chunks:
+        end = written + len(workload)
+        trace['workload'][written:end] = workload
+        trace['input_tokens'][written:end] = input_tokens
+        trace['output_tokens'][written:end] = output_tokens
+        written = end
+    trace.flush()
+    if written != requests:
+        raise ValueError(f"Expected {requests} requests, got {written}")
+    return path
+
+
+def csv_chunks(path, workloads=None, chunk=CHUNK):
+    """Chunks of a recorded CSV trace with input_tokens, output_tokens and optional workload key columns"""
+    workloads = workloads or load_workloads()
+    kinds = {w.key: i for i, w in enumerate(workloads)}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for row in reader:
+            rows.append((kinds[row['workload']] if row.get('workload') else 0,
+                         int(row['input_tokens']), int(row['output_tokens'])))
+            if len(rows) == chunk:
+                yield _chunk(rows)
+                rows = []
+        if rows:
+            yield _chunk(rows)
+
+
+def _chunk(rows):
+    block = np.array(rows, dtype=np.int64)
+    return block[:, 0].astype(np.uint8), block[:, 1].astype(np.uint32), block[:, 2].astype(np.uint32)
+
+
+def _tokens_label(tokens):
+    return f"{tokens / 2 ** 20:g}M" if tokens >= 2 ** 20 else f"{tokens // 1000:,}K"
+
+
+def _percent(value):
+    return 'Baseline' if value is None else f"{value:+.0%}"
+
+
+def pricing_markdown(summary):
+    """The README's Competitive Pricing Analysis table, with the vs column computed from summary"""
+    lines = ["| Provider | Model | Input/M | Output/M | Context | vs Gemini |",
+             "|----------|-------|---------|----------|---------|-----------|"]
+    for i, price in enumerate(summary.prices):
+        versus = summary.versus(i)
+        if versus is not None:
+            versus = f"{versus:+.0%} vs {summary.prices[summary.index(price.compare_to)].model.removeprefix('Gemini ')}"
+        lines.append(f"| {price.provider} | {price.model} | ${price.input_per_m:.2f} | ${price.output_per_m:.2f} "
+                     f"| {_tokens_label(price.context_window)} | {versus or 'Baseline'} |")
+    return '\n'.join(lines)
+
+
+def comparison_table_rows(summary):
+    """Header and rows for the report's blended cost comparison"""
+    rows = [['Provider', 'Model', 'Input / Output\n$ per M tokens', '$ per 1K\nrequests', 'Compared\nwith',
+             'Relative\ncost', 'Requests\nnot served']]
+    for i, price in enumerate(summary.prices):
+        rows.append([price.provider, price.model, f"${price.input_per_m:.2f} / ${price.output_per_m:.2f}",
+                     f"${summary.cost_per_1k(i):.2f}",
+                     summary.prices[summary.index(price.compare_to)].model if price.compare_to else '-',
+                     _percent(summary.versus(i)), f"{summary.unserved_share(i):.2%}"])
+    return rows
+
+
+def workload_table_rows(summary):
+    """Header and rows for the trace's workload mix"""
+    rows = [['Workload', 'Requests', 'Mean input\ntokens', 'Mean output\ntokens', 'Served by\nevery model']]
+    for j, workload in enumerate(summary.workloads):
+        count = max(1, summary.requests[j])
+        rows.append([workload.name, f"{summary.requests[j]:,}", f"{summary.input_tokens[j] / count:,.0f}",
+                     f"{summary.output_tokens[j] / count:,.0f}", f"{summary.common[j] / count:.1%}"])
+    return rows
+
+
+def workload_cost_rows(summary):
+    """Header and rows of $ per 1K requests by workload (rows) and model (columns)"""
+    rows = [['Workload'] + [price.model.replace(' ', '\n', 1) for price in summary.prices]]
+    for j, workload in enumerate(summary.workloads):
+        rows.append([workload.name] + [f"${summary.cost_per_1k(i, j):.2f}" for i in range(len(summary.prices))])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of a request trace per provider and model")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='synthetic requests to simulate')
+    parser.add_argument('--trace', help='simulate a .npy trace instead of a synthetic one')
+    parser.add_argument('--import-csv', help='recorded CSV trace to convert (needs --write-trace)')
+    parser.add_argument('--write-trace', help='write the synthetic or imported trace to this .npy file')
+    parser.add_argument('--chunk', type=int, default=CHUNK, help='requests per vectorized chunk')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--markdown', action='store_true', help='print the README pricing table')
+    args = parser.parse_args()
+
+    if args.import_csv:
+        if not args.write_trace:
+            parser.error('--import-csv needs --write-trace')
+        requests = sum(len(block[0]) for block in csv_chunks(args.import_csv, chunk=args.chunk))
+        args.trace = write_trace(args.write_trace, csv_chunks(args.import_csv, chunk=args.chunk), requests)
+    elif args.write_trace:
+        start = time.perf_counter()
+        args.trace = write_trace(args.write_trace, synthetic_chunks(args.requests, seed=args.seed, chunk=args.chunk),
+                                 args.requests)
+        print(f"Wrote {args.requests:,} requests to {args.trace} in {time.perf_counter() - start:.1f}s")
+
+    chunks = (trace_chunks(args.trace, args.chunk) if args.trace
+              else synthetic_chunks(args.requests, seed=args.seed, chunk=args.chunk))
+    summary = simulate(chunks)
+
+    if args.markdown:
+        print(pricing_markdown(summary))
+        return
+    for rows in (workload_table_rows(summary), comparison_table_rows(summary)):
+        widths = [max(len(str(row[c]).replace('\n', ' ')) for row in rows) for c in range(len(rows[0]))]
+        for row in rows:
+            print('  '.join(str(cell).replace('\n', ' ').ljust(width) for cell, width in zip(row, widths)))
+        print()
+    print(f"{summary.total_requests:,} requests priced for {len(summary.prices)} models in {summary.seconds:.2f}s "
+          f"({summary.total_requests / max(summary.seconds, 1e-9) / 1e6:.1f}M requests/s)")
+
+
+if __name__ == "__main__":
+    main()
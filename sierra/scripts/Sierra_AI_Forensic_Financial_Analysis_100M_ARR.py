@@ -5,95 +5,106 @@ Professional PDF Generation Script
 
 Author: Rohit Kelapure
 Date: December 2025
+
+reportlab is only imported to render: "--validate" builds the story and
+checks it (report_story.validate_story) without it.
+
+Usage: python Sierra_AI_Forensic_Financial_Analysis_100M_ARR.py [output.pdf | - | --validate]
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, KeepTogether
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY, TA_RIGHT
-from reportlab.pdfgen import canvas
-from datetime import datetime
-import os
-
-def create_sierra_analysis_pdf():
-    """Create professional PDF of Sierra AI forensic financial analysis"""
-
-    # Define file path
-    filename = "/Users/rohitkelapure/projects/sierra/Sierra_AI_Forensic_Financial_Analysis_100M_ARR_December_2025.pdf"
-
-    # Create document
-    doc = SimpleDocTemplate(filename, pagesize=letter,
-                          rightMargin=72, leftMargin=72,
-                          topMargin=72, bottomMargin=18)
-
-    # Get default styles and create custom styles
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue
-    )
-
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue
-    )
-
-    section_style = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceBefore=20,
-        spaceAfter=12,
-        textColor=colors.darkblue,
-        borderWidth=1,
-        borderColor=colors.darkblue,
-        borderPadding=5
-    )
-
-    subsection_style = ParagraphStyle(
-        'SubsectionHeader',
-        parent=styles['Heading3'],
-        fontSize=12,
-        spaceBefore=15,
-        spaceAfter=8,
-        textColor=colors.darkblue
-    )
-
-    body_style = ParagraphStyle(
-        'BodyText',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=12,
-        alignment=TA_JUSTIFY,
-        leftIndent=0,
-        rightIndent=0
-    )
+import sys
+
+from report_story import (Story, report_date, inch, letter, TA_CENTER, TA_JUSTIFY, banded_table, redact_story,
+                          validate_story)
+from sierra_data import load_dataset, format_millions
+from arr_sensitivity import tornado_table_rows
+
+# Short name used by the report tools and as the style registry namespace
+REPORT_KEY = 'forensic'
+
+OUTPUT_PATH = "/Users/rohitkelapure/projects/sierra/Sierra_AI_Forensic_Financial_Analysis_100M_ARR_December_2025.pdf"
+
+# Paragraph styles: key -> (style name, parent, attributes)
+STYLE_SPECS = {
+    'title': ('CustomTitle', 'Heading1', dict(
+        fontSize=18, spaceAfter=30, alignment=TA_CENTER, textColor='darkblue')),
+    'subtitle': ('CustomSubtitle', 'Heading2', dict(
+        fontSize=14, spaceAfter=20, alignment=TA_CENTER, textColor='darkblue')),
+    'section': ('SectionHeader', 'Heading2', dict(
+        fontSize=14, spaceBefore=20, spaceAfter=12, textColor='darkblue',
+        borderWidth=1, borderColor='darkblue', borderPadding=5)),
+    'subsection': ('SubsectionHeader', 'Heading3', dict(
+        fontSize=12, spaceBefore=15, spaceAfter=8, textColor='darkblue')),
+    'body': ('BodyText', 'Normal', dict(
+        fontSize=10, spaceAfter=12, alignment=TA_JUSTIFY, leftIndent=0, rightIndent=0)),
+    'author': ('AuthorStyle', 'Normal', dict(fontSize=12, alignment=TA_CENTER)),
+    'date': ('DateStyle', 'Normal', dict(fontSize=12, alignment=TA_CENTER)),
+    'footer': ('Footer', 'Normal', dict(fontSize=10, alignment=TA_CENTER, textColor='grey')),
+    'footer_date': ('FooterDate', 'Normal', dict(fontSize=9, alignment=TA_CENTER, textColor='grey')),
+}
+
+# Table themes: name -> TableStyle commands
+TABLE_SPECS = {
+    'summary': banded_table('darkblue', 12, 10, header_padding=12,
+                            extra=[('FONTNAME', (0, 1), (-1, -1), 'Helvetica')]),
+    'toc': [
+        ('BACKGROUND', (0, 0), (-1, 0), 'lightgrey'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, 'black'),
+    ],
+    'distribution': banded_table('darkblue', 8, align='CENTER', valign='MIDDLE', extra=[
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ('BACKGROUND', (0, -1), (-1, -1), 'lightgrey'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ]),
+    'tornado': banded_table('darkblue', 8, align='CENTER', valign='MIDDLE', extra=[
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ]),
+    'roster': banded_table('darkblue', 9),
+    'usecase': banded_table('darkblue', 7),
+}
+
+# Segment cuts: customer segments the roster and use-case tables can be limited to
+SEGMENTS = ('fintech', 'healthcare', 'retail', 'media')
+
+# Page geometry shared by the layout pass and the final canvas
+PAGE_MARGINS = dict(rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+def build_story(segment=None, redacted=False, date=None, dataset=None):
+    """Describe the forensic report as a Story of page-aligned sections
+
+    segment limits the customer tables to one SEGMENTS key, redacted masks
+    every dollar figure (report_story.redact_story) and leaves out the charts,
+    and date is the analysis date printed on the title page and footer
+    (default: report_story.report_date()).
+    dataset defaults to sierra_data.load_dataset().
+    """
+    if segment is not None and segment not in SEGMENTS:
+        raise ValueError(f"Unknown segment {segment!r}, expected one of {list(SEGMENTS)}")
+
+    def in_segment(record):
+        return segment is None or record.segment == segment
+
+    data = dataset or load_dataset()
+    date = date or report_date()
 
     # Start building the document
-    story = []
+    story = Story(title="Sierra AI Forensic Financial Analysis: $100M ARR Reconstruction",
+                  author="Rohit Kelapure")
 
     # Title Page
-    story.append(Spacer(1, 2*inch))
-    story.append(Paragraph("Forensic Financial Analysis:", title_style))
-    story.append(Paragraph("Reconstruction of Sierra AI's $100 Million Annual Recurring Revenue (ARR)", subtitle_style))
-    story.append(Spacer(1, 0.5*inch))
+    story.spacer(2*inch)
+    story.paragraph('title', "Forensic Financial Analysis:")
+    story.paragraph('subtitle', "Reconstruction of Sierra AI's $100 Million Annual Recurring Revenue (ARR)")
+    story.spacer(0.5*inch)
 
     # Author and date info
-    story.append(Paragraph("Prepared by: Rohit Kelapure", ParagraphStyle('AuthorStyle', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER)))
-    story.append(Paragraph(f"Analysis Date: {datetime.now().strftime('%B %Y')}", ParagraphStyle('DateStyle', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER)))
-    story.append(Spacer(1, 0.5*inch))
+    story.paragraph('author', "Prepared by: Rohit Kelapure")
+    story.paragraph('date', f"Analysis Date: {date.strftime('%B %Y')}")
+    story.spacer(0.5*inch)
 
     # Executive Summary Box
     exec_summary_data = [
@@ -106,259 +117,239 @@ def create_sierra_analysis_pdf():
         ["• No visible customer churn in public roster of 31 confirmed enterprises"]
     ]
 
-    exec_table = Table(exec_summary_data, colWidths=[6.5*inch])
-    exec_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-
-    story.append(exec_table)
-    story.append(PageBreak())
+    story.table('summary', exec_summary_data, [6.5*inch])
+    story.page_break()
 
     # Table of Contents
-    story.append(Paragraph("Table of Contents", section_style))
-    toc_data = [
-        ["Section", "Page"],
-        ["I. Executive Summary: Forensic Revenue Snapshot and Key Findings", "3"],
-        ["II. Strategic Context: Market Positioning and Enterprise Penetration", "5"],
-        ["III. Methodological Framework for Forensic ARR Reconstruction", "7"],
-        ["IV. Customer Identification and Use Case Mapping", "8"],
-        ["V. ARR Deep Dive by Core Sector: Valuation Justification", "10"],
-        ["VI. Churn Analysis, Retention Strategy, and Contract Risk", "13"],
-        ["VII. Conclusions and Forward-Looking Assessment", "14"],
-        ["References", "16"]
-    ]
-
-    toc_table = Table(toc_data, colWidths=[4.5*inch, 1*inch])
-    toc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-
-    story.append(toc_table)
-    story.append(PageBreak())
+    story.heading('section', "Table of Contents", 1)
+    story.toc('toc', [4.5*inch, 1*inch])
+    story.page_break()
 
     # I. Executive Summary
-    story.append(Paragraph("I. Executive Summary: Forensic Revenue Snapshot and Key Findings", section_style))
+    story.heading('section', "I. Executive Summary: Forensic Revenue Snapshot and Key Findings", 1)
 
-    story.append(Paragraph("1.1 Hyper-Growth Velocity: Context and Financial Implications", subsection_style))
-    story.append(Paragraph("""The achievement of $100 million in Annual Recurring Revenue (ARR) by Sierra AI within seven quarters—a timeframe of 21 months following its launch in February 2024—represents an extraordinary velocity in the enterprise software sector. This financial milestone establishes Sierra as one of the fastest-growing enterprise software companies in recent history. The rapid scaling validates the market hypothesis that generative AI agents are capable of transitioning from novel technology to mission-critical infrastructure in a condensed timeline.""", body_style))
+    story.heading('subsection', "1.1 Hyper-Growth Velocity: Context and Financial Implications", 2)
+    story.paragraph('body', """The achievement of $100 million in Annual Recurring Revenue (ARR) by Sierra AI within seven quarters—a timeframe of 21 months following its launch in February 2024—represents an extraordinary velocity in the enterprise software sector. This financial milestone establishes Sierra as one of the fastest-growing enterprise software companies in recent history. The rapid scaling validates the market hypothesis that generative AI agents are capable of transitioning from novel technology to mission-critical infrastructure in a condensed timeline.""")
 
-    story.append(Paragraph("""The swiftness of the revenue accrual mandates an examination of the revenue density and operational efficiency required to reach this threshold. Mathematically, achieving a $100 million ARR in 21 months is highly improbable through conventional volume-based SaaS models, typically reliant on thousands of smaller contracts. Given Sierra's confirmed focus on the Fortune 1000—where 50% of its customers report annual revenue exceeding $1 billion, and 20% exceed $10 billion—the revenue base is demonstrably concentrated.""", body_style))
+    story.paragraph('body', """The swiftness of the revenue accrual mandates an examination of the revenue density and operational efficiency required to reach this threshold. Mathematically, achieving a $100 million ARR in 21 months is highly improbable through conventional volume-based SaaS models, typically reliant on thousands of smaller contracts. Given Sierra's confirmed focus on the Fortune 1000—where 50% of its customers report annual revenue exceeding $1 billion, and 20% exceed $10 billion—the revenue base is demonstrably concentrated.""")
 
-    story.append(Paragraph("""Forensic modeling indicates that this ARR is derived from a small number of extraordinarily high-value contracts. Based on industry benchmarks for complex, mission-critical infrastructure deals, the ARR must be built upon approximately 47 major enterprise contracts, yielding an average Annual Contract Value (ACV) of roughly $2.1 million. This structure confirms a highly efficient, high-touch sales strategy optimized for maximizing initial contract value, rather than simply maximizing customer count.""", body_style))
+    story.paragraph('body', """Forensic modeling indicates that this ARR is derived from a small number of extraordinarily high-value contracts. Based on industry benchmarks for complex, mission-critical infrastructure deals, the ARR must be built upon approximately 47 major enterprise contracts, yielding an average Annual Contract Value (ACV) of roughly $2.1 million. This structure confirms a highly efficient, high-touch sales strategy optimized for maximizing initial contract value, rather than simply maximizing customer count.""")
 
-    story.append(Paragraph("1.2 Strategic Pillars: Outcome-Based Pricing (OBP) and Compliance Premiums", subsection_style))
-    story.append(Paragraph("""The structure of Sierra's pricing mechanism is fundamental to understanding its hyper-growth trajectory. Sierra explicitly employs an "outcome-based pricing" (OBP) model. This approach is not merely a preference for billing; it is the commercial mechanism that enables rapid, massive capital commitments from customers. OBP aligns Sierra's success directly with measurable business results achieved by the customer.""", body_style))
+    story.heading('subsection', "1.2 Strategic Pillars: Outcome-Based Pricing (OBP) and Compliance Premiums", 2)
+    story.paragraph('body', """The structure of Sierra's pricing mechanism is fundamental to understanding its hyper-growth trajectory. Sierra explicitly employs an "outcome-based pricing" (OBP) model. This approach is not merely a preference for billing; it is the commercial mechanism that enables rapid, massive capital commitments from customers. OBP aligns Sierra's success directly with measurable business results achieved by the customer.""")
 
-    story.append(Paragraph("""For instance, in the case of Rocket Mortgage, the agent enables homebuyers to convert four times faster. By linking the pricing to an outcome like increased conversion velocity—a direct revenue generator—Sierra is able to bypass the traditional budget constraints associated with short-term, cost-cutting IT initiatives. The price is justified not as a software cost, but as an investment that yields substantial and measurable return on investment (ROI), often tied to incremental cash flow improvement.""", body_style))
+    story.paragraph('body', """For instance, in the case of Rocket Mortgage, the agent enables homebuyers to convert four times faster. By linking the pricing to an outcome like increased conversion velocity—a direct revenue generator—Sierra is able to bypass the traditional budget constraints associated with short-term, cost-cutting IT initiatives. The price is justified not as a software cost, but as an investment that yields substantial and measurable return on investment (ROI), often tied to incremental cash flow improvement.""")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # II. Strategic Context
-    story.append(Paragraph("II. Strategic Context: Market Positioning and Enterprise Penetration", section_style))
+    story.heading('section', "II. Strategic Context: Market Positioning and Enterprise Penetration", 1)
 
-    story.append(Paragraph("2.1 Timeline and Market Inflection Point Analysis", subsection_style))
-    story.append(Paragraph("""Sierra's February 2024 launch date positioned the company to capitalize immediately on a critical market inflection point: the mass enterprise shift toward production-level deployment of Generative AI. While 2023 saw broad experimentation, 2024 marked the year that large organizations began moving GenAI from prototypes to core, customer-facing systems.""", body_style))
+    story.heading('subsection', "2.1 Timeline and Market Inflection Point Analysis", 2)
+    story.paragraph('body', """Sierra's February 2024 launch date positioned the company to capitalize immediately on a critical market inflection point: the mass enterprise shift toward production-level deployment of Generative AI. While 2023 saw broad experimentation, 2024 marked the year that large organizations began moving GenAI from prototypes to core, customer-facing systems.""")
 
-    story.append(Paragraph("""The pace of adoption observed in Sierra's customer base validates the assertion that this transition has been dramatically accelerated. The company's clientele spans both modern internet-era firms, such as Discord, Deliveroo, and Rivian, alongside deeply established, legacy "storied businesses" founded over a century ago, including Next (1864), ADT (1874), and Cigna (1982 merger of companies dating to 1792).""", body_style))
+    story.paragraph('body', """The pace of adoption observed in Sierra's customer base validates the assertion that this transition has been dramatically accelerated. The company's clientele spans both modern internet-era firms, such as Discord, Deliveroo, and Rivian, alongside deeply established, legacy "storied businesses" founded over a century ago, including Next (1864), ADT (1874), and Cigna (1982 merger of companies dating to 1792).""")
 
-    story.append(Paragraph("2.2 Target Market Penetration and Density", subsection_style))
-    story.append(Paragraph("""The financial rigor of Sierra's ARR is built upon an exclusively enterprise customer profile. The customer base is concentrated within the Fortune 1000, with half of its deploying organizations having annual revenues exceeding $1 billion, and 20% exceeding $10 billion. This rigorous segmentation strategy ensures that every new contract is inherently high-value, validating the estimated seven-figure ACV ranges utilized in the forensic reconstruction model.""", body_style))
+    story.heading('subsection', "2.2 Target Market Penetration and Density", 2)
+    story.paragraph('body', """The financial rigor of Sierra's ARR is built upon an exclusively enterprise customer profile. The customer base is concentrated within the Fortune 1000, with half of its deploying organizations having annual revenues exceeding $1 billion, and 20% exceeding $10 billion. This rigorous segmentation strategy ensures that every new contract is inherently high-value, validating the estimated seven-figure ACV ranges utilized in the forensic reconstruction model.""")
 
-    story.append(Paragraph("""Sierra reports serving: more than 95% of Black Friday shoppers; more than 50% of families in healthcare; more than 90% of the media ecosystem; and more than 70% of the value chain in fintech (banking, payments, insurance, investments). While the public roster names 31 specific enterprise clients, these claims of dominating specific verticals indicate the presence of non-disclosed contracts with market leaders, likely major banks, dominant payment processors, and global e-commerce leaders.""", body_style))
+    story.paragraph('body', """Sierra reports serving: more than 95% of Black Friday shoppers; more than 50% of families in healthcare; more than 90% of the media ecosystem; and more than 70% of the value chain in fintech (banking, payments, insurance, investments). While the public roster names 31 specific enterprise clients, these claims of dominating specific verticals indicate the presence of non-disclosed contracts with market leaders, likely major banks, dominant payment processors, and global e-commerce leaders.""")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # III. Methodological Framework
-    story.append(Paragraph("III. Methodological Framework for Forensic ARR Reconstruction", section_style))
+    story.heading('section', "III. Methodological Framework for Forensic ARR Reconstruction", 1)
 
     # Key assumptions table
-    story.append(Paragraph("3.1 Establishing ACV Benchmarks for Regulated AI Agents", subsection_style))
-    story.append(Paragraph("""The high-touch sales motion and complex deployment required for Sierra's solution necessitate substantial ACVs. Standard SaaS industry metrics confirm that businesses relying on winning large enterprise contracts prioritize Annual Contract Value as their most useful metric. These deals require high investment in field reps, solution engineers, and on-site pilots, justified only when the payoff per customer is substantial, often reaching six-figure ACV deals or higher.""", body_style))
+    story.heading('subsection', "3.1 Establishing ACV Benchmarks for Regulated AI Agents", 2)
+    story.paragraph('body', """The high-touch sales motion and complex deployment required for Sierra's solution necessitate substantial ACVs. Standard SaaS industry metrics confirm that businesses relying on winning large enterprise contracts prioritize Annual Contract Value as their most useful metric. These deals require high investment in field reps, solution engineers, and on-site pilots, justified only when the payoff per customer is substantial, often reaching six-figure ACV deals or higher.""")
 
     # ARR Reconstruction Table
-    story.append(Paragraph("3.2 ARR Distribution Model", subsection_style))
-
-    arr_data = [
-        ["Customer Segment", "Estimated ACV Range", "Est. Contracts", "Total ARR", "% of $100M"],
-        ["Anchor Tenants\n(Revenue Generation Focus)", "$5M - $7.5M", "5", "$30M", "30.0%"],
-        ["Highly Regulated Infrastructure\n(Compliance Premium)", "$2M - $4M", "10", "$35M", "35.0%"],
-        ["High-Volume E-commerce/Media", "$1M - $2M", "18", "$25M", "25.0%"],
-        ["Core Enterprise Clients", "$0.5M - $1M", "14", "$10M", "10.0%"],
-        ["TOTAL", "~$2.1M Avg", "47", "$100M", "100.0%"]
-    ]
-
-    arr_table = Table(arr_data, colWidths=[2.2*inch, 1.3*inch, 0.8*inch, 0.8*inch, 0.7*inch])
-    arr_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-
-    story.append(arr_table)
-    story.append(Spacer(1, 20))
-
-    story.append(PageBreak())
+    story.heading('subsection', "3.2 ARR Distribution Model", 2)
+
+    arr_data = [["Customer Segment", "Estimated ACV Range", "Est. Contracts", "Total ARR", "% of $100M"]]
+    total_arr = sum(tier.arr_m for tier in data.segments)
+    total_contracts = sum(tier.contracts for tier in data.segments)
+    for tier in data.segments:
+        label = f"{tier.name}\n({tier.focus})" if tier.focus else tier.name
+        arr_data.append([
+            label,
+            f"{format_millions(tier.acv_low_m)} - {format_millions(tier.acv_high_m)}",
+            str(tier.contracts),
+            format_millions(tier.arr_m),
+            f"{tier.arr_m / total_arr * 100:.1f}%",
+        ])
+    arr_data.append(["TOTAL", f"~${total_arr / total_contracts:.1f}M Avg", str(total_contracts),
+                     format_millions(total_arr), "100.0%"])
+
+    story.table('distribution', arr_data, [2.2*inch, 1.3*inch, 0.8*inch, 0.8*inch, 0.7*inch])
+    story.spacer(20)
+
+    if not redacted:
+        story.chart('waterfall', ("ARR by customer segment ($M)", [tier.name for tier in data.segments],
+                                  [tier.arr_m for tier in data.segments], "Total ARR"), 6.2*inch, 2.4*inch)
+        story.spacer(12)
+        story.chart('bar', ("Estimated ACV range per contract ($M)", [tier.name for tier in data.segments],
+                            [(tier.acv_low_m, tier.acv_high_m) for tier in data.segments]), 6.2*inch, 2.2*inch)
+        story.spacer(20)
+
+    # Sensitivity of the reconstruction to its inputs
+    story.heading('subsection', "3.3 Sensitivity of the ARR Reconstruction", 2)
+    story.paragraph('body', """The distribution model rests on assumed ACV ranges and contract counts, and under outcome-based pricing each contract's value also moves with the outcomes it bills for. The table below varies each input on its own (ACV bounds and contract counts by ±20%, containment between 50% and 90%, the fee between 5% and 15% of the $10-$20 avoided cost) and reports the ARR at either end of its range, widest swing first. The Sobol total index is the share of ARR variance attributable to that input, interactions included, when all inputs vary together.""")
+    story.table('tornado', tornado_table_rows(data),
+                [2.4*inch, 1.1*inch, 0.75*inch, 0.75*inch, 0.7*inch, 0.7*inch])
+    story.spacer(20)
+
+    story.page_break()
 
     # IV. Customer Identification and Use Case Mapping
-    story.append(Paragraph("IV. Customer Identification and Use Case Mapping", section_style))
+    story.heading('section', "IV. Customer Identification and Use Case Mapping", 1)
 
-    story.append(Paragraph("4.1 Consolidated Customer Roster and Verification", subsection_style))
-    story.append(Paragraph("""The following list identifies 31 confirmed enterprise clients of Sierra AI, established through named mentions in the company's milestone announcements and visual verification via published case studies or logo placements.""", body_style))
+    story.heading('subsection', "4.1 Consolidated Customer Roster and Verification", 2)
+    story.paragraph('body', """The following list identifies 31 confirmed enterprise clients of Sierra AI, established through named mentions in the company's milestone announcements and visual verification via published case studies or logo placements.""")
 
     # Customer roster
-    customers_data = [
-        ["Industry Sector", "Confirmed Enterprise Customers"],
-        ["Financial Services/Fintech", "Rocket Mortgage, SoFi, Ramp, Brex"],
-        ["Healthcare/Regulated Services", "Cigna, ADT, WeightWatchers, R1 RCM, CLEAR, AG1, Pendulum"],
-        ["Retail/E-commerce/CPG", "Wayfair, Deliveroo, Sonos, Next, Bissell, Safelite, Vans, Gap Inc., The North Face, Casper, Minted, Hy-Vee, Sweetgreen"],
-        ["Media/Telecom/Tech", "Discord, Rivian, Tubi, SiriusXM, DIRECTV, CDW, Redfin"]
-    ]
+    customers_data = [["Industry Sector", "Confirmed Enterprise Customers"]]
+    for sector, names in data.customers_by_sector(segment).items():
+        customers_data.append([sector, ", ".join(names)])
 
-    customers_table = Table(customers_data, colWidths=[1.8*inch, 4.5*inch])
-    customers_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-
-    story.append(customers_table)
-    story.append(Spacer(1, 20))
+    story.long_table('roster', customers_data, [1.8*inch, 4.5*inch])
+    story.spacer(20)
 
     # Use case analysis table
-    story.append(Paragraph("4.2 Detailed Use Case Analysis and Outcome Mapping", subsection_style))
-
-    usecase_data = [
-        ["Customer", "Industry", "Use Case/Agent Function", "Quantifiable Outcome", "Est. ACV Range"],
-        ["Rocket Mortgage", "Fintech/Lending", "Mortgage origination (Digital Assistant)", "Homebuyers convert 4x faster", "$5M - $7.5M"],
-        ["Cigna", "Healthcare/Insurance", "Patient authentication; Policyholder support", "Mission-critical infrastructure; Compliance", "$2.5M - $4M"],
-        ["WeightWatchers", "Healthcare/Wellness", "Empathetic Member Engagement", "4.6 CSAT, ~70% Resolution Rate", "$1.5M - $2.5M"],
-        ["Safelite", "Retail/Services", "Service scheduling (windshield repair)", "Improved service delivery/efficiency", "$0.75M - $1.5M"],
-        ["SoFi/Ramp", "Fintech", "Credit card ordering; Payment support", "Increased acquisition, cross-sell, upsell", "$1.5M - $3M"],
-        ["Deliveroo/Wayfair", "E-commerce", "Returns processing; Customer support", "Increased customer LTV; Scale automation", "$1M - $3M"]
-    ]
+    story.heading('subsection', "4.2 Detailed Use Case Analysis and Outcome Mapping", 2)
 
-    usecase_table = Table(usecase_data, colWidths=[1*inch, 1*inch, 1.7*inch, 1.5*inch, 1*inch])
-    usecase_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    usecase_data = [["Customer", "Industry", "Use Case/Agent Function", "Quantifiable Outcome", "Est. ACV Range"]]
+    for contract in filter(in_segment, data.contracts):
+        usecase_data.append([
+            contract.customer, contract.industry, contract.use_case, contract.outcome,
+            f"{format_millions(contract.acv_low_m)} - {format_millions(contract.acv_high_m)}",
+        ])
 
-    story.append(usecase_table)
-    story.append(PageBreak())
+    story.long_table('usecase', usecase_data, [1*inch, 1*inch, 1.7*inch, 1.5*inch, 1*inch])
+    story.page_break()
 
     # V. ARR Deep Dive by Core Sector
-    story.append(Paragraph("V. ARR Deep Dive by Core Sector: Valuation Justification", section_style))
+    story.heading('section', "V. ARR Deep Dive by Core Sector: Valuation Justification", 1)
 
-    story.append(Paragraph("5.1 Anchor Segment: Fintech and Financial Services ARR ($35M)", subsection_style))
-    story.append(Paragraph("""The financial services sector, claimed to represent over 70% of the value chain from banking to investments, is the highest contributing segment to the $100 million ARR. The high Annual Contract Value (ACV) derivation for anchor tenants in this segment is directly linked to the transactional revenue generated by the agents.""", body_style))
+    story.heading('subsection', "5.1 Anchor Segment: Fintech and Financial Services ARR ($35M)", 2)
+    story.paragraph('body', """The financial services sector, claimed to represent over 70% of the value chain from banking to investments, is the highest contributing segment to the $100 million ARR. The high Annual Contract Value (ACV) derivation for anchor tenants in this segment is directly linked to the transactional revenue generated by the agents.""")
 
-    story.append(Paragraph("""The estimated $5 million to $7.5 million ACV for Rocket Mortgage is justified because the Outcome-Based Pricing is indexed to the tangible financial gain derived from the agent's function. If the Digital Assistant increases conversion speed by 4x, it significantly accelerates the volume of profitable loans originated. The fee structure tied to this incremental revenue stream easily validates a multi-million dollar annual fee.""", body_style))
+    story.paragraph('body', """The estimated $5 million to $7.5 million ACV for Rocket Mortgage is justified because the Outcome-Based Pricing is indexed to the tangible financial gain derived from the agent's function. If the Digital Assistant increases conversion speed by 4x, it significantly accelerates the volume of profitable loans originated. The fee structure tied to this incremental revenue stream easily validates a multi-million dollar annual fee.""")
 
-    story.append(Paragraph("5.2 Healthcare and Regulated Services ARR ($25M)", subsection_style))
-    story.append(Paragraph("""The healthcare segment accounts for over 50% of families in the U.S. and requires exceptionally stringent deployment standards. The high ACV in healthcare is primarily driven by the complexity of integration and the compliance requirements. Sierra's agents must integrate seamlessly with sensitive core systems, including Electronic Health Records (EHR), Patient Management Systems (PMS), and Customer Relationship Management (CRM) tools.""", body_style))
+    story.heading('subsection', "5.2 Healthcare and Regulated Services ARR ($25M)", 2)
+    story.paragraph('body', """The healthcare segment accounts for over 50% of families in the U.S. and requires exceptionally stringent deployment standards. The high ACV in healthcare is primarily driven by the complexity of integration and the compliance requirements. Sierra's agents must integrate seamlessly with sensitive core systems, including Electronic Health Records (EHR), Patient Management Systems (PMS), and Customer Relationship Management (CRM) tools.""")
 
-    story.append(Paragraph("5.3 High-Volume Retail and E-commerce ARR ($25M)", subsection_style))
-    story.append(Paragraph("""The retail and e-commerce segment represents a large proportion of customers, including Wayfair, Deliveroo, and Gap Inc. The firm's claim of serving over 95% of Black Friday shoppers strongly suggests contracts with major global retailers beyond the named public roster. The ACV derivation in this segment, estimated at $1 million to $3 million, is justified by the requirement for extreme scalability and reliability under peak load conditions.""", body_style))
+    story.heading('subsection', "5.3 High-Volume Retail and E-commerce ARR ($25M)", 2)
+    story.paragraph('body', """The retail and e-commerce segment represents a large proportion of customers, including Wayfair, Deliveroo, and Gap Inc. The firm's claim of serving over 95% of Black Friday shoppers strongly suggests contracts with major global retailers beyond the named public roster. The ACV derivation in this segment, estimated at $1 million to $3 million, is justified by the requirement for extreme scalability and reliability under peak load conditions.""")
 
-    story.append(Paragraph("5.4 Media, Telecom, and Diversified Enterprise ARR ($15M)", subsection_style))
-    story.append(Paragraph("""This segment includes legacy service providers like ADT and SiriusXM, and digital media companies like Tubi and Discord. For storied businesses such as ADT and SiriusXM, the implementation of Sierra's unified, hyper-realistic Voice agent represents a fundamental customer experience transformation.""", body_style))
+    story.heading('subsection', "5.4 Media, Telecom, and Diversified Enterprise ARR ($15M)", 2)
+    story.paragraph('body', """This segment includes legacy service providers like ADT and SiriusXM, and digital media companies like Tubi and Discord. For storied businesses such as ADT and SiriusXM, the implementation of Sierra's unified, hyper-realistic Voice agent represents a fundamental customer experience transformation.""")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # VI. Churn Analysis
-    story.append(Paragraph("VI. Churn Analysis, Retention Strategy, and Contract Risk", section_style))
+    story.heading('section', "VI. Churn Analysis, Retention Strategy, and Contract Risk", 1)
 
-    story.append(Paragraph("6.1 Verification of Churn Status", subsection_style))
-    story.append(Paragraph("""Based on the available public information and customer announcements, there is no verifiable evidence or public indication of customer churn—such as contract termination or non-renewal—for any named Sierra AI client. The absence of visible churn within such a highly visible, early-adopting cohort suggests an exceptionally strong early Gross Revenue Retention (GRR).""", body_style))
+    story.heading('subsection', "6.1 Verification of Churn Status", 2)
+    story.paragraph('body', """Based on the available public information and customer announcements, there is no verifiable evidence or public indication of customer churn—such as contract termination or non-renewal—for any named Sierra AI client. The absence of visible churn within such a highly visible, early-adopting cohort suggests an exceptionally strong early Gross Revenue Retention (GRR).""")
 
-    story.append(Paragraph("6.2 Contract Risk Profile: Outcome Failure and Negative Churn", subsection_style))
-    story.append(Paragraph("""While Gross Revenue Retention appears stable, the greatest systemic threat to Sierra's ARR stability is the performance risk inherent in its Outcome-Based Pricing model. The OBP structure is intrinsically tied to continuous, measurable success. If the promised outcomes are not continuously met, or if the agent's performance degrades, the customer is contractually protected.""", body_style))
+    story.heading('subsection', "6.2 Contract Risk Profile: Outcome Failure and Negative Churn", 2)
+    story.paragraph('body', """While Gross Revenue Retention appears stable, the greatest systemic threat to Sierra's ARR stability is the performance risk inherent in its Outcome-Based Pricing model. The OBP structure is intrinsically tied to continuous, measurable success. If the promised outcomes are not continuously met, or if the agent's performance degrades, the customer is contractually protected.""")
 
-    story.append(Paragraph("6.3 Strategic Retention Drivers and High Switching Costs", subsection_style))
-    story.append(Paragraph("""Sierra has successfully deployed several strategies to mitigate inherent churn risks: 1) Integration as Structural Lock-in - agents integrate deeply into core enterprise systems creating extremely high operational switching costs; 2) Focus on LTV and NRR - by successfully delivering expansion revenue to clients, Sierra ensures that contracts are self-justifying.""", body_style))
+    story.heading('subsection', "6.3 Strategic Retention Drivers and High Switching Costs", 2)
+    story.paragraph('body', """Sierra has successfully deployed several strategies to mitigate inherent churn risks: 1) Integration as Structural Lock-in - agents integrate deeply into core enterprise systems creating extremely high operational switching costs; 2) Focus on LTV and NRR - by successfully delivering expansion revenue to clients, Sierra ensures that contracts are self-justifying.""")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # VII. Conclusions
-    story.append(Paragraph("VII. Conclusions and Forward-Looking Assessment", section_style))
+    story.heading('section', "VII. Conclusions and Forward-Looking Assessment", 1)
 
-    story.append(Paragraph("7.1 Summary of ARR Reconstruction Success", subsection_style))
-    story.append(Paragraph("""The forensic analysis confirms that Sierra AI's achievement of $100 million in Annual Recurring Revenue within 21 months is fundamentally sound and structurally justified by its strategic positioning. The revenue velocity is enabled by three core components:""", body_style))
+    story.heading('subsection', "7.1 Summary of ARR Reconstruction Success", 2)
+    story.paragraph('body', """The forensic analysis confirms that Sierra AI's achievement of $100 million in Annual Recurring Revenue within 21 months is fundamentally sound and structurally justified by its strategic positioning. The revenue velocity is enabled by three core components:""")
 
-    story.append(Paragraph("""1. <b>Exclusive Enterprise Targeting:</b> A relentless focus on Fortune 1000 companies, resulting in high-density ACVs (average ACV estimated at ~$2.1 million).""", body_style))
-    story.append(Paragraph("""2. <b>Outcome-Based Pricing (OBP):</b> The commercial model aligns pricing directly with revenue-generating outcomes (e.g., 4x conversion increase), justifying multi-million dollar contracts and driving high Net Revenue Retention.""", body_style))
-    story.append(Paragraph("""3. <b>Regulatory Moat:</b> Specialized compliance for regulated sectors (Fintech, Healthcare) enables the charging of a significant premium for security and compliance guarantees, further inflating contract values.""", body_style))
+    story.paragraph('body', """1. <b>Exclusive Enterprise Targeting:</b> A relentless focus on Fortune 1000 companies, resulting in high-density ACVs (average ACV estimated at ~$2.1 million).""")
+    story.paragraph('body', """2. <b>Outcome-Based Pricing (OBP):</b> The commercial model aligns pricing directly with revenue-generating outcomes (e.g., 4x conversion increase), justifying multi-million dollar contracts and driving high Net Revenue Retention.""")
+    story.paragraph('body', """3. <b>Regulatory Moat:</b> Specialized compliance for regulated sectors (Fintech, Healthcare) enables the charging of a significant premium for security and compliance guarantees, further inflating contract values.""")
 
-    story.append(Paragraph("7.2 Competitive Landscape and Future Sustainability", subsection_style))
-    story.append(Paragraph("""Sierra has established a commanding lead in the niche of agentic AI designed for complex, regulated enterprise environments, positioning itself ahead of vendors focused solely on general conversational AI platforms. Sustaining this trajectory requires continuous, demonstrable validation of the OBP outcomes.""", body_style))
+    story.heading('subsection', "7.2 Competitive Landscape and Future Sustainability", 2)
+    story.paragraph('body', """Sierra has established a commanding lead in the niche of agentic AI designed for complex, regulated enterprise environments, positioning itself ahead of vendors focused solely on general conversational AI platforms. Sustaining this trajectory requires continuous, demonstrable validation of the OBP outcomes.""")
 
-    story.append(Paragraph("""Future financial diligence must focus specifically on the unit economics of the most valuable contracts (those in the $5 million-plus range) and verify the gross margin associated with achieving and maintaining the promised outcomes. As Sierra scales, maintaining high NRR will depend entirely on the operational discipline required to keep the agents performing flawlessly, thereby protecting the integrity and growth of the existing $100 million ARR foundation.""", body_style))
+    story.paragraph('body', """Future financial diligence must focus specifically on the unit economics of the most valuable contracts (those in the $5 million-plus range) and verify the gross margin associated with achieving and maintaining the promised outcomes. As Sierra scales, maintaining high NRR will depend entirely on the operational discipline required to keep the agents performing flawlessly, thereby protecting the integrity and growth of the existing $100 million ARR foundation.""")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # References
-    story.append(Paragraph("References", section_style))
-
-    references = [
-        "1. Sierra hits $100M ARR milestone in 7 quarters, https://sierra.ai/blog/100m-arr",
-        "2. Sierra hits $100M ARR in 21 months, proving AI agents work - The Tech Buzz, https://www.techbuzz.ai/articles/sierra-hits-100m-arr-in-21-months-proving-ai-agents-work",
-        "3. Sierra hits $100M ARR milestone in 7 quarters - MLQ.ai, https://mlq.ai/news/sierra-hits-100m-arr-milestone-in-7-quarters/",
-        "4. ACV vs. ARR: What each metric really means and when they matter - Stripe, https://stripe.com/resources/more/acv-vs-arr-what-each-metric-really-means-and-when-they-matter",
-        "5. GrowthPad – Subscriptions Growth Tactics & Strategies, https://growthpad.blog/",
-        "6. Agentic AI Pricing Models: How to Choose Between Token‑, Task‑, and Outcome‑Based Pricing - Monetizely, https://www.getmonetizely.com/articles/agentic-ai-pricing-models-how-to-choose-between-token-task-and-outcomebased-pricing",
-        "7. Your trusted AI agent for better healthcare experiences | Sierra, https://sierra.ai/industries/healthcare",
-        "8. Sitemap | SaaStr, https://www.saastr.com/sitemap/",
-        "9. Your trusted AI agent for better customer experiences - Sierra, https://sierra.ai/industries/financial-services",
-        "10. Sierra | Better customer experiences | Sierra, https://sierra.ai/",
-        "11. Change agents: Rocket Mortgage - Sierra AI, https://sierra.ai/blog/ai-agents-in-action-rocket-mortgage",
-        "12. How to set and track contract duration - Juro, https://juro.com/learn/contract-duration",
-        "13. 2018 Annual Report, https://www.annualreports.com/HostedData/AnnualReportArchive/a/NYSE_AVYA_2018.pdf",
-        "14. Gartner Magic Quadrant for Conversational AI Platforms | Google Cloud Blog, https://cloud.google.com/blog/products/ai-machine-learning/gartner-magic-quadrant-for-conversational-ai-platforms"
-    ]
+    story.heading('section', "References", 1)
 
-    for i, ref in enumerate(references, 1):
-        story.append(Paragraph(f"{i}. {ref}", body_style))
+    for source in data.sources:
+        story.paragraph('body', f"{source.id}. {source.title}, {source.url}")
 
     # Footer with author info
-    story.append(Spacer(1, 30))
-    story.append(Paragraph("Prepared by: Rohit Kelapure", ParagraphStyle('Footer', parent=styles['Normal'], fontSize=10, alignment=TA_CENTER, textColor=colors.grey)))
-    story.append(Paragraph(f"Analysis completed: {datetime.now().strftime('%B %Y')}", ParagraphStyle('FooterDate', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER, textColor=colors.grey)))
-
-    # Build PDF
-    doc.build(story)
-
+    story.spacer(30)
+    story.paragraph('footer', "Prepared by: Rohit Kelapure")
+    story.paragraph('footer_date', f"Analysis completed: {date.strftime('%B %Y')}")
+
+    if redacted:
+        redact_story(story)
+    return story
+
+def render_report(story, output, pagesize=letter, cache=None, timings=None, profile=None):
+    """Lay out and write a story from build_story; returns render_story's section summary
+
+    Sections whose content is unchanged since an earlier render are reused
+    from cache (default: the process-wide report_engine.section_cache();
+    False disables it). timings, when a dict, receives the layout and
+    write seconds; profile names a report_profiles output profile.
+    """
+    from report_engine import render_story
+
+    return render_story(story, output, REPORT_KEY, STYLE_SPECS, TABLE_SPECS,
+                        dict(pagesize=pagesize, **PAGE_MARGINS), cache=cache, timings=timings,
+                        profile=profile)
+
+def write_pdf(output, pagesize=letter, segment=None, redacted=False, date=None, cache=None,
+              dataset=None, profile=None):
+    """Render the report into output: a file path, binary stream, socket or file descriptor
+
+    segment, redacted, date and dataset are passed to build_story, and cache
+    and profile to render_report, whose section summary is returned.
+    """
+    return render_report(build_story(segment, redacted, date, dataset), output, pagesize, cache,
+                         profile=profile)
+
+def pdf_bytes(pagesize=letter, segment=None, redacted=False, date=None, cache=None, dataset=None,
+              profile=None, view=False):
+    """Render the report in memory; returns bytes, or a memoryview over the buffer with view=True"""
+    from report_engine import pdf_bytes as render_pdf_bytes
+
+    return render_pdf_bytes(write_pdf, pagesize, segment, redacted, date, cache, dataset, profile,
+                            view=view)
+
+def create_sierra_analysis_pdf(filename=OUTPUT_PATH, pagesize=letter, segment=None, redacted=False,
+                               date=None, cache=None, dataset=None, profile=None):
+    """Create professional PDF of Sierra AI forensic financial analysis
+
+    Writes to filename (a path or anything write_pdf accepts) and returns it.
+    """
+    write_pdf(filename, pagesize, segment, redacted, date, cache, dataset, profile)
     return filename
 
+def validate(pagesize=letter, segment=None, redacted=False, date=None, dataset=None):
+    """Build the story and return its structural problems (report_story.validate_story) without rendering"""
+    return validate_story(build_story(segment, redacted, date, dataset), STYLE_SPECS, TABLE_SPECS,
+                          dict(pagesize=pagesize, **PAGE_MARGINS))
+
 if __name__ == "__main__":
-    pdf_file = create_sierra_analysis_pdf()
-    print(f"PDF created successfully: {pdf_file}")
\ No newline at end of file
+    # "-" writes the PDF to stdout, e.g. to pipe it into another program
+    target = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_PATH
+    if target == '-':
+        sys.stdout.flush()
+        write_pdf(sys.stdout.fileno())
+    elif target == '--validate':
+        problems = validate()
+        print('\n'.join(problems) or "Forensic analysis story is valid")
+        sys.exit(1 if problems else 0)
+    else:
+        pdf_file = create_sierra_analysis_pdf(target)
+        print(f"PDF created successfully: {pdf_file}")
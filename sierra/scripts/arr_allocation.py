@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Sierra Logo-Level ARR Allocation Model
+Monte Carlo scenario model for the per-contract ACVs behind the $100M ARR
+
+Every sample allocates an ACV to each of the 47 modelled contracts such that
+each contract stays inside its tier's ACV range, each tier sums to its ARR and
+the tiers sum to the total. Within a tier the sample is uniform over all
+allocations that meet those constraints. Named customers are placed in the
+tier given by the dataset; by default they also keep the relative order of
+their written ACV estimates, while unnamed contracts and customers without an
+estimate take the remaining positions at random.
+
+Sampling is batched: uniform Dirichlet draws scaled onto the tier's sum, with
+rows that break the upper bound rejected a whole batch at a time.
+
+Usage: python arr_allocation.py [--samples N] [--seed S] [--unranked]
+"""
+
+import argparse
+import time
+from math import comb
+
+import numpy as np
+
+from sierra_data import load_dataset, format_millions
+
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_BATCH_ROWS = 250_000
+
+
+def _slice_acceptance(n, t):
+    """Probability that n uniform spacings scaled to sum t all stay below 1"""
+    return sum((-1) ** k * comb(n, k) * max(0.0, 1 - k / t) ** (n - 1) for k in range(n + 1))
+
+
+def sample_bounded_sum(rng, n, low, high, total, size):
+    """size x n float32 array of values in [low, high] with every row summing to total
+
+    Rows are uniform over that constrained set. Values are sampled on the unit
+    cube as y = (x - low) / (high - low); when the target sits in the upper half
+    of the cube the mirror image 1 - y is sampled instead, which keeps the
+    acceptance rate of the upper-bound rejection step high.
+    """
+    width = high - low
+    slack = (total - n * low) / width
+    if slack < -1e-9 or slack > n + 1e-9:
+        raise ValueError(f"{n} values in [{low}, {high}] cannot sum to {total}")
+    slack = min(max(slack, 0.0), float(n))
+    flip = slack > n / 2
+    target = n - slack if flip else slack
+
+    if target == 0:
+        unit = np.zeros((size, n), dtype=np.float32)
+    else:
+        acceptance = _slice_acceptance(n, target) if n > 1 else 1.0
+        unit = np.empty((size, n), dtype=np.float32)
+        filled = 0
+        while filled < size:
+            rows = min(MAX_BATCH_ROWS, int((size - filled) / acceptance * 1.1) + 64)
+            # Contracts along axis 0 so the per-sample reductions run over contiguous rows
+            draws = rng.standard_exponential((n, rows), dtype=np.float32)
+            sums = draws.sum(axis=0)
+            keep = draws.max(axis=0) * np.float32(target) <= sums
+            take = min(int(keep.sum()), size - filled)
+            accepted = draws[:, keep][:, :take] * (np.float32(target) / sums[keep][:take])
+            unit[filled:filled + take] = accepted.T
+            filled += take
+
+    if flip:
+        unit = 1.0 - unit
+    return np.float32(low) + np.float32(width) * unit
+
+
+class Allocation:
+    """Sampled per-contract ACVs ($M) with column labels and tiers"""
+
+    def __init__(self, values, labels, tiers, named):
+        self.values = values          # samples x contracts
+        self.labels = labels          # contract label per column
+        self.tiers = tiers            # tier key per column
+        self.named = named            # True where the column is a named customer
+
+    def bands(self, percentiles=PERCENTILES):
+        """{label: percentile values} for the named customers"""
+        columns = np.flatnonzero(self.named)
+        # One contiguous row per customer makes the partitioning much cheaper
+        per_customer = np.ascontiguousarray(self.values[:, columns].T)
+        table = np.percentile(per_customer, percentiles, axis=1)
+        return {self.labels[c]: table[:, i] for i, c in enumerate(columns)}
+
+    def top_share(self, k=10, percentiles=PERCENTILES):
+        """Percentiles of the share of total ARR held by the k largest contracts"""
+        top = -np.partition(-self.values, k - 1, axis=1)[:, :k]
+        share = top.sum(axis=1) / self.values.sum(axis=1)
+        return np.percentile(share, percentiles)
+
+    def constraint_error(self, segments):
+        """Largest violation of any ACV bound or tier total across all samples"""
+        worst = 0.0
+        tiers = np.asarray(self.tiers)
+        for tier in segments:
+            block = self.values[:, tiers == tier.key]
+            worst = max(worst,
+                        float(np.max(tier.acv_low_m - block, initial=0.0)),
+                        float(np.max(block - tier.acv_high_m, initial=0.0)),
+                        float(np.max(np.abs(block.sum(axis=1) - tier.arr_m))))
+        return worst
+
+
+def _rank_named(rng, block, estimates):
+    """Reorder each row of a tier block so ranked customers keep their estimate order
+
+    The first len(estimates) columns are the ranked customers. Each row's values
+    are sorted, a random subset of rank positions goes to the ranked customers in
+    descending-estimate order (ties broken at random) and the rest go to the
+    other columns in random order.
+    """
+    size, n = block.shape
+    m = len(estimates)
+    ordered = -np.sort(-block, axis=1)
+    positions = np.argsort(rng.random((size, n)), axis=1)
+    ranked_positions = np.sort(positions[:, :m], axis=1)
+
+    jitter = rng.random((size, m)) * 1e-6
+    order = np.argsort(-(np.asarray(estimates) + jitter), axis=1)
+
+    result = np.empty_like(block)
+    rows = np.arange(size)[:, None]
+    result[rows, order] = np.take_along_axis(ordered, ranked_positions, axis=1)
+    result[:, m:] = np.take_along_axis(ordered, positions[:, m:], axis=1)
+    return result
+
+
+def allocate(samples=1_000_000, seed=None, ranked=True, dataset=None):
+    """Sample per-contract ACVs for every tier; returns an Allocation"""
+    dataset = dataset or load_dataset()
+    rng = np.random.default_rng(seed)
+
+    blocks, labels, tiers, named = [], [], [], []
+    for tier in dataset.segments:
+        customers = [c for c in dataset.customers if c.tier == tier.key]
+        if len(customers) > tier.contracts:
+            raise ValueError(f"{len(customers)} named customers in tier {tier.key!r} "
+                             f"but only {tier.contracts} contracts")
+        estimated = sorted((c for c in customers if c.est_acv_m is not None),
+                           key=lambda c: -c.est_acv_m)
+        unestimated = [c for c in customers if c.est_acv_m is None]
+        columns = [c.name for c in estimated + unestimated]
+        unnamed = tier.contracts - len(columns)
+        columns += [f"Unnamed {tier.name} #{i + 1}" for i in range(unnamed)]
+
+        block = sample_bounded_sum(rng, tier.contracts, tier.acv_low_m,
+                                   tier.acv_high_m, tier.arr_m, samples)
+        if ranked and estimated:
+            block = _rank_named(rng, block, [c.est_acv_m for c in estimated])
+
+        blocks.append(block)
+        labels += columns
+        tiers += [tier.key] * tier.contracts
+        named += [True] * len(customers) + [False] * unnamed
+
+    return Allocation(np.hstack(blocks), labels, tiers, np.array(named))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo logo-level ARR allocation")
+    parser.add_argument('--samples', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--unranked', action='store_true',
+                        help='treat contracts within a tier as exchangeable, ignoring written estimates')
+    args = parser.parse_args()
+
+    dataset = load_dataset()
+    start = time.perf_counter()
+    allocation = allocate(args.samples, args.seed, ranked=not args.unranked, dataset=dataset)
+    sampled = time.perf_counter() - start
+    bands = allocation.bands()
+    elapsed = time.perf_counter() - start
+
+    estimates = {c.name: c for c in dataset.customers}
+    header = ''.join(f"{'P%d' % p:>8}" for p in PERCENTILES)
+    print(f"{'Customer':<18} {'Tier':<12} {'Est.':>7}{header}")
+    for label, values in bands.items():
+        customer = estimates[label]
+        est = format_millions(customer.est_acv_m) if customer.est_acv_m is not None else '-'
+        flag = ''
+        if customer.est_acv_m is not None and not values[0] <= customer.est_acv_m <= values[-1]:
+            flag = '  outside P5-P95'
+        row = ''.join(f"{v:>8.2f}" for v in values)
+        print(f"{label:<18} {customer.tier:<12} {est:>7}{row}{flag}")
+
+    share = allocation.top_share(10)
+    print(f"\nTop-10 contract share of ARR: P5 {share[0]:.1%}, P50 {share[2]:.1%}, P95 {share[-1]:.1%}")
+    print(f"Max constraint violation: {allocation.constraint_error(dataset.segments):.2e} $M")
+    print(f"{args.samples:,} samples x {allocation.values.shape[1]} contracts: "
+          f"sampled in {sampled:.2f}s, {elapsed:.2f}s with percentile bands")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Sierra ARR Consistency Checker
+Cross-checks the ARR, contract and customer figures stated in the data, README, analysis and report sources
+
+Every figure the artifacts state about the revenue split is read into one
+model of facts: a table (a CSV file, a markdown table, the forensic report's
+section headings, ...), an entity (the total, a customer segment, an ARR
+distribution tier or a customer), a metric and a value, with the file and
+line (or report section and block) it came from. The CSV tables also contribute tallies, such as the number
+of named customers and their estimated ACV per segment and tier, and the
+analysis markdown its own tally of the customers it lists.
+
+All invariants are then evaluated over arrays of those facts at once:
+
+- agreement: every statement of a figure matches the first table giving it,
+  taking the data tables first, then the forensic report, README and analysis
+- sum: segment and tier figures in a table add up to the table's total, or
+  to the agreed total when the table does not state one
+- average: a stated average contract value is ARR / contracts
+- remainder: the ARR a segment or tier leaves after its estimated named
+  customers can be spread over its other contracts within the ACV range
+  (a tier's own range; for a segment, the lowest to highest tier ACV)
+- band: each customer's estimated ACV lies in its tier's ACV range and in
+  the range of its contract in contracts.csv
+- arithmetic: worked sums such as "$100M ÷ 47 contracts = $2.1M" hold to the
+  precision of their stated result
+
+The forensic report is read from the story its build_story makes, not
+from its source, so the check needs no reportlab. Building that story and
+checking everything takes about a tenth of a second, so render_reports runs
+the check after every render and lists the violations.
+
+Usage: python arr_consistency.py [--data-dir DIR] [--json]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from sierra_data import DATA_DIR, Dataset, load_dataset, format_millions
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SIERRA_DIR = os.path.dirname(SCRIPTS_DIR)
+REPO_ROOT = os.path.dirname(SIERRA_DIR)
+
+README_PATH = os.path.join(REPO_ROOT, 'README.md')
+ANALYSIS_PATH = os.path.join(SIERRA_DIR, 'analysis', 'Sierra_AI_Analysis_CP_Style_v1.md')
+FORENSIC_PATH = os.path.join(SCRIPTS_DIR, 'Sierra_AI_Forensic_Financial_Analysis_100M_ARR.py')
+
+# Customer segments and the words naming them in headings and table rows, matched in order
+SECTOR_WORDS = (
+    ('fintech', ('fintech', 'financial')),
+    ('healthcare', ('health',)),
+    ('retail', ('retail', 'e-commerce')),
+    ('media', ('media',)),
+)
+SECTORS = tuple(sector for sector, _ in SECTOR_WORDS)
+
+METRICS = ('arr_m', 'contracts', 'avg_acv_m', 'named', 'estimated', 'named_acv_m',
+           'acv_m', 'acv_low_m', 'acv_high_m', 'sector', 'tier')
+METRIC_LABELS = {
+    'arr_m': 'ARR',
+    'contracts': 'contracts',
+    'avg_acv_m': 'average ACV',
+    'named': 'named customers',
+    'estimated': 'customers with an ACV estimate',
+    'named_acv_m': 'estimated ACV of named customers',
+    'acv_m': 'ACV',
+    'acv_low_m': 'low ACV',
+    'acv_high_m': 'high ACV',
+    'sector': 'segment',
+    'tier': 'tier',
+}
+# Metrics a segment or tier breakdown adds up to the total
+ADDITIVE = ('arr_m', 'contracts', 'named', 'estimated', 'named_acv_m')
+
+# Largest difference still counted as agreement; averages are quoted to $0.1M
+TOLERANCE = 1e-6
+AVERAGE_TOLERANCE = 0.05
+
+# Markdown table columns read as metrics, by lower-cased header
+COLUMN_METRICS = {
+    'arr': 'arr_m',
+    'customers': 'contracts',
+    'avg contract': 'avg_acv_m',
+    'est. acv': 'acv_m',
+}
+
+_NUMBER = r'\$?\d+(?:\.\d+)?[MK]?'
+
+# Headline figures quoted in prose: pattern, entity and the metric of each group
+PROSE_FACTS = (
+    (re.compile(r'\b(\d+) (?:total )?enterprise contracts\b'), 'total', ('contracts',)),
+    (re.compile(r'\b(\d+) (?:publicly confirmed|confirmed enterprise customers|named enterprise customers)\b'),
+     'total', ('named',)),
+    (re.compile(r'(?:averaging |Average ACV\W*)\$(\d+(?:\.\d+)?)M'), 'total', ('avg_acv_m',)),
+    (re.compile(r'\$(\d+(?:\.\d+)?)M average contract value'), 'total', ('avg_acv_m',)),
+    (re.compile(r'\b(\d+) customers = \$(\d+(?:\.\d+)?)M ARR'), 'total', ('named', 'named_acv_m')),
+)
+
+# Worked arithmetic such as "$23M ÷ $1.4M avg = 16 additional contracts"
+_EQUATION = re.compile(rf'({_NUMBER})[^=\d$]*?\s([-+÷×*/])\s({_NUMBER})[^=\d$]*?=\s*({_NUMBER})')
+_OPERATORS = {'+': 0, '-': 1, '×': 2, '*': 2, '÷': 3, '/': 3}
+
+_SECTOR_HEADING = re.compile(r'^#{2,4}\s+(.+?)\s+\(\$(\d+(?:\.\d+)?)M ARR\)')
+_REPORT_ARR = re.compile(r'\bARR \(\$(\d+(?:\.\d+)?)M\)')
+
+
+@dataclass(frozen=True, slots=True)
+class Fact:
+    """One figure as stated, or tallied, in one table of a source
+
+    entity is 'total', 'sector:<segment>', 'tier:<tier key>' or
+    'customer:<name>'; sector and tier values are indexes into SECTORS and the
+    tier keys. location is 'path:line' relative to the repository, 'path
+    section N block M' for a report story, or just the path for tallies.
+    """
+    table: str
+    entity: str
+    metric: str
+    value: float
+    location: str
+
+
+@dataclass(frozen=True, slots=True)
+class Equation:
+    """Worked arithmetic 'a op b = c' quoted in a document"""
+    a: float
+    operator: str
+    b: float
+    c: float
+    decimals: int
+    text: str
+    location: str
+
+
+@dataclass(frozen=True, slots=True)
+class Violation:
+    """Broken invariant, reported at the statement that breaks it"""
+    invariant: str
+    location: str
+    message: str
+
+    def __str__(self):
+        return f"{self.location}: {self.message}"
+
+
+def _relative(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def _amount(text):
+    """'$35M' -> 35.0, '$800K' -> 0.8, '47' -> 47.0 ($-figures in millions)"""
+    text = text.strip().strip('*').strip()
+    value = float(text.lstrip('$').rstrip('MK'))
+    return value / 1000 if text.endswith('K') else value
+
+
+def _decimals(text):
+    digits = text.lstrip('$').rstrip('MK')
+    return len(digits.partition('.')[2])
+
+
+def sector_of(label):
+    """Customer segment named by a heading or row label, or None"""
+    label = label.lower()
+    for sector, words in SECTOR_WORDS:
+        if any(word in label for word in words):
+            return sector
+    return None
+
+
+def _tallies(table, customers, location, tiers):
+    """Named-customer counts and estimated ACV per segment, per tier and in total"""
+    facts = []
+    groups = [('total', customers)]
+    groups += [(f'sector:{sector}', [c for c in customers if c[1] == sector]) for sector in SECTORS]
+    if tiers:
+        groups += [(f'tier:{tier}', [c for c in customers if c[2] == tier]) for tier in tiers]
+    for entity, members in groups:
+        estimates = [acv for _, _, _, acv in members if acv is not None]
+        facts += [Fact(table, entity, 'named', len(members), location),
+                  Fact(table, entity, 'estimated', len(estimates), location),
+                  Fact(table, entity, 'named_acv_m', round(sum(estimates), 6), location)]
+    return facts
+
+
+def data_facts(dataset):
+    """Facts from the CSV tables: tiers, customers, contract ranges and their tallies"""
+    facts = []
+    path = _relative(os.path.join(dataset.data_dir, 'segments.csv'))
+    tiers = [tier.key for tier in dataset.segments]
+    for line, tier in enumerate(dataset.segments, 2):
+        for metric in ('arr_m', 'contracts', 'acv_low_m', 'acv_high_m'):
+            facts.append(Fact(path, f'tier:{tier.key}', metric, getattr(tier, metric), f"{path}:{line}"))
+    facts += [Fact(path, 'total', 'arr_m', sum(tier.arr_m for tier in dataset.segments), path),
+              Fact(path, 'total', 'contracts', sum(tier.contracts for tier in dataset.segments), path)]
+
+    path = _relative(os.path.join(dataset.data_dir, 'customers.csv'))
+    for line, customer in enumerate(dataset.customers, 2):
+        entity, location = f'customer:{customer.name}', f"{path}:{line}"
+        facts += [Fact(path, entity, 'sector', SECTORS.index(customer.segment), location),
+                  Fact(path, entity, 'tier', tiers.index(customer.tier), location)]
+        if customer.est_acv_m is not None:
+            facts.append(Fact(path, entity, 'acv_m', customer.est_acv_m, location))
+    facts += _tallies(path, [(c.name, c.segment, c.tier, c.est_acv_m) for c in dataset.customers], path, tiers)
+
+    path = _relative(os.path.join(dataset.data_dir, 'contracts.csv'))
+    for line, contract in enumerate(dataset.contracts, 2):
+        # Shared rows such as 'SoFi/Ramp' give the range of each customer's contract
+        for name in contract.customer.split('/'):
+            for metric in ('acv_low_m', 'acv_high_m'):
+                facts.append(Fact(path, f'customer:{name}', metric, getattr(contract, metric), f"{path}:{line}"))
+    return facts, tiers
+
+
+def _table_rows(lines, start):
+    """Cells of a markdown table from its header line; returns (header, [(line number, cells)])"""
+    def cells(line):
+        return [cell.strip().strip('*').strip() for cell in line.strip().strip('|').split('|')]
+
+    header = [cell.lower() for cell in cells(lines[start])]
+    rows = []
+    for number in range(start + 2, len(lines)):
+        if not lines[number].lstrip().startswith('|'):
+            break
+        rows.append((number + 1, cells(lines[number])))
+    return header, rows
+
+
+def markdown_facts(path):
+    """Facts and worked arithmetic from a markdown document
+
+    Tables whose first column is Segment give segment and total figures;
+    tables whose first column is Customer give each customer's ACV and, from
+    the heading above them, its segment, and are tallied as one table.
+    Headings ending in '($35M ARR)' give a segment's ARR.
+    """
+    source = _relative(path)
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    facts, equations, listed = [], [], []
+    sector = None
+    number = 0
+    while number < len(lines):
+        line = lines[number]
+        location = f"{source}:{number + 1}"
+        heading = _SECTOR_HEADING.match(line)
+        if heading:
+            sector = sector_of(heading.group(1))
+            if sector:
+                facts.append(Fact(f"{source} headings", f'sector:{sector}', 'arr_m', float(heading.group(2)),
+                                  location))
+        elif line.startswith('#'):
+            sector = None
+
+        if line.lstrip().startswith('|') and number + 1 < len(lines) and set(lines[number + 1].strip()) <= set('|-: '):
+            header, rows = _table_rows(lines, number)
+            columns = [(index, COLUMN_METRICS[name]) for index, name in enumerate(header) if name in COLUMN_METRICS]
+            table = location
+            for row_number, row in rows:
+                row_location = f"{source}:{row_number}"
+                if header[0] == 'segment':
+                    entity = 'total' if row[0].lower() == 'total' else sector_of(row[0])
+                    if entity is None:
+                        continue
+                    entity = entity if entity == 'total' else f'sector:{entity}'
+                elif header[0] == 'customer':
+                    entity = f'customer:{row[0]}'
+                    acv = next((_amount(row[index]) for index, metric in columns if metric == 'acv_m'), None)
+                    listed.append((row[0], sector, None, acv))
+                    if sector:
+                        facts.append(Fact(table, entity, 'sector', SECTORS.index(sector), row_location))
+                else:
+                    break
+                facts += [Fact(table, entity, metric, _amount(row[index]), row_location)
+                          for index, metric in columns if index < len(row)]
+            number += len(rows) + 2
+            continue
+
+        for pattern, entity, metrics in PROSE_FACTS:
+            for match in pattern.finditer(line):
+                facts += [Fact(f"{source} text", entity, metric, float(value), location)
+                          for metric, value in zip(metrics, match.groups())]
+        for match in _EQUATION.finditer(line):
+            a, operator, b, c = match.groups()
+            equations.append(Equation(_amount(a), operator, _amount(b), _amount(c), _decimals(c),
+                                      match.group(0), location))
+        number += 1
+
+    if listed:
+        facts += _tallies(f"{source} customer tables", listed, source, None)
+    return facts, equations
+
+
+def report_story(path, dataset=None):
+    """Story of the report generator at path, built from dataset; reportlab is not imported"""
+    sys.path.insert(0, os.path.dirname(path))
+    module = importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+    return module.build_story(dataset=dataset)
+
+
+def report_facts(story, source, customer_names):
+    """Segment ARR from a report story's 'ARR ($35M)' headings, and the customers named under each
+
+    Facts are read from the story's blocks, so their locations are the
+    section and block within the report built from source.
+    """
+    mention = re.compile('|'.join(rf'(?<!\w){re.escape(name)}(?!\w)'
+                                  for name in sorted(customer_names, key=len, reverse=True)))
+    facts = []
+    for section in story.sections:
+        # Each section is a page; a segment's heading covers the paragraphs after it on that page
+        sector = None
+        for position, block in enumerate(section.blocks, 1):
+            location = f"{source} section {section.index + 1} block {position}"
+            if block[0] == 'heading':
+                arr = _REPORT_ARR.search(block[2])
+                sector = sector_of(block[2]) if arr else None
+                if sector:
+                    facts.append(Fact(f"{source} headings", f'sector:{sector}', 'arr_m', float(arr.group(1)),
+                                      location))
+            elif sector and block[0] == 'paragraph':
+                for name in dict.fromkeys(mention.findall(block[2])):
+                    facts.append(Fact(f"{source} text", f'customer:{name}', 'sector', SECTORS.index(sector),
+                                      location))
+    return facts
+
+
+def collect(dataset=None, readme=README_PATH, analysis=ANALYSIS_PATH, report=FORENSIC_PATH):
+    """Facts, worked equations and tier keys from every source, data tables first"""
+    dataset = dataset or load_dataset()
+    facts, tiers = data_facts(dataset)
+    facts += report_facts(report_story(report, dataset), _relative(report),
+                          [customer.name for customer in dataset.customers])
+    equations = []
+    for path in (readme, analysis):
+        document_facts, document_equations = markdown_facts(path)
+        facts += document_facts
+        equations += document_equations
+    return facts, equations, tiers
+
+
+class FactModel:
+    """Facts as parallel arrays plus a (table, entity, metric) cube
+
+    consensus holds, per entity and metric, the first stated value, which
+    checks fall back to when a table does not state a figure itself.
+    """
+
+    def __init__(self, facts, tiers):
+        self.facts = facts
+        self.tiers = tiers
+        self.tables = list(dict.fromkeys(fact.table for fact in facts))
+        self.entities = list(dict.fromkeys(fact.entity for fact in facts))
+        table_index = {table: index for index, table in enumerate(self.tables)}
+        entity_index = {entity: index for index, entity in enumerate(self.entities)}
+        metric_index = {metric: index for index, metric in enumerate(METRICS)}
+
+        self.table = np.array([table_index[fact.table] for fact in facts], dtype=np.intp)
+        self.entity = np.array([entity_index[fact.entity] for fact in facts], dtype=np.intp)
+        self.metric = np.array([metric_index[fact.metric] for fact in facts], dtype=np.intp)
+        self.value = np.array([fact.value for fact in facts], dtype=np.float64)
+
+        shape = (len(self.tables), len(self.entities), len(METRICS))
+        self.cube = np.full(shape, np.nan)
+        self.where = np.full(shape, -1, dtype=np.intp)
+        # Assigned in reverse so the first fact wins where a table repeats a figure
+        order = np.arange(len(facts))[::-1]
+        self.cube[self.table[order], self.entity[order], self.metric[order]] = self.value[order]
+        self.where[self.table[order], self.entity[order], self.metric[order]] = order
+
+        key = self.entity * len(METRICS) + self.metric
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        self.reference = first[inverse]
+        self.consensus = np.full(shape[1:], np.nan)
+        self.consensus[self.entity[first], self.metric[first]] = self.value[first]
+
+        self.dimensions = ('sector', 'tier')
+        self.members = np.array([[entity.startswith(f'{dimension}:') for entity in self.entities]
+                                 for dimension in self.dimensions])
+        self.total = entity_index.get('total')
+        self.entity_index = entity_index
+
+    def stated(self, metric):
+        """(tables x entities) values of metric, falling back to the consensus where a table is silent"""
+        index = METRICS.index(metric)
+        values = self.cube[:, :, index]
+        return np.where(np.isnan(values), self.consensus[None, :, index], values)
+
+    def describe(self, entity, metric, value):
+        """'fintech segment ARR $35M' style description of a figure"""
+        name = self.entities[entity] if isinstance(entity, (int, np.integer)) else entity
+        kind, _, key = name.partition(':')
+        subject = {'sector': f"{key} segment", 'tier': f"{key} tier", 'customer': key}.get(kind, 'total')
+        metric = METRICS[metric] if isinstance(metric, (int, np.integer)) else metric
+        return f"{subject} {METRIC_LABELS[metric]} {self.format(metric, value)}"
+
+    def format(self, metric, value):
+        if metric == 'sector':
+            return SECTORS[int(value)]
+        if metric == 'tier':
+            return self.tiers[int(value)]
+        if metric.endswith('_m'):
+            return format_millions(round(float(value), 2))
+        return f"{value:g}"
+
+
+def _tolerances():
+    return np.array([AVERAGE_TOLERANCE if metric == 'avg_acv_m' else TOLERANCE for metric in METRICS])
+
+
+def check_agreement(model):
+    """Every statement of a figure equals the first one"""
+    reference = model.reference
+    bad = np.flatnonzero(np.abs(model.value - model.value[reference]) > _tolerances()[model.metric])
+    violations = []
+    for index in bad:
+        fact, first = model.facts[index], model.facts[reference[index]]
+        violations.append(Violation('agreement', fact.location,
+                                    f"{model.describe(fact.entity, fact.metric, fact.value)}, but "
+                                    f"{model.format(fact.metric, first.value)} in {first.location}"))
+    return violations
+
+
+def check_sums(model):
+    """Segment and tier figures in a table add up to its total, or the agreed total"""
+    if model.total is None:
+        return []
+    additive = [METRICS.index(metric) for metric in ADDITIVE]
+    values = model.cube[:, :, additive]
+    present = ~np.isnan(values)
+    members = model.members.astype(np.float64)
+    sums = np.einsum('de,tea->tda', members, np.nan_to_num(values))
+    covered = np.einsum('de,tea->tda', members, present) == members.sum(axis=1)[None, :, None]
+    totals = values[:, model.total, :]
+    totals = np.where(np.isnan(totals), model.consensus[model.total, additive][None, :], totals)
+    bad = np.argwhere(covered & ~np.isnan(totals)[:, None, :]
+                      & (np.abs(sums - totals[:, None, :]) > TOLERANCE * 10))
+
+    violations = []
+    for table, dimension, column in bad:
+        metric = additive[column]
+        where = model.where[table, model.total, metric]
+        if where < 0:
+            where = model.where[table, np.flatnonzero(model.members[dimension])[0], metric]
+        violations.append(Violation('sum', model.facts[where].location,
+                                    f"{METRIC_LABELS[model.dimensions[dimension]]} "
+                                    f"{METRIC_LABELS[METRICS[metric]]} add up to "
+                                    f"{model.format(METRICS[metric], sums[table, dimension, column])}, "
+                                    f"not the total {model.format(METRICS[metric], totals[table, column])}"))
+    return violations
+
+
+def check_averages(model):
+    """A stated average contract value is ARR / contracts"""
+    average = model.cube[:, :, METRICS.index('avg_acv_m')]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        computed = model.stated('arr_m') / model.stated('contracts')
+    bad = np.argwhere(~np.isnan(average) & ~np.isnan(computed)
+                      & (np.abs(average - computed) > AVERAGE_TOLERANCE + TOLERANCE))
+    violations = []
+    for table, entity in bad:
+        fact = model.facts[model.where[table, entity, METRICS.index('avg_acv_m')]]
+        violations.append(Violation('average', fact.location,
+                                    f"{model.describe(entity, 'avg_acv_m', average[table, entity])}, but ARR / "
+                                    f"contracts is {format_millions(round(float(computed[table, entity]), 2))}"))
+    return violations
+
+
+def check_remainders(model):
+    """The ARR left after the estimated named customers fits the remaining contracts' ACV range"""
+    arr, contracts = model.stated('arr_m'), model.stated('contracts')
+    estimated = model.consensus[:, METRICS.index('estimated')][None, :]
+    named_acv = model.consensus[:, METRICS.index('named_acv_m')][None, :]
+    low = model.consensus[:, METRICS.index('acv_low_m')].copy()
+    high = model.consensus[:, METRICS.index('acv_high_m')].copy()
+    tiers, sectors = model.members[model.dimensions.index('tier')], model.members[model.dimensions.index('sector')]
+    if tiers.any():
+        low[sectors], high[sectors] = np.nanmin(low[tiers]), np.nanmax(high[tiers])
+
+    # Checked where a table states the ARR or contract count itself
+    stated = ~np.isnan(model.cube[:, :, METRICS.index('arr_m')]) | ~np.isnan(model.cube[:, :, METRICS.index('contracts')])
+    remaining, open_contracts = arr - named_acv, contracts - estimated
+    with np.errstate(invalid='ignore'):
+        bad = (stated & (tiers | sectors)[None, :] & ~np.isnan(remaining) & ~np.isnan(open_contracts)
+               & ((open_contracts < 0) | (remaining < open_contracts * low - TOLERANCE)
+                  | (remaining > open_contracts * high + TOLERANCE)))
+
+    violations = []
+    for table, entity in np.argwhere(bad):
+        where = model.where[table, entity, METRICS.index('arr_m')]
+        if where < 0:
+            where = model.where[table, entity, METRICS.index('contracts')]
+        count = open_contracts[table, entity]
+        if count < 0:
+            message = (f"{model.describe(entity, 'contracts', contracts[table, entity])} is fewer than its "
+                       f"{estimated[0, entity]:g} named customers with an ACV estimate")
+        elif count == 0:
+            message = (f"{model.describe(entity, 'arr_m', arr[table, entity])} leaves "
+                       f"{format_millions(round(float(remaining[table, entity]), 2))} after its named customers "
+                       f"but has no other contracts")
+        else:
+            message = (f"{model.describe(entity, 'arr_m', arr[table, entity])} leaves "
+                       f"{format_millions(round(float(remaining[table, entity]), 2))} after its named customers "
+                       f"for {count:g} other contract{'s' if count != 1 else ''}, outside "
+                       f"{format_millions(low[entity])} - {format_millions(high[entity])} each")
+        violations.append(Violation('remainder', model.facts[where].location, message))
+    return violations
+
+
+def check_bands(model):
+    """Each stated customer ACV lies in its tier's range and its contract's range"""
+    acv = np.flatnonzero(model.metric == METRICS.index('acv_m'))
+    entity = model.entity[acv]
+    tier = model.consensus[entity, METRICS.index('tier')]
+    tier_entities = np.array([model.entity_index.get(f'tier:{key}', -1) for key in model.tiers], dtype=np.intp)
+    known = ~np.isnan(tier)
+    tier_entity = np.where(known, tier_entities[np.nan_to_num(tier).astype(np.intp)], -1)
+    known &= tier_entity >= 0
+    value = model.value[acv]
+
+    violations = []
+    bounds = [(model.consensus[tier_entity, METRICS.index('acv_low_m')],
+               model.consensus[tier_entity, METRICS.index('acv_high_m')], known, 'its tier'),
+              (model.consensus[entity, METRICS.index('acv_low_m')],
+               model.consensus[entity, METRICS.index('acv_high_m')],
+               ~np.isnan(model.consensus[entity, METRICS.index('acv_low_m')]), 'its contract range')]
+    for low, high, applies, label in bounds:
+        with np.errstate(invalid='ignore'):
+            bad = np.flatnonzero(applies & ((value < low - TOLERANCE) | (value > high + TOLERANCE)))
+        for index in bad:
+            fact = model.facts[acv[index]]
+            violations.append(Violation('band', fact.location,
+                                        f"{model.describe(fact.entity, 'acv_m', fact.value)} is outside {label} "
+                                        f"{format_millions(low[index])} - {format_millions(high[index])}"))
+    return violations
+
+
+def check_equations(equations):
+    """Worked arithmetic holds to the precision of its stated result"""
+    if not equations:
+        return []
+    a = np.array([equation.a for equation in equations])
+    b = np.array([equation.b for equation in equations])
+    c = np.array([equation.c for equation in equations])
+    operator = np.array([_OPERATORS[equation.operator] for equation in equations])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.choose(operator, [a + b, a - b, a * b, a / b])
+    tolerance = 0.5 * 10.0 ** -np.array([equation.decimals for equation in equations]) + TOLERANCE
+    return [Violation('arithmetic', equations[index].location,
+                      f"'{equations[index].text}' works out to {result[index]:.{equations[index].decimals + 1}f}")
+            for index in np.flatnonzero(~(np.abs(result - c) <= tolerance))]
+
+
+CHECKS = (check_agreement, check_sums, check_averages, check_remainders, check_bands)
+
+
+def run_checks(model, equations):
+    """Violations of every invariant over a FactModel and the worked equations, in check order"""
+    return [violation for check in CHECKS for violation in check(model)] + check_equations(equations)
+
+
+def check_consistency(dataset=None, readme=README_PATH, analysis=ANALYSIS_PATH, report=FORENSIC_PATH):
+    """Every violated invariant across the sources"""
+    facts, equations, tiers = collect(dataset, readme, analysis, report)
+    return run_checks(FactModel(facts, tiers), equations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-check the ARR, contract and segment figures across sources")
+    parser.add_argument('--data-dir', default=DATA_DIR, help='directory with the CSV tables')
+    parser.add_argument('--json', action='store_true', help='print the violations as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    facts, equations, tiers = collect(Dataset(args.data_dir))
+    model = FactModel(facts, tiers)
+    violations = run_checks(model, equations)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps([asdict(violation) for violation in violations], indent=2))
+    else:
+        for violation in violations:
+            print(f"{violation.invariant:<10} {violation}")
+        print(f"{len(violations)} violation{'s' if len(violations) != 1 else ''} in {len(facts)} facts "
+              f"from {len(model.tables)} tables and {len(equations)} worked sums, checked in {elapsed * 1000:.1f} ms")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Sierra ARR Sensitivity Analysis
+One-at-a-time and Sobol sensitivity of the $100M ARR model, with tornado data
+
+The model rebuilds total ARR from the ARR distribution table and the
+outcome-pricing identity of pricing_solver:
+
+    ARR = sum over tiers of contracts x ACV x (containment x fee fraction x avoided cost) / base
+
+Each tier's average ACV sits at the same relative position between its ACV
+bounds as in the dataset, so the base case reproduces the table's tier ARR.
+The outcome factor is 1 at the base containment, fee fraction and avoided
+cost: outcome-priced contracts gain or lose value in proportion to the
+outcomes they bill for.
+
+Every input (ACV bounds and contract count per tier, containment, fee
+fraction, avoided cost) is varied over the range SensitivityModel gives
+it. The one-at-a-time pass sets each input to its low and
+high value with the others at base, which gives the tornado bars. Sobol
+first-order and total indices (Saltelli and Jansen estimators) come from a
+single batched evaluation of N x (inputs + 2) rows, with bootstrap
+confidence intervals over the same evaluations.
+
+Usage: python arr_sensitivity.py [--samples N] [--seed S] [--spread 0.2] [--bootstrap B]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from pricing_solver import AVOIDED_COST, CONTAINMENT
+from sierra_data import load_dataset, format_millions
+
+# (low, base, high) for the global inputs; fee fraction reads "~$1 per resolution to save ~$10"
+CONTAINMENT_RANGE = (CONTAINMENT[0], sum(CONTAINMENT) / 2, CONTAINMENT[1])
+FEE_FRACTION_RANGE = (0.05, 0.10, 0.15)
+AVOIDED_COST_RANGE = (AVOIDED_COST[0], sum(AVOIDED_COST) / 2, AVOIDED_COST[1])
+
+# Relative change applied to each tier's ACV bounds and contract count
+DEFAULT_SPREAD = 0.2
+TORNADO_ROWS = 8
+
+# Elements per block of bootstrap resamples (resamples x inputs x samples)
+BOOTSTRAP_BLOCK = 8_000_000
+
+
+class SensitivityModel:
+    """Vectorized ARR model over the tier and outcome-pricing inputs"""
+
+    def __init__(self, dataset=None, spread=DEFAULT_SPREAD):
+        dataset = dataset or load_dataset()
+        self.tiers = dataset.segments
+        names, labels, ranges, integer = [], [], [], []
+        for tier in self.tiers:
+            for field, label, base in (('acv_low', 'ACV floor', tier.acv_low_m),
+                                       ('acv_high', 'ACV ceiling', tier.acv_high_m),
+                                       ('contracts', 'contracts', tier.contracts)):
+                names.append(f"{tier.key}.{field}")
+                labels.append(f"{tier.name}: {label}")
+                low, high = base * (1 - spread), base * (1 + spread)
+                if field == 'contracts':
+                    low, high = max(1, round(low)), round(high)
+                ranges.append((low, base, high))
+                integer.append(field == 'contracts')
+        for name, label, spec in (('containment', 'Containment rate', CONTAINMENT_RANGE),
+                                  ('fee_fraction', 'Fee as share of avoided cost', FEE_FRACTION_RANGE),
+                                  ('avoided_cost', 'Avoided cost per call', AVOIDED_COST_RANGE)):
+            names.append(name)
+            labels.append(label)
+            ranges.append(spec)
+            integer.append(False)
+        self.names = names
+        self.labels = labels
+        self.low, self.base, self.high = (np.array(column, dtype=float) for column in zip(*ranges))
+        self.integer = np.array(integer)
+        # Where each tier's average ACV sits between its bounds in the dataset
+        self.position = np.array([(tier.arr_m / tier.contracts - tier.acv_low_m)
+                                  / (tier.acv_high_m - tier.acv_low_m) for tier in self.tiers])
+
+    def __len__(self):
+        return len(self.names)
+
+    def evaluate(self, x):
+        """Total ARR ($M) for each row of an (n, inputs) array"""
+        tiers = x[:, :3 * len(self.tiers)].reshape(len(x), len(self.tiers), 3)
+        low, high, contracts = tiers[..., 0], tiers[..., 1], tiers[..., 2]
+        arr = (contracts * (low + self.position * (high - low))).sum(axis=1)
+        outcome = x[:, -3:].prod(axis=1) / self.base[-3:].prod()
+        return arr * outcome
+
+    def sample(self, rng, n):
+        """n input rows drawn uniformly over the ranges; contract counts are whole numbers"""
+        x = self.low + (self.high - self.low) * rng.random((n, len(self)))
+        x[:, self.integer] = np.rint(x[:, self.integer])
+        return x
+
+
+class Tornado:
+    """One-at-a-time ARR at each input's low and high value, widest swing first"""
+
+    def __init__(self, model, base, at_low, at_high):
+        order = np.argsort(-np.abs(at_high - at_low), kind='stable')
+        self.base = base
+        self.names = [model.names[i] for i in order]
+        self.labels = [model.labels[i] for i in order]
+        self.low = model.low[order]
+        self.high = model.high[order]
+        self.at_low = at_low[order]
+        self.at_high = at_high[order]
+        self.order = order
+
+    def bars(self):
+        """(label, change at low, change at high) in $M against the base case, for charting"""
+        return [(label, low - self.base, high - self.base)
+                for label, low, high in zip(self.labels, self.at_low, self.at_high)]
+
+
+def one_at_a_time(model):
+    """Tornado for the model, from one batch of 2 x inputs + 1 evaluations"""
+    k = len(model)
+    x = np.tile(model.base, (2 * k + 1, 1))
+    x[np.arange(k), np.arange(k)] = model.low
+    x[k + np.arange(k), np.arange(k)] = model.high
+    y = model.evaluate(x)
+    return Tornado(model, y[-1], y[:k], y[k:2 * k])
+
+
+class SobolIndices:
+    """First-order and total Sobol indices with bootstrap confidence intervals"""
+
+    def __init__(self, names, first, total, first_ci, total_ci, variance, evaluations):
+        self.names = names
+        self.first = first              # (inputs,)
+        self.total = total              # (inputs,)
+        self.first_ci = first_ci        # (2, inputs) 95% interval, None without bootstrap
+        self.total_ci = total_ci
+        self.variance = variance        # of total ARR over the sampled ranges
+        self.evaluations = evaluations
+
+
+def _sobol_estimates(f_a, f_b, f_ab):
+    """Saltelli first-order and Jansen total indices along the last axis"""
+    variance = np.concatenate([f_a, f_b], axis=-1).var(axis=-1)
+    first = (f_b * (f_ab - f_a)).mean(axis=-1) / variance
+    total = 0.5 * ((f_a - f_ab) ** 2).mean(axis=-1) / variance
+    return first, total, variance
+
+
+def sobol(model, samples=8192, seed=None, bootstrap=200):
+    """Sobol indices from one batch of samples x (inputs + 2) model evaluations"""
+    rng = np.random.default_rng(seed)
+    k = len(model)
+    a, b = model.sample(rng, samples), model.sample(rng, samples)
+    # AB_i is A with column i taken from B
+    ab = np.repeat(a[None], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+    y = model.evaluate(np.vstack([a, b, ab.reshape(-1, k)]))
+    f_a, f_b, f_ab = y[:samples], y[samples:2 * samples], y[2 * samples:].reshape(k, samples)
+
+    first, total, variance = _sobol_estimates(f_a, f_b, f_ab)
+    first_ci = total_ci = None
+    if bootstrap:
+        boot_first, boot_total = np.empty((2, k, bootstrap))
+        step = max(1, BOOTSTRAP_BLOCK // (k * samples))
+        for r in range(0, bootstrap, step):
+            picks = rng.integers(0, samples, (min(step, bootstrap - r), samples))
+            boot_first[:, r:r + step], boot_total[:, r:r + step], _ = _sobol_estimates(
+                f_a[picks], f_b[picks], f_ab[:, picks])
+        first_ci = np.percentile(boot_first, (2.5, 97.5), axis=1)
+        total_ci = np.percentile(boot_total, (2.5, 97.5), axis=1)
+    return SobolIndices(model.names, first, total, first_ci, total_ci, float(variance), len(y))
+
+
+def _range_label(name, low, high):
+    if name.endswith('.contracts'):
+        return f"{low:.0f} - {high:.0f}"
+    if name == 'containment' or name == 'fee_fraction':
+        return f"{low:.0%} - {high:.0%}"
+    if name == 'avoided_cost':
+        return f"${low:.0f} - ${high:.0f}"
+    return f"{format_millions(round(low, 2))} - {format_millions(round(high, 2))}"
+
+
+def tornado_table_rows(dataset=None, top=TORNADO_ROWS, samples=8192, seed=2025):
+    """Header and rows for the report's ARR sensitivity table, widest swing first"""
+    model = SensitivityModel(dataset)
+    tornado = one_at_a_time(model)
+    indices = sobol(model, samples, seed, bootstrap=0) if samples else None
+    rows = [['Input', 'Range tested', 'ARR at low', 'ARR at high', 'Swing', 'Sobol total']]
+    for i in range(min(top, len(model))):
+        column = tornado.order[i]
+        rows.append([
+            tornado.labels[i].replace(': ', ':\n'),
+            _range_label(tornado.names[i], tornado.low[i], tornado.high[i]),
+            f"${tornado.at_low[i]:.1f}M",
+            f"${tornado.at_high[i]:.1f}M",
+            f"${abs(tornado.at_high[i] - tornado.at_low[i]):.1f}M",
+            f"{indices.total[column]:.0%}" if indices else '-',
+        ])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensitivity of the ARR model to its inputs")
+    parser.add_argument('--samples', type=int, default=16_384, help='Sobol base samples (N)')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--spread', type=float, default=DEFAULT_SPREAD,
+                        help='relative range for the tier ACV bounds and contract counts')
+    parser.add_argument('--bootstrap', type=int, default=200, help='bootstrap resamples for the intervals (0 for none)')
+    args = parser.parse_args()
+
+    model = SensitivityModel(spread=args.spread)
+    start = time.perf_counter()
+    tornado = one_at_a_time(model)
+    indices = sobol(model, args.samples, args.seed, args.bootstrap)
+    elapsed = time.perf_counter() - start
+
+    print(f"Base case ARR: ${tornado.base:.2f}M")
+    print(f"{'Input':<52} {'Range':>15} {'At low':>8} {'At high':>8} {'Swing':>7} "
+          f"{'S1':>6} {'S1 95% CI':>15} {'ST':>6}")
+    for i, name in enumerate(tornado.names):
+        column = tornado.order[i]
+        ci = 'n/a'
+        if indices.first_ci is not None:
+            ci = f"{indices.first_ci[0, column]:.3f} - {indices.first_ci[1, column]:.3f}"
+        print(f"{tornado.labels[i]:<52} {_range_label(name, tornado.low[i], tornado.high[i]):>15} "
+              f"{tornado.at_low[i]:>8.2f} {tornado.at_high[i]:>8.2f} "
+              f"{abs(tornado.at_high[i] - tornado.at_low[i]):>7.2f} "
+              f"{indices.first[column]:>6.3f} {ci:>15} {indices.total[column]:>6.3f}")
+    print(f"\nSum of first-order indices {indices.first.sum():.3f} (1 - sum = share of variance from interactions)")
+    print(f"ARR standard deviation over the ranges: ${indices.variance ** 0.5:.2f}M")
+    print(f"{indices.evaluations:,} model evaluations and {args.bootstrap} bootstrap resamples "
+          f"in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
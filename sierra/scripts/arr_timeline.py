@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Sierra ARR Timeline Reconstruction
+Monthly ARR trajectories fitted through the dated milestones, as quarterly bands
+
+Every trajectory starts from zero at the February 2024 launch and follows one
+of several growth-curve families (exponential, power law, logistic,
+Gompertz, two-phase exponential). For each family, thousands of shape
+parameters are drawn from the prior ranges in FAMILIES. The scale that best
+fits the ARR anchors of the timeline table is then solved in closed form, by
+least squares on log ARR, with each anchor weighted by how precise its
+source is. Each draw is weighted by its likelihood under those anchor
+errors, and the weighted draws of all families are pooled. The results are
+percentile bands of ARR at each quarter end and of the implied net-new ARR
+added in each quarter.
+
+Alternative event sets are rows of anchor values over the same anchor
+dates, with NaN where a set leaves an anchor out. All sets share the same
+parameter draws, so a batch of thousands of sets is fitted with a few array
+operations per block of sets. The bands come from systematic resampling of the
+weighted draws rather than sorting them all, which keeps large batches quick
+enough to explore interactively.
+
+Usage: python arr_timeline.py [--draws N] [--seed S] [--families exponential logistic ...]
+       [--extend QUARTERS] [--event-sets N]
+"""
+
+import argparse
+import functools
+import time
+from datetime import date
+
+import numpy as np
+
+from sierra_data import load_dataset, format_millions
+
+LAUNCH = date(2024, 2, 1)
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Relative (log) error of an ARR anchor by source; company statements are the tightest
+ANCHOR_SIGMA = {'Sierra': 0.03}
+DEFAULT_SIGMA = 0.15
+
+# Elements per (event sets x draws) or (event sets x points x resampled draws) block
+MAX_BLOCK = 4_000_000
+
+
+def _exponential(p, t):
+    return np.expm1(p[0][:, None] * t)
+
+
+def _power(p, t):
+    return t ** p[0][:, None]
+
+
+def _logistic(p, t):
+    rate, midpoint = p[0][:, None], p[1][:, None]
+    return 1.0 / (1.0 + np.exp(-rate * (t - midpoint))) - 1.0 / (1.0 + np.exp(rate * midpoint))
+
+
+def _gompertz(p, t):
+    shift, rate = p[0][:, None], p[1][:, None]
+    return np.exp(-shift * np.exp(-rate * t)) - np.exp(-shift)
+
+
+def _two_phase(p, t):
+    early, late, switch = p[0][:, None], p[1][:, None], p[2][:, None]
+    return np.expm1(early * np.minimum(t, switch) + late * np.maximum(t - switch, 0.0))
+
+
+# Family -> (shape through zero at launch, uniform prior range of each shape parameter);
+# t is in months since launch and the scale is fitted separately
+FAMILIES = {
+    'exponential': (_exponential, ((0.05, 0.5),)),
+    'power': (_power, ((1.0, 4.0),)),
+    'logistic': (_logistic, ((0.05, 0.6), (4.0, 40.0))),
+    'gompertz': (_gompertz, ((1.0, 12.0), (0.02, 0.3))),
+    'two_phase': (_two_phase, ((0.05, 0.8), (0.01, 0.4), (3.0, 18.0))),
+}
+
+
+def months_since_launch(day, launch=LAUNCH):
+    """Fractional months from launch to a date"""
+    months = (day.year - launch.year) * 12 + day.month - launch.month
+    start = date(day.year, day.month, 1)
+    following = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return months + (day - start).days / (following - start).days
+
+
+def quarter_ends(last, extend=0, launch=LAUNCH):
+    """(labels, months since launch) of the calendar quarters from launch through the one holding last"""
+    labels, months = [], []
+    year, quarter = launch.year, (launch.month - 1) // 3 + 1
+    final = (last.year, (last.month - 1) // 3 + 1)
+    while (year, quarter) <= final or extend > 0:
+        if (year, quarter) > final:
+            extend -= 1
+        end = date(year + quarter // 4, quarter % 4 * 3 + 1, 1)
+        labels.append(f"Q{quarter} {year}")
+        months.append(months_since_launch(end, launch))
+        year, quarter = (year + 1, 1) if quarter == 4 else (year, quarter + 1)
+    return labels, np.array(months)
+
+
+def timeline_anchors(dataset=None):
+    """(events, months since launch, ARR $M, log sigma) for the timeline events stating an ARR"""
+    dataset = dataset or load_dataset()
+    events = [event for event in dataset.timeline if event.arr_m is not None]
+    return (events,
+            np.array([months_since_launch(event.date) for event in events]),
+            np.array([event.arr_m for event in events]),
+            np.array([ANCHOR_SIGMA.get(event.source, DEFAULT_SIGMA) for event in events]))
+
+
+def draw_shapes(rng, draws, families=None):
+    """{family: tuple of (draws,) parameter arrays} sampled from the priors"""
+    return {name: tuple(rng.uniform(low, high, draws) for low, high in FAMILIES[name][1])
+            for name in families or FAMILIES}
+
+
+def systematic_resample(weights, size):
+    """(rows, size) column indices drawn in proportion to each row of weights
+
+    Systematic resampling: one evenly spaced comb of size points per row,
+    located in the row's cumulative weights. All rows are searched at once by
+    offsetting each row's cumulative sum by its row number.
+    """
+    rows, columns = weights.shape
+    cumulative = np.cumsum(weights, axis=1)
+    cumulative /= cumulative[:, -1:]
+    offsets = np.arange(rows)[:, None]
+    comb = (np.arange(size) + 0.5) / size + offsets
+    found = np.searchsorted((cumulative + offsets).ravel(), comb.ravel()).reshape(rows, size)
+    return np.minimum(found - offsets * columns, columns - 1)
+
+
+class TimelineBands:
+    """Quarterly ARR and net-new ARR bands ($M) for one or more event sets"""
+
+    def __init__(self, quarters, percentiles, arr, net_new, anchor_fit, family_share, ess):
+        self.quarters = quarters            # quarter labels
+        self.percentiles = percentiles
+        self.arr = arr                      # sets x percentiles x quarters, ARR at quarter end
+        self.net_new = net_new              # sets x percentiles x quarters, ARR added in the quarter
+        self.anchor_fit = anchor_fit        # sets x percentiles x anchors, fitted ARR at each anchor
+        self.family_share = family_share    # {family: (sets,) share of the posterior weight}
+        self.ess = ess                      # (sets,) effective number of draws
+
+    def __len__(self):
+        return self.arr.shape[0]
+
+
+def reconstruct(anchor_months, values, sigmas, quarter_months, quarters, draws=20_000, seed=None,
+                families=None, percentiles=PERCENTILES, resample=2000):
+    """Fit every event set in values; returns TimelineBands
+
+    values is (anchors,) or (sets, anchors) ARR in $M with NaN for anchors a
+    set leaves out; sigmas is the matching log error. draws parameter draws are
+    made per family and shared by all sets. The bands are percentiles of
+    resample trajectories drawn from each set's weighted draws.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    sigmas = np.broadcast_to(np.asarray(sigmas, dtype=float), values.shape)
+    present = ~np.isnan(values)
+    if not present.any(axis=1).all():
+        raise ValueError("Every event set needs at least one ARR anchor")
+    logs = np.where(present, np.log(np.where(present, values, 1.0)), 0.0)
+    inverse = np.where(present, 1.0 / sigmas ** 2, 0.0)             # (S, A)
+
+    rng = np.random.default_rng(seed)
+    shapes = draw_shapes(rng, draws, families)
+    points = np.concatenate([anchor_months, quarter_months])
+    curve = np.vstack([np.maximum(FAMILIES[name][0](params, points), 1e-12)
+                       for name, params in shapes.items()])          # (F*D, A + Q)
+    family_of = np.repeat(np.arange(len(shapes)), draws)
+    anchors = len(anchor_months)
+    log_curve = np.log(curve[:, :anchors])
+
+    sets = len(values)
+    arr = np.empty((sets, len(percentiles), len(quarter_months)))
+    net_new = np.empty_like(arr)
+    anchor_fit = np.empty((sets, len(percentiles), anchors))
+    family_share = np.empty((sets, len(shapes)))
+    ess = np.empty(sets)
+    step = max(1, MAX_BLOCK // max(curve.shape[0], resample * curve.shape[1]))
+    for s in range(0, sets, step):
+        chunk = slice(s, s + step)
+        weight, y = inverse[chunk], logs[chunk]
+        total = weight.sum(axis=1, keepdims=True)
+        # Weighted least squares on log ARR gives the scale of every (set, draw) pair directly;
+        # with it, chi2 = sum w (y - L)^2 - W (log scale)^2, all as matrix products
+        log_scale = ((y * weight).sum(axis=1, keepdims=True) - weight @ log_curve.T) / total
+        chi2 = ((weight * y ** 2).sum(axis=1, keepdims=True) - 2.0 * (weight * y) @ log_curve.T
+                + weight @ (log_curve ** 2).T - total * log_scale ** 2)
+        weights = np.exp(-0.5 * (chi2 - chi2.min(axis=1, keepdims=True)))
+        weights /= weights.sum(axis=1, keepdims=True)
+        ess[chunk] = 1.0 / (weights ** 2).sum(axis=1)
+        family_share[chunk] = np.stack([np.bincount(family_of, row, len(shapes)) for row in weights])
+
+        picked = systematic_resample(weights, resample)               # (sets, resample)
+        # (sets, points, resample) so each percentile is taken over a contiguous axis
+        scale = np.exp(np.take_along_axis(log_scale, picked, axis=1))
+        fitted = scale[:, None, :] * curve.T[:, picked].swapaxes(0, 1)
+        quarterly = fitted[:, anchors:]
+        anchor_fit[chunk] = np.percentile(fitted[:, :anchors], percentiles, axis=2).transpose(1, 0, 2)
+        arr[chunk] = np.percentile(quarterly, percentiles, axis=2).transpose(1, 0, 2)
+        net_new[chunk] = np.percentile(np.diff(quarterly, axis=1, prepend=0.0), percentiles,
+                                       axis=2).transpose(1, 0, 2)
+
+    family_share = {name: family_share[:, index] for index, name in enumerate(shapes)}
+    return TimelineBands(quarters, percentiles, arr, net_new, anchor_fit, family_share, ess)
+
+
+@functools.lru_cache(maxsize=8)
+def fan_chart_data(dataset=None, draws=5000, seed=2025):
+    """report_charts fan chart data: quarterly ARR bands with the ARR anchors marked (kept per dataset)"""
+    events, anchor_months, values, sigmas = timeline_anchors(dataset)
+    quarters, quarter_months = quarter_ends(max(event.date for event in events))
+    bands = reconstruct(anchor_months, values, sigmas, quarter_months, quarters, draws, seed)
+    # Anchors placed between the quarter ends around them
+    positions = np.interp(anchor_months, quarter_months, np.arange(len(quarters)))
+    points = tuple((round(float(position), 3), float(event.arr_m), '') for position, event in zip(positions, events))
+    return ("Reconstructed ARR at quarter end: P5-P95 and P25-P75 bands, dots at reported ARR", tuple(quarters),
+            tuple(tuple(round(float(v), 2) for v in band) for band in bands.arr[0].T), points)
+
+
+def alternative_event_sets(rng, values, sigmas, count, drop=0.2):
+    """count event sets with each anchor redrawn within its error and dropped with probability drop"""
+    values = np.asarray(values, dtype=float)
+    redrawn = values * np.exp(rng.normal(0.0, 1.0, (count, len(values))) * sigmas)
+    dropped = rng.random((count, len(values))) < drop
+    # Keep the tightest anchor in every set so none is left empty
+    dropped[:, np.argmin(sigmas)] = False
+    return np.where(dropped, np.nan, redrawn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruct Sierra's ARR timeline from its milestones")
+    parser.add_argument('--draws', type=int, default=20_000, help='parameter draws per growth family')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--families', nargs='+', choices=list(FAMILIES), default=list(FAMILIES))
+    parser.add_argument('--extend', type=int, default=0, help='quarters to project past the last anchor')
+    parser.add_argument('--event-sets', type=int, default=0,
+                        help='also fit this many alternative event sets (anchors redrawn or dropped)')
+    args = parser.parse_args()
+
+    events, anchor_months, values, sigmas = timeline_anchors()
+    quarters, quarter_months = quarter_ends(max(event.date for event in events), args.extend)
+    start = time.perf_counter()
+    bands = reconstruct(anchor_months, values, sigmas, quarter_months, quarters, args.draws, args.seed,
+                        args.families)
+    elapsed = time.perf_counter() - start
+
+    header = ''.join(f"{'P%d' % p:>8}" for p in PERCENTILES)
+    print(f"{'Anchor':<12} {'Source':<8} {'ARR':>7} {'Month':>6}{header}")
+    for i, event in enumerate(events):
+        row = ''.join(f"{v:>8.1f}" for v in bands.anchor_fit[0, :, i])
+        print(f"{event.label:<12} {event.source:<8} {format_millions(event.arr_m):>7} {anchor_months[i]:>6.1f}{row}")
+
+    print(f"\n{'Quarter':<9} {'ARR at quarter end ($M)':^40}  {'Net-new ARR ($M)':^24}")
+    print(f"{'':<9}{header}  {'P5':>8}{'P50':>8}{'P95':>8}")
+    low, mid, high = (PERCENTILES.index(p) for p in (5, 50, 95))
+    for q, label in enumerate(quarters):
+        arr = ''.join(f"{v:>8.1f}" for v in bands.arr[0, :, q])
+        added = ''.join(f"{bands.net_new[0, i, q]:>8.1f}" for i in (low, mid, high))
+        print(f"{label:<9}{arr}  {added}")
+
+    shares = ', '.join(f"{name} {share[0]:.0%}" for name, share in bands.family_share.items())
+    print(f"\nPosterior weight by family: {shares}")
+    print(f"{args.draws:,} draws x {len(args.families)} families: effective sample {bands.ess[0]:,.0f}, "
+          f"fitted in {elapsed * 1000:.0f} ms")
+
+    if args.event_sets:
+        rng = np.random.default_rng(args.seed + 1)
+        sets = alternative_event_sets(rng, values, sigmas, args.event_sets)
+        start = time.perf_counter()
+        alternatives = reconstruct(anchor_months, sets, sigmas, quarter_months, quarters, args.draws,
+                                   args.seed, args.families)
+        elapsed = time.perf_counter() - start
+        medians = alternatives.arr[:, mid, :]
+        print(f"\n{args.event_sets:,} alternative event sets fitted in {elapsed:.2f}s; "
+              f"spread of the median ARR across sets:")
+        spread = np.percentile(medians, PERCENTILES, axis=0)
+        for q, label in enumerate(quarters):
+            print(f"{label:<9}{''.join(f'{v:>8.1f}' for v in spread[:, q])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Batch Renderer
+Renders every requested variant of both Sierra reports across a process pool
+
+Each worker imports reportlab and builds the shared styles once, then renders
+as many variants as it is handed; sections shared between variants are laid
+out once per worker through the section cache. Output files are named after the variant, and
+manifest.json lists them in a fixed order with their size and SHA-256 so two
+runs over the same inputs produce the same manifest. Per-job timings go to
+timings.json. The whole batch is written under one output profile
+(report_profiles), whose styles the workers build up front as well.
+
+Usage: python batch_render.py OUTPUT_DIR [--reports analysis forensic]
+       [--pagesizes letter a4] [--segments all fintech ...] [--redaction full redacted]
+       [--profile standard|fast|small|archive]
+"""
+
+import argparse
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Report key -> generator module
+REPORTS = {
+    'analysis': 'sierra_analysis',
+    'forensic': 'Sierra_AI_Forensic_Financial_Analysis_100M_ARR',
+}
+
+PAGESIZES = ('letter', 'a4')
+REDACTIONS = ('full', 'redacted')
+ALL_SEGMENTS = 'all'
+
+_worker_modules = {}
+_worker_pagesizes = {}
+
+
+def init_worker(report_keys, profiles=(None,)):
+    """Pay for reportlab imports, generator imports and style setup once per worker
+
+    Styles are built under the namespace render_story looks them up in for
+    each of profiles (output profile names; None is the default profile).
+    Used as the pool initializer here and by report_service.
+    """
+    from reportlab.lib.pagesizes import letter, A4
+    import report_engine
+    from report_profiles import resolve_profile, profile_specs
+
+    _worker_pagesizes.update(letter=letter, a4=A4)
+    for key in report_keys:
+        module = importlib.import_module(REPORTS[key])
+        for profile in profiles:
+            namespace, style_specs, table_specs = profile_specs(
+                resolve_profile(profile), key, module.STYLE_SPECS, module.TABLE_SPECS, report_engine.base_stylesheet())
+            report_engine.paragraph_styles(namespace, style_specs)
+            report_engine.table_styles(namespace, table_specs)
+        _worker_modules[key] = module
+
+
+def variant_options(variant):
+    """(generator module, render keyword arguments) for a variant, in a worker set up by init_worker"""
+    report, pagesize, segment, redaction = variant
+    return _worker_modules[report], dict(
+        pagesize=_worker_pagesizes[pagesize],
+        segment=None if segment == ALL_SEGMENTS else segment,
+        redacted=redaction == 'redacted',
+    )
+
+
+def variant_name(report, pagesize, segment, redaction):
+    """Stable file stem for a variant"""
+    return f"{report}-{pagesize}-{segment}-{redaction}"
+
+
+def expand_variants(reports, pagesizes=PAGESIZES, segments=None, redactions=REDACTIONS):
+    """Every (report, pagesize, segment, redaction) combination, in a deterministic order
+
+    segments defaults to the full report plus every segment cut each report supports;
+    segments a report does not support are skipped for that report.
+    """
+    variants = []
+    for report in sorted(reports):
+        module = importlib.import_module(REPORTS[report])
+        supported = [ALL_SEGMENTS] + list(module.SEGMENTS)
+        wanted = supported if segments is None else [s for s in segments if s in supported]
+        for pagesize, segment, redaction in itertools.product(pagesizes, wanted, redactions):
+            variants.append((report, pagesize, segment, redaction))
+    return variants
+
+
+def render_variant(variant, output_dir, profile=None):
+    """Render one variant in a worker under output profile profile; returns its manifest entry and timing"""
+    report, pagesize, segment, redaction = variant
+    name = variant_name(*variant)
+    path = os.path.join(output_dir, f"{name}.pdf")
+
+    start = time.perf_counter()
+    module, options = variant_options(variant)
+    module.create_sierra_analysis_pdf(path, profile=profile, **options)
+    seconds = time.perf_counter() - start
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    entry = {
+        'variant': name,
+        'report': report,
+        'pagesize': pagesize,
+        'segment': segment,
+        'redaction': redaction,
+        'file': os.path.basename(path),
+        'bytes': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+    return entry, {'variant': name, 'seconds': seconds, 'pid': os.getpid()}
+
+
+def run_batch(variants, output_dir, jobs=None, profile=None):
+    """Render variants under output profile profile across a process pool sized to the core count
+
+    Returns (manifest entries, timings), both sorted by variant name.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    reports = sorted({variant[0] for variant in variants})
+    jobs = jobs or os.cpu_count() or 1
+
+    manifest, timings = [], []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(reports, (profile,))) as pool:
+        futures = [pool.submit(render_variant, variant, output_dir, profile) for variant in variants]
+        for future in as_completed(futures):
+            entry, timing = future.result()
+            manifest.append(entry)
+            timings.append(timing)
+
+    manifest.sort(key=lambda entry: entry['variant'])
+    timings.sort(key=lambda timing: timing['variant'])
+    return manifest, timings
+
+
+def write_json(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    from report_profiles import PROFILES, DEFAULT_PROFILE
+
+    parser = argparse.ArgumentParser(description="Render Sierra report variants in parallel")
+    parser.add_argument('output_dir', help='directory for the PDFs and manifest')
+    parser.add_argument('--reports', nargs='+', choices=sorted(REPORTS), default=sorted(REPORTS))
+    parser.add_argument('--pagesizes', nargs='+', choices=PAGESIZES, default=list(PAGESIZES))
+    parser.add_argument('--segments', nargs='+', default=None,
+                        help=f"segment cuts to render ('{ALL_SEGMENTS}' is the full report; default: every cut)")
+    parser.add_argument('--redaction', nargs='+', choices=REDACTIONS, default=list(REDACTIONS))
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help='output profile every variant is written with')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: core count)')
+    args = parser.parse_args()
+
+    variants = expand_variants(args.reports, args.pagesizes, args.segments, args.redaction)
+    start = time.perf_counter()
+    manifest, timings = run_batch(variants, args.output_dir, args.jobs, args.profile)
+    wall = time.perf_counter() - start
+
+    write_json(os.path.join(args.output_dir, 'manifest.json'), manifest)
+    write_json(os.path.join(args.output_dir, 'timings.json'),
+               {'wall_seconds': wall, 'jobs': timings})
+
+    for timing in timings:
+        print(f"{timing['variant']:<40} {timing['seconds'] * 1000:>9.1f} ms  (pid {timing['pid']})")
+    busy = sum(timing['seconds'] for timing in timings)
+    print(f"Rendered {len(manifest)} variants in {wall:.2f}s wall, {busy:.2f}s of render time")
+
+
+if __name__ == "__main__":
+    main()
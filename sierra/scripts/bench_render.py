@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Render Benchmark
+Per-render cost with style setup on every render (before) vs. the shared registry (after)
+
+The section cache stage compares laying out every section (before) with a
+rebuild that reuses the cached sections (after). For reports with a table of
+contents, the toc stage compares reportlab's multiBuild with a TableOfContents
+flowable (before) against render_story filling in the same page numbers from a
+single layout (after), both without the section cache. The header stage
+renders a synthetic 500-page report from cached sections with the analysis
+header drawn with fresh operators on every page (before) and from one form
+XObject plus the page number (after), and also reports both file sizes.
+
+Usage: python bench_render.py [--runs N]
+"""
+
+import argparse
+import io
+import time
+
+from reportlab.platypus import PageBreak, SimpleDocTemplate
+from reportlab.platypus.tableofcontents import TableOfContents
+
+import report_engine
+from report_story import Story
+import sierra_analysis
+import Sierra_AI_Forensic_Financial_Analysis_100M_ARR as forensic
+
+GENERATORS = [
+    ('analysis', sierra_analysis),
+    ('forensic', forensic),
+]
+
+
+def _time_per_call(fn, runs, cold):
+    """Median seconds per call, optionally dropping the style registry before each call"""
+    samples = []
+    for _ in range(runs):
+        if cold:
+            report_engine.reset_registry()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+class _TOCDocTemplate(SimpleDocTemplate):
+    """Reports top-level story headings to TableOfContents, as multiBuild expects"""
+
+    def afterFlowable(self, flowable):
+        heading = getattr(flowable, 'story_heading', None)
+        if heading is not None and heading[0] == 1:
+            self.notify('TOCEntry', (0, heading[1], self.page))
+
+
+def multibuild_render(module, output):
+    """Render a report's story the conventional way, with multiBuild resolving its TOC"""
+    styles = report_engine.paragraph_styles(module.__name__, module.STYLE_SPECS)
+    tables = report_engine.table_styles(module.__name__, module.TABLE_SPECS)
+    flowables = []
+    for section in module.build_story().sections:
+        if flowables:
+            flowables.append(PageBreak())
+        for block in section.blocks:
+            if block[0] == 'toc':
+                flowables.append(TableOfContents())
+            else:
+                flowables.extend(report_engine.build_flowables([block], styles, tables))
+    doc = _TOCDocTemplate(output, pagesize=module.letter, **module.PAGE_MARGINS)
+    doc.multiBuild(flowables)
+    return doc
+
+
+class _InlineHeaderCanvas(sierra_analysis.header_canvas()):
+    header_form = False
+
+
+def header_benchmark(pages=500, runs=5):
+    """(inline seconds, form seconds, inline bytes, form bytes) for a synthetic report"""
+    story = Story()
+    for page in range(pages):
+        story.page_break()
+        story.paragraph('body', f"Synthetic page {page + 1}.")
+    cache = report_engine.SectionCache(max_entries=pages)
+    setup = dict(pagesize=sierra_analysis.letter, **sierra_analysis.PAGE_MARGINS)
+    results = []
+    for canvasmaker in (_InlineHeaderCanvas, sierra_analysis.header_canvas()):
+        def render():
+            output = io.BytesIO()
+            report_engine.render_story(story, output, 'analysis', sierra_analysis.STYLE_SPECS,
+                                       sierra_analysis.TABLE_SPECS, setup,
+                                       canvasmaker=canvasmaker, cache=cache)
+            return len(output.getvalue())
+        size = render()
+        results.append((_time_per_call(render, runs, cold=False), size))
+    (inline_seconds, inline_bytes), (form_seconds, form_bytes) = results
+    return inline_seconds, form_seconds, inline_bytes, form_bytes
+
+
+def run_benchmark(runs=20):
+    """Return benchmark rows: (report, stage, before seconds, after seconds)"""
+    rows = []
+    for name, module in GENERATORS:
+        def setup():
+            report_engine.paragraph_styles(name, module.STYLE_SPECS)
+            report_engine.table_styles(name, module.TABLE_SPECS)
+
+        def render():
+            module.create_sierra_analysis_pdf(io.BytesIO(), cache=False)
+
+        def rebuild():
+            module.create_sierra_analysis_pdf(io.BytesIO(), cache=cache)
+
+        cache = report_engine.SectionCache()
+        # Warm up imports, font metrics and the section cache so neither side pays for them
+        render()
+        rebuild()
+        for stage, fn in (('style setup', setup), ('full render', render)):
+            before = _time_per_call(fn, runs, cold=True)
+            after = _time_per_call(fn, runs, cold=False)
+            rows.append((name, stage, before, after))
+        rows.append((name, 'section cache', _time_per_call(render, runs, cold=False),
+                     _time_per_call(rebuild, runs, cold=False)))
+        if any(section.has_toc for section in module.build_story().sections):
+            rows.append((name, 'toc vs multiBuild',
+                         _time_per_call(lambda: multibuild_render(module, io.BytesIO()), runs, cold=False),
+                         _time_per_call(render, runs, cold=False)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='renders per measurement')
+    args = parser.parse_args()
+
+    print(f"{'Report':<10} {'Stage':<18} {'Before (ms)':>12} {'After (ms)':>12} {'Saved':>8}")
+    for name, stage, before, after in run_benchmark(args.runs):
+        saved = (before - after) / before * 100 if before else 0.0
+        print(f"{name:<10} {stage:<18} {before * 1000:>12.3f} {after * 1000:>12.3f} {saved:>7.1f}%")
+
+    pages = 500
+    inline_seconds, form_seconds, inline_bytes, form_bytes = header_benchmark(pages, max(1, args.runs // 4))
+    saved = (inline_seconds - form_seconds) / inline_seconds * 100
+    print(f"{'analysis':<10} {f'header x{pages}':<18} {inline_seconds * 1000:>12.3f} {form_seconds * 1000:>12.3f} {saved:>7.1f}%")
+    print(f"Header on {pages} pages: {inline_bytes:,} bytes inline, {form_bytes:,} bytes as a form XObject "
+          f"({(inline_bytes - form_bytes) / inline_bytes * 100:.1f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
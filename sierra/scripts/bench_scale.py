@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Scale Benchmark
+Render cost of both Sierra reports as the dataset grows to 10x, 100x and 1000x
+
+Synthetic datasets repeat every per-customer table (customers, contracts,
+case studies, volumes, timeline, risk indicators, sources) scale times, with
+numbered copies of each name, and keep the ARR tiers as they are. Every
+(report, scale) pair is rendered in a fresh process with the section cache
+off; the benchmark records wall time (split into story and layout/write),
+peak RSS, story block count, page count and output bytes.
+
+Each run is appended to a JSON history file (by default
+bench_scale_history.json next to this script, which git ignores) and
+compared with the previous run for the same report and scale, so
+regressions between versions show up as a percentage change.
+
+Usage: python bench_scale.py [--scales 1 10 100 1000] [--reports analysis forensic]
+       [--history FILE] [--fail-over PCT]
+"""
+
+import argparse
+import csv
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+from sierra_data import DATA_DIR, Dataset
+
+REPORTS = {
+    'analysis': 'sierra_analysis',
+    'forensic': 'Sierra_AI_Forensic_Financial_Analysis_100M_ARR',
+}
+
+SCALES = (1, 10, 100, 1000)
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_scale_history.json')
+
+# Table file -> columns that get a copy number so repeated rows stay distinct
+SCALED_TABLES = {
+    'customers.csv': ('name',),
+    'contracts.csv': ('customer',),
+    'case_studies.csv': ('customer',),
+    'volumes.csv': ('customer',),
+    'timeline.csv': ('label',),
+    'risk_indicators.csv': ('item',),
+    'sources.csv': ('title',),
+}
+
+
+def write_synthetic_dataset(directory, scale):
+    """Write a copy of sierra/data with every per-customer table repeated scale times"""
+    os.makedirs(directory, exist_ok=True)
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if not filename.endswith('.csv'):
+            continue
+        with open(os.path.join(DATA_DIR, filename), newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            columns, rows = reader.fieldnames, list(reader)
+        renamed = SCALED_TABLES.get(filename)
+        copies = scale if renamed is not None else 1
+        with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            for copy in range(copies):
+                for row in rows:
+                    if copy:
+                        row = dict(row, **{column: f"{row[column]} #{copy + 1}" for column in renamed})
+                    writer.writerow(row)
+        if filename == 'sources.csv' and copies > 1:
+            _renumber_sources(os.path.join(directory, filename))
+
+
+def _renumber_sources(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns, rows = reader.fieldnames, list(reader)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        for number, row in enumerate(rows, 1):
+            writer.writerow(dict(row, id=number))
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(report, scale, data_dir):
+    """Render one report over one dataset in this process; returns its result entry"""
+    module = importlib.import_module(REPORTS[report])
+    dataset = Dataset(data_dir)
+    entry = {'report': report, 'scale': scale}
+    start = time.perf_counter()
+    try:
+        story = module.build_story(date=date(2025, 12, 5), dataset=dataset)
+        built = time.perf_counter()
+        output = io.BytesIO()
+        summary = module.render_report(story, output, cache=False)
+    except Exception as exc:
+        entry.update(status='error', error=f"{type(exc).__name__}: {exc}",
+                     wall_seconds=time.perf_counter() - start, peak_rss_mb=_peak_rss_mb())
+        return entry
+    done = time.perf_counter()
+    entry.update(
+        status='ok',
+        wall_seconds=done - start,
+        story_seconds=built - start,
+        layout_seconds=done - built,
+        peak_rss_mb=_peak_rss_mb(),
+        blocks=sum(len(section.blocks) for section in story.sections),
+        pages=sum(pages for _, _, pages in summary),
+        bytes=len(output.getvalue()),
+    )
+    return entry
+
+
+def run_suite(reports, scales, jobs=1):
+    """Measure every (report, scale) pair, each in a process of its own"""
+    with tempfile.TemporaryDirectory(prefix='sierra-bench-') as root:
+        data_dirs = {}
+        for scale in scales:
+            data_dirs[scale] = os.path.join(root, f"x{scale}")
+            write_synthetic_dataset(data_dirs[scale], scale)
+        # One task per worker keeps each peak RSS reading independent of the others
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context, max_tasks_per_child=1) as pool:
+            futures = [pool.submit(measure, report, scale, data_dirs[scale])
+                       for report in reports for scale in scales]
+            return [future.result() for future in futures]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def previous_results(history):
+    """{(report, scale): entry} from the most recent run that measured each pair"""
+    latest = {}
+    for run in history:
+        for entry in run['results']:
+            if entry.get('status') == 'ok':
+                latest[(entry['report'], entry['scale'])] = entry
+    return latest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sierra report render cost across dataset scales")
+    parser.add_argument('--scales', nargs='+', type=int, default=list(SCALES))
+    parser.add_argument('--reports', nargs='+', choices=sorted(REPORTS), default=sorted(REPORTS))
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='measurements run at once (more than 1 makes timings noisier)')
+    parser.add_argument('--history', default=HISTORY_PATH, help='JSON file the run is appended to')
+    parser.add_argument('--fail-over', type=float, metavar='PCT',
+                        help='exit non-zero if any wall time grew by more than PCT%% since the last run')
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    baseline = previous_results(history)
+    results = run_suite(args.reports, args.scales, args.jobs)
+
+    print(f"{'Report':<10} {'Scale':>6} {'Wall (s)':>9} {'Story':>7} {'Layout':>7} {'RSS (MB)':>9} "
+          f"{'Blocks':>10} {'Pages':>7} {'Bytes':>12} {'vs last':>8}")
+    regressions = []
+    for entry in results:
+        if entry['status'] != 'ok':
+            print(f"{entry['report']:<10} {entry['scale']:>6} failed: {entry['error']}")
+            continue
+        previous = baseline.get((entry['report'], entry['scale']))
+        change = ''
+        if previous:
+            delta = (entry['wall_seconds'] - previous['wall_seconds']) / previous['wall_seconds'] * 100
+            change = f"{delta:+.1f}%"
+            if args.fail_over is not None and delta > args.fail_over:
+                regressions.append(entry)
+        print(f"{entry['report']:<10} {entry['scale']:>6} {entry['wall_seconds']:>9.2f} "
+              f"{entry['story_seconds']:>7.2f} {entry['layout_seconds']:>7.2f} {entry['peak_rss_mb']:>9.1f} "
+              f"{entry['blocks']:>10,} {entry['pages']:>7,} {entry['bytes']:>12,} {change:>8}")
+
+    history.append({
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'reportlab': importlib.import_module('reportlab').Version,
+        'platform': platform.platform(),
+        'results': results,
+    })
+    with open(args.history, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+        f.write('\n')
+    print(f"Appended run to {args.history}")
+
+    if regressions:
+        names = ', '.join(f"{entry['report']} x{entry['scale']}" for entry in regressions)
+        sys.exit(f"Wall time regressed by more than {args.fail_over}% for {names}")
+
+
+if __name__ == "__main__":
+    main()
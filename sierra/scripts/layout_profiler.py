@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Report Layout Profiler
+Wrap, split, draw and build timings per flowable class and report section
+
+While a LayoutProfiler is active (used as a context manager), the wrap,
+split and draw methods of every reportlab Flowable class are wrapped with
+timers. render_story reports each section it lays out, so every call is
+attributed to its report, its section and the flowable calls it is nested
+in (a Paragraph wrapped inside a Table cell shows up under Table.wrap).
+Building a block's flowables, which is where Paragraph parses its markup,
+is timed as <Class>.build, and replaying and writing the PDF as "write".
+Outside the context nothing is patched, so renders that are not profiled
+pay nothing beyond one check per section.
+
+Sections replayed from the section cache are not laid out, so profile with
+the cache disabled (render_reports.py --layout-profile does). Results come
+out as JSON (per section: calls, total and self seconds per Class.op) or as
+collapsed stacks with microseconds of self time, the input format of
+flamegraph.pl and speedscope.
+"""
+
+import contextlib
+import json
+import re
+import time
+
+from reportlab.platypus.flowables import Flowable
+
+PROFILED_METHODS = ('wrap', 'split', 'draw')
+
+_active = None
+
+
+def active_profiler():
+    """The LayoutProfiler currently collecting, or None"""
+    return _active
+
+
+def _flowable_classes():
+    classes, pending = [], [Flowable]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _frame_name(text):
+    """Stack frame label: markup stripped, ';' reserved as the frame separator"""
+    return re.sub(r"<[^>]+>", '', text).replace(';', ',').strip() or '?'
+
+
+class LayoutProfiler:
+    """Collects flowable timings for the renders made inside its with block"""
+
+    def __init__(self):
+        self.sections = []
+        self.stages = {}
+        self.stacks = {}
+        self._stack = []
+        self._path = ()
+        self._ops = None
+        self._patched = []
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A LayoutProfiler is already active")
+        for cls in _flowable_classes():
+            for method in PROFILED_METHODS:
+                fn = cls.__dict__.get(method)
+                if callable(fn):
+                    self._patched.append((cls, method, fn))
+                    setattr(cls, method, self._timed(method, fn))
+        _active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        for cls, method, fn in reversed(self._patched):
+            setattr(cls, method, fn)
+        self._patched.clear()
+        _active = None
+
+    def _timed(self, op, fn):
+        profiler = self
+
+        def timed(flowable, *args, **kwargs):
+            return profiler._call(flowable, op, fn, args, kwargs)
+
+        timed.__wrapped__ = fn
+        return timed
+
+    def _call(self, flowable, op, fn, args, kwargs):
+        stack = self._stack
+        # A subclass calling its base class's method is still the same call
+        if self._ops is None or (stack and stack[-1][0] is flowable and stack[-1][1] == op):
+            return fn(flowable, *args, **kwargs)
+        name = f"{type(flowable).__name__}.{op}"
+        frame = [flowable, op, name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return fn(flowable, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][3] += elapsed
+            self._add(name, tuple(f[2] for f in stack) + (name,), elapsed, elapsed - frame[3])
+
+    def _add(self, name, path, seconds, self_seconds):
+        stats = self._ops.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['self_seconds'] += self_seconds
+        key = self._path + path
+        self.stacks[key] = self.stacks.get(key, 0.0) + self_seconds
+
+    @contextlib.contextmanager
+    def section(self, report, section):
+        """Attribute the calls made inside the block to one section of a report"""
+        entry = {'report': report, 'index': section.index, 'title': _frame_name(section.title),
+                 'ops': {}, 'seconds': 0.0, 'pages': None}
+        self._path = (report, f"{section.index + 1:02d} {entry['title']}")
+        self._ops = entry['ops']
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = time.perf_counter() - start
+            accounted = sum(stats['self_seconds'] for stats in entry['ops'].values())
+            # Frame and doc template work outside any flowable method
+            self.stacks[self._path] = self.stacks.get(self._path, 0.0) + max(0.0, entry['seconds'] - accounted)
+            self.sections.append(entry)
+            self._path, self._ops = (), None
+
+    def build(self, build_flowables, blocks, *args):
+        """build_flowables(blocks, *args) with each block's construction timed as <Class>.build"""
+        flowables = []
+        for block in blocks:
+            start = time.perf_counter()
+            built = build_flowables([block], *args)
+            elapsed = time.perf_counter() - start
+            name = f"{type(built[0]).__name__ if built else block[0]}.build"
+            self._add(name, (name,), elapsed, elapsed)
+            flowables.extend(built)
+        return flowables
+
+    @contextlib.contextmanager
+    def stage(self, report, name):
+        """Time a step outside section layout, such as writing the PDF"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stages = self.stages.setdefault(report, {})
+            stages[name] = stages.get(name, 0.0) + elapsed
+            self.stacks[(report, name)] = self.stacks.get((report, name), 0.0) + elapsed
+
+    def as_dict(self):
+        return {'sections': self.sections, 'stages': self.stages}
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write('\n')
+
+    def collapsed(self):
+        """Collapsed stack lines ("frame;frame;frame microseconds"), heaviest first"""
+        lines = [(round(seconds * 1e6), ';'.join(path)) for path, seconds in self.stacks.items()]
+        return [f"{stack} {micros}" for micros, stack in sorted(lines, key=lambda line: (-line[0], line[1]))
+                if micros > 0]
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+
+    def totals(self, report=None):
+        """{Class.op: {'calls', 'seconds', 'self_seconds'}} summed over sections"""
+        totals = {}
+        for entry in self.sections:
+            if report is not None and entry['report'] != report:
+                continue
+            for name, stats in entry['ops'].items():
+                total = totals.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+                for key in total:
+                    total[key] += stats[key]
+        return totals
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Markdown Report Renderer
+Streams a Markdown analysis into story blocks styled like the Sierra reports
+
+The Markdown is read line by line and turned straight into report_story
+blocks, with no parse tree in between. iter_blocks yields each heading,
+paragraph, list item, code block and table as soon as its last line has been
+read, and story_sections adds them to a Story. Headings at or above
+break_level start a new page, so each top-level part of the document is its
+own section. Table columns are sized to their text and long cells wrap onto
+further lines. The blocks use the analysis report's paragraph styles and table
+themes, plus a code style for fenced blocks.
+
+Rendering goes through render_story and a persistent section cache. Each
+section is laid out as soon as the heading after it is read and its blocks
+are then dropped, so only one section's blocks are in memory at a time; the
+recorded pages of every section are kept until all of them are laid out and
+the PDF is written. After an edit, only the sections whose blocks changed
+are laid out again; the others are replayed from the previous run. Layout is
+redone per section rather than per block, because a changed block moves
+everything after it on its pages.
+
+Supported Markdown: ATX headings, paragraphs, **bold**, *italic*, `code`,
+[links](url), "-", "*" and "1." lists, fenced code blocks, pipe tables,
+block quotes and horizontal rules.
+
+Usage: python markdown_report.py INPUT.md OUTPUT.pdf [--break-level 2]
+       [--cache-dir DIR] [--pagesize letter|a4]
+"""
+
+import argparse
+import os
+import re
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from report_engine import SectionCache, render_story
+from report_story import Story, inch, FRAME_PADDING
+import sierra_analysis
+
+# The analysis report's styles plus a style for fenced code blocks
+STYLE_SPECS = dict(sierra_analysis.STYLE_SPECS, code=('MarkdownCode', 'Code', dict(
+    fontSize=8, leading=10, spaceBefore=4, spaceAfter=10, leftIndent=10,
+    backColor=colors.whitesmoke, borderPadding=4)))
+TABLE_SPECS = sierra_analysis.TABLE_SPECS
+TABLE_THEME = 'scenario'
+
+# Widest font of the table theme and its left plus right cell padding, used to fit columns
+TABLE_FONT = ('Helvetica-Bold', 8)
+TABLE_PADDING = 12
+
+PAGE_MARGINS = sierra_analysis.PAGE_MARGINS
+PAGESIZES = {'letter': letter, 'a4': A4}
+
+# Heading level -> paragraph style; deeper levels use the last one
+HEADING_STYLES = ('title', 'h1', 'h2', 'h3')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sierra-reports')
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s+(.*)$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_TABLE_DIVIDER = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+_INLINE = (
+    (re.compile(r"\*\*(.+?)\*\*|__(.+?)__"), lambda m: f"<b>{m.group(1) or m.group(2)}</b>"),
+    (re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?!\*)|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)"),
+     lambda m: f"<i>{m.group(1) or m.group(2)}</i>"),
+)
+_CODE_SPAN = re.compile(r"`([^`]+)`")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+
+
+def inline_markup(text):
+    """Paragraph markup for one Markdown line or paragraph"""
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    # Code spans and link targets are set aside first so emphasis markers inside them stay literal
+    spans = []
+
+    def keep(match):
+        spans.append(f'<font face="Courier">{match.group(1)}</font>')
+        return f"\x00{len(spans) - 1}\x00"
+
+    def link(match):
+        spans.append(match.group(2))
+        return f'<link href="\x00{len(spans) - 1}\x00" color="blue">{match.group(1)}</link>'
+
+    text = _CODE_SPAN.sub(keep, text)
+    text = _LINK.sub(link, text)
+    for pattern, replace in _INLINE:
+        text = pattern.sub(replace, text)
+    return re.sub(r"\x00(\d+)\x00", lambda m: spans[int(m.group(1))], text)
+
+
+def plain_text(text):
+    """Cell text with Markdown emphasis and code markers removed"""
+    text = re.sub(r"\*\*(.+?)\*\*|__(.+?)__", lambda m: m.group(1) or m.group(2), text)
+    text = re.sub(r"\[([^\]]+)\]\([^)\s]+\)", r"\1", text)
+    return text.replace('`', '')
+
+
+def _table_cells(line):
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [plain_text(cell.strip()) for cell in line.split('|')]
+
+
+def table_widths(rows, width):
+    """Column widths that fill width, fitting narrow columns to their text
+
+    Columns whose longest cell fits an equal share of what is left keep their
+    natural width; the remaining width is shared by the wider columns in
+    proportion to their natural widths.
+    """
+    columns = max(len(row) for row in rows)
+    natural = [max(stringWidth(row[column], *TABLE_FONT) for row in rows) + TABLE_PADDING
+               for column in range(columns)]
+    if sum(natural) <= width:
+        return [width * needed / sum(natural) for needed in natural]
+    widths = [None] * columns
+    while True:
+        open_columns = [column for column in range(columns) if widths[column] is None]
+        share = (width - sum(w for w in widths if w is not None)) / len(open_columns)
+        fitted = [column for column in open_columns if natural[column] <= share]
+        if not fitted:
+            break
+        for column in fitted:
+            widths[column] = natural[column]
+    remaining = width - sum(w for w in widths if w is not None)
+    wide = sum(natural[column] for column in open_columns)
+    for column in open_columns:
+        widths[column] = remaining * natural[column] / wide
+    return widths
+
+
+def _cell_lines(text, width):
+    """Lines of text that fit width, breaking words too long for a line of their own"""
+    lines = []
+    for line in simpleSplit(text, TABLE_FONT[0], TABLE_FONT[1], width) or [text]:
+        while stringWidth(line, *TABLE_FONT) > width and len(line) > 1:
+            cut = len(line) - 1
+            while cut > 1 and stringWidth(line[:cut], *TABLE_FONT) > width:
+                cut -= 1
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+    return lines
+
+
+def wrap_cells(rows, widths):
+    """Rows with each cell broken into lines that fit its column"""
+    return [['\n'.join(_cell_lines(cell, width - TABLE_PADDING)) for cell, width in zip(row, widths)]
+            for row in rows]
+
+
+def iter_blocks(lines, width):
+    """Yield the blocks of Markdown lines, each as soon as its last line is read
+
+    Blocks are ('heading', level, markup), ('paragraph', style key, markup),
+    ('code', text), ('table', rows, column widths) and ('rule',); tables are
+    fitted to width.
+    """
+    paragraph = []
+    table = []
+    code = None
+
+    def flush_paragraph():
+        if paragraph:
+            yield ('paragraph', 'body', inline_markup(' '.join(paragraph)))
+            paragraph.clear()
+
+    def flush_table():
+        if table:
+            columns = max(len(row) for row in table)
+            rows = [row + [''] * (columns - len(row)) for row in table]
+            widths = table_widths(rows, width)
+            yield ('table', wrap_cells(rows, widths), widths)
+            table.clear()
+
+    for line in lines:
+        line = line.rstrip('\n')
+        if code is not None:
+            if _FENCE.match(line):
+                yield ('code', '\n'.join(code))
+                code = None
+            else:
+                code.append(line)
+            continue
+        stripped = line.strip()
+        if table and not stripped.startswith('|'):
+            yield from flush_table()
+        if not stripped:
+            yield from flush_paragraph()
+        elif _FENCE.match(line):
+            yield from flush_paragraph()
+            code = []
+        elif stripped.startswith('|'):
+            yield from flush_paragraph()
+            if not _TABLE_DIVIDER.match(stripped):
+                table.append(_table_cells(stripped))
+        elif _HEADING.match(line):
+            yield from flush_paragraph()
+            marks, text = _HEADING.match(line).groups()
+            yield ('heading', len(marks), inline_markup(text))
+        elif _RULE.match(line):
+            yield from flush_paragraph()
+            yield ('rule',)
+        elif _BULLET.match(line):
+            yield from flush_paragraph()
+            yield ('paragraph', 'bullet', f"• {inline_markup(_BULLET.match(line).group(1))}")
+        elif _NUMBERED.match(line):
+            yield from flush_paragraph()
+            number, text = _NUMBERED.match(line).groups()
+            yield ('paragraph', 'bullet', f"{number}. {inline_markup(text)}")
+        elif stripped.startswith('>'):
+            yield from flush_paragraph()
+            yield ('paragraph', 'body', f"<i>{inline_markup(stripped.lstrip('>').strip())}</i>")
+        else:
+            paragraph.append(stripped)
+    if code is not None:
+        yield ('code', '\n'.join(code))
+    yield from flush_table()
+    yield from flush_paragraph()
+
+
+def story_sections(story, lines, pagesize=letter, break_level=2, keep=True):
+    """Add the blocks of Markdown lines to story, yielding each section once it is complete
+
+    A section is complete when the heading that starts the next page, or the
+    end of the input, has been read; headings up to break_level start a new
+    page (0 for none). With keep=False each section is dropped from
+    story.sections, leaving None in its place, once it has been yielded, so
+    only the section being read is held. story.title is set from the first
+    level-1 heading.
+    """
+    width = pagesize[0] - PAGE_MARGINS['leftMargin'] - PAGE_MARGINS['rightMargin'] - 2 * FRAME_PADDING
+    done = 0
+
+    def closed(count):
+        nonlocal done
+        while done < count:
+            yield story.sections[done]
+            if not keep:
+                story.sections[done] = None
+            done += 1
+
+    for block in iter_blocks(lines, width):
+        kind = block[0]
+        if kind == 'heading':
+            _, level, text = block
+            if level <= break_level:
+                story.page_break()
+                yield from closed(len(story.sections) - 1)
+            if story.title is None and level == 1:
+                story.title = re.sub(r"<[^>]+>", '', text)
+            story.heading(HEADING_STYLES[min(level, len(HEADING_STYLES)) - 1], text, level)
+        elif kind == 'paragraph':
+            story.paragraph(block[1], block[2])
+        elif kind == 'code':
+            story.preformatted('code', block[1])
+        elif kind == 'table':
+            story.table(TABLE_THEME, block[1], block[2])
+        elif kind == 'rule':
+            story.spacer(0.25*inch)
+    yield from closed(len(story.sections))
+
+
+def markdown_story(lines, pagesize=letter, break_level=2):
+    """Story for Markdown lines, read in full; headings up to break_level start a new page (0 for none)"""
+    story = Story()
+    for _ in story_sections(story, lines, pagesize, break_level):
+        pass
+    return story
+
+
+class _StreamedStory:
+    """What render_story reads of a Story, with the sections parsed as they are laid out"""
+
+    author = None
+
+    def __init__(self, story, sections):
+        self._story = story
+        self.sections = sections
+
+    @property
+    def title(self):
+        return self._story.title
+
+
+def render_markdown(source, output, pagesize=letter, break_level=2, cache=None):
+    """Render a Markdown file (path or open text stream) to output
+
+    cache is passed to render_story; returns its [(section title, cache hit,
+    pages)] summary.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8') as f:
+            return render_markdown(f, output, pagesize, break_level, cache)
+    story = Story()
+    sections = story_sections(story, source, pagesize, break_level, keep=False)
+    return render_story(_StreamedStory(story, sections), output, 'markdown', STYLE_SPECS, TABLE_SPECS,
+                        dict(pagesize=pagesize, **PAGE_MARGINS), cache=cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a Markdown analysis as a styled PDF")
+    parser.add_argument('input', help='Markdown file')
+    parser.add_argument('output', help='PDF to write')
+    parser.add_argument('--break-level', type=int, default=2,
+                        help='headings at this level or above start a new page (0: never)')
+    parser.add_argument('--cache-dir', default=os.environ.get('SIERRA_REPORT_CACHE') or DEFAULT_CACHE_DIR,
+                        help='section cache kept between runs (default: $SIERRA_REPORT_CACHE or %(default)s)')
+    parser.add_argument('--pagesize', choices=sorted(PAGESIZES), default='letter')
+    args = parser.parse_args()
+
+    summary = render_markdown(args.input, args.output, PAGESIZES[args.pagesize], args.break_level,
+                              SectionCache(args.cache_dir))
+    for title, hit, pages in summary:
+        print(f"{'cached ' if hit else 'laid out'} {pages:>3} page(s)  {re.sub(r'<[^>]+>', '', title)}")
+    laid_out = sum(1 for _, hit, _ in summary if not hit)
+    print(f"{args.output}: {sum(pages for _, _, pages in summary)} pages, "
+          f"{laid_out} of {len(summary)} sections laid out")
+
+
+if __name__ == "__main__":
+    main()
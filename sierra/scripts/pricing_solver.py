@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Sierra Implied Per-Resolution Price Solver
+Inverts a target ARR into the per-resolution fee it implies
+
+    ARR = 12 x monthly volume x containment x fee per resolution
+    fee per resolution = fee fraction x avoided human cost
+
+For a target ARR the solver evaluates a volume x containment x fee-fraction
+grid: the implied fee depends on volume and containment, and dividing it by
+the fee fraction gives the avoided cost per deflected call that the scenario
+needs. A grid point is consistent when that cost falls inside the $10-$20
+range quoted for a human-handled call. Only the volume x containment plane of
+fees is materialized; a fee fraction f is consistent when some fee on the
+plane lies in [$10 f, $20 f], which a binary search over the sorted plane
+answers for every f at once.
+
+Usage: python pricing_solver.py [--customer NAME] [--segment KEY --volume LOW HIGH]
+       [--grid NV NC NF]
+"""
+
+import argparse
+import functools
+import time
+
+import numpy as np
+
+from sierra_data import load_dataset, format_millions
+
+AVOIDED_COST = (10.0, 20.0)        # $ per deflected human-handled call
+CONTAINMENT = (0.5, 0.9)           # reported AI resolution / containment rates
+FEE_FRACTION = (0.001, 0.5)        # share of the avoided cost billed per resolution
+GRID = (200, 100, 100)             # volume x containment x fee-fraction points
+TARGET_CHUNK = 8                   # targets solved per broadcast in the report table
+
+
+class PriceGrid:
+    """Solved grid for one or more targets; arrays lead with the target axis"""
+
+    def __init__(self, targets, volumes, containment, fee_fraction, avoided_cost=AVOIDED_COST):
+        self.targets = targets              # (K,) target ARR in $
+        self.volumes = volumes              # (K, NV) monthly volumes
+        self.containment = containment      # (NC,)
+        self.fee_fraction = fee_fraction    # (NF,)
+        resolutions = 12.0 * volumes[:, :, None] * containment[None, None, :]
+        self.fee = targets[:, None, None] / resolutions                      # (K, NV, NC)
+        self.avoided_cost = avoided_cost    # ($ low, $ high) per deflected call
+
+    @property
+    def points(self):
+        """Fees computed: one per target, volume and containment; fee fractions are searched, not evaluated"""
+        return self.fee.size
+
+    def fee_range(self, k, percentiles=(5, 95)):
+        """Implied fee per resolution across the volume x containment plane"""
+        return np.percentile(self.fee[k], percentiles)
+
+    def billed_share_at(self, k, fee=1.0):
+        """Range of the share of monthly volume that must be billed at a flat fee to reach the target"""
+        shares = self.targets[k] / (12.0 * self.volumes[k] * fee)
+        return float(shares.min()), float(shares.max())
+
+    def fee_fraction_range(self, k):
+        """Fee fractions that are consistent somewhere on the grid, or None"""
+        fees = np.sort(self.fee[k], axis=None)
+        low, high = self.avoided_cost
+        usable = (np.searchsorted(fees, low * self.fee_fraction, 'left')
+                  < np.searchsorted(fees, high * self.fee_fraction, 'right'))
+        if not usable.any():
+            return None
+        fractions = self.fee_fraction[usable]
+        return float(fractions.min()), float(fractions.max())
+
+
+def solve(targets, volume_ranges, grid=GRID, containment=CONTAINMENT,
+          fee_fraction=FEE_FRACTION, avoided_cost=AVOIDED_COST):
+    """Solve every (target ARR, monthly volume range) pair on one shared grid"""
+    nv, nc, nf = grid
+    targets = np.asarray(targets, dtype=float)
+    lows, highs = np.asarray(volume_ranges, dtype=float).T
+    steps = np.linspace(0.0, 1.0, nv)
+    volumes = lows[:, None] + (highs - lows)[:, None] * steps[None, :]
+    return PriceGrid(targets, volumes,
+                     np.linspace(*containment, nc),
+                     np.geomspace(*fee_fraction, nf),
+                     avoided_cost)
+
+
+def customer_targets(dataset=None):
+    """(name, target ARR $, (monthly low, high), basis) for customers with volume data"""
+    dataset = dataset or load_dataset()
+    estimates = {c.name: c.est_acv_m for c in dataset.customers}
+    rows = []
+    for volume in dataset.volumes:
+        target = estimates.get(volume.customer)
+        if target is not None:
+            rows.append((volume.customer, target * 1e6,
+                         (volume.monthly_low, volume.monthly_high), volume.basis))
+    return rows
+
+
+def _volume_label(low, high):
+    def short(value):
+        return f"{value / 1e6:g}M" if value >= 1e6 else f"{value / 1e3:g}K"
+    return f"{short(low)}-{short(high)}"
+
+
+@functools.lru_cache(maxsize=8)
+def scenario_table_rows(dataset=None, grid=GRID):
+    """Header and rows for the report's implied pricing table (kept per dataset)"""
+    targets = customer_targets(dataset)
+    rows = [('Customer', 'Monthly inquiries\n(assumed)', 'Scenario ARR',
+             'Implied fee per\nresolution (P5-P95)', 'Fee as share of\n$10-$20 avoided cost',
+             'Inquiries billed\nat $1 / resolution')]
+    # The fee planes grow with the number of targets, so large rosters are solved in chunks
+    for first in range(0, len(targets), TARGET_CHUNK):
+        chunk = targets[first:first + TARGET_CHUNK]
+        solved = solve([t[1] for t in chunk], [t[2] for t in chunk], grid)
+        for k, (name, target, (low, high), _) in enumerate(chunk):
+            fee_low, fee_high = solved.fee_range(k)
+            fractions = solved.fee_fraction_range(k)
+            share = 'none' if fractions is None else f"{fractions[0]:.1%} - {fractions[1]:.1%}"
+            billed_low, billed_high = solved.billed_share_at(k)
+            rows.append((name, _volume_label(low, high), format_millions(target / 1e6),
+                         f"${fee_low:.2f} - ${fee_high:.2f}", share,
+                         f"{billed_low:.0%} - {billed_high:.0%}"))
+    return tuple(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Implied per-resolution fee for a target ARR")
+    parser.add_argument('--customer', action='append', help='customer with volume data (default: all)')
+    parser.add_argument('--segment', help='ARR distribution tier; target is its average contract')
+    parser.add_argument('--volume', nargs=2, type=float, metavar=('LOW', 'HIGH'),
+                        help='monthly volume range for --segment')
+    parser.add_argument('--grid', nargs=3, type=int, default=list(GRID), metavar=('NV', 'NC', 'NF'))
+    args = parser.parse_args()
+
+    dataset = load_dataset()
+    if args.segment:
+        if not args.volume:
+            parser.error('--segment needs --volume LOW HIGH')
+        tiers = {tier.key: tier for tier in dataset.segments}
+        if args.segment not in tiers:
+            parser.error(f"unknown segment {args.segment!r}, expected one of {sorted(tiers)}")
+        tier = tiers[args.segment]
+        targets = [(f"{tier.name} (avg contract)", tier.arr_m / tier.contracts * 1e6,
+                    tuple(args.volume), 'command line')]
+    else:
+        targets = [t for t in customer_targets(dataset)
+                   if not args.customer or t[0] in args.customer]
+        if not targets:
+            parser.error('no customers with volume data matched')
+
+    start = time.perf_counter()
+    solved = solve([t[1] for t in targets], [t[2] for t in targets], tuple(args.grid))
+    results = [(solved.fee_range(k), solved.fee_fraction_range(k), solved.billed_share_at(k))
+               for k in range(len(targets))]
+    elapsed = time.perf_counter() - start
+
+    for (name, target, (low, high), basis), ((fee_low, fee_high), fractions, billed) in zip(targets, results):
+        print(f"{name}: target ARR ${target / 1e6:.2f}M, {_volume_label(low, high)} inquiries/month ({basis})")
+        print(f"  implied fee per resolution P5-P95: ${fee_low:.3f} - ${fee_high:.3f}")
+        if fractions is None:
+            print("  no fee fraction on the grid matches a $10-$20 avoided cost")
+        else:
+            print(f"  consistent fee fractions: {fractions[0]:.2%} - {fractions[1]:.2%}")
+        print(f"  share of inquiries billed at $1 per resolution: {billed[0]:.1%} - {billed[1]:.1%}")
+    nv, nc, nf = args.grid
+    print(f"Solved {len(targets)} target{'s' if len(targets) != 1 else ''} in {elapsed * 1000:.0f} ms: "
+          f"{solved.points:,} fees on {nv} x {nc} volume x containment planes, "
+          f"{nf} fee fractions each located by binary search")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Runner
+Renders every report generator in the repository concurrently with per-stage timings
+
+A generator is any module in the repository that defines REPORT_KEY,
+build_story and render_report; they are found by reading the sources, so
+discovery imports nothing. Each selected report renders in a fresh process,
+and its time is split into importing the generator (including reportlab),
+building the story, laying out the sections and writing the PDF.
+
+With --profile every render also runs under cProfile. The stats are saved
+next to the PDF as <report>.prof (readable with pstats or snakeviz), and the
+functions with the most cumulative time are printed after the summary.
+
+With --layout-profile every render lays out all of its sections afresh
+under a layout_profiler.LayoutProfiler. Wrap, split, draw and build times
+per flowable class and section are saved next to the PDF as
+<report>.layout.json, with collapsed stacks for flame graphs in
+<report>.collapsed, and the slowest flowable operations and sections are
+printed after the summary.
+
+With --skip-unchanged every report is rendered in memory and compared page
+by page (report_diff) with the PDF already at its output path. A report
+whose pages are all unchanged, written with the same output profile, is not
+published: the existing file, and its modification time, are left as they
+are, so anything downstream keyed on the file sees no change. Otherwise the
+file is replaced and the number of changed, added and removed pages is
+shown next to it. The bytes shown are those of the file left on disk.
+
+After the summary the ARR, contract and segment figures stated across the
+data, README, analysis and report sources are cross-checked
+(arr_consistency) and any disagreements are listed with their locations;
+they do not fail the run.
+
+Usage: python render_reports.py [--only analysis forensic] [--jobs N]
+       [--output-dir DIR] [--profile] [--layout-profile] [--skip-unchanged]
+       [--output-profile standard|fast|small|archive] [--list]
+"""
+
+import argparse
+import cProfile
+import importlib
+import io
+import multiprocessing
+import os
+import pstats
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from report_diff import diff_pdfs
+from report_profiles import pdf_profile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Functions listed per report by --profile
+PROFILE_TOP = 15
+
+# Flowable operations and sections listed per report by --layout-profile
+LAYOUT_TOP = 10
+
+_REPORT_KEY = re.compile(r"^REPORT_KEY = ['\"](\w+)['\"]", re.MULTILINE)
+_GENERATOR_DEFS = (re.compile(r"^def build_story\(", re.MULTILINE),
+                   re.compile(r"^def render_report\(", re.MULTILINE))
+
+
+def discover_generators(root=REPO_ROOT):
+    """{report key: module path} for every report generator under root"""
+    generators = {}
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.') and d != '__pycache__')
+        for filename in sorted(files):
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, encoding='utf-8') as f:
+                source = f.read()
+            match = _REPORT_KEY.search(source)
+            if match and all(pattern.search(source) for pattern in _GENERATOR_DEFS):
+                if match.group(1) in generators:
+                    raise ValueError(f"REPORT_KEY {match.group(1)!r} is defined by both "
+                                     f"{generators[match.group(1)]} and {path}")
+                generators[match.group(1)] = path
+    return generators
+
+
+def publish(data, output):
+    """Replace output with the PDF bytes in data unless it already shows the same pages
+
+    report_diff compares pages across output profiles, so a previous file
+    written with another profile (pdf_profile) is replaced even when its
+    pages match. Returns (number of changed, added and removed pages, or
+    None when there was no previous file; whether the previous file was kept).
+    """
+    if not os.path.exists(output):
+        changes = None
+    else:
+        with open(output, 'rb') as f:
+            previous = f.read()
+        result = diff_pdfs(previous, data)
+        changes = len(result.changed) + len(result.added) + len(result.removed)
+        if not changes and pdf_profile(previous) == pdf_profile(data):
+            return 0, True
+    staged = output + '.tmp'
+    with open(staged, 'wb') as f:
+        f.write(data)
+    os.replace(staged, output)
+    return changes, False
+
+
+def render_generator(key, path, output_dir=None, profile=False, output_profile=None, layout_profile=False,
+                     skip_unchanged=False):
+    """Import and render one generator in this process; returns its timing entry"""
+    profiler = cProfile.Profile() if profile else None
+    layout_profiler = None
+    if layout_profile:
+        from layout_profiler import LayoutProfiler
+        layout_profiler = LayoutProfiler()
+    entry = {'report': key, 'module': os.path.relpath(path, REPO_ROOT)}
+    timings = {}
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        sys.path.insert(0, os.path.dirname(path))
+        module = importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+        # Generators import reportlab only to render; count it as import time
+        importlib.import_module('report_engine')
+        imported = time.perf_counter()
+        output = module.OUTPUT_PATH
+        if output_dir:
+            output = os.path.join(output_dir, os.path.basename(output))
+        story = module.build_story()
+        built = time.perf_counter()
+        target = io.BytesIO() if skip_unchanged else output
+        if layout_profiler:
+            with layout_profiler:
+                summary = module.render_report(story, target, cache=False, timings=timings,
+                                               profile=output_profile)
+        else:
+            summary = module.render_report(story, target, timings=timings, profile=output_profile)
+        if skip_unchanged:
+            compared = time.perf_counter()
+            entry['page_changes'], entry['kept'] = publish(target.getvalue(), output)
+            entry['compare_seconds'] = time.perf_counter() - compared
+    except Exception as exc:
+        entry.update(status='error', error=f"{type(exc).__name__}: {exc}",
+                     total_seconds=time.perf_counter() - start)
+        return entry
+    finally:
+        if profiler:
+            profiler.disable()
+    done = time.perf_counter()
+    entry.update(
+        status='ok',
+        output=output,
+        import_seconds=imported - start,
+        story_seconds=built - imported,
+        layout_seconds=timings['layout'],
+        write_seconds=timings['write'],
+        total_seconds=done - start,
+        pages=sum(pages for _, _, pages in summary),
+        bytes=os.path.getsize(output),
+    )
+    if profiler:
+        entry['profile'] = os.path.splitext(output)[0] + '.prof'
+        profiler.dump_stats(entry['profile'])
+    if layout_profiler:
+        stem = os.path.splitext(output)[0]
+        entry['layout_profile'] = stem + '.layout.json'
+        layout_profiler.write_json(entry['layout_profile'])
+        layout_profiler.write_collapsed(stem + '.collapsed')
+        entry['layout_ops'] = sorted(layout_profiler.totals().items(),
+                                     key=lambda item: -item[1]['self_seconds'])[:LAYOUT_TOP]
+        entry['layout_sections'] = sorted(((section['seconds'], section['pages'], section['title'])
+                                           for section in layout_profiler.sections), reverse=True)[:LAYOUT_TOP]
+    return entry
+
+
+def render_all(generators, jobs=None, output_dir=None, profile=False, output_profile=None,
+               layout_profile=False, skip_unchanged=False):
+    """Render {key: path} concurrently, one fresh process per report; returns entries by key"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or min(len(generators), os.cpu_count() or 1)
+    # Fresh spawned workers keep each report's import time honest
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = {key: pool.submit(render_generator, key, path, output_dir, profile, output_profile,
+                                         layout_profile, skip_unchanged)
+                   for key, path in sorted(generators.items())}
+        return [futures[key].result() for key in sorted(futures)]
+
+
+def main():
+    from report_profiles import DEFAULT_PROFILE, PROFILES
+
+    generators = discover_generators()
+    parser = argparse.ArgumentParser(description="Render the Sierra reports in parallel")
+    parser.add_argument('--only', nargs='+', choices=sorted(generators), default=sorted(generators),
+                        help='reports to render (default: all)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='reports rendered at once (default: one per report, up to the core count)')
+    parser.add_argument('--output-dir', help="directory for the PDFs (default: each generator's OUTPUT_PATH)")
+    parser.add_argument('--profile', action='store_true', help='run each render under cProfile')
+    parser.add_argument('--layout-profile', action='store_true',
+                        help='time wrap, split and draw per flowable class and section (disables the section cache)')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help='leave a report alone when its pages match the PDF already at its output path')
+    parser.add_argument('--output-profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help='PDF compression and font embedding profile (see report_profiles)')
+    parser.add_argument('--list', action='store_true', help='list the discovered generators and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for key, path in sorted(generators.items()):
+            print(f"{key:<10} {os.path.relpath(path, REPO_ROOT)}")
+        return
+
+    start = time.perf_counter()
+    entries = render_all({key: generators[key] for key in args.only}, args.jobs, args.output_dir, args.profile,
+                         args.output_profile, args.layout_profile, args.skip_unchanged)
+    wall = time.perf_counter() - start
+
+    print(f"{'Report':<10} {'Import':>9} {'Story':>9} {'Layout':>9} {'Write':>9} {'Total':>9} "
+          f"{'Pages':>6} {'Bytes':>10}  Output")
+    for entry in entries:
+        if entry['status'] != 'ok':
+            print(f"{entry['report']:<10} failed after {entry['total_seconds'] * 1000:.1f} ms: {entry['error']}")
+            continue
+        stages = ' '.join(f"{entry[f'{stage}_seconds'] * 1000:>9.1f}"
+                          for stage in ('import', 'story', 'layout', 'write', 'total'))
+        published = ''
+        if 'page_changes' in entry:
+            changes = entry['page_changes']
+            published = (' (new)' if changes is None else ' (unchanged, kept)' if entry['kept']
+                         else ' (output profile changed)' if not changes
+                         else f" ({changes} page{'s' if changes != 1 else ''} changed)")
+        print(f"{entry['report']:<10} {stages} {entry['pages']:>6} {entry['bytes']:>10,}  {entry['output']}{published}")
+    print(f"Times in ms; wall time {wall:.2f}s for {len(entries)} of {len(generators)} reports")
+
+    for entry in entries:
+        if 'profile' in entry:
+            print(f"\n{entry['report']}: top {PROFILE_TOP} functions by cumulative time ({entry['profile']})")
+            pstats.Stats(entry['profile'], stream=sys.stdout).sort_stats('cumulative').print_stats(PROFILE_TOP)
+
+    for entry in entries:
+        if 'layout_profile' in entry:
+            print(f"\n{entry['report']}: slowest flowable operations by self time ({entry['layout_profile']})")
+            print(f"  {'Operation':<28} {'Calls':>8} {'Total ms':>10} {'Self ms':>10}")
+            for name, stats in entry['layout_ops']:
+                print(f"  {name:<28} {stats['calls']:>8} {stats['seconds'] * 1000:>10.1f} "
+                      f"{stats['self_seconds'] * 1000:>10.1f}")
+            print(f"  {'Section':<28} {'Pages':>8} {'Layout ms':>10}")
+            for seconds, pages, title in entry['layout_sections']:
+                print(f"  {title[:28]:<28} {pages:>8} {seconds * 1000:>10.1f}")
+
+    from arr_consistency import check_consistency
+
+    violations = check_consistency()
+    if violations:
+        print(f"\nARR figures: {len(violations)} inconsistenc{'ies' if len(violations) != 1 else 'y'} "
+              f"across sources (details: python arr_consistency.py)")
+        for violation in violations:
+            print(f"  {violation}")
+
+    failed = [entry['report'] for entry in entries if entry['status'] != 'ok']
+    if failed:
+        sys.exit(f"Failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Report Charts
+Bar, waterfall and fan charts for the Sierra reports as reportlab Drawings
+
+Charts are described by plain data (tuples of labels and $M values), so a
+chart is an ordinary story block with a stable fingerprint. chart_drawing
+turns that data into a Drawing of primitive shapes (rectangles, lines,
+polygons and strings): all axis, scale and label geometry is worked out
+once, when the drawing is built. Finished drawings are kept in an LRU keyed
+by the SHA-256 of the chart's kind, data and size. Repeat renders, and
+report variants that share a chart (page sizes, output profiles, batches),
+reuse the same drawing instead of rebuilding it.
+
+chart_drawing takes the output profile's font mapping (standard font name
+to the name to draw with), so archive renders draw their labels in the
+embedded fonts; the mapping is part of the cache key. The drawing's initial
+font is the label font, so renderPDF does not select its Times-Roman
+default on the way in.
+
+Kinds and their data:
+
+  bar        (title, categories, values); a value given as a (low, high)
+             pair is drawn as a floating range bar
+  waterfall  (title, categories, values, total label); each category adds
+             its value on top of the previous ones, ending in a total bar
+  fan        (title, x labels, bands, points); bands holds (P5, P25, P50,
+             P75, P95) for each x label, drawn as nested bands around the
+             median, and points are (x position, value, label) markers with
+             x in label positions (0 for the first label)
+
+Charts use solid colours only, so recorded pages replay without extra
+graphics-state resources.
+"""
+
+import hashlib
+import math
+from collections import OrderedDict
+
+from reportlab.graphics.shapes import Circle, Drawing, Line, PolyLine, Polygon, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.utils import simpleSplit
+
+from sierra_data import format_millions
+
+# Bump when the drawing code changes what a given input looks like
+CHART_VERSION = 2
+
+# Finished drawings kept in the process-wide cache
+MAX_DRAWINGS = 64
+
+FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+TITLE_SIZE = 10
+LABEL_SIZE = 7
+
+# Plot area insets from the drawing edges (left, bottom, right, top)
+INSETS = (44, 34, 10, 22)
+
+BAR_COLOR = colors.darkblue
+TOTAL_COLOR = colors.HexColor('#1b5e20')
+DECREASE_COLOR = colors.firebrick
+OUTER_BAND_COLOR = colors.HexColor('#c6d4ea')
+INNER_BAND_COLOR = colors.HexColor('#8ea9d6')
+MARKER_COLOR = colors.firebrick
+GRID_COLOR = colors.lightgrey
+
+
+def nice_ticks(low, high, count=5):
+    """Round tick values from at or below low to at or above high, about count steps apart"""
+    span = (high - low) or abs(high) or 1.0
+    raw = span / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first, last = math.floor(low / step), math.ceil(high / step)
+    return [round(i * step, 10) for i in range(first, last + 1)]
+
+
+def _money(value):
+    return format_millions(round(value, 1))
+
+
+class _Plot:
+    """Drawing with a title, a value axis with grid lines and a plot area"""
+
+    def __init__(self, width, height, title, low, high, fonts=None):
+        fonts = fonts or {}
+        self.font = fonts.get(FONT, FONT)
+        self.bold_font = fonts.get(BOLD_FONT, BOLD_FONT)
+        self.drawing = Drawing(width, height, initialFontName=self.font, initialFontSize=LABEL_SIZE)
+        self.drawing.hAlign = 'CENTER'
+        left, bottom, right, top = INSETS
+        self.x0, self.y0 = left, bottom
+        self.x1, self.y1 = width - right, height - top
+        self.ticks = nice_ticks(min(low, 0.0), high)
+        self.low, self.high = self.ticks[0], self.ticks[-1]
+        self.add(String(width / 2, height - TITLE_SIZE - 2, title, fontName=self.bold_font,
+                        fontSize=TITLE_SIZE, fillColor=colors.darkblue, textAnchor='middle'))
+        for tick in self.ticks:
+            y = self.y(tick)
+            self.add(Line(self.x0, y, self.x1, y, strokeColor=GRID_COLOR, strokeWidth=0.5))
+            self.add(String(self.x0 - 4, y - LABEL_SIZE / 3, format_millions(tick), fontName=self.font,
+                            fontSize=LABEL_SIZE, textAnchor='end'))
+        self.add(Line(self.x0, self.y(0.0), self.x1, self.y(0.0), strokeColor=colors.black, strokeWidth=0.75))
+
+    def add(self, shape):
+        self.drawing.add(shape)
+
+    def y(self, value):
+        return self.y0 + (value - self.low) / (self.high - self.low) * (self.y1 - self.y0)
+
+    def slot(self, count):
+        return (self.x1 - self.x0) / count
+
+    def category_labels(self, labels, centers, width):
+        """Labels under the axis, wrapped to width"""
+        for label, x in zip(labels, centers):
+            lines = simpleSplit(label, self.font, LABEL_SIZE, width)[:3]
+            for i, line in enumerate(lines):
+                self.add(String(x, self.y0 - 10 - i * (LABEL_SIZE + 1), line, fontName=self.font,
+                                fontSize=LABEL_SIZE, textAnchor='middle'))
+
+    def value_label(self, x, y, text):
+        self.add(String(x, y + 3, text, fontName=self.font, fontSize=LABEL_SIZE, textAnchor='middle'))
+
+
+def bar_chart(width, height, title, categories, values, fonts=None):
+    """Vertical bars from zero, or floating bars for (low, high) values"""
+    spans = [value if isinstance(value, tuple) else (0.0, value) for value in values]
+    plot = _Plot(width, height, title, min(low for low, _ in spans), max(high for _, high in spans), fonts)
+    slot = plot.slot(len(categories))
+    centers = [plot.x0 + slot * (i + 0.5) for i in range(len(categories))]
+    for x, value, (low, high) in zip(centers, values, spans):
+        plot.add(Rect(x - slot * 0.3, plot.y(low), slot * 0.6, plot.y(high) - plot.y(low),
+                      fillColor=BAR_COLOR, strokeColor=None))
+        label = f"{_money(low)} - {_money(high)}" if isinstance(value, tuple) else _money(high)
+        plot.value_label(x, plot.y(high), label)
+    plot.category_labels(categories, centers, slot * 0.95)
+    return plot.drawing
+
+
+def waterfall_chart(width, height, title, categories, values, total_label, fonts=None):
+    """Running total built up category by category, ending in a total bar"""
+    ends = [0.0]
+    for value in values:
+        ends.append(ends[-1] + value)
+    plot = _Plot(width, height, title, min(ends), max(ends), fonts)
+    slot = plot.slot(len(categories) + 1)
+    centers = [plot.x0 + slot * (i + 0.5) for i in range(len(categories) + 1)]
+    bar = slot * 0.6
+    for i, value in enumerate(values):
+        start, end = ends[i], ends[i + 1]
+        plot.add(Rect(centers[i] - bar / 2, plot.y(min(start, end)), bar, abs(plot.y(end) - plot.y(start)),
+                      fillColor=BAR_COLOR if value >= 0 else DECREASE_COLOR, strokeColor=None))
+        plot.add(Line(centers[i] + bar / 2, plot.y(end), centers[i + 1] - bar / 2, plot.y(end),
+                      strokeColor=colors.grey, strokeWidth=0.5, strokeDashArray=[2, 2]))
+        plot.value_label(centers[i], plot.y(max(start, end)), f"{'+' if value >= 0 else '-'}{_money(abs(value))}")
+    total = ends[-1]
+    plot.add(Rect(centers[-1] - bar / 2, plot.y(min(0.0, total)), bar, abs(plot.y(total) - plot.y(0.0)),
+                  fillColor=TOTAL_COLOR, strokeColor=None))
+    plot.value_label(centers[-1], plot.y(max(0.0, total)), _money(total))
+    plot.category_labels(list(categories) + [total_label], centers, slot * 0.95)
+    return plot.drawing
+
+
+def fan_chart(width, height, title, labels, bands, points=(), fonts=None):
+    """P5-P95 and P25-P75 bands around the median, with optional point markers"""
+    values = [value for band in bands for value in band] + [value for _, value, _ in points]
+    plot = _Plot(width, height, title, min(values), max(values), fonts)
+    step = (plot.x1 - plot.x0) / max(1, len(labels) - 1)
+    # Leave room for the first and last labels inside the plot area
+    inset = min(step / 2, 20)
+    step = (plot.x1 - plot.x0 - 2 * inset) / max(1, len(labels) - 1)
+
+    def x(position):
+        return plot.x0 + inset + position * step
+
+    for low, high, fill in ((0, 4, OUTER_BAND_COLOR), (1, 3, INNER_BAND_COLOR)):
+        upper = [(x(i), plot.y(band[high])) for i, band in enumerate(bands)]
+        lower = [(x(i), plot.y(band[low])) for i, band in reversed(list(enumerate(bands)))]
+        plot.add(Polygon([coordinate for point in upper + lower for coordinate in point],
+                         fillColor=fill, strokeColor=None))
+    median = [coordinate for i, band in enumerate(bands) for coordinate in (x(i), plot.y(band[2]))]
+    plot.add(PolyLine(median, strokeColor=BAR_COLOR, strokeWidth=1.5))
+    for position, value, label in points:
+        plot.add(Circle(x(position), plot.y(value), 2.5, fillColor=MARKER_COLOR, strokeColor=colors.white,
+                        strokeWidth=0.5))
+        if label:
+            plot.add(String(x(position) - 4, plot.y(value) + 3, label, fontName=plot.font, fontSize=LABEL_SIZE - 1,
+                            fillColor=MARKER_COLOR, textAnchor='end'))
+    plot.category_labels(labels, [x(i) for i in range(len(labels))], step * 0.95)
+    return plot.drawing
+
+
+CHARTS = {
+    'bar': bar_chart,
+    'waterfall': waterfall_chart,
+    'fan': fan_chart,
+}
+
+
+def chart_key(kind, data, width, height, fonts=None):
+    """SHA-256 identifying a chart's finished drawing"""
+    fonts = sorted((fonts or {}).items())
+    return hashlib.sha256(repr((CHART_VERSION, kind, data, width, height, fonts)).encode('utf-8')).hexdigest()
+
+
+class DrawingCache:
+    """LRU of finished chart Drawings keyed by chart_key"""
+
+    def __init__(self, max_entries=MAX_DRAWINGS):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, build):
+        """Cached drawing for key, building and storing it with build() on a miss"""
+        drawing = self._entries.get(key)
+        if drawing is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return drawing
+        self.misses += 1
+        drawing = self._entries[key] = build()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return drawing
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_drawing_cache = DrawingCache()
+
+
+def drawing_cache():
+    """The process-wide DrawingCache"""
+    return _drawing_cache
+
+
+def chart_drawing(kind, data, width, height, cache=None, fonts=None):
+    """Drawing for a chart block; cache is a DrawingCache, None for the process-wide one or False
+
+    fonts maps standard font names to the fonts to draw with, as the output
+    profile sets them (report_profiles.profile_fonts); None draws in the
+    standard fonts.
+    """
+    if kind not in CHARTS:
+        raise ValueError(f"Unknown chart kind {kind!r}, expected one of {sorted(CHARTS)}")
+
+    def build():
+        return CHARTS[kind](width, height, *data, fonts=fonts)
+
+    if cache is False:
+        return build()
+    if cache is None:
+        cache = _drawing_cache
+    return cache.get(chart_key(kind, data, width, height, fonts), build)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Report Page Diff
+Page-by-page comparison of two builds of a PDF report
+
+Every page is reduced to three digests: one of its normalized content
+stream and link annotations, one of the text it shows and one of its links
+alone. Normalizing decodes the stream filters
+(ASCII85, Flate), replaces font resource names (/F1) with the fonts' base
+names and form XObject names with digests of the forms, and collapses
+whitespace, so builds that differ only in compression, output profile or
+resource numbering compare equal. Pages are aligned by content digest, so a
+page inserted early in a report shows up as one added page rather than as
+every later page changing. A changed page whose text digest is unchanged
+changed only in its links (rectangles, URIs, destinations) or in its
+graphics (rules, table backgrounds, charts). Links are compared by their
+rectangle, URI and destination, with destination pages given by page
+number rather than object number.
+
+PDFs with a classic cross-reference table, which is what reportlab writes,
+are read directly: the table locates each page and its streams without
+parsing the rest of the file. Each page also gets a key over its still
+encoded streams and resources; pages are aligned on those keys first, and
+only the runs that do not match are decoded and aligned again on their
+content digests. Comparing two builds of a thousand-page report that share
+most of their pages takes tens of milliseconds. Other PDFs
+(cross-reference streams, incremental updates) are read with pypdf.
+
+render_reports.py --skip-unchanged uses diff_pdfs to leave an existing
+report (and its modification time) alone when a rebuild produced the same
+pages. Like diff, the command exits with status 1 when the builds differ.
+
+Usage: python report_diff.py OLD.pdf NEW.pdf [--text] [--json]
+"""
+
+import argparse
+import base64
+import difflib
+import hashlib
+import io
+import json
+import re
+import time
+import zlib
+
+DIGEST_SIZE = 16
+
+_XREF_ENTRY = re.compile(rb'(\d{10}) (\d{5}) ([nf])')
+_REF = rb'(\d+) (\d+) R'
+_REF_LIST = re.compile(_REF)
+_NAMED_REF = re.compile(rb'/([^\s/<>\[\]]+)\s+' + _REF)
+_CONTENTS = re.compile(rb'/Contents\s+(?:' + _REF + rb'|\[([^\]]*)\])')
+_LENGTH = re.compile(rb'/Length\s+(' + _REF + rb'|\d+)')
+_FONT_USE = re.compile(rb'/([^\s/\[\]()<>{}%]+)(\s+[-\d.]+\s+Tf)')
+_XOBJECT_USE = re.compile(rb'/([^\s/\[\]()<>{}%]+)(\s+Do)')
+_WHITESPACE = re.compile(rb'\s+')
+_STRING = re.compile(rb'\((?:\\.|[^\\()])*\)')
+_STRING_ESCAPE = re.compile(rb'\\(.)', re.S)
+_ANNOTS = re.compile(rb'/Annots\s*(?:' + _REF + rb'|\[([^\]]*)\])')
+_RECT = re.compile(rb'/Rect\s*\[([^\]]*)\]')
+_URI = re.compile(rb'/URI\s*(' + _STRING.pattern + rb')')
+_DESTINATION = re.compile(rb'/D(?:est)?\s*(\[[^\]]*\]|/[^\s/\[\]<>()]+|' + _STRING.pattern + rb')')
+
+
+class UnsupportedPdf(ValueError):
+    """The PDF needs a full parser (cross-reference streams, incremental updates)"""
+
+
+class PageDigest:
+    """Content and text digests of one page"""
+
+    def __init__(self, content, text, strings, links):
+        self.content = content
+        self.text = text
+        self.strings = strings      # text shown on the page, one entry per string operand
+        self.links = links
+
+    def __eq__(self, other):
+        return isinstance(other, PageDigest) and self.content == other.content
+
+    def __hash__(self):
+        return hash(self.content)
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def _decode(data, filters):
+    for name in filters:
+        if name in ('ASCII85Decode', 'A85'):
+            data = base64.a85decode(data.strip().removesuffix(b'~>').removeprefix(b'<~'), ignorechars=b' \t\n\r\v')
+        elif name in ('FlateDecode', 'Fl'):
+            data = zlib.decompress(data)
+        else:
+            raise UnsupportedPdf(f"Unsupported stream filter /{name}")
+    return data
+
+
+def _strings(content):
+    return [_STRING_ESCAPE.sub(lambda m: m.group(1), literal[1:-1]).decode('latin-1')
+            for literal in _STRING.findall(content)]
+
+
+def _number(token):
+    try:
+        return b'%g' % float(token)
+    except ValueError:
+        return token
+
+
+def link_key(rect, uri, destination):
+    """Stable bytes for one link annotation
+
+    rect is its four coordinates, uri the target of a URI action (or None)
+    and destination the tokens of its destination, with the target page
+    already given as 'page N'.
+    """
+    return b'%s|%s|%s\n' % (b' '.join(b'%.2f' % float(value) for value in rect), uri or b'',
+                            b' '.join(_number(token) for token in destination))
+
+
+def digest_page(content, fonts, forms, links=b''):
+    """PageDigest of a decoded content stream and its link keys; fonts and forms map resource names to stable names"""
+    content = _FONT_USE.sub(lambda m: b'/' + fonts.get(m.group(1), m.group(1)) + m.group(2), content)
+    content = _XOBJECT_USE.sub(lambda m: b'/' + forms.get(m.group(1), m.group(1)) + m.group(2), content)
+    content = _WHITESPACE.sub(b' ', content).strip()
+    strings = _strings(content)
+    return PageDigest(_digest(content + b'\0' + links), _digest('\0'.join(strings).encode('utf-8')), strings,
+                      _digest(links))
+
+
+class Page:
+    """One page: a key over its encoded streams and resources, and its PageDigest computed on first use
+
+    Equal keys imply equal digests, so pages whose keys match across two
+    builds are never decoded.
+    """
+
+    def __init__(self, key, load):
+        self.key = key
+        self._load = load
+        self._digest = None
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = self._load()
+        return self._digest
+
+
+class _ClassicPdf:
+    """Just enough of a PDF reader to find the pages of a file with a classic xref table"""
+
+    def __init__(self, data):
+        self.data = data
+        start = data.rfind(b'startxref')
+        if start < 0:
+            raise UnsupportedPdf("No startxref")
+        offset = int(data[start + 9:data.index(b'%%EOF', start)].strip())
+        if not data.startswith(b'xref', offset):
+            raise UnsupportedPdf("Cross-reference stream")
+        self.offsets = {}
+        position = offset + 4
+        trailer = data.index(b'trailer', position)
+        lines = iter(data[position:trailer].split(b'\n'))
+        for line in lines:
+            header = line.split()
+            if len(header) != 2:
+                continue
+            first, count = int(header[0]), int(header[1])
+            for number in range(first, first + count):
+                match = _XREF_ENTRY.match(next(lines).strip())
+                if match and match.group(3) == b'n':
+                    self.offsets[number] = int(match.group(1))
+        self.trailer = data[trailer:start]
+        if b'/Prev' in self.trailer:
+            raise UnsupportedPdf("Incremental update")
+        self._objects = {}
+        self._fonts = {}
+        self._forms = {}
+        self._parsed = {}
+
+    def object(self, number):
+        """(dictionary bytes, encoded stream bytes or None) of an indirect object"""
+        cached = self._objects.get(number)
+        if cached is None:
+            start = self.data.index(b'obj', self.offsets[number]) + 3
+            # A stream may contain "endobj", but never before its own "stream" keyword
+            end = self.data.index(b'endobj', start)
+            stream = self.data.find(b'stream', start, end)
+            if 0 <= stream < end:
+                head = self.data[start:stream]
+                body = stream + 6 + (2 if self.data.startswith(b'\r\n', stream + 6) else 1)
+                length = _LENGTH.search(head).group(1)
+                length = int(self.object(int(length.split()[0]))[0]) if length.endswith(b'R') else int(length)
+                cached = (head, self.data[body:body + length])
+            else:
+                cached = (self.data[start:end].strip(), None)
+            self._objects[number] = cached
+        return cached
+
+    @staticmethod
+    def _value(head, key):
+        match = re.search(rb'/' + key + rb'\s+(' + _REF + rb'|/?[^\s/>\]]+)', head)
+        return match.group(1) if match else None
+
+    def _entry(self, head, key):
+        """Body of a dictionary value (inline or referenced), or b'' when absent"""
+        match = re.search(rb'/' + key + rb'\s+(?:' + _REF + rb'|<<)', head)
+        if match is None:
+            return b''
+        if match.group(1):
+            return self.object(int(match.group(1)))[0]
+        depth, position = 1, match.end()
+        while depth:
+            opening, closing = head.find(b'<<', position), head.find(b'>>', position)
+            if 0 <= opening < closing:
+                depth, position = depth + 1, opening + 2
+            else:
+                depth, position = depth - 1, closing + 2
+        return head[match.end():position - 2]
+
+    def _dictionary(self, head, key):
+        """Entries of a dictionary value as {name: object number}"""
+        return {name: int(number) for name, number, _ in _NAMED_REF.findall(self._entry(head, key))}
+
+    def _resources(self, head):
+        """(fonts, forms, key material) of a page's resources, parsed once per distinct dictionary"""
+        body = self._entry(head, b'Resources')
+        cached = self._parsed.get(body)
+        if cached is None:
+            fonts = {name: self._font_name(number) for name, number in self._dictionary(body, b'Font').items()}
+            forms = self._dictionary(body, b'XObject')
+            material = b''.join(b'/%s %s\0' % item for item in sorted(fonts.items()))
+            material += b''.join(b'/%s ' % name + self.object(number)[1] for name, number in sorted(forms.items()))
+            cached = self._parsed[body] = (fonts, forms, material)
+        return cached
+
+    def _page_dictionaries(self):
+        """(object number, dictionary bytes) of every page in document order"""
+        root = int(self._value(self.trailer, b'Root').split()[0])
+        pages_ref = self._value(self.object(root)[0], b'Pages')
+        pending, pages = [int(pages_ref.split()[0])], []
+        while pending:
+            number = pending.pop()
+            head, _ = self.object(number)
+            kids = re.search(rb'/Kids\s*\[([^\]]*)\]', head)
+            if kids:
+                pending.extend(reversed([int(number) for number, _ in _REF_LIST.findall(kids.group(1))]))
+            else:
+                pages.append((number, head))
+        return pages
+
+    def _links(self, head, page_numbers):
+        """link_key bytes of a page's link annotations"""
+        annots = _ANNOTS.search(head)
+        if annots is None:
+            return b''
+        refs = self.object(int(annots.group(1)))[0] if annots.group(1) else annots.group(3)
+        links = []
+        for number, _ in _REF_LIST.findall(refs):
+            annotation = self.object(int(number))[0]
+            rect = _RECT.search(annotation)
+            uri = _URI.search(annotation)
+            destination = _DESTINATION.search(annotation)
+            tokens = []
+            if destination and destination.group(1).startswith(b'('):
+                tokens = [_strings(destination.group(1))[0].encode('latin-1')]
+            elif destination:
+                tokens = _REF_LIST.sub(lambda m: b'page %d' % page_numbers.get(int(m.group(1)), 0),
+                                       destination.group(1).strip(b'[]')).split()
+            uri = _strings(uri.group(1))[0].encode('latin-1') if uri else None
+            links.append(link_key(rect.group(1).split() if rect else (), uri, tokens))
+        return b''.join(links)
+
+    def stream(self, number):
+        """Decoded stream of an indirect object"""
+        head, raw = self.object(number)
+        filters = re.search(rb'/Filter\s*(\[[^\]]*\]|/\w+)', head)
+        names = re.findall(rb'/(\w+)', filters.group(1)) if filters else []
+        return _decode(raw, [name.decode('ascii') for name in names])
+
+    def _font_name(self, number):
+        if number not in self._fonts:
+            self._fonts[number] = self._value(self.object(number)[0], b'BaseFont').lstrip(b'/')
+        return self._fonts[number]
+
+    def _form_name(self, number, fonts):
+        if number not in self._forms:
+            head, raw = self.object(number)
+            if re.search(rb'/Subtype\s*/Form', head):
+                self._forms[number] = b'Form.' + digest_page(self.stream(number), fonts, {}).content.encode('ascii')
+            else:
+                # Images are compared as encoded
+                self._forms[number] = b'Image.' + _digest(raw).encode('ascii')
+        return self._forms[number]
+
+    def _digest_page(self, numbers, fonts, forms, links):
+        forms = {name: self._form_name(number, fonts) for name, number in forms.items()}
+        return digest_page(b'\n'.join(self.stream(number) for number in numbers), fonts, forms, links)
+
+    def pages(self):
+        """Page per page in document order"""
+        pages = []
+        dictionaries = self._page_dictionaries()
+        page_numbers = {number: index for index, (number, _) in enumerate(dictionaries, 1)}
+        for _, head in dictionaries:
+            fonts, forms, material = self._resources(head)
+            links = self._links(head, page_numbers)
+            contents = _CONTENTS.search(head)
+            numbers = ([int(contents.group(1))] if contents and contents.group(1)
+                       else [int(number) for number, _ in _REF_LIST.findall(contents.group(3))] if contents else [])
+            key = hashlib.blake2b(material + b'\0' + links, digest_size=DIGEST_SIZE)
+            for number in numbers:
+                key.update(self.object(number)[1])
+                key.update(b'\0')
+            pages.append(Page(key.hexdigest(), lambda numbers=numbers, fonts=fonts, forms=forms, links=links:
+                              self._digest_page(numbers, fonts, forms, links)))
+        return pages
+
+
+def _pypdf_links(page, page_numbers):
+    """link_key bytes of a pypdf page's link annotations"""
+    links = []
+    for annotation in page.get('/Annots') or ():
+        annotation = annotation.get_object()
+        action = annotation.get('/A') or {}
+        uri = action.get('/URI')
+        destination = annotation.get('/Dest', action.get('/D'))
+        tokens = []
+        if isinstance(destination, list):
+            for item in destination:
+                reference = getattr(item, 'idnum', None)
+                tokens.append(b'page %d' % page_numbers.get(reference, 0) if reference is not None
+                              else str(item).encode('latin-1'))
+        elif destination is not None:
+            tokens = [str(destination).encode('latin-1')]
+        links.append(link_key(annotation.get('/Rect', ()), uri and str(uri).encode('latin-1'), tokens))
+    return b''.join(links)
+
+
+def _pypdf_pages(source):
+    from pypdf import PdfReader
+
+    pages = []
+    reader = PdfReader(source)
+    page_numbers = {page.indirect_reference.idnum: index for index, page in enumerate(reader.pages, 1)}
+    for page in reader.pages:
+        resources = page.get('/Resources') or {}
+        fonts = {name[1:].encode('latin-1'): str(font.get_object().get('/BaseFont', name)).lstrip('/').encode('latin-1')
+                 for name, font in (resources.get('/Font') or {}).items()}
+        forms = {}
+        for name, xobject in (resources.get('/XObject') or {}).items():
+            xobject = xobject.get_object()
+            if xobject.get('/Subtype') == '/Form':
+                forms[name[1:].encode('latin-1')] = (
+                    b'Form.' + digest_page(xobject.get_data(), fonts, {}).content.encode('ascii'))
+            else:
+                forms[name[1:].encode('latin-1')] = b'Image.' + _digest(xobject._data).encode('ascii')
+        contents = page.get_contents()
+        digest = digest_page(contents.get_data() if contents is not None else b'', fonts, forms,
+                             _pypdf_links(page, page_numbers))
+        pages.append(Page(digest.content, lambda digest=digest: digest))
+    return pages
+
+
+def read_pages(source):
+    """Page per page of a PDF given as a path or bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+    try:
+        return _ClassicPdf(data).pages()
+    except (UnsupportedPdf, KeyError, ValueError, AttributeError, TypeError):
+        return _pypdf_pages(io.BytesIO(data))
+
+
+def page_digests(source):
+    """PageDigest per page of a PDF given as a path or bytes"""
+    return [page.digest for page in read_pages(source)]
+
+
+class PageDiff:
+    """Aligned comparison of two builds given as lists of Page; page numbers are 1-based
+
+    Pages are aligned on their keys first; only the runs that do not match
+    are decoded and aligned again on their content digests.
+    """
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        self.unchanged = []     # (old page, new page)
+        self.changed = []       # (old page, new page, 'text', 'links' or 'graphics')
+        self.added = []         # new pages
+        self.removed = []       # old pages
+        keys = difflib.SequenceMatcher(None, [p.key for p in old], [p.key for p in new], autojunk=False)
+        for tag, i1, i2, j1, j2 in keys.get_opcodes():
+            if tag == 'equal':
+                self.unchanged.extend(zip(range(i1 + 1, i2 + 1), range(j1 + 1, j2 + 1)))
+                continue
+            digests = difflib.SequenceMatcher(None, [p.digest.content for p in old[i1:i2]],
+                                              [p.digest.content for p in new[j1:j2]], autojunk=False)
+            for tag, a1, a2, b1, b2 in digests.get_opcodes():
+                a1, a2, b1, b2 = a1 + i1, a2 + i1, b1 + j1, b2 + j1
+                if tag == 'equal':
+                    self.unchanged.extend(zip(range(a1 + 1, a2 + 1), range(b1 + 1, b2 + 1)))
+                    continue
+                paired = min(a2 - a1, b2 - b1)
+                for i, j in zip(range(a1, a1 + paired), range(b1, b1 + paired)):
+                    kind = ('text' if old[i].digest.text != new[j].digest.text
+                            else 'links' if old[i].digest.links != new[j].digest.links else 'graphics')
+                    self.changed.append((i + 1, j + 1, kind))
+                self.removed.extend(range(a1 + paired + 1, a2 + 1))
+                self.added.extend(range(b1 + paired + 1, b2 + 1))
+        self.unchanged.sort()
+
+    @property
+    def identical(self):
+        return not (self.changed or self.added or self.removed)
+
+    def text_changes(self, old_page, new_page, context=1):
+        """Unified diff of the strings shown on a changed page"""
+        return list(difflib.unified_diff(self.old[old_page - 1].digest.strings,
+                                         self.new[new_page - 1].digest.strings,
+                                         f"old page {old_page}", f"new page {new_page}", n=context, lineterm=''))
+
+    def as_dict(self):
+        return {
+            'old_pages': len(self.old), 'new_pages': len(self.new), 'identical': self.identical,
+            'changed': [{'old': i, 'new': j, 'kind': kind} for i, j, kind in self.changed],
+            'added': self.added, 'removed': self.removed, 'unchanged': len(self.unchanged),
+        }
+
+
+def diff_pdfs(old, new):
+    """PageDiff between two PDFs given as paths or bytes"""
+    return PageDiff(read_pages(old), read_pages(new))
+
+
+def same_pages(old, new):
+    """True when two PDFs show the same pages (compression, profile and resource numbering aside)"""
+    return diff_pdfs(old, new).identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two builds of a PDF report page by page")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--text', action='store_true', help='show the text changes on changed pages')
+    parser.add_argument('--json', action='store_true', help='print the comparison as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = diff_pdfs(args.old, args.new)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result.as_dict(), indent=2))
+    else:
+        for old_page, new_page, kind in result.changed:
+            print(f"changed  page {old_page} -> {new_page} ({kind})")
+            if args.text and kind == 'text':
+                for line in result.text_changes(old_page, new_page):
+                    print(f"    {line}")
+        for page in result.removed:
+            print(f"removed  page {page}")
+        for page in result.added:
+            print(f"added    page {page}")
+        print(f"{len(result.old)} -> {len(result.new)} pages: {len(result.changed)} changed, "
+              f"{len(result.added)} added, {len(result.removed)} removed, {len(result.unchanged)} unchanged "
+              f"in {elapsed * 1000:.1f} ms")
+    if not result.identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
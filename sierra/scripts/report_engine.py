@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Shared Report Rendering Engine
+Named paragraph styles and table themes for the Sierra report generators
+
+Styles and TableStyles are built once per process and kept in a registry,
+so repeated renders reuse them instead of rebuilding the sample stylesheet.
+
+render_story lays out a report_story.Story one section at a time. Each
+section is laid out on its own on a recording canvas that keeps the page
+content streams and link annotations; the final canvas replays them and
+draws the page chrome (headers, page numbers). Because every section's page count and heading
+pages are known before the final canvas is created, tables of contents and
+"Page X of Y" totals are filled in without laying the document out twice; only
+a section holding a table of contents is laid out again, and only when its
+own length changes. Recorded sections are kept in a content-addressed
+SectionCache, so a rebuild only lays out the sections whose blocks, styles or
+page geometry changed. Output is always written in reportlab's invariant mode,
+so equal inputs give byte-identical PDFs whether sections came from the cache
+or not.
+
+render_story writes to a file path, any binary stream, a socket or a raw
+file descriptor, so reports can go straight to a pipe or network peer without
+a temporary file; pdf_bytes renders into memory and returns bytes or a
+memoryview over the buffer.
+
+The default cache lives in memory for the life of the process; set
+SIERRA_REPORT_CACHE to a directory to also keep it on disk between runs.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from collections import OrderedDict, deque
+
+import reportlab
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Preformatted, Spacer, Table, TableStyle, Flowable
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.lib import colors
+
+from layout_profiler import active_profiler
+from report_charts import chart_drawing, drawing_cache
+from report_profiles import (resolve_profile, profile_creator, profile_fonts, profile_specs,
+                             profile_canvasmaker, profile_encoding, prepare_canvas)
+from report_story import Section
+
+# Bump when the recorded section format or the replay logic changes
+CACHE_VERSION = 4
+
+# Layouts of a table-of-contents section tried before giving up on stable page numbers
+MAX_TOC_PASSES = 4
+
+_base_stylesheet = None
+_paragraph_styles = {}
+_table_styles = {}
+
+
+def base_stylesheet():
+    """Return the reportlab sample stylesheet, created on first use"""
+    global _base_stylesheet
+    if _base_stylesheet is None:
+        _base_stylesheet = getSampleStyleSheet()
+    return _base_stylesheet
+
+
+def _color(value):
+    """reportlab colour for a colour name ('darkblue', '#1a73e8'); anything else as it is"""
+    return colors.toColor(value) if isinstance(value, str) else value
+
+
+# Table style commands -> position of their colour argument
+_COLOR_ARGUMENTS = {'BACKGROUND': 3, 'TEXTCOLOR': 3, 'ROWBACKGROUNDS': 3, 'COLBACKGROUNDS': 3,
+                    'GRID': 4, 'BOX': 4, 'OUTLINE': 4, 'INNERGRID': 4, 'LINEBELOW': 4, 'LINEABOVE': 4,
+                    'LINEBEFORE': 4, 'LINEAFTER': 4}
+
+
+def _table_command(command):
+    """command with its colour argument, or list of colours, resolved"""
+    position = _COLOR_ARGUMENTS.get(command[0])
+    if position is None or len(command) <= position:
+        return command
+    value = command[position]
+    value = [_color(item) for item in value] if isinstance(value, (list, tuple)) else _color(value)
+    return command[:position] + (value,) + tuple(command[position + 1:])
+
+
+def paragraph_styles(namespace, specs):
+    """Return the ParagraphStyles for a report, building them on first use
+
+    specs maps a short key to (style name, parent style name, attributes).
+    Styles are registered per namespace so two reports can use the same
+    style names with different attributes. Colour attributes may be given
+    by name.
+    """
+    styles = _paragraph_styles.get(namespace)
+    if styles is None:
+        sheet = base_stylesheet()
+        styles = {}
+        for key, (name, parent, attrs) in specs.items():
+            attrs = {attr: _color(value) if attr.endswith('Color') else value for attr, value in attrs.items()}
+            styles[key] = ParagraphStyle(name, parent=sheet[parent], **attrs)
+        _paragraph_styles[namespace] = styles
+    return styles
+
+
+def table_styles(namespace, specs):
+    """Return the TableStyles for a report, building them on first use
+
+    specs maps a theme name to a list of table style commands, whose colours
+    may be given by name (see report_story.banded_table).
+    """
+    themes = _table_styles.get(namespace)
+    if themes is None:
+        themes = {name: TableStyle([_table_command(command) for command in commands])
+                  for name, commands in specs.items()}
+        _table_styles[namespace] = themes
+    return themes
+
+
+def reset_registry():
+    """Drop every cached style and chart drawing so the next render rebuilds them (used by benchmarks)"""
+    global _base_stylesheet
+    _base_stylesheet = None
+    _paragraph_styles.clear()
+    _table_styles.clear()
+    drawing_cache().clear()
+
+
+class StreamingTable(Flowable):
+    """Table fed from a row iterator and laid out one frame-sized chunk at a time
+
+    Rows are read only as far as the current frame needs. Each row's height
+    comes from its line count and the theme's leading and padding, the rule
+    Table itself applies to plain-string cells, so no Table is built to
+    measure it. Every chunk is drawn as an ordinary Table with the header row
+    repeated, which keeps layout time and memory linear in the row count
+    rather than growing with rows x pages as a long Table does when it is
+    split again on every page.
+
+    Cells must be plain strings. Theme commands that address the last row
+    apply to the last row of each chunk. The flowable always reports more
+    height than the frame offers so the frame splits it into Tables; it
+    belongs directly in a story, not inside KeepTogether or a table cell.
+    """
+
+    hAlign = 'CENTER'
+
+    def __init__(self, header, rows, col_widths, style):
+        Flowable.__init__(self)
+        self.header = list(header)
+        self.rows = iter(rows)
+        self.col_widths = list(col_widths)
+        self.style = style
+        self.width = sum(self.col_widths)
+        self._buffer = deque()
+        self._buffered_height = 0.0
+        self._exhausted = False
+
+        blank = [''] * len(self.header)
+        probe = Table([self.header, blank, blank], colWidths=self.col_widths, style=style)
+        self._header_metrics, self._body_metrics = (
+            [(cell.leading or 1.2 * cell.fontsize, cell.topPadding + cell.bottomPadding)
+             for cell in probe._cellStyles[row]]
+            for row in (0, 1))
+        self._header_height = self._row_height(self.header, self._header_metrics)
+
+    @staticmethod
+    def _row_height(row, metrics):
+        return max(leading * (str(value).count('\n') + 1 if value is not None else 1) + padding
+                   for value, (leading, padding) in zip(row, metrics))
+
+    def _fill(self, height):
+        """Read rows until the buffer is taller than height or the iterator runs out"""
+        while not self._exhausted and self._buffered_height <= height:
+            try:
+                row = next(self.rows)
+            except StopIteration:
+                self._exhausted = True
+                break
+            row_height = self._row_height(row, self._body_metrics)
+            self._buffer.append((list(row), row_height))
+            self._buffered_height += row_height
+
+    def wrap(self, availWidth, availHeight):
+        # Always too tall, so the frame asks split() for a chunk that fits
+        return self.width, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        room = availHeight - self._header_height
+        self._fill(room)
+        taken, used = 0, 0.0
+        for _, row_height in self._buffer:
+            if used + row_height > room + 1e-6:
+                break
+            taken += 1
+            used += row_height
+        finished = self._exhausted and taken == len(self._buffer)
+        if not taken and not finished:
+            return []
+        rows = [self._buffer.popleft()[0] for _ in range(taken)]
+        self._buffered_height -= used
+        chunk = Table([self.header] + rows, colWidths=self.col_widths, style=self.style)
+        if finished:
+            return [chunk]
+        return [chunk, self._remainder()]
+
+    def _remainder(self):
+        rest = StreamingTable.__new__(StreamingTable)
+        rest.__dict__.update(self.__dict__)
+        rest.__dict__.pop('_postponed', None)
+        return rest
+
+    def draw(self):
+        raise RuntimeError("StreamingTable is always split into Tables before drawing")
+
+
+def build_flowables(blocks, styles, tables, fonts=None):
+    """Flowables for a sequence of report_story blocks; charts are drawn with fonts (see chart_drawing)"""
+    flowables = []
+    for block in blocks:
+        kind = block[0]
+        if kind == 'heading':
+            paragraph = Paragraph(block[2], styles[block[1]])
+            paragraph.story_heading = (block[3], block[2])
+            flowables.append(paragraph)
+        elif kind == 'paragraph':
+            flowables.append(Paragraph(block[2], styles[block[1]]))
+        elif kind == 'preformatted':
+            flowables.append(Preformatted(block[2], styles[block[1]]))
+        elif kind == 'spacer':
+            flowables.append(Spacer(block[1], block[2]))
+        elif kind == 'table':
+            _, theme, rows, col_widths = block
+            table = Table([list(row) for row in rows], colWidths=list(col_widths))
+            table.setStyle(tables[theme])
+            flowables.append(table)
+        elif kind == 'long_table':
+            _, theme, rows, col_widths = block
+            flowables.append(StreamingTable(rows[0], iter(rows[1:]), col_widths, tables[theme]))
+        elif kind == 'chart':
+            flowables.append(chart_drawing(*block[1:], fonts=fonts))
+        elif kind == 'toc':
+            raise ValueError("Table of contents blocks must be resolved by render_story first")
+        else:
+            raise ValueError(f"Unknown story block {kind!r}")
+    return flowables
+
+
+class _RecordingCanvas(Canvas):
+    """Canvas that keeps each page's content stream and links instead of writing a PDF
+
+    Link annotations and bookmarks live outside the content stream, so the
+    calls paragraphs make for <link> and <a name> markup are kept per page,
+    with rectangles in page space, to be made again on replay.
+    """
+
+    def __init__(self, *args, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        self.recorded_pages = []
+        self.recorded_links = []
+        self._page_links = []
+
+    def showPage(self):
+        self.recorded_pages.append(self._code)
+        self.recorded_links.append(self._page_links)
+        self._page_links = []
+        self._startPage()
+
+    def linkURL(self, url, rect, relative=0, thickness=0, color=None, dashArray=None, kind="URI", **kw):
+        self._page_links.append(['url', url, list(self._absRect(rect, relative)), kind])
+
+    def linkRect(self, contents, destinationname, Rect=None, addtopage=1, name=None, relative=1,
+                 thickness=0, color=None, dashArray=None, **kw):
+        self._page_links.append(['rect', destinationname, list(self._absRect(Rect, relative))])
+
+    def bookmarkPage(self, key, fit="Fit", left=None, top=None, bottom=None, right=None, zoom=None):
+        self._page_links.append(['bookmark', key, dict(fit=fit, left=left, top=top, bottom=bottom,
+                                                       right=right, zoom=zoom)])
+
+    def save(self):
+        pass
+
+
+def _replay_links(canv, links):
+    """Make the link annotations and bookmarks recorded for a page on the current page"""
+    for link in links:
+        if link[0] == 'url':
+            canv.linkURL(link[1], link[2], kind=link[3])
+        elif link[0] == 'rect':
+            canv.linkAbsolute("", link[1], link[2])
+        else:
+            canv.bookmarkPage(link[1], **link[2])
+
+
+_FONT_REF = re.compile(r'/F\d+(?= [\d.]+ Tf)')
+
+
+class _SectionDocTemplate(SimpleDocTemplate):
+    """Lays out a single section and notes the page each heading lands on"""
+
+    def afterFlowable(self, flowable):
+        heading = getattr(flowable, 'story_heading', None)
+        if heading is not None:
+            self.headings.append((self.page - 1,) + heading)
+
+
+def record_section(section, styles, tables, page_setup, fonts=None):
+    """Lay out one section on its own, with charts drawn in fonts
+
+    Returns its page streams, each page's links (when any page has one),
+    the fonts they use and (page offset, level, text) for every heading.
+    """
+    doc = _SectionDocTemplate(io.BytesIO(), invariant=1, **page_setup)
+    doc.headings = []
+    profiler = active_profiler()
+    if profiler is None:
+        flowables = build_flowables(section.blocks, styles, tables, fonts)
+    else:
+        flowables = profiler.build(build_flowables, section.blocks, styles, tables, fonts)
+    doc.build(flowables, canvasmaker=_RecordingCanvas)
+    pages = doc.canv.recorded_pages
+    used = {ref for page in pages for line in page for ref in _FONT_REF.findall(line)}
+    fonts = {ref: name for name, ref in doc.canv._doc.fontMapping.items() if ref in used}
+    record = {'pages': pages, 'fonts': fonts, 'headings': doc.headings}
+    if any(doc.canv.recorded_links):
+        record['links'] = doc.canv.recorded_links
+    return record
+
+
+class SectionCache:
+    """Content-addressed store of recorded sections, in memory and optionally on disk
+
+    Keeps the max_entries most recently used sections in memory; with a
+    directory every section is also written there as <key>.json.
+    """
+
+    def __init__(self, directory=None, max_entries=256):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        record = self._entries.get(key)
+        if record is not None:
+            self._entries.move_to_end(key)
+        elif self.directory:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                record = None
+            if record is not None:
+                self._remember(key, record)
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return record
+
+    def put(self, key, record):
+        self._remember(key, record)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(temp, self._path(key))
+
+    def _remember(self, key, record):
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_section_cache = None
+
+
+def section_cache():
+    """Process-wide SectionCache, persisted under $SIERRA_REPORT_CACHE when that is set"""
+    global _section_cache
+    if _section_cache is None:
+        _section_cache = SectionCache(os.environ.get('SIERRA_REPORT_CACHE') or None)
+    return _section_cache
+
+
+def _layout_context(namespace, style_specs, table_specs, page_setup):
+    """Hash of everything besides a section's own blocks that changes its layout"""
+    context = (CACHE_VERSION, reportlab.Version, namespace, style_specs, table_specs,
+               sorted(page_setup.items()))
+    return hashlib.sha256(repr(context).encode('utf-8')).hexdigest()
+
+
+_MARKUP = re.compile(r'<[^>]+>')
+
+
+def _resolve_toc(section, records, index):
+    """Copy of section, the index-th of the story, with its toc blocks turned into tables of heading pages
+
+    Page numbers come from the recorded sections; sections not laid out yet
+    count as one page with no headings.
+    """
+    starts, page = [], 1
+    for record in records:
+        starts.append(page)
+        page += len(record['pages']) if record else 1
+
+    resolved = Section(section.index)
+    seen = 0
+    for block in section.blocks:
+        if block[0] == 'heading':
+            seen += 1
+        if block[0] != 'toc':
+            resolved.blocks.append(block)
+            continue
+        _, theme, header, col_widths, max_level = block
+        rows = [header]
+        for position in range(index, len(records)):
+            headings = records[position]['headings'] if records[position] else []
+            if position == index:
+                headings = headings[seen:]
+            for offset, level, text in headings:
+                if level <= max_level:
+                    rows.append((_MARKUP.sub('', text), str(starts[position] + offset)))
+        resolved.blocks.append(('table', theme, tuple(rows), col_widths))
+    return resolved
+
+
+class _SocketOutput:
+    """Binary stream facade over a socket for reportlab's save"""
+
+    def __init__(self, sock):
+        self._sock = sock
+
+    def write(self, data):
+        self._sock.sendall(data)
+        return len(data)
+
+
+class _DescriptorOutput:
+    """Binary stream facade over a raw file descriptor such as a pipe"""
+
+    def __init__(self, fd):
+        self._fd = fd
+        self.name = fd
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        return len(data)
+
+
+def writable_output(output):
+    """Return something reportlab can save to from a path, stream, socket or file descriptor"""
+    if isinstance(output, (str, os.PathLike)):
+        return os.fspath(output)
+    if isinstance(output, int):
+        return _DescriptorOutput(output)
+    if callable(getattr(output, 'sendall', None)):
+        return _SocketOutput(output)
+    if callable(getattr(output, 'write', None)):
+        return output
+    raise TypeError(f"Cannot write a PDF to {output!r}")
+
+
+def pdf_bytes(render, *args, view=False, **kwargs):
+    """Call render(output, *args, **kwargs) on an in-memory buffer and return the PDF
+
+    The result is bytes, or with view=True a memoryview over the buffer that
+    avoids copying the document.
+    """
+    buffer = io.BytesIO()
+    render(buffer, *args, **kwargs)
+    return buffer.getbuffer() if view else buffer.getvalue()
+
+
+def render_story(story, output, namespace, style_specs, table_specs, page_setup,
+                 canvasmaker=Canvas, cache=None, timings=None, profile=None):
+    """Lay out and write a Story; returns [(section title, cache hit, pages)]
+
+    output is a file path, a binary stream, a socket or a file descriptor
+    (see writable_output). page_setup holds the SimpleDocTemplate geometry
+    (pagesize and margins). cache is a SectionCache, None for the
+    process-wide one or False to lay out every section afresh. canvasmaker
+    draws the page chrome as each page is shown, exactly as it would under
+    doc.build; its page_count attribute is set to the document's total before
+    the first page is drawn. When timings is a dict, the seconds spent laying
+    out sections ('layout') and replaying and writing the PDF ('write') are
+    stored in it. profile is a report_profiles output profile or its name
+    (default: 'standard'); it is named in the document info. Renders made while a layout_profiler.LayoutProfiler
+    is active report each section they lay out to it.
+
+    story.sections may be any iterable, such as a generator that parses a
+    source as it goes: each section is laid out as soon as it is produced and
+    only its recorded pages are kept, except for sections holding a table of
+    contents, which are laid out once every page number is known.
+    """
+    start = time.perf_counter()
+    profiler = active_profiler()
+    report = namespace
+    if cache is None:
+        cache = section_cache()
+    profile = resolve_profile(profile)
+    namespace, style_specs, table_specs = profile_specs(profile, namespace, style_specs, table_specs,
+                                                        base_stylesheet())
+    styles = paragraph_styles(namespace, style_specs)
+    tables = table_styles(namespace, table_specs)
+    fonts = profile_fonts(profile)
+    context = _layout_context(namespace, style_specs, table_specs, page_setup)
+
+    records = []
+    summary = []
+
+    def lay_out(position, section):
+        key = hashlib.sha256(f"{context}:{section.fingerprint()}".encode('ascii')).hexdigest()
+        record = cache.get(key) if cache else None
+        hit = record is not None
+        if record is None:
+            if profiler is None:
+                record = record_section(section, styles, tables, page_setup, fonts)
+            else:
+                with profiler.section(report, section) as entry:
+                    record = record_section(section, styles, tables, page_setup, fonts)
+                entry['pages'] = len(record['pages'])
+            if cache:
+                cache.put(key, record)
+        records[position] = record
+        summary[position] = (section.title, hit, len(record['pages']))
+
+    # Sections with a table of contents, by position; the others are only kept as records
+    dynamic = {}
+    for section in story.sections:
+        if not section.blocks:
+            continue
+        records.append(None)
+        summary.append(None)
+        if section.has_toc:
+            dynamic[len(records) - 1] = section
+        else:
+            lay_out(len(records) - 1, section)
+
+    # Tables of contents depend on page numbers, which depend on their own length
+    settled = {}
+    for _ in range(MAX_TOC_PASSES + 1):
+        resolved = {position: _resolve_toc(section, records, position)
+                    for position, section in dynamic.items()}
+        fingerprints = {position: section.fingerprint() for position, section in resolved.items()}
+        if fingerprints == settled:
+            break
+        for position, section in resolved.items():
+            lay_out(position, section)
+        settled = fingerprints
+    else:
+        raise RuntimeError("Table of contents page numbers did not settle")
+
+    laid_out = time.perf_counter()
+    with profile_encoding(profile), (profiler.stage(report, 'write') if profiler else contextlib.nullcontext()):
+        canv = profile_canvasmaker(profile, canvasmaker)(
+            writable_output(output), pagesize=page_setup['pagesize'], invariant=1,
+            pageCompression=int(profile.page_compression))
+        prepare_canvas(profile, canv)
+        canv.page_count = sum(len(record['pages']) for record in records)
+        canv.setCreator(profile_creator(profile))
+        if story.title:
+            canv.setTitle(story.title)
+        if story.author:
+            canv.setAuthor(story.author)
+        for record in records:
+            fonts = {ref: canv._doc.getInternalFontName(name) for ref, name in record['fonts'].items()}
+            renamed = any(ref != internal for ref, internal in fonts.items())
+            links = record.get('links') or [()] * len(record['pages'])
+            for page, page_links in zip(record['pages'], links):
+                if renamed:
+                    page = [_FONT_REF.sub(lambda m: fonts[m.group(0)], line) for line in page]
+                canv._code.extend(page)
+                _replay_links(canv, page_links)
+                canv.showPage()
+        canv.save()
+    if timings is not None:
+        timings.update(layout=laid_out - start, write=time.perf_counter() - laid_out)
+    return summary
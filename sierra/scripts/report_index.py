@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Report Full-Text Index
+Incremental, memory-mapped inverted index over every PDF report in the repository
+
+The index answers "which report mentions SiriusXM containment" from files
+on disk, without parsing a PDF at query time. It lives in one directory:
+
+  manifest.json        indexed PDFs (path, mtime, size, SHA-256, page range)
+  pages.bin, .npy      zlib-compressed text of every page, with offsets
+  terms.bin, .npy      sorted UTF-8 terms, with offsets
+  postings.npy         page ids per term, in term order
+  counts.npy           occurrences of the term on each of those pages
+  posting_offsets.npy  where each term's postings start
+
+Queries memory-map these files, find each term by binary search over the
+sorted terms, intersect the page lists and rank pages by term frequency
+weighted by inverse document frequency. Quoted phrases are checked against
+the stored page text, which also gives the snippets.
+
+Updating is incremental: PDFs whose mtime and size are unchanged are
+skipped, and a changed mtime with an unchanged SHA-256 only refreshes the
+manifest. Text is extracted (with pypdf, needed only for updates) just for
+new and changed PDFs; the inverted index is rebuilt from the stored page
+text, which takes milliseconds. Files are written to temporaries and moved
+into place, manifest last.
+
+Set SIERRA_REPORT_INDEX to keep the index somewhere other than
+.report-index at the repository root.
+
+Usage: python report_index.py --update
+       python report_index.py [--limit N] siriusxm containment
+       python report_index.py '"outcome-based pricing"' healthcare
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_INDEX_DIR = os.path.join(REPO_ROOT, '.report-index')
+
+# Bump when the file layout or tokenization changes; older indexes are rebuilt
+INDEX_VERSION = 1
+
+SNIPPET_CHARS = 160
+
+_TOKEN = re.compile(r"\w+")
+# A "quoted phrase" or a run of non-space characters; a stray quote or apostrophe stays in its word
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def index_dir():
+    """Index directory: $SIERRA_REPORT_INDEX, or .report-index at the repository root"""
+    return os.environ.get('SIERRA_REPORT_INDEX') or DEFAULT_INDEX_DIR
+
+
+def tokenize(text):
+    """Lower-case word terms of text, in order"""
+    return _TOKEN.findall(text.lower())
+
+
+def find_reports(root=REPO_ROOT):
+    """Repository-relative paths of every PDF under root, skipping hidden directories"""
+    paths = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.') and d != '__pycache__')
+        paths.extend(os.path.relpath(os.path.join(directory, name), root)
+                     for name in sorted(files) if name.lower().endswith('.pdf'))
+    return paths
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pages(path):
+    """Text of every page of a PDF"""
+    from pypdf import PdfReader
+
+    return [page.extract_text() or '' for page in PdfReader(path).pages]
+
+
+def _write_atomic(path, write):
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+def _save_array(path, array):
+    _write_atomic(path, lambda f: np.save(f, array))
+
+
+class _Blob:
+    """Byte strings stored back to back in a memory-mapped file, located by an offsets array"""
+
+    def __init__(self, directory, name):
+        self.offsets = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        with open(os.path.join(directory, f"{name}.bin"), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[int(self.offsets[i]):int(self.offsets[i + 1])]
+
+
+def _write_blob(directory, name, items):
+    offsets = np.zeros(len(items) + 1, dtype=np.uint64)
+    np.cumsum([len(item) for item in items], out=offsets[1:])
+    _write_atomic(os.path.join(directory, f"{name}.bin"), lambda f: f.write(b''.join(items)))
+    _save_array(os.path.join(directory, f"{name}.npy"), offsets)
+
+
+class IndexUpdate:
+    """What ReportIndex.update did"""
+
+    def __init__(self):
+        self.extracted = []     # new or changed PDFs whose text was extracted
+        self.touched = []       # PDFs with a new mtime but the same content
+        self.removed = []       # PDFs no longer in the repository
+        self.unchanged = 0
+        self.extract_seconds = 0.0
+        self.build_seconds = 0.0
+
+    @property
+    def changed(self):
+        return bool(self.extracted or self.touched or self.removed)
+
+
+class Hit:
+    """One matching page, with its score and a snippet around the first match"""
+
+    def __init__(self, path, page, score, snippet):
+        self.path = path
+        self.page = page            # 1-based page number within the PDF
+        self.score = score
+        self.snippet = snippet
+
+
+class ReportIndex:
+    """Memory-mapped full-text index over the repository's PDF reports"""
+
+    def __init__(self, directory=None, root=REPO_ROOT):
+        self.directory = directory or index_dir()
+        self.root = root
+        self.documents = []
+        self._open()
+
+    def _open(self):
+        self.documents = []
+        self.pages = self.terms = None
+        manifest_path = os.path.join(self.directory, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != INDEX_VERSION:
+            return
+        self.documents = manifest['documents']
+        self.pages = _Blob(self.directory, 'pages')
+        self.terms = _Blob(self.directory, 'terms')
+        self.postings = np.load(os.path.join(self.directory, 'postings.npy'), mmap_mode='r')
+        self.counts = np.load(os.path.join(self.directory, 'counts.npy'), mmap_mode='r')
+        self.posting_offsets = np.load(os.path.join(self.directory, 'posting_offsets.npy'), mmap_mode='r')
+        self.page_documents = np.load(os.path.join(self.directory, 'page_documents.npy'), mmap_mode='r')
+
+    @property
+    def page_count(self):
+        return len(self.pages) if self.pages is not None else 0
+
+    def page_text(self, page):
+        return zlib.decompress(self.pages[page]).decode('utf-8')
+
+    def stale(self):
+        """Repository-relative paths of PDFs added, changed or removed since the last update"""
+        indexed = {doc['path']: doc for doc in self.documents}
+        current = find_reports(self.root)
+        stale = [path for path in indexed if path not in current]
+        for path in current:
+            stat = os.stat(os.path.join(self.root, path))
+            doc = indexed.get(path)
+            if doc is None or doc['mtime_ns'] != stat.st_mtime_ns or doc['size'] != stat.st_size:
+                stale.append(path)
+        return stale
+
+    def update(self, force=False):
+        """Bring the index in line with the PDFs on disk; returns an IndexUpdate"""
+        result = IndexUpdate()
+        indexed = {} if force else {doc['path']: doc for doc in self.documents}
+        current = find_reports(self.root)
+        result.removed = [path for path in indexed if path not in current]
+        documents, texts = [], []
+        for path in current:
+            full = os.path.join(self.root, path)
+            stat = os.stat(full)
+            doc = indexed.get(path)
+            if doc is not None and doc['mtime_ns'] == stat.st_mtime_ns and doc['size'] == stat.st_size:
+                result.unchanged += 1
+            else:
+                sha256 = _sha256(full)
+                if doc is not None and doc['sha256'] == sha256:
+                    result.touched.append(path)
+                else:
+                    start = time.perf_counter()
+                    pages = [zlib.compress(text.encode('utf-8')) for text in extract_pages(full)]
+                    result.extract_seconds += time.perf_counter() - start
+                    result.extracted.append(path)
+                    doc = {'sha256': sha256, 'text': pages}
+                doc = dict(doc, path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            if 'text' in doc:
+                texts.append(doc.pop('text'))
+            else:
+                # Unchanged content: reuse the stored page text
+                texts.append([self.pages[page] for page in range(doc['first_page'], doc['first_page'] + doc['pages'])])
+            doc['pages'] = len(texts[-1])
+            documents.append(doc)
+
+        start = time.perf_counter()
+        if result.extracted or result.removed or force or self.pages is None:
+            self._write(documents, texts)
+        elif result.touched:
+            self._write_manifest(documents)
+            self.documents = documents
+        result.build_seconds = time.perf_counter() - start
+        return result
+
+    def _write(self, documents, texts):
+        os.makedirs(self.directory, exist_ok=True)
+        pages, page_documents = [], []
+        for number, (doc, doc_pages) in enumerate(zip(documents, texts)):
+            doc['first_page'] = len(pages)
+            pages.extend(doc_pages)
+            page_documents.extend([number] * len(doc_pages))
+
+        # term -> {page: count}, built from the stored page text
+        postings = {}
+        for page, compressed in enumerate(pages):
+            for term in tokenize(zlib.decompress(compressed).decode('utf-8')):
+                counts = postings.setdefault(term.encode('utf-8'), {})
+                counts[page] = counts.get(page, 0) + 1
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+        np.cumsum([len(postings[term]) for term in terms], out=offsets[1:])
+        page_ids = np.fromiter((page for term in terms for page in sorted(postings[term])), np.uint32, int(offsets[-1]))
+        counts = np.fromiter((postings[term][page] for term in terms for page in sorted(postings[term])),
+                             np.uint32, int(offsets[-1]))
+
+        # Drop the open maps before their files are replaced
+        self.pages = self.terms = None
+        _write_blob(self.directory, 'pages', pages)
+        _write_blob(self.directory, 'terms', terms)
+        _save_array(os.path.join(self.directory, 'postings.npy'), page_ids)
+        _save_array(os.path.join(self.directory, 'counts.npy'), counts)
+        _save_array(os.path.join(self.directory, 'posting_offsets.npy'), offsets)
+        _save_array(os.path.join(self.directory, 'page_documents.npy'), np.array(page_documents, dtype=np.uint32))
+        self._write_manifest(documents)
+        self._open()
+
+    def _write_manifest(self, documents):
+        manifest = {'version': INDEX_VERSION, 'documents': documents}
+        _write_atomic(os.path.join(self.directory, 'manifest.json'),
+                      lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8') + b'\n'))
+
+    def _term_index(self, term):
+        """Position of term in the sorted terms, or None"""
+        key = term.encode('utf-8')
+        low, high = 0, len(self.terms)
+        while low < high:
+            middle = (low + high) // 2
+            if self.terms[middle] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self.terms) and self.terms[low] == key else None
+
+    def _postings(self, term):
+        i = self._term_index(term)
+        if i is None:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+        start, end = int(self.posting_offsets[i]), int(self.posting_offsets[i + 1])
+        return self.postings[start:end], self.counts[start:end]
+
+    def search(self, query, limit=10):
+        """Hits for pages containing every term of query, best first
+
+        Words are matched as terms; "quoted phrases" must also appear on the
+        page as written (case and spacing aside).
+        """
+        if self.pages is None:
+            return []
+        parts = [phrase or word for phrase, word in _QUERY_PART.findall(query)]
+        phrases = [' '.join(tokenize(part)) for part in parts if len(tokenize(part)) > 1]
+        terms = list(dict.fromkeys(term for part in parts for term in tokenize(part)))
+        if not terms:
+            return []
+        pages, scores = None, None
+        for term in terms:
+            term_pages, term_counts = self._postings(term)
+            weight = math.log(1 + self.page_count / max(1, len(term_pages)))
+            if pages is None:
+                pages, scores = np.asarray(term_pages), term_counts * weight
+            else:
+                pages, here, there = np.intersect1d(pages, term_pages, assume_unique=True, return_indices=True)
+                scores = scores[here] + term_counts[there] * weight
+            if not len(pages):
+                return []
+
+        hits = []
+        for i in np.argsort(-scores, kind='stable'):
+            page = int(pages[i])
+            text = self.page_text(page)
+            normalized = ' '.join(tokenize(text))
+            if any(phrase not in normalized for phrase in phrases):
+                continue
+            doc = self.documents[int(self.page_documents[page])]
+            hits.append(Hit(doc['path'], page - doc['first_page'] + 1, float(scores[i]),
+                            _snippet(text, phrases[0] if phrases else terms[0])))
+            if len(hits) == limit:
+                break
+        return hits
+
+
+def _snippet(text, needle):
+    """Text around the first occurrence of needle (a term or space-separated phrase), on one line"""
+    words = needle.split()
+    pattern = r'\W+'.join(re.escape(word) for word in words)
+    match = re.search(rf'\b{pattern}\b', text, re.IGNORECASE)
+    flat = ' '.join(text.split())
+    if match is None:
+        return flat[:SNIPPET_CHARS]
+    position = len(' '.join(text[:match.start()].split()))
+    start = max(0, position - SNIPPET_CHARS // 2)
+    return ('...' if start else '') + flat[start:start + SNIPPET_CHARS] + (
+        '...' if start + SNIPPET_CHARS < len(flat) else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over the repository's PDF reports")
+    parser.add_argument('query', nargs='*', help='terms and "quoted phrases" that must all appear on a page')
+    parser.add_argument('--update', action='store_true', help='index new and changed PDFs first')
+    parser.add_argument('--rebuild', action='store_true', help='re-extract every PDF')
+    parser.add_argument('--index', help=f'index directory (default: $SIERRA_REPORT_INDEX or {DEFAULT_INDEX_DIR})')
+    parser.add_argument('--limit', type=int, default=10, help='pages to show')
+    args = parser.parse_args()
+
+    index = ReportIndex(args.index)
+    if args.update or args.rebuild or not args.query:
+        result = index.update(force=args.rebuild)
+        print(f"{len(result.extracted)} extracted ({result.extract_seconds:.2f}s), {len(result.touched)} touched, "
+              f"{len(result.removed)} removed, {result.unchanged} unchanged; index written in "
+              f"{result.build_seconds * 1000:.0f} ms")
+        for path in result.extracted:
+            print(f"  + {path}")
+        for path in result.removed:
+            print(f"  - {path}")
+        print(f"{len(index.documents)} PDFs, {index.page_count} pages, {len(index.terms or ())} terms in {index.directory}")
+        if not args.query:
+            return
+
+    stale = index.stale()
+    if stale:
+        print(f"Note: {len(stale)} PDF(s) changed since the last update; run with --update to include them")
+    start = time.perf_counter()
+    hits = index.search(' '.join(args.query), args.limit)
+    elapsed = time.perf_counter() - start
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.path}, page {hit.page}\n         {hit.snippet}")
+    print(f"{len(hits)} pages in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Report Output Profiles
+Named trade-offs between render time, file size and self-containment
+
+A profile controls how render_story writes the PDF:
+
+- standard: reportlab's defaults. Page streams are Flate compressed and then
+  ASCII85 encoded, and the base-14 fonts are referenced without embedding.
+  This is the output the reports have always had.
+- fast: no compression or encoding, for the quickest write (local previews).
+- small: Flate without ASCII85 and base-14 fonts by reference (email).
+- archive: Flate without ASCII85, with every standard font that reportlab
+  ships a Type 1 program for (the Helvetica, Times and Courier families, and
+  Symbol and ZapfDingbats for characters outside WinAnsi) embedded, so the
+  file renders the same without the viewer's fonts.
+
+render_story names the profile in the document info (/Creator), so a
+build can tell which profile wrote an existing file (pdf_profile) before
+treating it as up to date.
+
+The ASCII85 switch also covers inline and XObject images. Embedded fonts use
+reportlab's built-in metrics, so line breaks and page counts do not change
+between profiles. reportlab cannot subset Type 1 programs, so archive embeds
+whole fonts. TrueType subsets are numbered per document and could not be
+replayed from the section cache.
+
+Running this module measures the render-time vs. byte-size trade-off of
+every profile on both Sierra reports.
+
+Usage: python report_profiles.py [--runs N] [--profiles standard fast small archive]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import time
+from dataclasses import dataclass
+
+from reportlab import rl_config
+from reportlab.pdfbase import _fontdata, pdfdoc, pdfmetrics
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """How the final PDF is compressed, encoded and supplied with fonts"""
+    name: str
+    page_compression: bool
+    ascii85: bool
+    embed_fonts: bool
+    description: str
+
+
+PROFILES = {profile.name: profile for profile in (
+    OutputProfile('standard', True, True, False, 'Flate + ASCII85 streams, base-14 fonts by reference'),
+    OutputProfile('fast', False, False, False, 'uncompressed streams, base-14 fonts by reference'),
+    OutputProfile('small', True, False, False, 'Flate streams, base-14 fonts by reference'),
+    OutputProfile('archive', True, False, True, 'Flate streams, standard fonts embedded'),
+)}
+DEFAULT_PROFILE = 'standard'
+
+# Font descriptor values from Adobe's core font metrics: cap height, x-height, stem width
+_DESCRIPTOR_METRICS = {
+    'Helvetica': (718, 523, 88), 'Helvetica-Bold': (718, 532, 140),
+    'Helvetica-Oblique': (718, 523, 88), 'Helvetica-BoldOblique': (718, 532, 140),
+    'Times-Roman': (662, 450, 84), 'Times-Bold': (676, 461, 139),
+    'Times-Italic': (653, 441, 76), 'Times-BoldItalic': (669, 462, 121),
+    'Courier': (562, 426, 51), 'Courier-Bold': (562, 439, 106),
+    'Courier-Oblique': (562, 426, 51), 'Courier-BoldOblique': (562, 439, 106),
+    'Symbol': (1010, 0, 85), 'ZapfDingbats': (1000, 0, 90),
+}
+
+# Family -> (regular, bold, italic, bold italic) standard font names
+_FAMILIES = {
+    'Helvetica': ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique'),
+    'Times-Roman': ('Times-Roman', 'Times-Bold', 'Times-Italic', 'Times-BoldItalic'),
+    'Courier': ('Courier', 'Courier-Bold', 'Courier-Oblique', 'Courier-BoldOblique'),
+}
+
+# Document info /Creator of a report_engine PDF, naming its output profile
+_CREATOR = "report_engine, {} profile"
+_CREATOR_MARKER = re.compile(rb"/Creator \(report_engine, (\w+) profile\)")
+
+_embedded_fonts = None
+
+
+def resolve_profile(profile):
+    """OutputProfile for a profile name, an OutputProfile or None (the default)"""
+    if isinstance(profile, OutputProfile):
+        return profile
+    try:
+        return PROFILES[profile or DEFAULT_PROFILE]
+    except KeyError:
+        raise ValueError(f"Unknown output profile {profile!r}; expected one of {', '.join(PROFILES)}") from None
+
+
+def profile_creator(profile):
+    """/Creator document info entry for PDFs written under profile"""
+    return _CREATOR.format(profile.name)
+
+
+def pdf_profile(data):
+    """Name of the output profile a report_engine PDF (bytes) was written with; None when unmarked"""
+    match = _CREATOR_MARKER.search(data)
+    return match.group(1).decode('ascii') if match else None
+
+
+class _EmbeddedStandardFace(pdfmetrics.EmbeddedType1Face):
+    """Type 1 program shipped with reportlab, measured with a base-14 font's metrics"""
+
+    def __init__(self, standard_name, pfb_path):
+        pdfmetrics.TypeFace.__init__(self, None)
+        self.afmFileName = None
+        self.pfbFileName = os.path.abspath(pfb_path)
+        self.requiredEncoding = None
+        self._loadGlyphs(self.pfbFileName)
+        header = self._binaryData[:self._length1].decode('latin-1')
+        self.name = re.search(r"/FontName\s*/(\S+)", header).group(1)
+        self.familyName = self.name
+        self.bbox = [int(float(v)) for v in re.search(r"/FontBBox\s*[{\[]([^}\]]*)", header).group(1).split()]
+        self.italicAngle = float(re.search(r"/ItalicAngle\s+(\S+)", header).group(1))
+        self.ascent, self.descent = _fontdata.ascent_descent[standard_name]
+        self.capHeight, self.xHeight, self.stemV = _DESCRIPTOR_METRICS[standard_name]
+        self.glyphWidths = dict(_fontdata.widthsByFontGlyph[standard_name])
+        self.glyphNames = sorted(self.glyphWidths)
+
+    def getFontFiles(self):
+        return [self.pfbFileName]
+
+
+class _EmbeddedStandardFont(pdfmetrics.Font):
+    """Font whose program is embedded even when it carries a base-14 PostScript name"""
+
+    def addObjects(self, doc):
+        pdfmetrics.Font.addObjects(self, doc)
+        pdf_font = doc.idToObject['BasicFonts'].dict[doc.fontMapping[self.fontName][1:]]
+        # Font.addObjects only describes fonts whose names are not base-14 names
+        if getattr(pdf_font, 'FontDescriptor', None) is None:
+            pdf_font.FirstChar = 0
+            pdf_font.LastChar = 255
+            pdf_font.Widths = pdfdoc.PDFArray(self.widths)
+            pdf_font.FontDescriptor = self.face.addObjects(doc)
+
+
+def _embed(standard_name, encoding, substitution_fonts=None):
+    """Register the embedded twin of a standard font; returns its name, or None without a Type 1 program"""
+    try:
+        pfb_path = _fontdata.findT1File(standard_name)
+    except (KeyError, AssertionError):
+        pfb_path = None
+    if not pfb_path:
+        return None
+    face = _EmbeddedStandardFace(standard_name, pfb_path)
+    embedded_name = f"{standard_name}-Embedded"
+    # Some programs (Courier, Symbol) carry the base-14 name itself, so the face is
+    # filed under the embedded name; registerTypeFace would replace the built-in face
+    pdfmetrics._typefaces[embedded_name] = face
+    pdfmetrics.registerFont(_EmbeddedStandardFont(embedded_name, embedded_name, encoding, substitution_fonts))
+    return embedded_name
+
+
+def embedded_fonts():
+    """{standard font name: embedded font name}, registering the embedded fonts on first use"""
+    global _embedded_fonts
+    if _embedded_fonts is None:
+        fonts = {}
+        # Characters outside WinAnsi fall back to Symbol and ZapfDingbats, as with the base-14 fonts
+        for standard_name, encoding in (('Symbol', 'SymbolEncoding'), ('ZapfDingbats', 'ZapfDingbatsEncoding')):
+            embedded_name = _embed(standard_name, encoding)
+            if embedded_name:
+                fonts[standard_name] = embedded_name
+        substitutes = [pdfmetrics.getFont(fonts.get(name, name)) for name in ('Symbol', 'ZapfDingbats')]
+        for family, members in _FAMILIES.items():
+            for standard_name in members:
+                embedded_name = _embed(standard_name, 'WinAnsiEncoding', substitutes)
+                if embedded_name:
+                    fonts[standard_name] = embedded_name
+            if all(name in fonts for name in members):
+                pdfmetrics.registerFontFamily(fonts[family], *(fonts[name] for name in members))
+        # Characters no font has are drawn as a ZapfDingbats box; use the embedded one
+        for embedded_name in fonts.values():
+            pdfmetrics.getFont(embedded_name)._notdefFont = substitutes[-1]
+        _embedded_fonts = fonts
+    return _embedded_fonts
+
+
+def profile_fonts(profile):
+    """{standard font name: font to draw it with} under profile; {} when fonts are not embedded"""
+    return embedded_fonts() if profile.embed_fonts else {}
+
+
+def profile_specs(profile, namespace, style_specs, table_specs, base_styles):
+    """(namespace, paragraph style specs, table specs) to lay a report out with under profile
+
+    Only profiles that embed fonts change anything: every style and table
+    theme is pointed at the embedded fonts, under a namespace of its own.
+    base_styles is the sample stylesheet parent styles are looked up in.
+    """
+    if not profile.embed_fonts:
+        return namespace, style_specs, table_specs
+    fonts = embedded_fonts()
+    paragraph = {}
+    for key, (name, parent, attrs) in style_specs.items():
+        attrs = dict(attrs)
+        for attr in ('fontName', 'bulletFontName'):
+            font = attrs.get(attr) or getattr(base_styles[parent], attr)
+            attrs[attr] = fonts.get(font, font)
+        paragraph[key] = (name, parent, attrs)
+    base_font = fonts.get(rl_config.canvas_basefontname, rl_config.canvas_basefontname)
+    tables = {}
+    for theme, commands in table_specs.items():
+        tables[theme] = [('FONTNAME', (0, 0), (-1, -1), base_font)] + [
+            command[:3] + (fonts.get(command[3], command[3]),) + tuple(command[4:])
+            if command[0] in ('FONTNAME', 'FONT') else command
+            for command in commands]
+    return f"{namespace}+{profile.name}", paragraph, tables
+
+
+def profile_canvasmaker(profile, canvasmaker):
+    """canvasmaker, drawing its page chrome in the embedded fonts when profile embeds them"""
+    if not profile.embed_fonts:
+        return canvasmaker
+    fonts = embedded_fonts()
+
+    class EmbeddedFontCanvas(canvasmaker):
+        def __init__(self, *args, **kwargs):
+            # The page preamble selects the initial font on every page
+            kwargs.setdefault('initialFontName', fonts.get(rl_config.canvas_basefontname))
+            canvasmaker.__init__(self, *args, **kwargs)
+
+        def setFont(self, psfontname, size, leading=None):
+            canvasmaker.setFont(self, fonts.get(psfontname, psfontname), size, leading)
+
+    EmbeddedFontCanvas.__name__ = f"EmbeddedFont{canvasmaker.__name__}"
+    return EmbeddedFontCanvas
+
+
+@contextlib.contextmanager
+def profile_encoding(profile):
+    """Apply profile's ASCII85 setting for the canvas created and saved inside the block
+
+    reportlab reads the setting from rl_config while pages, forms and images
+    are created and written, so it is swapped in for the block and restored after.
+    """
+    saved = rl_config.useA85
+    rl_config.useA85 = int(profile.ascii85)
+    try:
+        yield
+    finally:
+        rl_config.useA85 = saved
+
+
+def prepare_canvas(profile, canv):
+    """Per-document settings a profile needs once its canvas exists"""
+    if profile.embed_fonts and profile.page_compression:
+        # Embedded font programs are stored raw unless the document has default filters
+        canv._doc.defaultStreamFilters = [pdfdoc.PDFZCompress]
+
+
+def measure_profiles(profiles, runs=5):
+    """[(report, profile, layout s, write s, total s, bytes)] for both Sierra reports"""
+    import sierra_analysis
+    import Sierra_AI_Forensic_Financial_Analysis_100M_ARR as forensic
+    from datetime import date
+
+    rows = []
+    for module in (sierra_analysis, forensic):
+        story = module.build_story(date=date(2025, 12, 5))
+        for name in profiles:
+            samples = []
+            for _ in range(runs + 1):
+                output = io.BytesIO()
+                timings = {}
+                start = time.perf_counter()
+                module.render_report(story, output, cache=False, timings=timings, profile=name)
+                samples.append((time.perf_counter() - start, timings['layout'], timings['write']))
+            # The first render pays for font registration and style setup
+            samples = sorted(samples[1:])
+            total, layout, write = samples[len(samples) // 2]
+            rows.append((module.REPORT_KEY, name, layout, write, total, len(output.getvalue())))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='renders per measurement')
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    rows = measure_profiles(args.profiles, args.runs)
+    baseline = {report: size for report, name, _, _, _, size in rows if name == DEFAULT_PROFILE}
+    print(f"{'Report':<10} {'Profile':<9} {'Layout (ms)':>12} {'Write (ms)':>11} {'Total (ms)':>11} "
+          f"{'Bytes':>10} {'vs ' + DEFAULT_PROFILE:>12}")
+    for report, name, layout, write, total, size in rows:
+        change = f"{(size - baseline[report]) / baseline[report] * 100:+.1f}%" if report in baseline else ''
+        print(f"{report:<10} {name:<9} {layout * 1000:>12.1f} {write * 1000:>11.1f} {total * 1000:>11.1f} "
+              f"{size:>10,} {change:>12}")
+    print()
+    for name in args.profiles:
+        print(f"{name:<9} {PROFILES[name].description}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Service
+Local asyncio HTTP service that renders the Sierra reports on demand
+
+GET /reports/<report>.pdf renders one variant of a report, chosen with the
+same options as batch_render (?pagesize=letter|a4&segment=all|<segment>
+&redaction=full|redacted). Rendering runs in a process pool whose workers
+import reportlab and build the shared styles once (batch_render.init_worker).
+Requests for a variant that is already being rendered wait for that render
+instead of starting another, and start their own if the request that began
+it is cancelled. Finished PDFs are kept in an LRU cache bounded by total
+bytes, keyed on the variant and the report date.
+
+GET /stats returns, per endpoint, the request count, cache hits, coalesced
+requests, renders, errors, p50/p99 latency over the recent requests and the
+current queue depth (renders submitted to the pool and not yet finished).
+
+Usage: python report_service.py [--host 127.0.0.1] [--port 8080] [--jobs N]
+       [--cache-mb 64]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from batch_render import ALL_SEGMENTS, PAGESIZES, REDACTIONS, REPORTS, init_worker, variant_options
+from report_story import report_date
+
+# Latency samples kept per endpoint for the percentiles
+LATENCY_WINDOW = 1024
+
+# Longest request head (request line and headers) accepted, in bytes
+MAX_HEAD_BYTES = 16 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+def render_pdf(variant, date):
+    """Render one (report, pagesize, segment, redaction) variant in a worker; returns bytes"""
+    module, options = variant_options(variant)
+    return module.pdf_bytes(date=date, **options)
+
+
+class ByteLRU:
+    """LRU mapping bounded by the total size of its bytes values"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        """Store data unless it alone exceeds the bound; evicts least recently used entries"""
+        if len(data) > self.max_bytes:
+            return
+        if key in self._entries:
+            self.size -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of samples, or None when there are none"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class EndpointStats:
+    """Counters, recent latencies and queue depth for one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.renders = 0
+        self.errors = 0
+        self.queue_depth = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self):
+        p50 = percentile(self.latencies, 0.50)
+        p99 = percentile(self.latencies, 0.99)
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'coalesced': self.coalesced,
+            'renders': self.renders,
+            'errors': self.errors,
+            'queue_depth': self.queue_depth,
+            'p50_ms': None if p50 is None else round(p50 * 1000, 3),
+            'p99_ms': None if p99 is None else round(p99 * 1000, 3),
+        }
+
+
+class RequestError(Exception):
+    """Request the service answers with an error status instead of a PDF"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReportService:
+    """Renders, coalesces and caches report variants for the HTTP front end"""
+
+    def __init__(self, jobs=None, cache_bytes=64 * 1024 * 1024):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = ByteLRU(cache_bytes)
+        self.stats = {f"/reports/{report}.pdf": EndpointStats() for report in sorted(REPORTS)}
+        self.stats['/stats'] = EndpointStats()
+        self._segments = {report: (ALL_SEGMENTS,) + tuple(importlib.import_module(module).SEGMENTS)
+                          for report, module in REPORTS.items()}
+        self._inflight = {}
+        self._pool = None
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker,
+                                         initargs=(sorted(REPORTS),))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def parse_variant(self, report, query):
+        """(report, pagesize, segment, redaction) from a query string, validated"""
+        options = {name: values[-1] for name, values in parse_qs(query).items()}
+        variant = (report, options.get('pagesize', 'letter'), options.get('segment', ALL_SEGMENTS),
+                   options.get('redaction', 'full'))
+        for name, value, allowed in (('pagesize', variant[1], PAGESIZES),
+                                     ('segment', variant[2], self._segments[report]),
+                                     ('redaction', variant[3], REDACTIONS)):
+            if value not in allowed:
+                raise RequestError(400, f"{name} must be one of {', '.join(allowed)}")
+        return variant
+
+    async def pdf(self, variant, stats):
+        """PDF bytes for a variant from the cache, an in-flight render or a new render"""
+        date = report_date()
+        key = (variant, date.isoformat())
+        data = self.cache.get(key)
+        if data is not None:
+            stats.cache_hits += 1
+            return data
+        future = self._inflight.get(key)
+        if future is not None:
+            stats.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The request that started the render was cancelled, not this one: render again
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.pdf(variant, stats)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        stats.renders += 1
+        stats.queue_depth += 1
+        try:
+            data = await loop.run_in_executor(self._pool, render_pdf, variant, date)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting for it
+            future.exception()
+            raise
+        else:
+            self.cache.put(key, data)
+            future.set_result(data)
+            return data
+        finally:
+            # Cancellation (the client went away) is not an Exception; waiters must not hang on it
+            if not future.done():
+                future.cancel()
+            stats.queue_depth -= 1
+            del self._inflight[key]
+
+    def snapshot(self):
+        return {
+            'endpoints': {path: stats.snapshot() for path, stats in self.stats.items()},
+            'cache': {'entries': len(self.cache), 'bytes': self.cache.size,
+                      'max_bytes': self.cache.max_bytes},
+            'jobs': self.jobs,
+        }
+
+    async def respond(self, method, target):
+        """(status, content type, body) for one request"""
+        url = urlsplit(target)
+        stats = self.stats.get(url.path)
+        if stats is None:
+            raise RequestError(404, f"No endpoint at {url.path}")
+        if method != 'GET':
+            raise RequestError(405, 'Only GET is supported')
+        start = time.perf_counter()
+        stats.requests += 1
+        try:
+            if url.path == '/stats':
+                body = json.dumps(self.snapshot(), indent=2, sort_keys=True).encode('utf-8') + b'\n'
+                return 200, 'application/json', body
+            report = url.path[len('/reports/'):-len('.pdf')]
+            return 200, 'application/pdf', await self.pdf(self.parse_variant(report, url.query), stats)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.latencies.append(time.perf_counter() - start)
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP/1.1 request per connection"""
+        try:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            try:
+                method, target, _ = head.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+            except ValueError:
+                status, content_type, body = 400, 'text/plain', b'Malformed request line\n'
+            else:
+                try:
+                    status, content_type, body = await self.respond(method, target)
+                except RequestError as exc:
+                    status, content_type, body = exc.status, 'text/plain', f"{exc}\n".encode('utf-8')
+                except Exception as exc:
+                    status, content_type = 500, 'text/plain'
+                    body = f"Render failed: {type(exc).__name__}: {exc}\n".encode('utf-8')
+            writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                         f"Content-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\n"
+                         "Connection: close\r\n\r\n".encode('latin-1'))
+            writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, jobs=None, cache_bytes=64 * 1024 * 1024):
+    """Run the service until cancelled"""
+    service = ReportService(jobs, cache_bytes)
+    service.start()
+    try:
+        server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEAD_BYTES)
+        async with server:
+            for sock in server.sockets:
+                print(f"Serving Sierra reports on http://{sock.getsockname()[0]}:{sock.getsockname()[1]}/")
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Sierra reports over local HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: core count)')
+    parser.add_argument('--cache-mb', type=float, default=64, help='PDF cache size in megabytes')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.jobs, int(args.cache_mb * 1024 * 1024)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
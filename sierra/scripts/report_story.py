@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Report Story Description
+Reportlab-free description of a report as page-aligned sections of blocks
+
+Generators describe their content as blocks (headings, paragraphs, spacers,
+tables, charts) instead of flowables. Blocks are grouped into sections that run from
+one hard page break to the next, so every section starts at the top of a fresh
+page and lays out the same way wherever it sits in the document. report_engine
+turns blocks into flowables and keys its section cache on each section's
+fingerprint.
+
+Page sizes, paragraph alignments and table themes (banded_table, with
+colours given by name) are described here too, so a generator module can be
+imported, and its story built and checked with validate_story, without
+importing reportlab at all; report_engine resolves the colour names when it
+builds the styles.
+"""
+
+import hashlib
+import os
+import re
+from datetime import date, datetime, timezone
+
+inch = 72.0  # points, same as reportlab.lib.units.inch
+
+# Same as reportlab.lib.pagesizes
+letter = (612.0, 792.0)
+A4 = (595.2755905511812, 841.8897637795277)
+
+# Paragraph alignments, same as reportlab.lib.enums
+TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY = 0, 1, 2, 4
+
+# Padding on each side of a SimpleDocTemplate frame, inside the page margins
+FRAME_PADDING = 6.0
+
+
+def report_date():
+    """Date printed on the reports: SOURCE_DATE_EPOCH when set, otherwise today"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).date()
+    return date.today()
+
+
+class Section:
+    """Blocks between two hard page breaks
+
+    Each block is a tuple whose first item is its kind:
+    ('heading', style key, text, level), ('paragraph', style key, text),
+    ('preformatted', style key, text), ('spacer', width, height),
+    ('table', theme, rows, column widths),
+    ('long_table', theme, rows, column widths),
+    ('chart', kind, data, width, height) or
+    ('toc', theme, header, column widths, max level).
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.blocks = []
+
+    @property
+    def title(self):
+        """Text of the first heading, used to name the section in reports and logs"""
+        for block in self.blocks:
+            if block[0] == 'heading':
+                return block[2]
+        return 'Title page' if self.index == 0 else f"Section {self.index + 1}"
+
+    @property
+    def has_toc(self):
+        return any(block[0] == 'toc' for block in self.blocks)
+
+    def fingerprint(self):
+        """SHA-256 of the blocks; sections with equal fingerprints lay out identically"""
+        return hashlib.sha256(repr(self.blocks).encode('utf-8')).hexdigest()
+
+
+def _frozen(value):
+    """value with every list turned into a tuple, so blocks stay hashable"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+class Story:
+    """Ordered sections of a report, built with one call per block"""
+
+    def __init__(self, title=None, author=None):
+        self.title = title
+        self.author = author
+        self.sections = [Section(0)]
+        # Set by redact_story
+        self.redacted = False
+
+    def _add(self, block):
+        self.sections[-1].blocks.append(block)
+
+    def heading(self, style, text, level=1):
+        self._add(('heading', style, text, level))
+
+    def paragraph(self, style, text):
+        self._add(('paragraph', style, text))
+
+    def preformatted(self, style, text):
+        """Text kept line for line, without markup, as in a code block"""
+        self._add(('preformatted', style, text))
+
+    def spacer(self, height, width=1):
+        self._add(('spacer', width, height))
+
+    def table(self, theme, rows, col_widths):
+        self._add(('table', theme, tuple(tuple(row) for row in rows), tuple(col_widths)))
+
+    def long_table(self, theme, rows, col_widths):
+        """Table laid out page by page with the header row repeated; rows[0] is the header"""
+        self._add(('long_table', theme, tuple(tuple(row) for row in rows), tuple(col_widths)))
+
+    def chart(self, kind, data, width, height):
+        """Chart drawn by report_charts from plain data (nested tuples of labels and numbers)"""
+        self._add(('chart', kind, _frozen(data), width, height))
+
+    def toc(self, theme, col_widths, header=('Section', 'Page'), max_level=1):
+        """Table of the headings that follow it; page numbers are filled in at render time"""
+        self._add(('toc', theme, tuple(header), tuple(col_widths), max_level))
+
+    def page_break(self):
+        """End the current section; the next block starts a new page"""
+        if self.sections[-1].blocks:
+            self.sections.append(Section(len(self.sections)))
+
+    def headings(self):
+        """(section index, level, text) for every heading in document order"""
+        return [(section.index, block[3], block[2])
+                for section in self.sections for block in section.blocks
+                if block[0] == 'heading']
+
+
+def banded_table(header_bg, header_size, body_size=None, body_bg=None,
+                 header_padding=None, align='LEFT', valign='TOP', extra=()):
+    """Commands for the standard coloured-header grid table used across the reports"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), header_bg),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ]
+    if body_size is None:
+        commands.append(('FONTSIZE', (0, 0), (-1, -1), header_size))
+    else:
+        commands.append(('FONTSIZE', (0, 0), (-1, 0), header_size))
+        commands.append(('FONTSIZE', (0, 1), (-1, -1), body_size))
+    if header_padding is not None:
+        commands.append(('BOTTOMPADDING', (0, 0), (-1, 0), header_padding))
+    if body_bg is not None:
+        commands.append(('BACKGROUND', (0, 1), (-1, -1), body_bg))
+    commands.append(('GRID', (0, 0), (-1, -1), 1, 'black'))
+    commands.append(('VALIGN', (0, 0), (-1, -1), valign))
+    commands.extend(extra)
+    return commands
+
+
+# Dollar amounts as the reports write them: "$7M", "~$26M", "$5 million", "$1.5B", "$50K-$200K", "$1-3M"
+_AMOUNT = r'\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:[MKB]|million|billion|thousand)\b)?'
+_DOLLAR_FIGURE = re.compile(rf'[~>]?{_AMOUNT}(?:\s?[-–]\s?(?:{_AMOUNT}|\d[\d,]*(?:\.\d+)?(?:\s?[MKB]\b)?))?')
+
+
+def dollar_figures(text):
+    """Every dollar figure in text"""
+    return _DOLLAR_FIGURE.findall(text)
+
+
+def redact_text(text, placeholder='[redacted]'):
+    """text with every dollar figure replaced by placeholder"""
+    return _DOLLAR_FIGURE.sub(placeholder, text)
+
+
+def redact_story(story, placeholder='[redacted]'):
+    """Mask every dollar figure in a Story in place and mark it redacted
+
+    The title, headings, paragraphs, preformatted text and every table cell,
+    header rows included, are masked. Charts are left out, since their axes
+    and labels carry the figures. story.redacted tells the page chrome to
+    mask its own text as well.
+    """
+    story.title = story.title and redact_text(story.title, placeholder)
+    for section in story.sections:
+        blocks = []
+        for block in section.blocks:
+            kind = block[0]
+            if kind in ('heading', 'paragraph', 'preformatted'):
+                block = block[:2] + (redact_text(block[2], placeholder),) + block[3:]
+            elif kind in ('table', 'long_table'):
+                rows = tuple(tuple(redact_text(cell, placeholder) for cell in row) for row in block[2])
+                block = block[:2] + (rows,) + block[3:]
+            elif kind == 'chart':
+                continue
+            blocks.append(block)
+        section.blocks = blocks
+    story.redacted = True
+    return story
+
+
+# Leading ordinal of a numbered heading: "a)", "IV.", "3." or "5.2"
+_ORDINAL = re.compile(r'^(?:(?P<letter>[a-z])\)|(?P<roman>[IVXLC]+)\.|(?P<number>\d+(?:\.\d+)*)\.?)\s')
+_ROMAN = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
+_TAG = re.compile(r'<(/?)([a-zA-Z]+)\b[^>]*?(/?)>')
+_EMPTY_TAGS = {'br', 'img', 'seqreset', 'seq'}
+_BLOCK_STYLES = {'heading', 'paragraph', 'preformatted'}
+_BLOCK_THEMES = {'table', 'long_table', 'toc'}
+_BLOCK_KINDS = _BLOCK_STYLES | _BLOCK_THEMES | {'spacer', 'chart'}
+
+
+def _ordinal(text):
+    """Numbering of a heading as a tuple of ints, or None when it is not numbered"""
+    match = _ORDINAL.match(text)
+    if match is None:
+        return None
+    if match.group('letter'):
+        return (ord(match.group('letter')) - ord('a') + 1,)
+    if match.group('roman'):
+        values = [_ROMAN[c] for c in match.group('roman')]
+        return (sum(-v if v < following else v for v, following in zip(values, values[1:] + [0])),)
+    return tuple(int(part) for part in match.group('number').split('.'))
+
+
+def _markup_problems(text):
+    """Unbalanced inline markup tags in a paragraph"""
+    problems, open_tags = [], []
+    for closing, tag, empty in _TAG.findall(text):
+        tag = tag.lower()
+        if empty or tag in _EMPTY_TAGS:
+            continue
+        if not closing:
+            open_tags.append(tag)
+        elif tag in open_tags:
+            while open_tags[-1] != tag:
+                problems.append(f"<{open_tags.pop()}> is not closed before </{tag}>")
+            open_tags.pop()
+        else:
+            problems.append(f"</{tag}> does not close an open tag")
+    problems.extend(f"<{tag}> is never closed" for tag in open_tags)
+    return problems
+
+
+def validate_story(story, style_specs, table_specs, page_setup):
+    """Structural problems that would break or garble a render of story; [] when there are none
+
+    Checks that every block is of a known kind and names a style or table
+    theme the report defines, that table rows have one cell per column,
+    that tables fit the page and spacers and charts the frame given by
+    page_setup (pagesize and margins, as passed to render_story), that
+    inline markup is balanced,
+    and that numbered headings ("a)", "IV.", "3.", "5.2") run in order under
+    their parent heading. Needs nothing but the story and the generator's
+    specs, so it runs without reportlab.
+    """
+    width, height = page_setup.get('pagesize', letter)
+    frame_width = width - page_setup.get('leftMargin', inch) - page_setup.get('rightMargin', inch) - 2 * FRAME_PADDING
+    frame_height = height - page_setup.get('topMargin', inch) - page_setup.get('bottomMargin', inch) - 2 * FRAME_PADDING
+    problems = []
+    # Numbering of the last heading seen per level; a heading clears the levels below it
+    numbering = {}
+
+    for section in story.sections:
+        for position, block in enumerate(section.blocks):
+            kind = block[0]
+
+            def problem(message):
+                problems.append(f"Section {section.index + 1} ({section.title}), block {position + 1} "
+                                f"({kind}): {message}")
+
+            if kind not in _BLOCK_KINDS:
+                problem("unknown block kind")
+                continue
+            if kind in _BLOCK_STYLES and block[1] not in style_specs:
+                problem(f"style {block[1]!r} is not in the report's STYLE_SPECS")
+            if kind in _BLOCK_THEMES and block[1] not in table_specs:
+                problem(f"table theme {block[1]!r} is not in the report's TABLE_SPECS")
+            if kind in ('heading', 'paragraph'):
+                for message in _markup_problems(block[2]):
+                    problem(message)
+
+            if kind == 'heading':
+                level, ordinal = block[3], _ordinal(block[2])
+                for deeper in [key for key in numbering if key > level]:
+                    del numbering[deeper]
+                if ordinal is None:
+                    continue
+                parent = numbering.get(level - 1)
+                previous = numbering.get(level)
+                if len(ordinal) > 1 and parent is not None and ordinal[:-1] != parent[-len(ordinal) + 1:]:
+                    problem(f"heading {block[2][:40]!r} is numbered outside its parent "
+                            f"{'.'.join(map(str, parent))}")
+                expected = 1 if previous is None else previous[-1] + 1
+                if ordinal[-1] != expected:
+                    problem(f"heading {block[2][:40]!r} is out of order: expected number {expected}")
+                numbering[level] = ordinal
+            elif kind in ('table', 'long_table'):
+                _, _, rows, col_widths = block
+                if not rows:
+                    problem("table has no rows")
+                for number, row in enumerate(rows):
+                    if len(row) != len(col_widths):
+                        problem(f"row {number + 1} has {len(row)} cells for {len(col_widths)} columns")
+                if kind == 'long_table' and any(not isinstance(cell, str) for row in rows for cell in row):
+                    problem("long table cells must be plain strings")
+                # Tables may spill into the margins, but not off the page
+                if sum(col_widths) > width + 0.5:
+                    problem(f"columns are {sum(col_widths):.0f}pt wide, the page {width:.0f}pt")
+            elif kind == 'toc':
+                _, _, header, col_widths, _ = block
+                if len(header) != len(col_widths):
+                    problem(f"header has {len(header)} cells for {len(col_widths)} columns")
+            elif kind == 'spacer' and block[2] > frame_height:
+                problem(f"spacer is {block[2]:.0f}pt tall, the frame {frame_height:.0f}pt")
+            elif kind == 'chart':
+                _, chart, _, chart_width, chart_height = block
+                if chart_width > frame_width + 0.5 or chart_height > frame_height:
+                    problem(f"{chart} chart is {chart_width:.0f}x{chart_height:.0f}pt, "
+                            f"the frame {frame_width:.0f}x{frame_height:.0f}pt")
+    return problems
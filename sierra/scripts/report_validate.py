@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Report Story Validator
+Checks every report generator's inputs and story structure without reportlab
+
+Each generator is run in a fresh interpreter that imports it, loads its
+data and builds its story, then checks the story with
+report_story.validate_story: known styles and table themes, one cell per
+column in every table row, numbered headings in order, balanced markup and
+charts that fit the page. Nothing is laid out or written, and reportlab is
+never imported: a generator that pulls it in at import or while building
+its story fails validation, since that is what keeps this mode fast.
+
+The cold-start budget is the wall time of the fresh interpreter, from
+process start until the story is checked. It is 0.5 s per report, enough
+for Python, numpy, the CSV tables and the story (about 0.25 s for either
+Sierra report on a laptop, against about 0.5 s to render one); the Gemini
+scenario and token cost reports get more because building their stories
+runs a Monte Carlo model and a request simulation. A report over its budget
+fails; --budget-scale stretches every budget on slower machines.
+
+Usage: python report_validate.py [--only analysis forensic] [--budget-scale F]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from report_story import letter, validate_story
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds from interpreter start to a validated story
+DEFAULT_BUDGET = 0.5
+COLD_START_BUDGETS = {
+    'gemini': 1.0,
+    'tokens': 2.5,
+}
+
+
+def validate_generator(path):
+    """Import a generator, build and check its story in this process; returns its result entry"""
+    sys.path.insert(0, os.path.dirname(path))
+    module = importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+    if hasattr(module, 'validate'):
+        problems = module.validate()
+    else:
+        problems = validate_story(module.build_story(), module.STYLE_SPECS, module.TABLE_SPECS,
+                                  dict(pagesize=letter, **module.PAGE_MARGINS))
+    return {'problems': problems, 'reportlab': 'reportlab' in sys.modules}
+
+
+def run_validation(key, path, budget):
+    """Validate one generator in a fresh interpreter and time its cold start"""
+    entry = {'report': key, 'module': os.path.relpath(path, REPO_ROOT), 'budget_seconds': budget}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', path],
+                            capture_output=True, text=True)
+    entry['seconds'] = time.perf_counter() - start
+    if result.returncode:
+        error = result.stderr.strip().splitlines()
+        entry.update(status='error', error=error[-1] if error else f"exit status {result.returncode}")
+        return entry
+    entry.update(json.loads(result.stdout))
+    failures = list(entry['problems'])
+    if entry['reportlab']:
+        failures.append("reportlab was imported")
+    if entry['seconds'] > budget:
+        failures.append(f"cold start {entry['seconds']:.2f}s is over its {budget:.2f}s budget")
+    entry.update(status='ok' if not failures else 'failed', failures=failures)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the report stories without rendering them")
+    parser.add_argument('--only', nargs='+', help='reports to validate (default: all)')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='multiply every cold-start budget, e.g. 2 on a slow CI runner')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(validate_generator(args.worker)))
+        return
+
+    # Discovery is only needed here, not in the workers whose start-up is timed
+    from render_reports import discover_generators
+
+    generators = discover_generators()
+    unknown = sorted(set(args.only or ()) - set(generators))
+    if unknown:
+        parser.error(f"unknown reports: {', '.join(unknown)} (choose from {', '.join(sorted(generators))})")
+    entries = [run_validation(key, generators[key],
+                              COLD_START_BUDGETS.get(key, DEFAULT_BUDGET) * args.budget_scale)
+               for key in args.only or sorted(generators)]
+
+    print(f"{'Report':<10} {'Cold start':>11} {'Budget':>8}  Result")
+    for entry in entries:
+        timing = f"{entry['seconds'] * 1000:>9.1f}ms {entry['budget_seconds'] * 1000:>6.0f}ms"
+        if entry['status'] == 'error':
+            print(f"{entry['report']:<10} {timing}  error: {entry['error']}")
+            continue
+        print(f"{entry['report']:<10} {timing}  {'ok' if entry['status'] == 'ok' else 'FAILED'}")
+        for failure in entry['failures']:
+            print(f"  {failure}")
+
+    failed = [entry['report'] for entry in entries if entry['status'] != 'ok']
+    if failed:
+        sys.exit(f"Failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,166 +2,182 @@
 """
 Sierra $100M ARR Analysis Report Generator
 Creates a professionally formatted PDF from the comprehensive analysis
+
+reportlab is only imported to render: "--validate" builds the story and
+checks it (report_story.validate_story) without it.
+
+Usage: python sierra_analysis.py [output.pdf | - | --validate]
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle,
-    KeepTogether, NextPageTemplate, PageTemplate
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
-from reportlab.pdfgen.canvas import Canvas
-from datetime import datetime
-import os
-
-class HeaderCanvas(Canvas):
-    def __init__(self, *args, **kwargs):
-        Canvas.__init__(self, *args, **kwargs)
-
-    def showPage(self):
-        self._draw_header()
-        Canvas.showPage(self)
-
-    def _draw_header(self):
-        # Page header
-        self.setFont('Helvetica-Bold', 10)
-        self.setFillColor(colors.grey)
-        self.drawString(0.5 * inch, letter[1] - 0.5 * inch,
-                       "Sierra $100M ARR Analysis - Forensic Reconstruction")
-
-        # Page number
-        page_num = f"Page {self._pageNumber}"
-        self.drawRightString(letter[0] - 0.5 * inch, letter[1] - 0.5 * inch, page_num)
-
-        # Line under header
-        self.setStrokeColor(colors.grey)
-        self.setLineWidth(0.5)
-        self.line(0.5 * inch, letter[1] - 0.6 * inch,
-                 letter[0] - 0.5 * inch, letter[1] - 0.6 * inch)
-
-def create_sierra_analysis_pdf():
-    """Create the complete Sierra analysis PDF with perfect formatting"""
-
-    filename = "/Users/rohitkelapure/projects/sierra/Sierra_100M_ARR_Analysis.pdf"
-
-    # Create document with custom canvas for headers
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=letter,
-        rightMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        topMargin=1*inch,
-        bottomMargin=0.75*inch,
-        canvasmaker=HeaderCanvas
-    )
-
-    # Get styles and create custom styles
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue,
-        fontName='Helvetica-Bold'
-    )
-
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        textColor=colors.grey,
-        fontName='Helvetica-Oblique'
-    )
-
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=20,
-        spaceBefore=20,
-        textColor=colors.darkblue,
-        fontName='Helvetica-Bold',
-        borderWidth=1,
-        borderColor=colors.lightgrey,
-        borderPadding=5
-    )
-
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=15,
-        spaceBefore=15,
-        textColor=colors.darkgreen,
-        fontName='Helvetica-Bold'
-    )
-
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        spaceAfter=10,
-        spaceBefore=10,
-        textColor=colors.darkred,
-        fontName='Helvetica-Bold'
-    )
-
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=10,
-        alignment=TA_JUSTIFY,
-        fontName='Helvetica'
-    )
-
-    bullet_style = ParagraphStyle(
-        'CustomBullet',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=8,
-        leftIndent=20,
-        bulletIndent=10,
-        fontName='Helvetica'
-    )
+import sys
+
+from report_story import (Story, report_date, inch, letter, TA_CENTER, TA_JUSTIFY, banded_table, redact_story,
+                          redact_text, validate_story)
+from sierra_data import load_dataset
+from pricing_solver import scenario_table_rows
+from arr_timeline import fan_chart_data
+
+# Short name used by the report tools and as the style registry namespace
+REPORT_KEY = 'analysis'
+
+OUTPUT_PATH = "/Users/rohitkelapure/projects/sierra/Sierra_100M_ARR_Analysis.pdf"
+
+# Paragraph styles: key -> (style name, parent, attributes)
+STYLE_SPECS = {
+    'title': ('CustomTitle', 'Title', dict(
+        fontSize=24, spaceAfter=30, alignment=TA_CENTER,
+        textColor='darkblue', fontName='Helvetica-Bold')),
+    'subtitle': ('CustomSubtitle', 'Heading2', dict(
+        fontSize=14, spaceAfter=20, alignment=TA_CENTER,
+        textColor='grey', fontName='Helvetica-Oblique')),
+    'h1': ('CustomH1', 'Heading1', dict(
+        fontSize=16, spaceAfter=20, spaceBefore=20, textColor='darkblue',
+        fontName='Helvetica-Bold', borderWidth=1, borderColor='lightgrey',
+        borderPadding=5)),
+    'h2': ('CustomH2', 'Heading2', dict(
+        fontSize=14, spaceAfter=15, spaceBefore=15, textColor='darkgreen',
+        fontName='Helvetica-Bold')),
+    'h3': ('CustomH3', 'Heading3', dict(
+        fontSize=12, spaceAfter=10, spaceBefore=10, textColor='darkred',
+        fontName='Helvetica-Bold')),
+    'body': ('CustomBody', 'Normal', dict(
+        fontSize=10, spaceAfter=10, alignment=TA_JUSTIFY, fontName='Helvetica')),
+    'bullet': ('CustomBullet', 'Normal', dict(
+        fontSize=10, spaceAfter=8, leftIndent=20, bulletIndent=10,
+        fontName='Helvetica')),
+    'author': ('Author', 'Normal', dict(
+        fontSize=12, alignment=TA_CENTER, spaceAfter=10)),
+}
+
+# Table themes: name -> TableStyle commands
+TABLE_SPECS = {
+    'timeline': banded_table('lightblue', 9, 8, body_bg='beige', header_padding=12),
+    'mechanics': banded_table('lightgreen', 9, 8, body_bg='white', header_padding=12),
+    'fintech': banded_table('darkblue', 8, 7, body_bg='lightblue', header_padding=8),
+    'retail': banded_table('darkgreen', 8, 7, body_bg='lightgreen', header_padding=8),
+    'media': banded_table('purple', 8, 7, body_bg='lavender', header_padding=8),
+    'security': banded_table('darkred', 8, 7, body_bg='mistyrose', header_padding=8),
+    'churn': banded_table('orange', 9, 8, body_bg='wheat', header_padding=12),
+    'scenario': banded_table('darkblue', 8, 8, body_bg='whitesmoke', header_padding=8),
+}
+
+HEADER_TEXT = "Sierra $100M ARR Analysis - Forensic Reconstruction"
+
+_header_canvas = None
+
+def header_canvas(redacted=False):
+    """Return the HeaderCanvas class (the page chrome), created on first use
+
+    With redacted, a subclass whose header text has its dollar figures masked.
+    """
+    global _header_canvas
+    if _header_canvas is None:
+        from reportlab.lib import colors
+        from reportlab.pdfgen.canvas import Canvas
+
+        class HeaderCanvas(Canvas):
+            # Draw the static header chrome once as a form XObject and reference it on every page
+            header_form = True
+            header_text = HEADER_TEXT
+
+            def __init__(self, *args, **kwargs):
+                Canvas.__init__(self, *args, **kwargs)
+                # Total pages, set by report_engine.render_story before the first page is shown
+                self.page_count = None
+
+            def showPage(self):
+                self._draw_header()
+                Canvas.showPage(self)
+
+            def _draw_header(self):
+                width, height = self._pagesize
+
+                if self.header_form:
+                    name = f"Header{width:g}x{height:g}"
+                    if not self.hasForm(name):
+                        self.beginForm(name)
+                        self._draw_header_chrome(width, height)
+                        self.endForm()
+                    self.doForm(name)
+                else:
+                    self._draw_header_chrome(width, height)
+
+                # Page number
+                self.setFont('Helvetica-Bold', 10)
+                self.setFillColor(colors.grey)
+                page_num = f"Page {self._pageNumber}"
+                if self.page_count:
+                    page_num += f" of {self.page_count}"
+                self.drawRightString(width - 0.5 * inch, height - 0.5 * inch, page_num)
+
+            def _draw_header_chrome(self, width, height):
+                """Header text and rule, the parts that are the same on every page"""
+                # Page header
+                self.setFont('Helvetica-Bold', 10)
+                self.setFillColor(colors.grey)
+                self.drawString(0.5 * inch, height - 0.5 * inch, self.header_text)
+
+                # Line under header
+                self.setStrokeColor(colors.grey)
+                self.setLineWidth(0.5)
+                self.line(0.5 * inch, height - 0.6 * inch,
+                         width - 0.5 * inch, height - 0.6 * inch)
+
+        class RedactedHeaderCanvas(HeaderCanvas):
+            header_text = redact_text(HEADER_TEXT)
+
+        _header_canvas = HeaderCanvas, RedactedHeaderCanvas
+    return _header_canvas[1 if redacted else 0]
+
+# Segment cuts: the customer tables in section b) 3 that each segment keeps
+SEGMENTS = ('fintech', 'retail', 'media', 'security')
+
+# Page geometry shared by the layout pass and the final canvas
+PAGE_MARGINS = dict(rightMargin=0.5*inch, leftMargin=0.5*inch, topMargin=1*inch, bottomMargin=0.75*inch)
+
+def build_story(segment=None, redacted=False, date=None, dataset=None):
+    """Describe the analysis report as a Story of page-aligned sections
+
+    segment keeps only one of the SEGMENTS customer tables, redacted masks
+    every dollar figure (report_story.redact_story) and leaves out the charts,
+    and date is printed on the title page (default: report_story.report_date()).
+    dataset defaults to sierra_data.load_dataset().
+    """
+    if segment is not None and segment not in SEGMENTS:
+        raise ValueError(f"Unknown segment {segment!r}, expected one of {list(SEGMENTS)}")
+
+    def include(table_segment):
+        return segment is None or segment == table_segment
+
+    def case_study_rows(table_segment, metrics_header):
+        rows = [['Customer', 'Use case summary', metrics_header, '$ subscription amount', 'Evidence']]
+        for study in data.case_studies_for(table_segment):
+            rows.append([study.customer, study.use_case, study.metrics, study.subscription, study.evidence])
+        return rows
+
+    data = dataset or load_dataset()
+    date = date or report_date()
 
     # Build story content
-    story = []
+    story = Story(title="Sierra $100M ARR Analysis", author="Rohit Kelapure")
 
     # Title page
-    story.append(Spacer(1, 1*inch))
-    story.append(Paragraph("Sierra AI", title_style))
-    story.append(Paragraph("$100M ARR Forensic Analysis", subtitle_style))
-    story.append(Spacer(1, 0.5*inch))
-    story.append(Paragraph("Comprehensive Revenue Reconstruction", subtitle_style))
-    story.append(Spacer(1, 1*inch))
+    story.spacer(1*inch)
+    story.paragraph('title', "Sierra AI")
+    story.paragraph('subtitle', "$100M ARR Forensic Analysis")
+    story.spacer(0.5*inch)
+    story.paragraph('subtitle', "Comprehensive Revenue Reconstruction")
+    story.spacer(1*inch)
 
     # Author and date
-    author_style = ParagraphStyle(
-        'Author',
-        parent=styles['Normal'],
-        fontSize=12,
-        alignment=TA_CENTER,
-        spaceAfter=10
-    )
-
-    story.append(Paragraph(f"Prepared by: Rohit Kelapure", author_style))
-    story.append(Paragraph(f"Date: {datetime.now().strftime('%B %d, %Y')}", author_style))
-    story.append(PageBreak())
+    story.paragraph('author', f"Prepared by: Rohit Kelapure")
+    story.paragraph('author', f"Date: {date.strftime('%B %d, %Y')}")
+    story.page_break()
 
     # Executive Summary
-    story.append(Paragraph("a) Executive Summary", h1_style))
+    story.heading('h1', "a) Executive Summary", 1)
 
-    story.append(Paragraph("1. What can and cannot be known", h2_style))
+    story.heading('h2', "1. What can and cannot be known", 2)
 
     bullet_points_1 = [
         "Public sources confirm that Sierra crossed roughly <b>$100M in ARR in November 2025</b>, 21 months / 7 quarters after launch in February 2024.",
@@ -170,10 +186,10 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in bullet_points_1:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Spacer(1, 0.2*inch))
-    story.append(Paragraph("<b>Critically:</b>", body_style))
+    story.spacer(0.2*inch)
+    story.paragraph('body', "<b>Critically:</b>")
 
     critical_points = [
         "<b>No public source discloses contract‑by‑contract subscription amounts, customer‑level ARR, or specific churned logos.</b>",
@@ -181,10 +197,10 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in critical_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
     # Revenue model section
-    story.append(Paragraph("2. Revenue model and ARR drivers", h2_style))
+    story.heading('h2', "2. Revenue model and ARR drivers", 2)
 
     revenue_points = [
         "Sierra's revenue comes primarily from <b>usage‑ and outcome‑based contracts</b>: customers pay <b>per conversation or per successful resolution / outcome</b>, often bundled with implementation and optimization in <b>multi‑year enterprise agreements</b>.",
@@ -195,12 +211,12 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in revenue_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
     # Key customers section
-    story.append(Paragraph("3. Key customers and use cases (high level)", h2_style))
+    story.heading('h2', "3. Key customers and use cases (high level)", 2)
 
-    story.append(Paragraph("Across public materials, a consistent cohort of <b>large, brand‑name customers</b> show up in multiple independent sources (Sierra's own content plus press/analyst/partner posts). Their agents collectively form the most credible basis for the $100M ARR:", body_style))
+    story.paragraph('body', "Across public materials, a consistent cohort of <b>large, brand‑name customers</b> show up in multiple independent sources (Sierra's own content plus press/analyst/partner posts). Their agents collectively form the most credible basis for the $100M ARR:")
 
     customer_segments = [
         "<b>Financial services / fintech</b> – SoFi, Ramp, Brex, Chime, Marshmallow, Rocket Mortgage, Cigna, plus other unnamed banks and insurers. Agents handle card replacement, account servicing, authentication, disputes, policy changes, cancellations/retention, and mortgage origination.",
@@ -209,11 +225,11 @@ def create_sierra_analysis_pdf():
         "<b>Security / identity / infrastructure</b> – ADT, CLEAR, CDW. Agents handle alarm troubleshooting, billing, appointment scheduling, member services, and complex B2B IT support for hundreds of thousands of customers."
     ]
 
-    for segment in customer_segments:
-        story.append(Paragraph(f"• {segment}", bullet_style))
+    for customer_segment in customer_segments:
+        story.paragraph('bullet', f"• {customer_segment}")
 
     # Monetization section
-    story.append(Paragraph("4. Monetization vs. per‑customer amounts", h2_style))
+    story.heading('h2', "4. Monetization vs. per‑customer amounts", 2)
 
     monetization_points = [
         "Public sources <b>do not disclose</b> how much SoFi, Wayfair, SiriusXM, etc. each pay. Even investor memos and ARR write‑ups speak only in <b>aggregate</b> (e.g., ARR, valuations, funding size).",
@@ -222,10 +238,10 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in monetization_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
     # Churn section
-    story.append(Paragraph("5. Churn", h2_style))
+    story.heading('h2', "5. Churn", 2)
 
     churn_points = [
         "I see <b>no public disclosures</b> of specific customers that have churned from Sierra. On the contrary, most evidence is of <b>expanding relationships</b> (e.g., WeightWatchers and SiriusXM taking on more channels / data platforms; Brex, Ramp, and Thrive Market expanding use cases; Rocket Mortgage shipping additional journeys; Safelite extending from consumer to insurer programs).",
@@ -234,49 +250,32 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in churn_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Spacer(1, 0.3*inch))
-    story.append(Paragraph("In short: we can <b>forensically reconstruct Sierra's revenue mechanics and customer footprint</b> around the $100M ARR mark, but <b>not</b> a logo‑by‑logo dollar breakdown or a list of churned customers with causes.", body_style))
+    story.spacer(0.3*inch)
+    story.paragraph('body', "In short: we can <b>forensically reconstruct Sierra's revenue mechanics and customer footprint</b> around the $100M ARR mark, but <b>not</b> a logo‑by‑logo dollar breakdown or a list of churned customers with causes.")
 
-    story.append(PageBreak())
+    story.page_break()
 
     # Structured breakdown section
-    story.append(Paragraph("b) Structured breakdown", h1_style))
+    story.heading('h1', "b) Structured breakdown", 1)
 
     # ARR Timeline table
-    story.append(Paragraph("1. ARR and capital timeline", h2_style))
-
-    arr_timeline_data = [
-        ['Date (approx)', 'Metric', 'Amount / fact', 'Sources'],
-        ['Oct 2024', 'Annualized revenue', 'Crossed about $20M in annualized revenue', 'Sacra'],
-        ['Dec 2024', 'ARR estimate', 'Sacra estimates ~$26M ARR', 'Sacra'],
-        ['Sep 2025', 'Funding', '$350M round led by Greenoaks at $10B valuation;\nSierra "on track to exceed $100M enterprise ARR"', 'Sierra'],
-        ['Nov 5 2025', 'Product & scale', 'Agent OS 2.0 announced; voice agents handling\nhundreds of millions of calls', 'Sacra'],
-        ['Nov 21 2025', 'ARR milestone', 'Sierra blog: $100M ARR in 7 quarters;\nTech / SaaS media confirm', 'Sierra'],
-        ['Nov 2025', 'ARR estimate', 'Sacra: $104M ARR, up 4x from late 2024', 'Sacra'],
-        ['Dec 4 2025', 'Strategic funding', 'Additional investment from SoftBank Vision Fund 2\nfor Japan expansion; confirms >$100M run‑rate', 'Axios']
-    ]
+    story.heading('h2', "1. ARR and capital timeline", 2)
+
+    arr_timeline_data = [['Date (approx)', 'Metric', 'Amount / fact', 'Sources']]
+    for event in data.timeline:
+        arr_timeline_data.append([event.label, event.metric, event.fact, event.source])
 
-    arr_table = Table(arr_timeline_data, colWidths=[1.2*inch, 1.3*inch, 3.2*inch, 1*inch])
-    arr_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(arr_table)
-    story.append(Spacer(1, 0.3*inch))
+    story.long_table('timeline', arr_timeline_data, [1.2*inch, 1.3*inch, 3.2*inch, 1*inch])
+    story.spacer(0.3*inch)
+
+    if not redacted:
+        story.chart('fan', fan_chart_data(data), 6.7*inch, 2.8*inch)
+        story.spacer(0.3*inch)
 
     # Revenue mechanics table
-    story.append(Paragraph("2. Revenue mechanics", h2_style))
+    story.heading('h2', "2. Revenue mechanics", 2)
 
     revenue_mechanics_data = [
         ['Component', 'Description', 'Evidence'],
@@ -288,173 +287,70 @@ def create_sierra_analysis_pdf():
         ['Channel mix', 'Voice has overtaken text as primary channel by\nSept 2025, implying a large share of revenue from\nAI phone calls handled per minute or per resolution.', 'Sacra']
     ]
 
-    revenue_table = Table(revenue_mechanics_data, colWidths=[1.5*inch, 3.5*inch, 1.7*inch])
-    revenue_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgreen),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(revenue_table)
-    story.append(PageBreak())
+    story.table('mechanics', revenue_mechanics_data, [1.5*inch, 3.5*inch, 1.7*inch])
+    story.page_break()
 
     # Major customers section
-    story.append(Paragraph("3. Major customers, use cases, and metrics", h2_style))
+    story.heading('h2', "3. Major customers, use cases, and metrics", 2)
 
-    story.append(Paragraph("Below is a <b>sample of large, repeatedly‑named customers</b> that are credibly in production with Sierra. For each, I include at least two independent sources (Sierra + external where available). \"$ Subscription amount\" is marked <b>Not disclosed</b> whenever no credible figure exists; that is the case for all rows.", body_style))
+    story.paragraph('body', "Below is a <b>sample of large, repeatedly‑named customers</b> that are credibly in production with Sierra. For each, I include at least two independent sources (Sierra + external where available). \"$ Subscription amount\" is marked <b>Not disclosed</b> whenever no credible figure exists; that is the case for all rows.")
 
     # Financial services table
-    story.append(Paragraph("Financial services & fintech", h3_style))
-
-    fintech_data = [
-        ['Customer', 'Use case summary', 'Key metrics disclosed', '$ subscription amount', 'Evidence'],
-        ['SoFi', 'Consumer fintech / bank – AI agent\nfor member support across account,\ncards, payments', 'Named as major Sierra client; cited\nas one of the "major clients" whose\nmulti‑year contracts underpin the $100M ARR.', 'Not disclosed', 'Sierra ARR blog lists SoFi among\nflagship customers. Third‑party\ncoverage lists SoFi as active Sierra client.'],
-        ['Ramp', 'Corporate card / spend management\n– AI agent automating support,\ncard replacement, admin workflows', '90% case‑resolution via automation;\nrolling out voice agent.', 'Not disclosed', 'Sierra Ramp case study. Sierra\ncustomers page & LinkedIn posts\nemphasize Ramp as a flagship fintech.'],
-        ['Brex', 'Fintech – "Change agents: Brex"\ncustomer agent for finance ops\n& customer service', 'Blog states AI agent has accelerated\nservice by ~90% and saved customers\n>15,000 hours/year.', 'Not disclosed', 'Sierra "Change agents: Brex" blog.\nInvestor write‑ups list Brex as one\nof the flagship fintechs.'],
-        ['Chime', 'Neobank – AI agents as 24/7\n"brand extensions" for member questions', 'Reported resolution increase from\n50% → 70%, with better hallucination\nresistance than prior tools.', 'Not disclosed', 'Sierra "Change agents: Chime" blog.\nExecsInTheKnow article confirms\nChime partnership and performance gains.'],
-        ['Marshmallow (UK)', 'Motor insurance – agent "Marsha"\nhandles quotes, renewals, policy\nupdates, multilingual regulated support', 'CSAT 82% on AI‑handled conversations;\n"significant share" of service volume,\n24/7, multilingual.', 'Not disclosed', 'Sierra Marshmallow customer page\n& sector pages. Sierra LinkedIn\nannouncement with performance stats.']
-    ]
+    if include('fintech'):
+        story.heading('h3', "Financial services & fintech", 3)
+
+    fintech_data = case_study_rows('fintech', 'Key metrics disclosed')
 
-    fintech_table = Table(fintech_data, colWidths=[1*inch, 1.8*inch, 1.8*inch, 1*inch, 1.9*inch])
-    fintech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 8),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(fintech_table)
-    story.append(Spacer(1, 0.3*inch))
+    if include('fintech'):
+        story.long_table('fintech', fintech_data, [1*inch, 1.8*inch, 1.8*inch, 1*inch, 1.9*inch])
+        story.spacer(0.3*inch)
 
     # Retail/DTC table
-    story.append(Paragraph("Retail / DTC / CPG", h3_style))
-
-    retail_data = [
-        ['Customer', 'Use case summary', 'Key metrics disclosed', '$ subscription amount', 'Evidence'],
-        ['Tubi', 'AVOD streaming – subscriber\nsupport, account & device issues', 'Reported ~80% containment and\n+7 percentage‑point CSAT improvement\nafter Sierra deployment.', 'Not disclosed', 'Sierra Tubi case study and\nmedia‑industry page. LinkedIn posts\nquoting containment & CSAT uplift.'],
-        ['Sonos', 'Consumer electronics – support\nacross channels to reduce "time‑to‑music"', 'Agents support 15M customers;\nfocus on setup/troubleshooting\nacross complex home networks.', 'Not disclosed', 'Sierra Sonos case study and holiday blog.\nExternal tech/business coverage names\nSonos as one of Sierra\'s early customers.'],
-        ['OluKai', 'Footwear – "Aloha Experience" support', 'Sierra handles ~70% of service tickets;\nused heavily for holiday launches;\nre‑applied patterns to other brands.', 'Not disclosed', 'Sierra OluKai case + holiday blog.\nLinkedIn posts from Sierra and\nOluKai leadership discussing results.'],
-        ['Wilson', 'Sporting goods – equipment\n& custom orders', 'Agent has resolved tens of thousands\nof conversations with >77% containment.', 'Not disclosed', 'Wilson customer story + Sierra\ncustomers page.'],
-        ['Thrive Market', 'Membership retail – member support,\nsubscriptions, experimentation', 'Reported >50% improvement in case\nresolution and ~90% CSAT on\nAI interactions.', 'Not disclosed', 'Sierra Thrive Market case study\n+ LinkedIn posts.']
-    ]
+    if include('retail'):
+        story.heading('h3', "Retail / DTC / CPG", 3)
+
+    retail_data = case_study_rows('retail', 'Key metrics disclosed')
 
-    retail_table = Table(retail_data, colWidths=[1*inch, 1.8*inch, 1.8*inch, 1*inch, 1.9*inch])
-    retail_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 8),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(retail_table)
-    story.append(Spacer(1, 0.3*inch))
+    if include('retail'):
+        story.long_table('retail', retail_data, [1*inch, 1.8*inch, 1.8*inch, 1*inch, 1.9*inch])
+        story.spacer(0.3*inch)
 
     # Media/telecom table
-    story.append(Paragraph("Media, telecom, and identity", h3_style))
+    if include('media'):
+        story.heading('h3', "Media, telecom, and identity", 3)
 
-    media_data = [
-        ['Customer', 'Use case summary', 'Key metrics', '$ subscription amount', 'Evidence'],
-        ['SiriusXM', 'Audio subscription – "Harmony" AI agent,\nfirst adopter of Agent Data Platform', 'Serves 34M subscribers; millions of\ncustomer enquiries; now first customer\nfor Sierra\'s Agent Data Platform.', 'Not disclosed', 'Sierra SiriusXM case + ADP announcement.\nAxios & other coverage cite SiriusXM\nas a flagship Sierra customer.'],
-        ['DIRECTV', 'Pay‑TV – subscriber support', 'Listed as key customer on site;\nfeatured in Summit media/telecom content.', 'Not disclosed', 'Sierra site and homepage logos.\nLinear\'s overview lists DIRECTV\namong major brands using Sierra agents.'],
-        ['CLEAR', 'Identity / travel', 'Member hospitality & retention engine;\nCSAT 4.7/5 for AI‑handled interactions.', 'Not disclosed', 'Sierra CLEAR customer story and\nindustry/product pages. External\nanalysis notes CLEAR as a Sierra customer.']
-    ]
+    media_data = case_study_rows('media', 'Key metrics')
 
-    media_table = Table(media_data, colWidths=[1*inch, 2*inch, 2*inch, 1*inch, 2.5*inch])
-    media_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.purple),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 8),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lavender),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(media_table)
-    story.append(PageBreak())
+    if include('media'):
+        story.long_table('media', media_data, [1*inch, 2*inch, 2*inch, 1*inch, 2.5*inch])
+    if segment is None:
+        story.page_break()
 
     # Security/B2B table
-    story.append(Paragraph("Security, infra & B2B", h3_style))
+    if include('security'):
+        story.heading('h3', "Security, infra & B2B", 3)
 
-    security_data = [
-        ['Customer', 'Use case summary', 'Key metrics', '$ subscription amount', 'Evidence'],
-        ['ADT', 'Home security – 24/7 alarm & account\nsupport; "every second counts"', '2M+ customer inquiries per month;\nAI agent handles troubleshooting,\naccount changes, and (soon) payments\n& service orders.', 'Not disclosed', 'Sierra ADT case + "What is an AI agent?"\nexamples. Medium and LinkedIn posts\nconfirm ADT deploying Sierra agent.'],
-        ['CDW', 'B2B IT reseller – complex support\nfor 250k+ customers', 'Sierra agent used for procurement /\nIT support; Taylor notes 250K customers\nserved and highlights B2B CX improvements.', 'Not disclosed', 'Sierra CDW customer story.\nTaylor\'s LinkedIn post corroborates\npartnership and scale.'],
-        ['Safelite', 'Auto glass – consumer & insurer claims', '"Scarlett" agent handles auto‑glass claims;\nSierra + Safelite also launching\nAgent‑Maker program for insurers.', 'Not disclosed', 'Sierra "Change agents: Safelite" blog;\nCEO Renee Cacchillo profile. External\nposts highlight the Safelite partnership.']
-    ]
+    security_data = case_study_rows('security', 'Key metrics')
 
-    security_table = Table(security_data, colWidths=[1*inch, 2*inch, 2.2*inch, 1*inch, 2.3*inch])
-    security_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkred),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 8),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.mistyrose),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(security_table)
-    story.append(Spacer(1, 0.3*inch))
+    if include('security'):
+        story.long_table('security', security_data, [1*inch, 2*inch, 2.2*inch, 1*inch, 2.3*inch])
+        story.spacer(0.3*inch)
 
     # Churn and risk table
-    story.append(Paragraph("4. Churn and risk indicators", h2_style))
-
-    churn_data = [
-        ['Item', 'What we can see', 'Forensic assessment'],
-        ['Named customer churn', 'No public reports of specific named customers\n(SoFi, Wayfair, WeightWatchers, Sonos, etc.)\ndiscontinuing Sierra.', 'We cannot identify any logo that has clearly\nchurned from Sierra based on public data.'],
-        ['Negative end‑user\nsentiment', 'Some posts (e.g., Deliveroo driver forums,\ngeneral AI‑support complaints) show frustration\nwith AI agents and mention "Sierra" generically\nin delivering poor support.', 'Indicates experience risk but not confirmed\nenterprise churn. These are end‑user anecdotes,\nnot corporate termination announcements.'],
-        ['Pricing / complexity\ncritiques', 'Independent reviews describe Sierra as powerful\nbut with "opaque pricing" and a steep learning\ncurve, positioning it as a fit for teams with\nstrong engineering and CX resources.', 'Suggests a risk of future churn among smaller\nor less technical customers; no concrete\nlogo‑level churn disclosed.'],
-        ['Retention signals', 'Numerous case studies and posts show customers\nexpanding use (more channels, voice, new\njourneys, adoption of Agent Data Platform).', 'Expansion behavior is consistent with strong\nnet revenue retention, but exact NRR is not disclosed.']
-    ]
+    story.heading('h2', "4. Churn and risk indicators", 2)
+
+    churn_data = [['Item', 'What we can see', 'Forensic assessment']]
+    for risk in data.risk_indicators:
+        churn_data.append([risk.item, risk.observation, risk.assessment])
 
-    churn_table = Table(churn_data, colWidths=[1.5*inch, 2.8*inch, 2.8*inch])
-    churn_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.orange),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.wheat),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-
-    story.append(churn_table)
-    story.append(PageBreak())
+    story.long_table('churn', churn_data, [1.5*inch, 2.8*inch, 2.8*inch])
+    story.page_break()
 
     # Narrative report section
-    story.append(Paragraph("c) Narrative report (forensic-style)", h1_style))
+    story.heading('h1', "c) Narrative report (forensic-style)", 1)
 
-    story.append(Paragraph("1. Mandate and approach", h2_style))
-    story.append(Paragraph("You asked for an SEC‑grade reconstruction of how Sierra reached $100M in ARR in seven quarters, including:", body_style))
+    story.heading('h2', "1. Mandate and approach", 2)
+    story.paragraph('body', "You asked for an SEC‑grade reconstruction of how Sierra reached $100M in ARR in seven quarters, including:")
 
     mandate_points = [
         "Sources of revenue and ARR structure",
@@ -463,9 +359,9 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in mandate_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Given Sierra is private, with no public 10‑K/10‑Q equivalents, I rely on:", body_style))
+    story.paragraph('body', "Given Sierra is private, with no public 10‑K/10‑Q equivalents, I rely on:")
 
     source_points = [
         "Sierra's own blogs, product/industry pages, and customer case studies",
@@ -475,12 +371,12 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in source_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
     # Revenue curve reconstruction
-    story.append(Paragraph("2. Reconstructing the ARR curve", h2_style))
+    story.heading('h2', "2. Reconstructing the ARR curve", 2)
 
-    story.append(Paragraph("Sacra's private‑markets profile provides the most concrete, quantitative revenue trajectory:", body_style))
+    story.paragraph('body', "Sacra's private‑markets profile provides the most concrete, quantitative revenue trajectory:")
 
     trajectory_points = [
         "<b>2024</b> – Sierra is founded in 2023, launches in early 2024, and by October 2024 has \"crossed about $20M\" in annualized revenue. Sacra estimates $26M ARR by December 2024.",
@@ -488,11 +384,11 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in trajectory_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Sierra's own blog then publicly confirms that they have \"just hit <b>$100M in ARR</b> — seven quarters after we launched in February 2024,\" calling themselves one of the fastest‑growing enterprise software companies in history.", body_style))
+    story.paragraph('body', "Sierra's own blog then publicly confirms that they have \"just hit <b>$100M in ARR</b> — seven quarters after we launched in February 2024,\" calling themselves one of the fastest‑growing enterprise software companies in history.")
 
-    story.append(Paragraph("From this, the most reasonable reconstruction is:", body_style))
+    story.paragraph('body', "From this, the most reasonable reconstruction is:")
 
     reconstruction_points = [
         "Late 2024: ARR in the <b>low tens of millions</b> ($20–$30M range), as pilots go live.",
@@ -501,12 +397,12 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in reconstruction_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
     # Revenue model section
-    story.append(Paragraph("3. Revenue model: why ARR looks like classic enterprise SaaS", h2_style))
+    story.heading('h2', "3. Revenue model: why ARR looks like classic enterprise SaaS", 2)
 
-    story.append(Paragraph("Although Sierra is marketing itself as a radically new \"agentic AI\" platform, their <b>revenue mechanics</b> are deliberately conservative:", body_style))
+    story.paragraph('body', "Although Sierra is marketing itself as a radically new \"agentic AI\" platform, their <b>revenue mechanics</b> are deliberately conservative:")
 
     conservative_points = [
         "<b>Contract structure</b> – Bret Taylor states that Sierra follows traditional enterprise norms: 12‑month minimum terms, often multi‑year, billed annually up front, with 30 days for the customer to pay the invoice.",
@@ -515,9 +411,9 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in conservative_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Third‑party analyses offer hints about the <b>unit economics</b>:", body_style))
+    story.paragraph('body', "Third‑party analyses offer hints about the <b>unit economics</b>:")
 
     economics_points = [
         "Lenny's insights vault notes that Sierra collects a set fee per AI‑resolved call, economically tied to the $10–$20 cost the customer avoids per deflected human call.",
@@ -525,14 +421,14 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in economics_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Neither source gives precise list pricing, but together they make the economics clear: <b>Sierra's fee per resolution is set as a fraction of the avoided human cost</b>, so large enterprises with millions of calls can easily generate <b>multi‑million‑dollar annual contracts</b> without publishing a public per‑seat or per‑token price.", body_style))
+    story.paragraph('body', "Neither source gives precise list pricing, but together they make the economics clear: <b>Sierra's fee per resolution is set as a fraction of the avoided human cost</b>, so large enterprises with millions of calls can easily generate <b>multi‑million‑dollar annual contracts</b> without publishing a public per‑seat or per‑token price.")
 
     # Continue with remaining sections...
-    story.append(Paragraph("4. Customers and use cases as ARR drivers", h2_style))
+    story.heading('h2', "4. Customers and use cases as ARR drivers", 2)
 
-    story.append(Paragraph("The $100M ARR is, in practice, <b>the sum of a relatively small number of very large deployments plus a long tail of other enterprises</b>. The most heavily‑publicized customers cluster in a few sectors:", body_style))
+    story.paragraph('body', "The $100M ARR is, in practice, <b>the sum of a relatively small number of very large deployments plus a long tail of other enterprises</b>. The most heavily‑publicized customers cluster in a few sectors:")
 
     cluster_points = [
         "<b>Fintech / financial services</b> – SoFi, Ramp, Brex, Chime, Marshmallow, Rocket Mortgage, Cigna, plus other unnamed banks and insurers in the U.S. and Europe.",
@@ -542,9 +438,9 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in cluster_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("For nearly all of these customers, Sierra and/or the customer publishes <b>hard performance metrics</b> (containment rates, CSAT, case‑resolution share, conversion lift, cancellation reduction), but <b>never dollar figures</b>. Examples:", body_style))
+    story.paragraph('body', "For nearly all of these customers, Sierra and/or the customer publishes <b>hard performance metrics</b> (containment rates, CSAT, case‑resolution share, conversion lift, cancellation reduction), but <b>never dollar figures</b>. Examples:")
 
     metrics_examples = [
         "Ramp: <b>90%</b> of cases fully resolved by the agent.",
@@ -555,9 +451,9 @@ def create_sierra_analysis_pdf():
     ]
 
     for example in metrics_examples:
-        story.append(Paragraph(f"• {example}", bullet_style))
+        story.paragraph('bullet', f"• {example}")
 
-    story.append(Paragraph("From a revenue‑forensics standpoint, these numbers matter because they show how Sierra can justify <b>large outcome‑based contracts</b>:", body_style))
+    story.paragraph('body', "From a revenue‑forensics standpoint, these numbers matter because they show how Sierra can justify <b>large outcome‑based contracts</b>:")
 
     justification_points = [
         "A customer like <b>ADT</b> with <b>2M+ monthly inquiries</b> can route a large fraction through Sierra at a per‑resolution fee that still undercuts human support costs.",
@@ -565,14 +461,14 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in justification_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("It is entirely plausible that <b>a few dozen such customers account for the majority of the $100M ARR</b>, but because contract values are not disclosed, we cannot decompose that ARR logo‑by‑logo.", body_style))
+    story.paragraph('body', "It is entirely plausible that <b>a few dozen such customers account for the majority of the $100M ARR</b>, but because contract values are not disclosed, we cannot decompose that ARR logo‑by‑logo.")
 
     # Subscription amounts section
-    story.append(Paragraph("5. Subscription amounts: what we can infer—and what we can't", h2_style))
+    story.heading('h2', "5. Subscription amounts: what we can infer—and what we can't", 2)
 
-    story.append(Paragraph("You explicitly asked for each customer's <b>subscription amount</b>. Here's what the evidence allows:", body_style))
+    story.paragraph('body', "You explicitly asked for each customer's <b>subscription amount</b>. Here's what the evidence allows:")
 
     evidence_points = [
         "We know the <b>total</b> (≈$100M ARR) and we know many of the <b>logos</b> contributing to it.",
@@ -581,16 +477,16 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in evidence_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Therefore, the only honest statement is:", body_style))
-    story.append(Paragraph("<i>All currently available public information is <b>insufficient to assign per‑customer subscription amounts or logo‑level ARR</b>. We can only describe <b>how</b> Sierra monetizes each customer, not <b>how much</b> revenue each contributes.</i>", body_style))
+    story.paragraph('body', "Therefore, the only honest statement is:")
+    story.paragraph('body', "<i>All currently available public information is <b>insufficient to assign per‑customer subscription amounts or logo‑level ARR</b>. We can only describe <b>how</b> Sierra monetizes each customer, not <b>how much</b> revenue each contributes.</i>")
 
     # Churn analysis section
-    story.append(Paragraph("6. Churn analysis", h2_style))
+    story.heading('h2', "6. Churn analysis", 2)
 
-    story.append(Paragraph("You also asked to \"identify the customers that churned and the reasons why.\"", body_style))
-    story.append(Paragraph("Based on the corpus examined:", body_style))
+    story.paragraph('body', "You also asked to \"identify the customers that churned and the reasons why.\"")
+    story.paragraph('body', "Based on the corpus examined:")
 
     churn_findings = [
         "<b>No article, blog, or analyst report</b> claims that a named customer (e.g., WeightWatchers, Sonos, SiriusXM, SoFi, Wayfair, ADT) <b>has left Sierra</b>. On the contrary, many stories are framed as <b>expansion</b> (additional channels, new products like Agent Data Platform, more complex journeys).",
@@ -599,9 +495,9 @@ def create_sierra_analysis_pdf():
     ]
 
     for finding in churn_findings:
-        story.append(Paragraph(f"• {finding}", bullet_style))
+        story.paragraph('bullet', f"• {finding}")
 
-    story.append(Paragraph("Given SEC‑style evidentiary standards, the correct conclusion is:", body_style))
+    story.paragraph('body', "Given SEC‑style evidentiary standards, the correct conclusion is:")
 
     conclusion_points = [
         "<b>Known churned customers: none (publicly disclosed).</b>",
@@ -609,12 +505,12 @@ def create_sierra_analysis_pdf():
     ]
 
     for point in conclusion_points:
-        story.append(Paragraph(f"• {point}", bullet_style))
+        story.paragraph('bullet', f"• {point}")
 
-    story.append(Paragraph("Any statement like \"X churned because Y\" would go beyond the evidence and into conjecture.", body_style))
+    story.paragraph('body', "Any statement like \"X churned because Y\" would go beyond the evidence and into conjecture.")
 
     # Overall conclusion
-    story.append(Paragraph("7. Overall forensic conclusion", h2_style))
+    story.heading('h2', "7. Overall forensic conclusion", 2)
 
     final_conclusions = [
         "Sierra's <b>$100M+ ARR</b> is real and well‑corroborated across the company's own disclosures, investor/analyst estimates, and independent media.",
@@ -623,15 +519,78 @@ def create_sierra_analysis_pdf():
     ]
 
     for conclusion in final_conclusions:
-        story.append(Paragraph(f"• {conclusion}", bullet_style))
+        story.paragraph('bullet', f"• {conclusion}")
 
-    story.append(Paragraph("If you want, the next logical step would be to build a <b>scenario model</b>: for example, assume a distribution of contract sizes across the identified customers (e.g., a handful of $5–$10M ARR \"whales,\" more $1–3M \"elephants,\" and a long tail), and explore what per‑resolution or per‑call pricing that would imply. That would necessarily be <b>hypothetical</b>, but we can keep it consistent with the published unit‑economics constraints.", body_style))
+    story.paragraph('body', "If you want, the next logical step would be to build a <b>scenario model</b>: for example, assume a distribution of contract sizes across the identified customers (e.g., a handful of $5–$10M ARR \"whales,\" more $1–3M \"elephants,\" and a long tail), and explore what per‑resolution or per‑call pricing that would imply. That would necessarily be <b>hypothetical</b>, but we can keep it consistent with the published unit‑economics constraints.")
 
-    # Build the PDF
-    doc.build(story)
+    # Scenario model: implied per-resolution pricing
+    story.heading('h2', "8. Scenario model: implied per‑resolution pricing (hypothetical)", 2)
 
+    story.paragraph('body', "As a first cut of that scenario model, the table inverts an <b>assumed</b> contract value into the per‑resolution fee it would imply, using the volumes cited above and containment between 50% and 90%. The contract values are scenario inputs, not disclosed figures.")
+
+    story.long_table('scenario', scenario_table_rows(data),
+                      [1*inch, 1.1*inch, 0.9*inch, 1.4*inch, 1.5*inch, 1.3*inch])
+
+    if redacted:
+        redact_story(story)
+    return story
+
+def render_report(story, output, pagesize=letter, cache=None, timings=None, profile=None):
+    """Lay out and write a story from build_story; returns render_story's section summary
+
+    Sections whose content is unchanged since an earlier render are reused
+    from cache (default: the process-wide report_engine.section_cache();
+    False disables it). timings, when a dict, receives the layout and
+    write seconds; profile names a report_profiles output profile.
+    """
+    from report_engine import render_story
+
+    return render_story(story, output, REPORT_KEY, STYLE_SPECS, TABLE_SPECS,
+                        dict(pagesize=pagesize, **PAGE_MARGINS), canvasmaker=header_canvas(story.redacted),
+                        cache=cache, timings=timings, profile=profile)
+
+def write_pdf(output, pagesize=letter, segment=None, redacted=False, date=None, cache=None,
+              dataset=None, profile=None):
+    """Render the report into output: a file path, binary stream, socket or file descriptor
+
+    segment, redacted, date and dataset are passed to build_story, and cache
+    and profile to render_report, whose section summary is returned.
+    """
+    return render_report(build_story(segment, redacted, date, dataset), output, pagesize, cache,
+                         profile=profile)
+
+def pdf_bytes(pagesize=letter, segment=None, redacted=False, date=None, cache=None, dataset=None,
+              profile=None, view=False):
+    """Render the report in memory; returns bytes, or a memoryview over the buffer with view=True"""
+    from report_engine import pdf_bytes as render_pdf_bytes
+
+    return render_pdf_bytes(write_pdf, pagesize, segment, redacted, date, cache, dataset, profile,
+                            view=view)
+
+def create_sierra_analysis_pdf(filename=OUTPUT_PATH, pagesize=letter, segment=None, redacted=False,
+                               date=None, cache=None, dataset=None, profile=None):
+    """Create the complete Sierra analysis PDF with perfect formatting
+
+    Writes to filename (a path or anything write_pdf accepts) and returns it.
+    """
+    write_pdf(filename, pagesize, segment, redacted, date, cache, dataset, profile)
     return filename
 
+def validate(pagesize=letter, segment=None, redacted=False, date=None, dataset=None):
+    """Build the story and return its structural problems (report_story.validate_story) without rendering"""
+    return validate_story(build_story(segment, redacted, date, dataset), STYLE_SPECS, TABLE_SPECS,
+                          dict(pagesize=pagesize, **PAGE_MARGINS))
+
 if __name__ == "__main__":
-    pdf_file = create_sierra_analysis_pdf()
-    print(f"Sierra analysis PDF created successfully: {pdf_file}")
\ No newline at end of file
+    # "-" writes the PDF to stdout, e.g. to pipe it into another program
+    target = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_PATH
+    if target == '-':
+        sys.stdout.flush()
+        write_pdf(sys.stdout.fileno())
+    elif target == '--validate':
+        problems = validate()
+        print('\n'.join(problems) or "Sierra analysis story is valid")
+        sys.exit(1 if problems else 0)
+    else:
+        pdf_file = create_sierra_analysis_pdf(target)
+        print(f"Sierra analysis PDF created successfully: {pdf_file}")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Sierra Report Dataset Store
+Typed, lazily loaded tables behind both Sierra report generators
+
+Each table lives as a CSV file in sierra/data and is parsed into __slots__
+records the first time it is accessed, so a report only reads the tables it
+uses. No reportlab import is needed to query the data.
+"""
+
+import csv
+import os
+import types
+import typing
+from dataclasses import dataclass, fields
+from datetime import date
+from functools import cached_property
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'data')
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    """ARR distribution tier from the forensic ACV model"""
+    key: str
+    name: str
+    focus: str
+    acv_low_m: float
+    acv_high_m: float
+    contracts: int
+    arr_m: float
+
+
+@dataclass(frozen=True, slots=True)
+class Customer:
+    """Publicly confirmed enterprise customer
+
+    tier is the ARR distribution Segment the contract is modelled in and
+    est_acv_m the point estimate from the written analysis, when there is one.
+    """
+    name: str
+    segment: str
+    sector: str
+    tier: str
+    est_acv_m: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class Contract:
+    """Named use case with its estimated ACV range"""
+    customer: str
+    segment: str
+    industry: str
+    use_case: str
+    outcome: str
+    acv_low_m: float
+    acv_high_m: float
+
+
+@dataclass(frozen=True, slots=True)
+class CaseStudy:
+    """Customer deployment with disclosed metrics and evidence"""
+    customer: str
+    segment: str
+    use_case: str
+    metrics: str
+    subscription: str
+    evidence: str
+
+
+@dataclass(frozen=True, slots=True)
+class TimelineEvent:
+    """Dated ARR or capital milestone; arr_m is set when the event states an ARR figure"""
+    date: date
+    label: str
+    metric: str
+    fact: str
+    source: str
+    arr_m: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class VolumeAssumption:
+    """Assumed monthly inquiry volume for a customer, with the public figure it rests on"""
+    customer: str
+    monthly_low: float
+    monthly_high: float
+    basis: str
+
+
+@dataclass(frozen=True, slots=True)
+class RiskIndicator:
+    """Churn or risk signal with its forensic assessment"""
+    item: str
+    observation: str
+    assessment: str
+
+
+@dataclass(frozen=True, slots=True)
+class Source:
+    """Numbered reference"""
+    id: int
+    title: str
+    url: str
+
+
+def _converter(annotation):
+    """Function turning a CSV cell into the field's type; blank cells become None for optional fields"""
+    if isinstance(annotation, types.UnionType):
+        inner = _converter(next(arg for arg in typing.get_args(annotation) if arg is not type(None)))
+        return lambda value: inner(value) if value != '' else None
+    if annotation is date:
+        return date.fromisoformat
+    return annotation
+
+
+def read_table(path, record_type):
+    """Parse a CSV file into a tuple of records, converting each column to its field type"""
+    converters = [(field.name, _converter(field.type)) for field in fields(record_type)]
+    with open(path, newline='', encoding='utf-8') as f:
+        return tuple(record_type(**{name: convert(row[name]) for name, convert in converters})
+                     for row in csv.DictReader(f))
+
+
+def format_millions(value):
+    """$-millions label as used in the reports, e.g. 7.5 -> '$7.5M'"""
+    return f"${value:g}M"
+
+
+class Dataset:
+    """The Sierra report tables, each read from disk on first access"""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+
+    def _read(self, filename, record_type):
+        return read_table(os.path.join(self.data_dir, filename), record_type)
+
+    @cached_property
+    def segments(self):
+        return self._read('segments.csv', Segment)
+
+    @cached_property
+    def customers(self):
+        return self._read('customers.csv', Customer)
+
+    @cached_property
+    def contracts(self):
+        return self._read('contracts.csv', Contract)
+
+    @cached_property
+    def case_studies(self):
+        return self._read('case_studies.csv', CaseStudy)
+
+    @cached_property
+    def timeline(self):
+        return self._read('timeline.csv', TimelineEvent)
+
+    @cached_property
+    def volumes(self):
+        return self._read('volumes.csv', VolumeAssumption)
+
+    @cached_property
+    def risk_indicators(self):
+        return self._read('risk_indicators.csv', RiskIndicator)
+
+    @cached_property
+    def sources(self):
+        return self._read('sources.csv', Source)
+
+    def loaded_tables(self):
+        """Names of the tables read so far"""
+        return sorted(name for name in vars(self) if name != 'data_dir')
+
+    def customers_by_sector(self, segment=None):
+        """Ordered {sector: [customer names]}, optionally for one segment"""
+        grouped = {}
+        for customer in self.customers:
+            if segment is None or customer.segment == segment:
+                grouped.setdefault(customer.sector, []).append(customer.name)
+        return grouped
+
+    def case_studies_for(self, segment):
+        return [study for study in self.case_studies if study.segment == segment]
+
+
+_default_dataset = None
+
+
+def load_dataset():
+    """Process-wide Dataset over sierra/data; tables are still read lazily"""
+    global _default_dataset
+    if _default_dataset is None:
+        _default_dataset = Dataset()
+    return _default_dataset
@@ -0,0 +1,11 @@
+"""
+Shared setup for the report script tests
+The scripts import each other as top-level modules, as when run from sierra/scripts
+
+Usage: python -m pytest sierra/scripts/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+"""Tests for the constrained ACV sampler behind the logo-level ARR allocation"""
+
+import numpy as np
+import pytest
+
+import arr_allocation
+from sierra_data import load_dataset
+
+
+@pytest.mark.parametrize('total', [12.0, 30.0, 47.5])
+def test_bounded_sum_rows_meet_every_constraint(total):
+    rng = np.random.default_rng(3)
+    rows = arr_allocation.sample_bounded_sum(rng, 8, 1.0, 7.0, total, 4000)
+    assert rows.shape == (4000, 8)
+    assert rows.min() >= 1.0 - 1e-5 and rows.max() <= 7.0 + 1e-5
+    np.testing.assert_allclose(rows.sum(axis=1), total, rtol=1e-5)
+    # Uniform over the constrained set, so every position has the same mean
+    np.testing.assert_allclose(rows.mean(axis=0), total / 8, rtol=0.03)
+
+
+def test_bounded_sum_edges_and_impossible_totals():
+    rng = np.random.default_rng(3)
+    np.testing.assert_allclose(arr_allocation.sample_bounded_sum(rng, 4, 1.0, 3.0, 4.0, 5), 1.0)
+    np.testing.assert_allclose(arr_allocation.sample_bounded_sum(rng, 4, 1.0, 3.0, 12.0, 5), 3.0)
+    with pytest.raises(ValueError, match='cannot sum'):
+        arr_allocation.sample_bounded_sum(rng, 4, 1.0, 3.0, 12.5, 5)
+
+
+def test_slice_acceptance_matches_the_closed_form():
+    # Two spacings summing to 1.5 both stay below 1 on a third of the segment
+    assert arr_allocation._slice_acceptance(2, 1.5) == pytest.approx(1 / 3)
+    assert arr_allocation._slice_acceptance(5, 0.9) == pytest.approx(1.0)
+
+
+def test_allocation_keeps_tier_totals_and_estimate_order():
+    dataset = load_dataset()
+    allocation = arr_allocation.allocate(samples=2000, seed=5, dataset=dataset)
+    assert allocation.values.shape == (2000, sum(tier.contracts for tier in dataset.segments))
+    assert allocation.constraint_error(dataset.segments) < 1e-3
+
+    columns = {label: i for i, label in enumerate(allocation.labels)}
+    for tier in dataset.segments:
+        estimated = sorted((c for c in dataset.customers if c.tier == tier.key and c.est_acv_m is not None),
+                           key=lambda c: -c.est_acv_m)
+        for larger, smaller in zip(estimated, estimated[1:]):
+            if larger.est_acv_m > smaller.est_acv_m:
+                assert np.all(allocation.values[:, columns[larger.name]]
+                              >= allocation.values[:, columns[smaller.name]])
@@ -0,0 +1,69 @@
+"""Tests for the invariants arr_consistency checks across sources"""
+
+import arr_consistency
+from report_story import Story
+
+TABLE = """# Revenue
+
+| Segment | ARR | Customers | Avg Contract |
+|---------|-----|-----------|--------------|
+| Financial Services | $35M | 5 | $7M |
+| Healthcare | $25M | 10 | {healthcare_average} |
+| E-commerce/Retail | $25M | 18 | $1.4M |
+| Media | {media_arr} | 14 | $1.1M |
+| **Total** | **$100M** | **47** | **$2.1M** |
+
+Sierra reached $100M ÷ 47 contracts = {average} per contract across {contracts} enterprise contracts.
+"""
+
+
+def _violations(tmp_path, **figures):
+    """(invariant, line) of every violation stated in a README built from TABLE"""
+    readme, empty = tmp_path / 'README.md', tmp_path / 'empty.md'
+    values = dict(healthcare_average='$2.5M', media_arr='$15M', average='$2.1M', contracts=47)
+    readme.write_text(TABLE.format(**dict(values, **figures)), encoding='utf-8')
+    empty.write_text('', encoding='utf-8')
+    source = arr_consistency._relative(str(readme))
+    return {(violation.invariant, int(violation.location.rpartition(':')[2]))
+            for violation in arr_consistency.check_consistency(readme=str(readme), analysis=str(empty))
+            if violation.location.startswith(source + ':')}
+
+
+def test_consistent_figures_only_flag_the_fintech_remainder(tmp_path):
+    # Four estimated fintech customers leave $19.5M for a single other contract
+    assert _violations(tmp_path) == {('remainder', 5)}
+
+
+def test_each_invariant_reports_the_statement_that_breaks_it(tmp_path):
+    violations = _violations(tmp_path, healthcare_average='$3.5M', media_arr='$16M', average='$2.3M', contracts=46)
+    # Media's $16M also disagrees with the forensic report's $15M heading
+    assert violations == {('remainder', 5), ('average', 6), ('agreement', 8), ('sum', 9), ('agreement', 11),
+                          ('arithmetic', 11)}
+
+
+def test_facts_read_markdown_tables_prose_and_equations(tmp_path):
+    readme = tmp_path / 'README.md'
+    readme.write_text(TABLE.format(healthcare_average='$2.5M', media_arr='$15M', average='$2.1M', contracts=47),
+                      encoding='utf-8')
+    facts, equations = arr_consistency.markdown_facts(str(readme))
+    by_key = {(fact.entity, fact.metric): fact.value for fact in facts if fact.table.endswith(':3')}
+    assert by_key[('sector:retail', 'contracts')] == 18
+    assert by_key[('total', 'arr_m')] == 100 and by_key[('sector:media', 'avg_acv_m')] == 1.1
+    assert [(equation.a, equation.operator, equation.b, equation.c, equation.decimals)
+            for equation in equations] == [(100, '÷', 47, 2.1, 1)]
+
+
+def test_report_facts_come_from_the_story_blocks():
+    story = Story()
+    story.heading('subsection', "5.1 Fintech ARR ($35M)", 2)
+    story.paragraph('body', "Rocket Mortgage and SoFi, but not Rocket alone.")
+    story.heading('subsection', "5.2 Outlook", 2)
+    story.paragraph('body', "Cigna is not counted under a heading without ARR.")
+    story.page_break()
+    story.paragraph('body', "Nor is Wayfair on the next page.")
+    facts = arr_consistency.report_facts(story, 'report.py', ['Rocket Mortgage', 'SoFi', 'Cigna', 'Wayfair'])
+    assert [(fact.entity, fact.metric, fact.value, fact.location) for fact in facts] == [
+        ('sector:fintech', 'arr_m', 35.0, 'report.py section 1 block 1'),
+        ('customer:Rocket Mortgage', 'sector', 0, 'report.py section 1 block 2'),
+        ('customer:SoFi', 'sector', 0, 'report.py section 1 block 2'),
+    ]
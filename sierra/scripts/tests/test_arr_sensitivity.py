@@ -0,0 +1,38 @@
+"""Tests for the ARR sensitivity model, tornado and Sobol indices"""
+
+import numpy as np
+import pytest
+
+import arr_sensitivity
+from sierra_data import load_dataset
+
+
+def test_base_case_reproduces_the_tier_table():
+    model = arr_sensitivity.SensitivityModel()
+    assert model.evaluate(model.base[None])[0] == pytest.approx(sum(tier.arr_m for tier in load_dataset().segments))
+    x = model.sample(np.random.default_rng(0), 1000)
+    assert np.all((x >= model.low) & (x <= model.high))
+    np.testing.assert_array_equal(x[:, model.integer], np.rint(x[:, model.integer]))
+
+
+def test_tornado_bars_match_single_evaluations_widest_first():
+    model = arr_sensitivity.SensitivityModel()
+    tornado = arr_sensitivity.one_at_a_time(model)
+    swings = np.abs(tornado.at_high - tornado.at_low)
+    assert np.all(np.diff(swings) <= 0)
+    for position, column in enumerate(tornado.order[:5]):
+        x = model.base.copy()
+        x[column] = model.high[column]
+        assert tornado.at_high[position] == pytest.approx(model.evaluate(x[None])[0])
+        assert tornado.bars()[position][2] == pytest.approx(tornado.at_high[position] - tornado.base)
+
+
+def test_sobol_indices_rank_like_the_tornado():
+    model = arr_sensitivity.SensitivityModel()
+    indices = arr_sensitivity.sobol(model, samples=4096, seed=3, bootstrap=50)
+    assert indices.evaluations == 4096 * (len(model) + 2)
+    assert 0.8 < indices.first.sum() <= 1.05
+    assert np.all(indices.first_ci[0] <= indices.first_ci[1])
+    # The outcome-pricing inputs scale every tier, so they dominate both rankings
+    top = set(np.argsort(-indices.total)[:3])
+    assert top == set(arr_sensitivity.one_at_a_time(model).order[:3])
@@ -0,0 +1,48 @@
+"""Tests for the ARR timeline reconstruction"""
+
+import numpy as np
+import pytest
+
+import arr_timeline
+
+ANCHOR_MONTHS = np.array([6.0, 12.0, 18.0, 21.0])
+QUARTERS, QUARTER_MONTHS = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6', 'Q7', 'Q8'], np.arange(1, 9) * 3.0
+
+
+def test_systematic_resample_follows_each_row_of_weights():
+    weights = np.array([[0.5, 0.25, 0.25, 0.0], [0.0, 0.0, 0.0, 1.0], [1.0, 1.0, 1.0, 1.0]])
+    picked = arr_timeline.systematic_resample(weights, 8)
+    counts = np.stack([np.bincount(row, minlength=4) for row in picked])
+    np.testing.assert_array_equal(counts, [[4, 2, 2, 0], [0, 0, 0, 8], [2, 2, 2, 2]])
+
+
+def test_bands_fit_an_exponential_timeline():
+    values = 2.0 * np.expm1(0.2 * ANCHOR_MONTHS)
+    bands = arr_timeline.reconstruct(ANCHOR_MONTHS, values, 0.03, QUARTER_MONTHS, QUARTERS, draws=4000,
+                                     seed=1, families=['exponential', 'power'])
+    median = bands.percentiles.index(50)
+    np.testing.assert_allclose(bands.anchor_fit[0, median], values, rtol=0.05)
+    assert bands.family_share['exponential'][0] > 0.9
+    # Bands are ordered, ARR grows and net new ARR adds up to the last quarter's ARR
+    assert np.all(np.diff(bands.arr[0], axis=0) >= 0)
+    assert np.all(np.diff(bands.arr[0, median]) > 0)
+    np.testing.assert_allclose(bands.net_new[0, median].sum(), bands.arr[0, median, -1], rtol=0.05)
+
+
+def test_event_sets_in_a_batch_fit_as_they_would_alone():
+    values = np.array([[5.0, 20.0, 60.0, 100.0], [5.0, np.nan, 60.0, 100.0], [np.nan, 25.0, np.nan, 90.0]])
+    sigmas = np.array([0.15, 0.15, 0.15, 0.03])
+    batch = arr_timeline.reconstruct(ANCHOR_MONTHS, values, sigmas, QUARTER_MONTHS, QUARTERS, draws=2000, seed=4)
+    for s, row in enumerate(values):
+        alone = arr_timeline.reconstruct(ANCHOR_MONTHS, row, sigmas, QUARTER_MONTHS, QUARTERS, draws=2000, seed=4)
+        np.testing.assert_allclose(batch.arr[s], alone.arr[0])
+        assert batch.ess[s] == pytest.approx(alone.ess[0])
+    with pytest.raises(ValueError, match='at least one ARR anchor'):
+        arr_timeline.reconstruct(ANCHOR_MONTHS, np.full(4, np.nan), sigmas, QUARTER_MONTHS, QUARTERS, draws=10)
+
+
+def test_alternative_event_sets_keep_the_tightest_anchor():
+    sigmas = np.array([0.15, 0.15, 0.03, 0.15])
+    sets = arr_timeline.alternative_event_sets(np.random.default_rng(0), [5.0, 20.0, 60.0, 100.0], sigmas, 500)
+    assert not np.isnan(sets[:, 2]).any()
+    assert 0.1 < np.isnan(sets[:, [0, 1, 3]]).mean() < 0.3
@@ -0,0 +1,23 @@
+"""Tests for the synthetic datasets and measurements of bench_scale"""
+
+import bench_scale
+from sierra_data import Dataset, load_dataset
+
+
+def test_synthetic_dataset_repeats_customer_tables(tmp_path):
+    bench_scale.write_synthetic_dataset(str(tmp_path), 3)
+    scaled, original = Dataset(str(tmp_path)), load_dataset()
+    assert len(scaled.customers) == 3 * len(original.customers)
+    assert len({customer.name for customer in scaled.customers}) == len(scaled.customers)
+    assert [tier.arr_m for tier in scaled.segments] == [tier.arr_m for tier in original.segments]
+
+
+def test_measure_counts_story_blocks(tmp_path):
+    bench_scale.write_synthetic_dataset(str(tmp_path), 2)
+    entry = bench_scale.measure('forensic', 2, str(tmp_path))
+    assert entry['status'] == 'ok'
+    assert 'flowables' not in entry and entry['blocks'] > 0
+    assert entry['pages'] > 0 and entry['bytes'] > 0
+
+    history = [{'results': [dict(entry, wall_seconds=9.0)]}, {'results': [entry]}]
+    assert bench_scale.previous_results(history)[('forensic', 2)] is entry
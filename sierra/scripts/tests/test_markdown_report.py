@@ -0,0 +1,98 @@
+"""Tests for the streaming Markdown renderer"""
+
+import io
+
+from pypdf import PdfReader
+
+import markdown_report
+import report_engine
+
+DOCUMENT = """# Sierra
+
+Intro paragraph with **bold**, *italic* and `code`.
+
+## Customers
+
+See [Sierra](https://sierra.ai) for the list.
+
+| Customer | ACV |
+|----------|-----|
+| Rocket Mortgage | $7M |
+
+## Method
+
+- first
+- second
+
+```
+raw *text*
+```
+"""
+
+
+def test_inline_markup():
+    assert markdown_report.inline_markup("**a** *b* `c*d*` [e](https://x.y)") == (
+        '<b>a</b> <i>b</i> <font face="Courier">c*d*</font> <link href="https://x.y" color="blue">e</link>')
+    assert markdown_report.inline_markup("a < b & c") == "a &lt; b &amp; c"
+    # Emphasis markers in a link target stay part of the URL
+    assert markdown_report.inline_markup("[_d_](https://x.y/_b_/c) _e_") == (
+        '<link href="https://x.y/_b_/c" color="blue"><i>d</i></link> <i>e</i>')
+
+
+def test_blocks():
+    kinds = [block[0] for block in markdown_report.iter_blocks(DOCUMENT.splitlines(), 400)]
+    assert kinds == ['heading', 'paragraph', 'heading', 'paragraph', 'table', 'heading',
+                     'paragraph', 'paragraph', 'code']
+
+
+def test_tables_fit_the_frame():
+    wide = ["| " + " | ".join(["a long cell of table text"] * 6) + " |", "|" + "---|" * 6]
+    story = markdown_report.markdown_story(wide)
+    (_, _, _, widths), = story.sections[0].blocks
+    frame = (markdown_report.letter[0] - markdown_report.PAGE_MARGINS['leftMargin']
+             - markdown_report.PAGE_MARGINS['rightMargin'] - 2 * markdown_report.FRAME_PADDING)
+    assert sum(widths) <= frame + 1e-6
+
+
+def test_story_sections_and_title():
+    story = markdown_report.markdown_story(DOCUMENT.splitlines())
+    assert story.title == "Sierra"
+    assert [section.title for section in story.sections] == ["Sierra", "Customers", "Method"]
+
+
+def test_sections_are_laid_out_while_the_input_is_read(monkeypatch):
+    read = []
+
+    def lines():
+        for line in DOCUMENT.splitlines():
+            read.append(line)
+            yield line
+
+    laid_out_after = []
+    record_section = report_engine.record_section
+
+    def recording(section, *args):
+        laid_out_after.append(len(read))
+        return record_section(section, *args)
+
+    monkeypatch.setattr(report_engine, 'record_section', recording)
+    summary = markdown_report.render_markdown(lines(), io.BytesIO(), cache=False)
+    assert [title for title, _, _ in summary] == ["Sierra", "Customers", "Method"]
+    # Each section is laid out once the heading after it is read, not after the whole input
+    assert laid_out_after[:2] == [DOCUMENT.splitlines().index("## Customers") + 1,
+                                  DOCUMENT.splitlines().index("## Method") + 1]
+
+
+def test_streamed_sections_are_dropped():
+    story = markdown_report.Story()
+    for section in markdown_report.story_sections(story, DOCUMENT.splitlines(), keep=False):
+        assert section.blocks
+    assert story.sections == [None, None, None]
+
+
+def test_links_reach_the_pdf():
+    output = io.BytesIO()
+    markdown_report.render_markdown(io.StringIO(DOCUMENT), output, cache=False)
+    pages = PdfReader(io.BytesIO(output.getvalue())).pages
+    uris = [annotation.get_object()['/A']['/URI'] for page in pages for annotation in page.get('/Annots', [])]
+    assert uris == ['https://sierra.ai']
@@ -0,0 +1,38 @@
+"""Tests for the implied per-resolution price solver"""
+
+import numpy as np
+
+import pricing_solver
+from sierra_data import load_dataset
+
+
+def _brute_force_fractions(solved, k):
+    """Consistent fee-fraction range from the full volume x containment x fee-fraction grid"""
+    low, high = solved.avoided_cost
+    cost = solved.fee[k][..., None] / solved.fee_fraction
+    usable = ((cost >= low) & (cost <= high)).any(axis=(0, 1))
+    if not usable.any():
+        return None
+    return float(solved.fee_fraction[usable].min()), float(solved.fee_fraction[usable].max())
+
+
+def test_fee_fraction_range_matches_the_full_grid():
+    rng = np.random.default_rng(7)
+    lows = rng.uniform(1e3, 2e6, 40)
+    volumes = np.column_stack([lows, lows * rng.uniform(1, 20, 40)])
+    # The last target needs a fee above any $10-$20 avoided cost
+    targets = np.append(rng.uniform(5e4, 2e7, 39), 5e9)
+    volumes[-1] = (1e3, 2e3)
+    solved = pricing_solver.solve(targets, volumes, (30, 20, 50))
+    results = [solved.fee_fraction_range(k) for k in range(len(targets))]
+    assert results == [_brute_force_fractions(solved, k) for k in range(len(targets))]
+    assert None in results and any(results)
+    assert solved.points == 40 * 30 * 20
+
+
+def test_scenario_rows_are_kept_per_dataset():
+    dataset = load_dataset()
+    rows = pricing_solver.scenario_table_rows(dataset)
+    assert pricing_solver.scenario_table_rows(dataset) is rows
+    assert len(rows) == 1 + len(pricing_solver.customer_targets(dataset))
+    assert all(len(row) == len(rows[0]) for row in rows)
@@ -0,0 +1,59 @@
+"""Tests for dollar-figure redaction of stories and rendered reports"""
+
+import importlib
+import io
+import re
+
+import pytest
+from pypdf import PdfReader
+
+import sierra_analysis
+from report_story import Story, dollar_figures, redact_story, redact_text
+
+forensic = importlib.import_module('Sierra_AI_Forensic_Financial_Analysis_100M_ARR')
+
+# Anything that still reads as an amount once the PDF text is extracted
+_LEAK = re.compile(r'\$\s?\d')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("ARR ($35M)", "ARR ([redacted])"),
+    ("$5 million to $7.5 million ACV for Rocket Mortgage", "[redacted] to [redacted] ACV for Rocket Mortgage"),
+    ("$1 million to $3 million", "[redacted] to [redacted]"),
+    ("~$26M total, >$1.5B valuation", "[redacted] total, [redacted] valuation"),
+    ("$50K-$200K per seat, $1-3M per deal", "[redacted] per seat, [redacted] per deal"),
+    ("$1,250,000.50 a year", "[redacted] a year"),
+    ("40% of 2024 revenue", "40% of 2024 revenue"),
+])
+def test_redact_text_masks_every_form_of_amount(text, expected):
+    assert redact_text(text) == expected
+    assert dollar_figures(expected) == []
+
+
+def test_redact_story_covers_every_text_block():
+    story = Story(title="Sierra $100M ARR")
+    story.heading('heading', "ARR ($35M)", 1)
+    story.paragraph('body', "<b>$5 million</b> ACV")
+    story.preformatted('code', "arr = $7M")
+    story.table('grid', [["Customer", "ACV ($M)"], ["Acme", "$2.5M"]], [100, 100])
+    story.page_break()
+    story.long_table('grid', [["Range"], ["$1 million to $3 million"]], [200])
+    story.chart('bars', (('Enterprise', 35.0),), 100, 100)
+
+    assert redact_story(story) is story
+    assert story.redacted
+    assert story.title == "Sierra [redacted] ARR"
+    blocks = [block for section in story.sections for block in section.blocks]
+    assert not any(block[0] == 'chart' for block in blocks)
+    assert not dollar_figures(repr(blocks))
+
+
+@pytest.mark.parametrize('module', [sierra_analysis, forensic], ids=['analysis', 'forensic'])
+def test_redacted_build_has_no_dollar_figures(module):
+    reader = PdfReader(io.BytesIO(module.pdf_bytes(redacted=True, cache=False)))
+    text = '\n'.join(page.extract_text() for page in reader.pages)
+    assert not _LEAK.findall(text)
+    assert not _LEAK.search(reader.metadata.title)
+
+    unredacted = PdfReader(io.BytesIO(module.pdf_bytes(cache=False)))
+    assert _LEAK.search(unredacted.pages[0].extract_text() + unredacted.metadata.title)
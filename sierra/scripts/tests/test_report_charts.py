@@ -0,0 +1,62 @@
+"""Tests for chart drawings, their cache and the fonts they are drawn in"""
+
+import importlib
+import io
+
+import pytest
+from pypdf import PdfReader
+from reportlab.graphics.shapes import String
+
+import report_charts
+import sierra_analysis
+from report_profiles import PROFILES, profile_fonts
+
+forensic = importlib.import_module('Sierra_AI_Forensic_Financial_Analysis_100M_ARR')
+
+BAR = ("ARR by segment", ("Enterprise", "Mid-market"), (35.0, (10.0, 20.0)))
+
+
+def _strings(drawing):
+    return [shape for shape in drawing.contents if isinstance(shape, String)]
+
+
+def test_drawing_cache_is_keyed_on_fonts():
+    cache = report_charts.DrawingCache()
+    fonts = profile_fonts(PROFILES['archive'])
+    standard = report_charts.chart_drawing('bar', BAR, 300, 200, cache)
+    assert report_charts.chart_drawing('bar', BAR, 300, 200, cache) is standard
+    embedded = report_charts.chart_drawing('bar', BAR, 300, 200, cache, fonts)
+    assert embedded is not standard
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert {string.fontName for string in _strings(standard)} == {'Helvetica', 'Helvetica-Bold'}
+    assert {string.fontName for string in _strings(embedded)} == {fonts['Helvetica'], fonts['Helvetica-Bold']}
+    assert embedded.initialFontName == fonts['Helvetica']
+
+
+def test_lru_evicts_the_least_recently_used_drawing():
+    cache = report_charts.DrawingCache(max_entries=2)
+    first = cache.get('a', object)
+    cache.get('b', object)
+    assert cache.get('a', object) is first
+    cache.get('c', object)
+    assert len(cache) == 2
+    assert cache.get('a', object) is first
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def _fonts(data):
+    """{base font name: whether its program is embedded} over every page"""
+    fonts = {}
+    for page in PdfReader(io.BytesIO(data)).pages:
+        for font in (page['/Resources'].get('/Font') or {}).values():
+            font = font.get_object()
+            descriptor = font.get('/FontDescriptor')
+            fonts[font['/BaseFont']] = descriptor is not None and '/FontFile' in descriptor
+    return fonts
+
+
+@pytest.mark.parametrize('module', [sierra_analysis, forensic], ids=['analysis', 'forensic'])
+def test_archive_builds_embed_every_font(module):
+    fonts = _fonts(module.pdf_bytes(profile='archive', cache=False))
+    assert fonts and all(fonts.values()), fonts
+    assert '/Times-Roman' not in _fonts(module.pdf_bytes(cache=False))
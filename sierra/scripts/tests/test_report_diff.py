@@ -0,0 +1,95 @@
+"""Tests for page alignment in report_diff and for render_reports.publish"""
+
+import io
+import os
+
+from reportlab.pdfgen.canvas import Canvas
+
+import report_engine
+from render_reports import publish
+from report_diff import _pypdf_pages, diff_pdfs, read_pages, same_pages
+from report_story import Story, inch, letter
+
+STYLE_SPECS = {'body': ('DiffBody', 'Normal', dict(fontSize=10))}
+MARGINS = dict(leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch)
+
+
+def _pdf(pages, compression=1):
+    """PDF with one page per string, showing it"""
+    buffer = io.BytesIO()
+    canv = Canvas(buffer, invariant=1, pageCompression=compression)
+    for text in pages:
+        canv.drawString(72, 720, text)
+        canv.showPage()
+    canv.save()
+    return buffer.getvalue()
+
+
+PAGES = [f"Page {n}" for n in range(1, 9)]
+
+
+def test_inserted_page_is_one_addition():
+    result = diff_pdfs(_pdf(PAGES), _pdf(PAGES[:2] + ["Inserted"] + PAGES[2:]))
+    assert (result.added, result.removed, result.changed) == ([3], [], [])
+    assert len(result.unchanged) == len(PAGES)
+    assert (3, 4) in result.unchanged
+
+
+def test_removed_and_changed_pages():
+    result = diff_pdfs(_pdf(PAGES), _pdf(PAGES[:1] + PAGES[2:5] + ["Page 6, revised"] + PAGES[6:]))
+    assert result.removed == [2]
+    assert result.changed == [(6, 5, 'text')]
+    assert result.as_dict()['unchanged'] == 6
+
+
+def test_compression_does_not_count_as_a_change():
+    assert same_pages(_pdf(PAGES, compression=1), _pdf(PAGES, compression=0))
+    assert not same_pages(_pdf(PAGES), _pdf(PAGES[::-1]))
+
+
+def _linked_pdf(url, target_page):
+    """Two pages, the first linking to url and to the top of target_page"""
+    buffer = io.BytesIO()
+    canv = Canvas(buffer, invariant=1)
+    for number in (1, 2):
+        canv.bookmarkPage(f"page{number}")
+        canv.drawString(72, 720, f"Page {number}")
+        if number == 1:
+            canv.linkURL(url, (72, 700, 200, 712), relative=1)
+            canv.linkAbsolute("Top", f"page{target_page}", (72, 680, 200, 692))
+        canv.showPage()
+    canv.save()
+    return buffer.getvalue()
+
+
+def test_link_targets_are_part_of_the_page():
+    base = _linked_pdf('https://sierra.ai', 1)
+    assert same_pages(base, _linked_pdf('https://sierra.ai', 1))
+    assert diff_pdfs(base, _linked_pdf('https://sierra.ai/customers', 1)).changed == [(1, 1, 'links')]
+    assert diff_pdfs(base, _linked_pdf('https://sierra.ai', 2)).changed == [(1, 1, 'links')]
+    # The direct reader and pypdf agree on what a page links to
+    direct, parsed = read_pages(base), _pypdf_pages(io.BytesIO(base))
+    assert [page.digest.content for page in direct] == [page.digest.content for page in parsed]
+
+
+def _report(profile):
+    story = Story(title="Publish")
+    story.paragraph('body', "Unchanged content")
+    buffer = io.BytesIO()
+    report_engine.render_story(story, buffer, 'test-publish', STYLE_SPECS, {}, dict(pagesize=letter, **MARGINS),
+                               cache=False, profile=profile)
+    return buffer.getvalue()
+
+
+def test_publish_keeps_only_files_from_the_same_profile(tmp_path):
+    output = str(tmp_path / 'report.pdf')
+    assert publish(_report('standard'), output) == (None, False)
+    os.utime(output, (0, 0))
+    assert publish(_report('standard'), output) == (0, True)
+    assert os.path.getmtime(output) == 0
+
+    small = _report('small')
+    assert publish(small, output) == (0, False)
+    with open(output, 'rb') as f:
+        assert f.read() == small
+    assert publish(small, output) == (0, True)
@@ -0,0 +1,145 @@
+"""Tests for the shared style registry and section renderer in report_engine"""
+
+import io
+
+from pypdf import PdfReader
+from reportlab.lib import colors
+from reportlab.platypus import PageBreak, SimpleDocTemplate
+
+import report_engine
+from report_story import Story, banded_table, inch, letter
+
+STYLE_SPECS = {
+    'body': ('TestBody', 'Normal', dict(fontSize=10, textColor='darkblue')),
+    'heading': ('TestHeading', 'Heading2', dict(fontSize=14, fontName='Helvetica-Bold')),
+}
+TABLE_SPECS = {'grid': banded_table('darkblue', 9, 8, body_bg='beige')}
+MARGINS = dict(leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch)
+
+
+def test_paragraph_styles_are_built_once_per_namespace():
+    styles = report_engine.paragraph_styles('test-registry', STYLE_SPECS)
+    assert report_engine.paragraph_styles('test-registry', STYLE_SPECS) is styles
+    assert styles['body'].textColor == colors.darkblue
+    assert styles['heading'].parent is report_engine.base_stylesheet()['Heading2']
+
+
+def test_namespaces_keep_their_own_attributes():
+    other = {'body': ('TestBody', 'Normal', dict(fontSize=12))}
+    first = report_engine.paragraph_styles('test-first', STYLE_SPECS)
+    second = report_engine.paragraph_styles('test-second', other)
+    assert (first['body'].fontSize, second['body'].fontSize) == (10, 12)
+
+
+def test_table_themes_resolve_colour_names():
+    themes = report_engine.table_styles('test-themes', TABLE_SPECS)
+    assert report_engine.table_styles('test-themes', TABLE_SPECS) is themes
+    background = next(command for command in themes['grid'].getCommands() if command[0] == 'BACKGROUND')
+    assert background[3] == colors.darkblue
+
+
+def test_reset_registry_rebuilds_styles():
+    styles = report_engine.paragraph_styles('test-reset', STYLE_SPECS)
+    report_engine.reset_registry()
+    assert report_engine.paragraph_styles('test-reset', STYLE_SPECS) is not styles
+
+
+def _link_story(extra=None):
+    story = Story(title="Links")
+    story.heading('heading', '<a name="top"/>Links', 1)
+    story.paragraph('body', 'See <link href="https://sierra.ai" color="blue">Sierra</link> '
+                            'or go back to <link href="#top">the top</link>.')
+    story.page_break()
+    story.paragraph('body', 'Second page without links.')
+    if extra:
+        story.paragraph('body', extra)
+    return story
+
+
+def _render(story, cache=False):
+    """(PDF bytes, render_story summary)"""
+    buffer = io.BytesIO()
+    summary = report_engine.render_story(story, buffer, 'test-links', STYLE_SPECS, TABLE_SPECS,
+                                         dict(pagesize=letter, **MARGINS), cache=cache)
+    return buffer.getvalue(), summary
+
+
+def _annotations(data):
+    return [[annotation.get_object() for annotation in page.get('/Annots', [])]
+            for page in PdfReader(io.BytesIO(data)).pages]
+
+
+def test_links_survive_section_replay():
+    pages = _annotations(_render(_link_story())[0])
+    assert [len(page) for page in pages] == [2, 0]
+    url, internal = pages[0]
+    assert url['/A']['/URI'] == 'https://sierra.ai'
+    assert '/Dest' in internal
+
+
+def test_links_match_a_direct_platypus_build():
+    story = _link_story()
+    styles = report_engine.paragraph_styles('test-links', STYLE_SPECS)
+    tables = report_engine.table_styles('test-links', TABLE_SPECS)
+    flowables = []
+    for section in story.sections:
+        flowables += report_engine.build_flowables(section.blocks, styles, tables) + [PageBreak()]
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter, **MARGINS).build(flowables[:-1])
+
+    def rects(data):
+        return [[list(annotation['/Rect']) for annotation in page] for page in _annotations(data)]
+
+    assert rects(_render(story)[0]) == rects(buffer.getvalue())
+
+
+def test_cached_sections_give_identical_bytes(tmp_path):
+    first, summary = _render(_link_story(), report_engine.SectionCache(str(tmp_path)))
+    assert [hit for _, hit, _ in summary] == [False, False]
+    second, summary = _render(_link_story(), report_engine.SectionCache(str(tmp_path)))
+    assert [hit for _, hit, _ in summary] == [True, True]
+    assert second == first
+    assert _render(_link_story())[0] == first
+
+
+def test_only_changed_sections_are_laid_out_again():
+    cache = report_engine.SectionCache()
+    _render(_link_story(), cache)
+    _, summary = _render(_link_story(extra="An extra paragraph on the second page."), cache)
+    assert [hit for _, hit, _ in summary] == [True, False]
+
+
+def _page_texts(data):
+    return [page.extract_text() for page in PdfReader(io.BytesIO(data)).pages]
+
+
+def test_streaming_table_repeats_the_header_and_keeps_every_row():
+    story = Story()
+    story.long_table('grid', [('Customer', 'ARR')] + [(f'row-{i:03d}', f'{i}\nlines') for i in range(240)],
+                     (3 * inch, 2 * inch))
+    texts = _page_texts(_render(story)[0])
+    assert len(texts) > 2
+    assert all(text.startswith('Customer\nARR\n') for text in texts)
+    rows = [line for text in texts for line in text.splitlines() if line.startswith('row-')]
+    assert rows == [f'row-{i:03d}' for i in range(240)]
+
+
+def test_table_of_contents_points_at_the_pages_headings_land_on():
+    story = Story()
+    story.heading('heading', 'Contents', 1)
+    story.toc('grid', (4 * inch, 1 * inch), max_level=2)
+    for chapter in range(6):
+        story.page_break()
+        story.heading('heading', f'Chapter {chapter}', 1)
+        rows = [('Item', 'Value')] + [(f'c{chapter}-{i}', str(i)) for i in range(25 + 30 * chapter)]
+        story.long_table('grid', rows, (3 * inch, 2 * inch))
+        story.heading('heading', f'Notes {chapter}', 2)
+    texts = _page_texts(_render(story)[0])
+
+    lines = texts[0].splitlines()
+    cells = lines[lines.index('Page') + 1:]
+    entries = list(zip(cells[::2], cells[1::2]))
+    assert [title for title, _ in entries] == [text for _, _, text in story.headings()][1:]
+    for title, page in entries:
+        assert title in texts[int(page) - 1].splitlines()
+    assert entries[-1] == ('Notes 5', str(len(texts)))
@@ -0,0 +1,60 @@
+"""Tests for incremental updates and search in report_index"""
+
+import os
+
+from reportlab.pdfgen.canvas import Canvas
+
+import report_index
+
+
+def _write_pdf(path, *pages):
+    canvas = Canvas(str(path), invariant=1)
+    for text in pages:
+        canvas.drawString(72, 720, text)
+        canvas.showPage()
+    canvas.save()
+
+
+def test_updates_only_extract_new_and_changed_reports(tmp_path):
+    root, directory = tmp_path / 'repo', str(tmp_path / 'index')
+    (root / 'reports').mkdir(parents=True)
+    _write_pdf(root / 'reports' / 'sierra.pdf', 'SiriusXM containment rate', 'Outcome based pricing for retail')
+    _write_pdf(root / 'gemini.pdf', 'Gemini Flash token pricing')
+
+    index = report_index.ReportIndex(directory, root=str(root))
+    result = index.update()
+    assert sorted(result.extracted) == ['gemini.pdf', os.path.join('reports', 'sierra.pdf')]
+    assert index.page_count == 3
+    [hit] = index.search('siriusxm containment')
+    assert (hit.path, hit.page) == (os.path.join('reports', 'sierra.pdf'), 1)
+    assert [hit.page for hit in index.search('"based pricing"')] == [2]
+    assert index.search('"pricing based"') == []
+
+    result = report_index.ReportIndex(directory, root=str(root)).update()
+    assert (result.extracted, result.touched, result.unchanged, result.changed) == ([], [], 2, False)
+
+    stat = os.stat(root / 'gemini.pdf')
+    os.utime(root / 'gemini.pdf', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.stale() == ['gemini.pdf']
+    result = index.update()
+    assert (result.extracted, result.touched) == ([], ['gemini.pdf'])
+    assert index.stale() == []
+
+    _write_pdf(root / 'gemini.pdf', 'Gemini Pro long context pricing')
+    (root / 'reports' / 'sierra.pdf').unlink()
+    result = index.update()
+    assert (result.extracted, result.removed) == (['gemini.pdf'], [os.path.join('reports', 'sierra.pdf')])
+    assert index.page_count == 1 and index.search('siriusxm') == []
+    assert [hit.path for hit in report_index.ReportIndex(directory, root=str(root)).search('long context')] == [
+        'gemini.pdf']
+
+
+def test_queries_with_apostrophes_and_stray_quotes(tmp_path):
+    root = tmp_path / 'repo'
+    root.mkdir()
+    _write_pdf(root / 'sierra.pdf', "Sierra's containment rate at SiriusXM", 'Containment by segment')
+    index = report_index.ReportIndex(str(tmp_path / 'index'), root=str(root))
+    index.update()
+    assert [hit.page for hit in index.search("Sierra's containment")] == [1]
+    assert [hit.page for hit in index.search('"sierra\'s containment" siriusxm')] == [1]
+    assert sorted(hit.page for hit in index.search('"containment')) == [1, 2]
@@ -0,0 +1,56 @@
+"""Tests for the output profiles render_story writes with"""
+
+import io
+
+import pytest
+from pypdf import PdfReader
+
+import batch_render
+import report_engine
+import report_profiles
+from report_story import Story, banded_table, inch, letter
+
+STYLE_SPECS = {'body': ('ProfileBody', 'Normal', {})}
+TABLE_SPECS = {'grid': banded_table('darkblue', 9)}
+
+
+def _render(profile):
+    story = Story()
+    story.paragraph('body', 'Outcome-based pricing ' * 200)
+    story.page_break()
+    story.table('grid', [('Segment', 'ARR'), ('Fintech', '$35M')], (2 * inch, 2 * inch))
+    buffer = io.BytesIO()
+    report_engine.render_story(story, buffer, 'test-profiles', STYLE_SPECS, TABLE_SPECS,
+                               dict(pagesize=letter, leftMargin=inch, rightMargin=inch, topMargin=inch,
+                                    bottomMargin=inch), cache=False, profile=profile)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('name', sorted(report_profiles.PROFILES))
+def test_profiles_mark_their_output_and_keep_the_layout(name):
+    profile = report_profiles.PROFILES[name]
+    data = _render(name)
+    assert report_profiles.pdf_profile(data) == name
+    assert (b'/FlateDecode' in data) == profile.page_compression
+    assert (b'/ASCII85Decode' in data) == profile.ascii85
+    assert (b'/FontFile' in data) == profile.embed_fonts
+    reader = PdfReader(io.BytesIO(data))
+    assert len(reader.pages) == 2
+    assert reader.pages[1].extract_text().split() == ['Segment', 'ARR', 'Fintech', '$35M']
+    # Embedded fonts use the same metrics, so lines break in the same places
+    standard = PdfReader(io.BytesIO(_render('standard'))).pages[0].extract_text()
+    assert reader.pages[0].extract_text().splitlines() == standard.splitlines()
+
+
+def test_unknown_profiles_and_unmarked_files():
+    with pytest.raises(ValueError, match='Unknown output profile'):
+        report_profiles.resolve_profile('tiny')
+    assert report_profiles.resolve_profile(None).name == report_profiles.DEFAULT_PROFILE
+    assert report_profiles.pdf_profile(b'%PDF-1.4 /Creator (ReportLab PDF Library)') is None
+
+
+def test_batch_workers_build_the_styles_of_their_profiles():
+    report_engine.reset_registry()
+    batch_render.init_worker(['analysis'], ('archive',))
+    assert 'analysis+archive' in report_engine._paragraph_styles
+    assert 'analysis+archive' in report_engine._table_styles
@@ -0,0 +1,85 @@
+"""Tests for request coalescing, cancellation and the byte-bounded LRU in report_service"""
+
+import asyncio
+import threading
+
+import pytest
+
+import report_service
+from report_service import ByteLRU, ReportService
+
+VARIANT = ('analysis', 'letter', 'all', 'full')
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """(variants rendered so far, event each render waits for)"""
+    calls = []
+    release = threading.Event()
+
+    def render_pdf(variant, date):
+        calls.append(variant)
+        release.wait(5)
+        return b'%PDF ' + repr(variant).encode('ascii')
+
+    monkeypatch.setattr(report_service, 'render_pdf', render_pdf)
+    return calls, release
+
+
+def _stats(service):
+    return service.stats['/reports/analysis.pdf']
+
+
+def test_concurrent_requests_share_one_render(renders):
+    renders, release = renders
+    service = ReportService(jobs=1)
+
+    async def scenario():
+        stats = _stats(service)
+        requests = [asyncio.create_task(service.pdf(VARIANT, stats)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*requests)
+        return results, await service.pdf(VARIANT, stats)
+
+    results, cached = asyncio.run(scenario())
+    assert len(set(results)) == 1 and cached == results[0]
+    assert len(renders) == 1
+    stats = _stats(service)
+    assert (stats.renders, stats.coalesced, stats.cache_hits, stats.queue_depth) == (1, 2, 1, 0)
+
+
+def test_cancelled_render_does_not_strand_coalesced_requests(renders):
+    renders, release = renders
+    service = ReportService(jobs=1)
+
+    async def scenario():
+        stats = _stats(service)
+        first = asyncio.create_task(service.pdf(VARIANT, stats))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(service.pdf(VARIANT, stats))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.wait_for(second, 5)
+
+    assert asyncio.run(scenario()).startswith(b'%PDF')
+    assert len(renders) == 2
+    assert not service._inflight
+    assert _stats(service).queue_depth == 0
+
+
+def test_byte_lru_evicts_least_recently_used_entries():
+    cache = ByteLRU(10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234'
+    cache.put('c', b'1234')
+    assert (cache.get('b'), len(cache), cache.size) == (None, 2, 8)
+    cache.put('huge', b'x' * 11)
+    assert cache.get('huge') is None and cache.get('a') is not None
+    cache.put('a', b'12345678')
+    assert (cache.get('c'), cache.size) == (None, 8)
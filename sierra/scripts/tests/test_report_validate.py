@@ -0,0 +1,48 @@
+"""Tests for the validate-only mode that checks stories without reportlab"""
+
+import pytest
+
+import report_validate
+from render_reports import discover_generators
+from report_story import Story, banded_table, inch, letter, validate_story
+
+STYLE_SPECS = {'body': ('Body', 'Normal', {}), 'heading': ('Heading', 'Heading2', {})}
+TABLE_SPECS = {'grid': banded_table('darkblue', 9)}
+PAGE_SETUP = dict(pagesize=letter, leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch)
+
+
+def _story():
+    story = Story()
+    story.heading('heading', '1. Revenue', 1)
+    story.heading('heading', '1.1 Segments', 2)
+    story.paragraph('body', 'Total <b>ARR</b> is $100M.')
+    story.table('grid', [('Segment', 'ARR'), ('Fintech', '$35M')], (2 * inch, 2 * inch))
+    story.heading('heading', '2. Customers', 1)
+    return story
+
+
+def test_a_well_formed_story_has_no_problems():
+    assert validate_story(_story(), STYLE_SPECS, TABLE_SPECS, PAGE_SETUP) == []
+
+
+def test_problems_name_the_section_and_block():
+    story = _story()
+    story.heading('heading', '4. Risks', 1)
+    story.paragraph('caption', 'Unclosed <i>markup')
+    story.table('banded', [('Segment', 'ARR'), ('Fintech',)], (2 * inch, 2 * inch))
+    story.chart('bar', (), 9 * inch, 2 * inch)
+    problems = validate_story(story, STYLE_SPECS, TABLE_SPECS, PAGE_SETUP)
+    assert len(problems) == 6
+    assert all(problem.startswith('Section 1 (1. Revenue), block ') for problem in problems)
+    assert "'4. Risks' is out of order: expected number 3" in problems[0]
+    assert "style 'caption' is not in the report's STYLE_SPECS" in problems[1]
+    assert '<i> is never closed' in problems[2]
+    assert "table theme 'banded'" in problems[3] and 'row 2 has 1 cells for 2 columns' in problems[4]
+    assert 'bar chart is 648x144pt' in problems[5]
+
+
+@pytest.mark.parametrize('key', sorted(discover_generators()))
+def test_generators_validate_without_importing_reportlab(key):
+    entry = report_validate.run_validation(key, discover_generators()[key], budget=60)
+    assert entry['status'] == 'ok', entry
+    assert entry['problems'] == [] and entry['reportlab'] is False
@@ -0,0 +1,34 @@
+"""Tests for the lazily loaded Sierra dataset store"""
+
+import os
+import subprocess
+import sys
+
+import sierra_data
+
+
+def test_tables_are_read_on_first_access():
+    dataset = sierra_data.Dataset()
+    assert dataset.loaded_tables() == []
+    segments = dataset.segments
+    assert dataset.loaded_tables() == ['segments']
+    assert dataset.segments is segments
+    assert sum(tier.arr_m for tier in segments) == 100
+    assert isinstance(segments[0].contracts, int) and isinstance(segments[0].acv_low_m, float)
+
+
+def test_customer_queries():
+    dataset = sierra_data.load_dataset()
+    assert sierra_data.load_dataset() is dataset
+    grouped = dataset.customers_by_sector('fintech')
+    assert sum(map(len, grouped.values())) == sum(c.segment == 'fintech' for c in dataset.customers)
+    assert all(study.segment == 'healthcare' for study in dataset.case_studies_for('healthcare'))
+    assert sierra_data.format_millions(7.5) == '$7.5M' and sierra_data.format_millions(35.0) == '$35M'
+
+
+def test_querying_the_data_does_not_import_reportlab():
+    code = ("import sys, sierra_data; sierra_data.load_dataset().customers; "
+            "print('reportlab' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(sierra_data.__file__))
+    assert result.stdout.strip() == 'False'